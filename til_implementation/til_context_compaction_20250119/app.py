@@ -3,6 +3,7 @@
 from google.adk.apps import App
 from google.adk.apps.app import EventsCompactionConfig
 from context_compaction_agent import root_agent
+from context_compaction_agent.token_budget import TokenBudgetCompactionPlugin
 
 # Configure context compaction
 # This automatically summarizes conversation history to reduce token usage
@@ -13,11 +14,22 @@ compaction_config = EventsCompactionConfig(
     overlap_size=1,
 )
 
+# Token-budget compaction alongside the interval-based config:
+# compacts as soon as the estimated prompt size exceeds the budget
+# (e.g. after a huge tool response), however few interactions that took
+token_budget_compaction = TokenBudgetCompactionPlugin(
+    # Estimated prompt tokens that trigger a compaction
+    token_budget=8000,
+    # Compact down to ~50% of the budget so compactions are incremental
+    target_ratio=0.5,
+)
+
 # Create app with compaction enabled
 app = App(
     name="context_compaction_app",
     root_agent=root_agent,
     events_compaction_config=compaction_config,
+    plugins=[token_budget_compaction],
 )
 
 __all__ = ["app"]
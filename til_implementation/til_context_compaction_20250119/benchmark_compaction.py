@@ -0,0 +1,197 @@
+"""Replay a synthetic long conversation and measure token-budget compaction.
+
+Builds a 500-turn conversation (chit-chat, longer questions, and periodic
+tool calls with large JSON responses) in an InMemorySessionService and runs
+TokenBudgetCompactionPlugin after every turn, exactly as the Runner would.
+Summaries come from a deterministic local summarizer, so no API key is
+needed.
+
+Reports, per turn, the estimated prompt size with and without compaction
+and the compaction cost (estimated summarizer input tokens).
+
+Usage:
+  python benchmark_compaction.py --turns 500 --budget 8000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from google.adk.apps.base_events_summarizer import BaseEventsSummarizer
+from google.adk.events.event import Event
+from google.adk.events.event_actions import EventActions, EventCompaction
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from context_compaction_agent.token_budget import (
+    TokenBudgetCompactionPlugin,
+    estimate_content_tokens,
+)
+
+AGENT = "context_compaction_agent"
+WORDS = (
+    "agent session context token summary tool event compaction prompt model "
+    "budget history response request latency cost window overlap"
+).split()
+
+
+class LocalSummarizer(BaseEventsSummarizer):
+  """Deterministic summarizer: keeps a bounded digest of the events."""
+
+  def __init__(self, max_chars: int = 1200):
+    self.max_chars = max_chars
+
+  async def maybe_summarize_events(self, *, events: list[Event]):
+    lines = []
+    for event in events:
+      for part in (event.content.parts if event.content else None) or []:
+        if part.text:
+          lines.append(f"{event.author}: {part.text[:80]}")
+        if part.function_call:
+          lines.append(f"called {part.function_call.name}")
+    digest = "\n".join(lines)[-self.max_chars:]
+    return Event(
+        author="user",
+        actions=EventActions(
+            compaction=EventCompaction(
+                start_timestamp=events[0].timestamp,
+                end_timestamp=events[-1].timestamp,
+                compacted_content=types.Content(
+                    role="model", parts=[types.Part(text=digest)]
+                ),
+            )
+        ),
+    )
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+  return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def synthetic_turn(rng: random.Random, turn: int, clock: list) -> list[Event]:
+  """Events for one user turn; every 7th turn calls a tool with a big payload."""
+
+  def event(author, *parts):
+    clock[0] += 0.001
+    return Event(
+        author=author,
+        invocation_id=f"turn-{turn}",
+        content=types.Content(
+            role="user" if author == "user" else "model", parts=list(parts)
+        ),
+        timestamp=clock[0],
+    )
+
+  words = rng.choice([5, 12, 40]) if turn % 3 else 120
+  events = [event("user", types.Part(text=_sentence(rng, words)))]
+
+  if turn % 7 == 0:
+    rows = [
+        {"id": i, "title": _sentence(rng, 6), "score": rng.random()}
+        for i in range(rng.choice([50, 150, 400]))
+    ]
+    events.append(
+        event(
+            AGENT,
+            types.Part(
+                function_call=types.FunctionCall(
+                    name="search_docs", args={"query": _sentence(rng, 4)}
+                )
+            ),
+        )
+    )
+    events.append(
+        event(
+            AGENT,
+            types.Part(
+                function_response=types.FunctionResponse(
+                    name="search_docs", response={"rows": rows}
+                )
+            ),
+        )
+    )
+
+  events.append(event(AGENT, types.Part(text=_sentence(rng, rng.choice([20, 60])))))
+  return events
+
+
+async def run(turns: int, budget: int, seed: int) -> dict:
+  rng = random.Random(seed)
+  clock = [time.time()]
+  service = InMemorySessionService()
+  session = await service.create_session(app_name="bench", user_id="bench")
+  plugin = TokenBudgetCompactionPlugin(
+      token_budget=budget, summarizer=LocalSummarizer()
+  )
+
+  uncompacted = 0
+  rows = []
+  for turn in range(1, turns + 1):
+    for event in synthetic_turn(rng, turn, clock):
+      await service.append_event(session=session, event=event)
+      uncompacted += estimate_content_tokens(event.content)
+
+    start = time.perf_counter()
+    compacted = await plugin.compact_session(session, service) is not None
+    overhead_ms = (time.perf_counter() - start) * 1000
+
+    rows.append({
+        "turn": turn,
+        "uncompacted_tokens": uncompacted,
+        "prompt_tokens": plugin.estimate_prompt_tokens(session.events),
+        "compaction_input_tokens": (
+            plugin.compactions[-1]["summarizer_input_tokens"] if compacted else 0
+        ),
+        "policy_ms": overhead_ms,
+        "compacted": compacted,
+    })
+
+  return {"rows": rows, "compactions": sum(row["compacted"] for row in rows)}
+
+
+def report(result: dict, budget: int) -> None:
+  rows = result["rows"]
+  compactions = result["compactions"]
+
+  print(f"📊 Token-budget compaction, budget {budget} tokens\n")
+  print(f"{'turn':>6}{'no compaction':>16}{'with budget':>14}{'compaction cost':>18}")
+  for row in rows:
+    if row["turn"] % 50 == 0 or row["turn"] == 1:
+      print(
+          f"{row['turn']:>6}{row['uncompacted_tokens']:>16}"
+          f"{row['prompt_tokens']:>14}{row['compaction_input_tokens']:>18}"
+      )
+
+  prompt = [row["prompt_tokens"] for row in rows]
+  cost = [row["compaction_input_tokens"] for row in rows]
+  policy_ms = [row["policy_ms"] for row in rows]
+  tail = prompt[-100:]
+  print()
+  print(f"Max prompt tokens:             {max(prompt)}")
+  print(f"Mean prompt tokens (last 100): {sum(tail) / len(tail):.0f}")
+  print(f"Compactions:                   {compactions}")
+  if compactions:
+    print(
+        "Mean compaction input tokens:  "
+        f"{sum(cost) / compactions:.0f}"
+    )
+  print(f"Compaction cost per turn:      {sum(cost) / len(rows):.0f} tokens")
+  print(
+      f"Policy overhead per turn:      {sum(policy_ms) / len(rows):.2f} ms"
+  )
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+  parser.add_argument("--turns", type=int, default=500)
+  parser.add_argument("--budget", type=int, default=8000)
+  parser.add_argument("--seed", type=int, default=7)
+  args = parser.parse_args()
+
+  result = asyncio.run(run(args.turns, args.budget, args.seed))
+  report(result, args.budget)
+
+
+if __name__ == "__main__":
+  main()
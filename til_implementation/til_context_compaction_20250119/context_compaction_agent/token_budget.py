@@ -0,0 +1,334 @@
+"""Token-budget-driven context compaction.
+
+`EventsCompactionConfig(compaction_interval=5, overlap_size=1)` compacts on a
+fixed invocation count: short chit-chat is summarized as often as huge tool
+outputs, and one giant tool response can still blow the context between two
+compactions.
+
+`TokenBudgetCompactionPlugin` compacts on size instead. After each
+invocation it estimates the prompt tokens of the session with a fast local
+estimator (no API call), and when the estimate exceeds the budget it folds
+the oldest events - together with the previous summary - into one new
+summary. The prompt stays roughly flat at one summary plus the most recent
+events, however long the conversation grows.
+
+Usage:
+
+  app = App(
+      name="my_app",
+      root_agent=root_agent,
+      plugins=[TokenBudgetCompactionPlugin(token_budget=8000)],
+  )
+"""
+
+import json
+import logging
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Optional
+
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.apps.base_events_summarizer import BaseEventsSummarizer
+from google.adk.apps.llm_event_summarizer import LlmEventSummarizer
+from google.adk.events.event import Event
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.sessions.base_session_service import BaseSessionService
+from google.adk.sessions.session import Session
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+# Average characters per token for prose and for JSON payloads. JSON
+# tokenizes worse than prose (quotes, braces, keys), so tool payloads are
+# weighted up relative to their character count.
+TEXT_CHARS_PER_TOKEN = 4.0
+JSON_CHARS_PER_TOKEN = 3.0
+# Fixed cost of each part (role markers, part framing)
+PART_OVERHEAD_TOKENS = 4
+
+
+def estimate_text_tokens(text: str) -> int:
+  """Estimate the token count of plain text."""
+  return math.ceil(len(text) / TEXT_CHARS_PER_TOKEN)
+
+
+def _estimate_json_tokens(payload) -> int:
+  serialized = json.dumps(payload, default=str, separators=(",", ":"))
+  return math.ceil(len(serialized) / JSON_CHARS_PER_TOKEN)
+
+
+def estimate_content_tokens(content: Optional[types.Content]) -> int:
+  """Estimate the prompt tokens a Content contributes.
+
+  Text is counted at ~4 chars/token; function call arguments and function
+  response payloads are serialized to JSON and counted at ~3 chars/token.
+  """
+  if content is None or not content.parts:
+    return 0
+
+  tokens = 0
+  for part in content.parts:
+    tokens += PART_OVERHEAD_TOKENS
+    if part.text:
+      tokens += estimate_text_tokens(part.text)
+    if part.function_call:
+      tokens += estimate_text_tokens(part.function_call.name or "")
+      tokens += _estimate_json_tokens(part.function_call.args or {})
+    if part.function_response:
+      tokens += estimate_text_tokens(part.function_response.name or "")
+      tokens += _estimate_json_tokens(part.function_response.response or {})
+  return tokens
+
+
+def _compaction_of(event: Event):
+  """Return the event's compaction if it has a complete range, else None."""
+  compaction = event.actions.compaction if event.actions else None
+  if (
+      compaction is None
+      or compaction.start_timestamp is None
+      or compaction.end_timestamp is None
+      or compaction.compacted_content is None
+  ):
+    return None
+  return compaction
+
+
+def effective_events(events: list[Event]) -> list[Event]:
+  """Return the events that make up the prompt, oldest first.
+
+  Mirrors how ADK assembles the prompt: raw events inside a compacted range
+  are replaced by the summary, and a compaction whose range is contained in
+  a later one is superseded by it. Summaries are ordered by the start of
+  their range.
+  """
+  compactions = [
+      (i, c.start_timestamp, c.end_timestamp)
+      for i, event in enumerate(events)
+      if (c := _compaction_of(event)) is not None
+  ]
+  live = [
+      (i, start, end)
+      for i, start, end in compactions
+      if not any(
+          other_start <= start
+          and other_end >= end
+          and (other_start < start or other_end > end or j > i)
+          for j, other_start, other_end in compactions
+          if j != i
+      )
+  ]
+  live_indexes = {i for i, _, _ in live}
+
+  timeline = []
+  for i, event in enumerate(events):
+    if event.actions and event.actions.compaction:
+      if i in live_indexes:
+        timeline.append((event.actions.compaction.start_timestamp, i, event))
+      continue
+    if any(start <= event.timestamp <= end for _, start, end in live):
+      continue
+    timeline.append((event.timestamp, i, event))
+
+  timeline.sort(key=lambda item: (item[0], item[1]))
+  return [event for _, _, event in timeline]
+
+
+def _is_function_response(event: Event) -> bool:
+  return bool(event.get_function_responses())
+
+
+class TokenBudgetCompactionPlugin(BasePlugin):
+  """Compacts session history whenever its estimated size exceeds a budget.
+
+  Each compaction rolls the previous summary and the oldest raw events into
+  a single new summary, so only one summary is ever live.
+  """
+
+  def __init__(
+      self,
+      token_budget: int = 8000,
+      target_ratio: float = 0.5,
+      retain_recent_tokens: Optional[int] = None,
+      summarizer: Optional[BaseEventsSummarizer] = None,
+      max_records: int = 100,
+      max_cached_events: int = 10_000,
+      name: str = "token_budget_compaction",
+  ):
+    """Initialize the plugin.
+
+    Args:
+      token_budget: Estimated prompt tokens that trigger a compaction.
+      target_ratio: Compact until the estimate is below
+        token_budget * target_ratio, so compactions are incremental rather
+        than every turn.
+      retain_recent_tokens: Most recent events kept raw, by estimated tokens
+        (defaults to a quarter of the budget). The newest event is always
+        kept, so a giant tool response is summarized as soon as a later
+        event exists.
+      summarizer: Summarizer for compacted events (defaults to an
+        LlmEventSummarizer on the agent's model).
+      max_records: Most recent compaction records kept in `compactions`.
+      max_cached_events: Per-event token estimates kept (least recently
+        used are dropped and re-estimated if seen again).
+      name: Plugin name.
+    """
+    super().__init__(name=name)
+    if token_budget <= 0:
+      raise ValueError("token_budget must be positive")
+    if not 0 < target_ratio < 1:
+      raise ValueError("target_ratio must be between 0 and 1")
+
+    self.token_budget = token_budget
+    self.target_ratio = target_ratio
+    self.retain_recent_tokens = (
+        retain_recent_tokens
+        if retain_recent_tokens is not None
+        else token_budget // 4
+    )
+    self.summarizer = summarizer
+    self.compactions: deque[dict] = deque(maxlen=max_records)
+    self.max_cached_events = max_cached_events
+    # Event ids are unique and events are immutable once appended, so an
+    # estimate stays valid for as long as it is cached.
+    self._token_cache: OrderedDict[str, int] = OrderedDict()
+
+  def estimate_event_tokens(self, event: Event) -> int:
+    """Estimate the prompt tokens one event contributes (cached by id)."""
+    cached = self._token_cache.get(event.id)
+    if cached is not None:
+      self._token_cache.move_to_end(event.id)
+      return cached
+
+    compaction = _compaction_of(event)
+    content = compaction.compacted_content if compaction else event.content
+    tokens = estimate_content_tokens(content)
+    self._token_cache[event.id] = tokens
+    if len(self._token_cache) > self.max_cached_events:
+      self._token_cache.popitem(last=False)
+    return tokens
+
+  def estimate_prompt_tokens(self, events: list[Event]) -> int:
+    """Estimate the prompt tokens of a session's history."""
+    return sum(
+        self.estimate_event_tokens(event) for event in effective_events(events)
+    )
+
+  def select_events_to_compact(self, events: list[Event]) -> list[Event]:
+    """Return the oldest prompt events to fold into a new summary.
+
+    Returns an empty list while the estimate is within budget.
+    """
+    live = effective_events(events)
+    tokens = [self.estimate_event_tokens(event) for event in live]
+    total = sum(tokens)
+    if total < self.token_budget:
+      return []
+
+    # Keep the newest events raw, up to retain_recent_tokens (at least one)
+    max_split = len(live) - 1
+    retained = tokens[-1]
+    while max_split > 0 and retained + tokens[max_split - 1] <= (
+        self.retain_recent_tokens
+    ):
+      max_split -= 1
+      retained += tokens[max_split]
+
+    target = self.token_budget * self.target_ratio
+    split = 0
+    removed = 0
+    while split < max_split and total - removed > target:
+      removed += tokens[split]
+      split += 1
+
+    # Never separate a function call from its response
+    while split < len(live) - 1 and _is_function_response(live[split]):
+      split += 1
+
+    selected = live[:split]
+    if not any(_compaction_of(event) is None for event in selected):
+      return []
+    return selected
+
+  def _summarizer_for(self, agent) -> BaseEventsSummarizer:
+    if self.summarizer is None:
+      self.summarizer = LlmEventSummarizer(llm=agent.canonical_model)
+    return self.summarizer
+
+  async def compact_session(
+      self,
+      session: Session,
+      session_service: BaseSessionService,
+      summarizer: Optional[BaseEventsSummarizer] = None,
+  ) -> Optional[Event]:
+    """Compact the session if it is over budget.
+
+    Returns:
+      The appended compaction event, or None if no compaction was needed.
+    """
+    summarizer = summarizer or self.summarizer
+    if summarizer is None:
+      raise ValueError("No summarizer configured")
+
+    selected = self.select_events_to_compact(session.events)
+    if not selected:
+      return None
+
+    # The previous summary is handed over as regular content so the new
+    # summary carries it forward; its timestamp makes the new range cover
+    # (and supersede) the previous one.
+    to_summarize = []
+    for event in selected:
+      compaction = _compaction_of(event)
+      if compaction is None:
+        to_summarize.append(event)
+        continue
+      to_summarize.append(
+          Event(
+              author=event.author,
+              invocation_id=event.invocation_id,
+              content=compaction.compacted_content,
+              timestamp=compaction.start_timestamp,
+          )
+      )
+
+    prompt_before = self.estimate_prompt_tokens(session.events)
+    start = time.perf_counter()
+    compaction_event = await summarizer.maybe_summarize_events(
+        events=to_summarize
+    )
+    if compaction_event is None:
+      return None
+    await session_service.append_event(session=session, event=compaction_event)
+    elapsed = time.perf_counter() - start
+
+    record = {
+        "session_id": session.id,
+        "events_compacted": len(selected),
+        "summarizer_input_tokens": sum(
+            estimate_content_tokens(event.content) for event in to_summarize
+        ),
+        "prompt_tokens_before": prompt_before,
+        "prompt_tokens_after": self.estimate_prompt_tokens(session.events),
+        "seconds": elapsed,
+    }
+    self.compactions.append(record)
+    logger.info(
+        f"COMPACTION: {record['events_compacted']} events, prompt "
+        f"~{record['prompt_tokens_before']} -> "
+        f"~{record['prompt_tokens_after']} tokens"
+    )
+    return compaction_event
+
+  async def after_run_callback(
+      self, *, invocation_context: InvocationContext
+  ) -> None:
+    """Compact after each invocation; failures never fail the run."""
+    try:
+      await self.compact_session(
+          invocation_context.session,
+          invocation_context.session_service,
+          summarizer=self._summarizer_for(invocation_context.agent),
+      )
+    except Exception as e:
+      logger.warning(f"Token-budget compaction skipped: {e}")
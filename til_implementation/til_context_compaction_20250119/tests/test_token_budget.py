@@ -0,0 +1,282 @@
+"""Tests for token-budget-driven context compaction."""
+
+from types import SimpleNamespace
+
+import pytest
+from google.adk.events.event import Event
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from benchmark_compaction import LocalSummarizer
+from context_compaction_agent.token_budget import (
+    TokenBudgetCompactionPlugin,
+    effective_events,
+    estimate_content_tokens,
+    estimate_text_tokens,
+)
+
+AGENT = "context_compaction_agent"
+
+
+class Conversation:
+  """Builds events with strictly increasing timestamps."""
+
+  def __init__(self):
+    self.clock = 1000.0
+
+  def _event(self, author, part):
+    self.clock += 1
+    return Event(
+        author=author,
+        invocation_id=f"inv-{self.clock}",
+        content=types.Content(role="user", parts=[part]),
+        timestamp=self.clock,
+    )
+
+  def text(self, author, words):
+    return self._event(author, types.Part(text="word " * words))
+
+  def tool_call(self):
+    return self._event(
+        AGENT,
+        types.Part(
+            function_call=types.FunctionCall(name="search", args={"q": "x"})
+        ),
+    )
+
+  def tool_response(self, rows):
+    return self._event(
+        AGENT,
+        types.Part(
+            function_response=types.FunctionResponse(
+                name="search", response={"rows": ["result"] * rows}
+            )
+        ),
+    )
+
+
+async def _session(events):
+  service = InMemorySessionService()
+  session = await service.create_session(app_name="test", user_id="u")
+  for event in events:
+    await service.append_event(session=session, event=event)
+  return service, session
+
+
+def _chat(conversation, turns, words=100):
+  events = []
+  for _ in range(turns):
+    events.append(conversation.text("user", words))
+    events.append(conversation.text(AGENT, words))
+  return events
+
+
+class TestTokenEstimation:
+  """Test the local token estimator."""
+
+  def test_text_estimate(self):
+    """Test text is estimated at ~4 chars per token."""
+    assert estimate_text_tokens("") == 0
+    assert estimate_text_tokens("a" * 400) == 100
+
+  def test_function_response_weighted(self):
+    """Test JSON tool payloads count more than prose of the same length."""
+    payload = {"data": "x" * 1200}
+    response = types.Content(
+        parts=[
+            types.Part(
+                function_response=types.FunctionResponse(
+                    name="t", response=payload
+                )
+            )
+        ]
+    )
+    text = types.Content(parts=[types.Part(text="x" * 1200)])
+
+    assert estimate_content_tokens(response) > estimate_content_tokens(text)
+
+  def test_event_estimate_cached(self):
+    """Test each event is estimated only once."""
+    plugin = TokenBudgetCompactionPlugin(summarizer=LocalSummarizer())
+    event = Conversation().text("user", 10)
+
+    first = plugin.estimate_event_tokens(event)
+    event.content.parts[0].text = "changed " * 1000
+
+    assert plugin.estimate_event_tokens(event) == first
+
+
+class TestTokenBudgetCompaction:
+  """Test when and what the plugin compacts."""
+
+  @pytest.mark.asyncio
+  async def test_under_budget_not_compacted(self):
+    """Test short conversations are left alone."""
+    service, session = await _session(_chat(Conversation(), turns=3))
+    plugin = TokenBudgetCompactionPlugin(
+        token_budget=10_000, summarizer=LocalSummarizer()
+    )
+
+    assert await plugin.compact_session(session, service) is None
+    assert not plugin.compactions
+
+  @pytest.mark.asyncio
+  async def test_over_budget_compacts_to_target(self):
+    """Test the estimate drops below budget and recent events stay raw."""
+    events = _chat(Conversation(), turns=20)
+    service, session = await _session(events)
+    plugin = TokenBudgetCompactionPlugin(
+        token_budget=1000, summarizer=LocalSummarizer(max_chars=400)
+    )
+
+    assert plugin.estimate_prompt_tokens(session.events) > 1000
+    assert await plugin.compact_session(session, service) is not None
+
+    assert plugin.estimate_prompt_tokens(session.events) < 1000
+    assert effective_events(session.events)[-1] is events[-1]
+    assert plugin.compactions[0]["summarizer_input_tokens"] > 0
+
+  @pytest.mark.asyncio
+  async def test_summaries_roll_up(self):
+    """Test only one summary is live after repeated compactions."""
+    conversation = Conversation()
+    service, session = await _session([])
+    plugin = TokenBudgetCompactionPlugin(
+        token_budget=1000, summarizer=LocalSummarizer(max_chars=400)
+    )
+
+    sizes = []
+    for _ in range(30):
+      for event in _chat(conversation, turns=2):
+        await service.append_event(session=session, event=event)
+      await plugin.compact_session(session, service)
+      sizes.append(plugin.estimate_prompt_tokens(session.events))
+
+    live = effective_events(session.events)
+    summaries = [e for e in live if e.actions and e.actions.compaction]
+    assert len(plugin.compactions) > 1
+    assert len(summaries) == 1
+    assert live[0] is summaries[0]
+    assert max(sizes) < 1000
+
+  @pytest.mark.asyncio
+  async def test_records_and_estimate_cache_bounded(self):
+    """Test a long session keeps a bounded history and estimate cache."""
+    conversation = Conversation()
+    service, session = await _session([])
+    plugin = TokenBudgetCompactionPlugin(
+        token_budget=1000,
+        summarizer=LocalSummarizer(max_chars=400),
+        max_records=3,
+        max_cached_events=20,
+    )
+
+    compacted = 0
+    for _ in range(30):
+      for event in _chat(conversation, turns=2):
+        await service.append_event(session=session, event=event)
+      if await plugin.compact_session(session, service) is not None:
+        compacted += 1
+
+    assert compacted > 3
+    assert len(plugin.compactions) == 3
+    assert len(plugin._token_cache) <= 20
+    assert plugin.estimate_prompt_tokens(session.events) < 1000
+
+  @pytest.mark.asyncio
+  async def test_tool_call_not_split_from_response(self):
+    """Test a compacted range never ends between a call and its response."""
+    conversation = Conversation()
+    events = _chat(conversation, turns=2)
+    events += [conversation.tool_call(), conversation.tool_response(rows=50)]
+    events += _chat(conversation, turns=2)
+    _, session = await _session(events)
+    plugin = TokenBudgetCompactionPlugin(
+        token_budget=300, target_ratio=0.9, retain_recent_tokens=0
+    )
+
+    selections = []
+    for target_ratio in (0.3, 0.5, 0.9):
+      plugin.target_ratio = target_ratio
+      selections.append(plugin.select_events_to_compact(session.events))
+
+    assert any(selections)
+    for selected in selections:
+      assert not (selected and selected[-1].get_function_calls())
+
+  @pytest.mark.asyncio
+  async def test_giant_tool_response_compacted_next_turn(self):
+    """Test one huge tool response is folded in once a newer event exists."""
+    conversation = Conversation()
+    events = [
+        conversation.text("user", 5),
+        conversation.tool_call(),
+        conversation.tool_response(rows=5000),
+        conversation.text(AGENT, 20),
+    ]
+    service, session = await _session(events)
+    plugin = TokenBudgetCompactionPlugin(
+        token_budget=4000, summarizer=LocalSummarizer(max_chars=400)
+    )
+
+    await plugin.compact_session(session, service)
+
+    live = effective_events(session.events)
+    assert events[2] not in live
+    assert live[-1] is events[-1]
+    assert plugin.estimate_prompt_tokens(session.events) < 4000
+
+  def test_invalid_parameters(self):
+    """Test nonsensical budgets are rejected."""
+    with pytest.raises(ValueError):
+      TokenBudgetCompactionPlugin(token_budget=0)
+    with pytest.raises(ValueError):
+      TokenBudgetCompactionPlugin(target_ratio=1.5)
+
+
+class TestPluginCallback:
+  """Test the Runner integration."""
+
+  @pytest.mark.asyncio
+  async def test_after_run_callback_compacts(self):
+    """Test the plugin compacts the invocation's session."""
+    service, session = await _session(_chat(Conversation(), turns=20))
+    plugin = TokenBudgetCompactionPlugin(
+        token_budget=1000, summarizer=LocalSummarizer(max_chars=400)
+    )
+    context = SimpleNamespace(
+        session=session, session_service=service, agent=None
+    )
+
+    await plugin.after_run_callback(invocation_context=context)
+
+    assert len(plugin.compactions) == 1
+
+  @pytest.mark.asyncio
+  async def test_after_run_callback_never_raises(self):
+    """Test summarizer failures do not fail the invocation."""
+
+    class BrokenSummarizer(LocalSummarizer):
+      async def maybe_summarize_events(self, *, events):
+        raise RuntimeError("model unavailable")
+
+    service, session = await _session(_chat(Conversation(), turns=20))
+    plugin = TokenBudgetCompactionPlugin(
+        token_budget=1000, summarizer=BrokenSummarizer()
+    )
+    context = SimpleNamespace(
+        session=session, session_service=service, agent=None
+    )
+
+    await plugin.after_run_callback(invocation_context=context)
+
+    assert not plugin.compactions
+
+  def test_app_registers_plugin(self):
+    """Test the app runs token-budget compaction alongside the interval."""
+    from app import app
+
+    assert app.events_compaction_config.compaction_interval == 5
+    assert any(
+        isinstance(p, TokenBudgetCompactionPlugin) for p in app.plugins
+    )
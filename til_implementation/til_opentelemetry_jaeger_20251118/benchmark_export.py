@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request cost of span export: sync vs background mode.
+
+This script:
+1. Starts an in-process OTLP receiver with an artificial delay (slow collector)
+2. Simulates agent requests (invocation -> LLM call -> tool call spans)
+3. "sync": BatchSpanProcessor + force_flush after every request (the default)
+4. "background": tail sampling + background flusher, no flush on the request path
+5. Prints p50/p95/p99 added latency per request and the spans each mode exported
+
+Usage:
+    python benchmark_export.py --requests 50 --collector-delay-ms 100
+"""
+
+import argparse
+import time
+
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor
+from opentelemetry.trace import Status, StatusCode
+
+from math_agent.otlp_stub import OtlpStubReceiver
+from math_agent.trace_export import (
+    BackgroundTraceFlusher,
+    TailSampler,
+    TailSamplingSpanProcessor,
+)
+
+
+def simulate_request(tracer, fail: bool = False) -> None:
+    """Emit the span tree of one math agent request."""
+    with tracer.start_as_current_span("invocation"):
+        with tracer.start_as_current_span("agent_run [math_assistant]"):
+            for _ in range(2):
+                with tracer.start_as_current_span("call_llm"):
+                    pass
+            with tracer.start_as_current_span("execute_tool add_numbers") as span:
+                if fail:
+                    span.set_status(Status(StatusCode.ERROR, "tool failed"))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_mode(
+    mode: str,
+    requests: int,
+    delay_s: float,
+    sample_rate: float,
+    error_every: int,
+) -> dict:
+    """Run the simulated workload in one export mode."""
+    with OtlpStubReceiver(delay_s=delay_s) as receiver:
+        exporter = OTLPSpanExporter(endpoint=receiver.endpoint)
+        provider = TracerProvider()
+
+        if mode == "background":
+            processor = TailSamplingSpanProcessor(
+                BackgroundTraceFlusher(exporter),
+                sampler=TailSampler(sample_rate=sample_rate),
+            )
+            after_request = lambda: None  # noqa: E731
+        else:
+            processor = BatchSpanProcessor(exporter)
+            after_request = lambda: provider.force_flush(5000)  # noqa: E731
+
+        provider.add_span_processor(processor)
+        tracer = provider.get_tracer("benchmark")
+
+        latencies_ms = []
+        for i in range(requests):
+            start = time.perf_counter()
+            simulate_request(tracer, fail=error_every > 0 and i % error_every == 0)
+            after_request()
+            latencies_ms.append((time.perf_counter() - start) * 1000)
+
+        stats = processor.stats() if mode == "background" else {}
+        provider.shutdown()
+
+        return {
+            "mode": mode,
+            "p50_ms": percentile(latencies_ms, 50),
+            "p95_ms": percentile(latencies_ms, 95),
+            "p99_ms": percentile(latencies_ms, 99),
+            "traces_exported": len(receiver.trace_ids),
+            "spans_exported": len(receiver.span_names),
+            "stats": stats,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--collector-delay-ms", type=float, default=100)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    parser.add_argument(
+        "--error-every", type=int, default=10, help="Every Nth request fails"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"📊 {args.requests} requests, collector delay "
+        f"{args.collector_delay_ms:.0f}ms, sample rate {args.sample_rate:.0%}\n"
+    )
+    print(
+        f"{'mode':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+        f"{'traces':>10}{'spans':>10}"
+    )
+
+    for mode in ("sync", "background"):
+        result = run_mode(
+            mode,
+            args.requests,
+            args.collector_delay_ms / 1000,
+            args.sample_rate,
+            args.error_every,
+        )
+        print(
+            f"{result['mode']:<12}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+            f"{result['p99_ms']:>10.2f}{result['traces_exported']:>10}"
+            f"{result['spans_exported']:>10}"
+        )
+        if result["stats"]:
+            stats = result["stats"]
+            print(
+                f"{'':<12}kept: {stats['kept_error']} error, "
+                f"{stats['kept_slow']} slow, {stats['kept_sampled']} sampled; "
+                f"sampled out: {stats['sampled_out']}; "
+                f"queue drops: {stats['traces_dropped_queue_full']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -27,7 +27,12 @@ from math_agent.tools import add_numbers, subtract_numbers, multiply_numbers, di
 # For demo: Use initialize_otel() to manually set up TracerProvider
 #
 # We detect the context by checking if __name__ == "__main__" (demo) or not (adk web)
-from math_agent.otel_config import initialize_otel_env, initialize_otel, force_flush
+from math_agent.otel_config import (
+    initialize_otel_env,
+    initialize_otel,
+    force_flush,
+    flush_after_request,
+)
 
 # When running as "python -m math_agent.agent", __name__ will be "__main__"
 # When imported by adk web, __name__ will be "math_agent.agent"
@@ -136,13 +141,15 @@ async def run_agent(query: str) -> str:
         # This is especially important for adk web where we're in an async
         # handler that will return immediately. Without this, traces might
         # not reach Jaeger before the request completes.
-        force_flush(timeout_millis=5000)
+        # In background export mode (OTEL_EXPORT_MODE=background) this
+        # returns immediately and a background thread exports the trace.
+        flush_after_request(timeout_millis=5000)
         
         return response_text if response_text else "No response"
     except Exception as e:
         logger.error(f"Agent invocation failed: {e}", exc_info=True)
         # Still try to flush even on error
-        force_flush(timeout_millis=5000)
+        flush_after_request(timeout_millis=5000)
         raise
 
 
@@ -34,6 +34,12 @@ from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExport
 from opentelemetry.exporter.otlp.proto.http._log_exporter import OTLPLogExporter
 from opentelemetry.sdk._events import EventLoggerProvider
 
+from math_agent.trace_export import (
+    BackgroundTraceFlusher,
+    TailSampler,
+    TailSamplingSpanProcessor,
+)
+
 
 # ============================================================================
 # SIMPLIFIED APPROACH: Let ADK handle OTel setup via environment variables
@@ -120,6 +126,10 @@ def initialize_otel_env(
 _trace_provider = None
 _logger_provider = None
 _initialized = False
+_export_mode = "sync"
+_trace_processor = None
+
+EXPORT_MODES = ("sync", "background")
 
 
 def initialize_otel(
@@ -130,6 +140,9 @@ def initialize_otel(
     enable_events: bool = True,
     log_level: int = logging.INFO,
     force_reinit: bool = False,
+    export_mode: Optional[str] = None,
+    tail_sampler: Optional[TailSampler] = None,
+    max_queue_traces: int = 2048,
 ) -> tuple[TracerProvider, Optional[LoggerProvider]]:
     """
     **ALTERNATIVE**: Manually set up OpenTelemetry (for detailed control).
@@ -151,15 +164,29 @@ def initialize_otel(
         enable_events: Enable OTel events
         log_level: Python logging level
         force_reinit: Force re-initialization (for testing)
+        export_mode: "sync" (BatchSpanProcessor, flush after each request)
+            or "background" (tail sampling + non-blocking background
+            flusher). Defaults to OTEL_EXPORT_MODE, then "sync".
+        tail_sampler: Sampling policy for background mode
+            (defaults to TailSampler.from_env())
+        max_queue_traces: Kept traces buffered before new ones are dropped
+            (background mode only)
         
     Returns:
         Tuple of (TracerProvider, LoggerProvider or None)
     """
     global _trace_provider, _logger_provider, _initialized
+    global _export_mode, _trace_processor
     
     # Idempotent: only initialize once unless forced
     if _initialized and not force_reinit:
         return _trace_provider, _logger_provider
+
+    export_mode = export_mode or os.environ.get("OTEL_EXPORT_MODE", "sync")
+    if export_mode not in EXPORT_MODES:
+        raise ValueError(
+            f"Unknown export_mode {export_mode!r}, expected one of {EXPORT_MODES}"
+        )
     
     # Set environment variables first (for framework autodiscovery)
     os.environ.setdefault("OTEL_EXPORTER_OTLP_ENDPOINT", jaeger_endpoint.rsplit("/v1", 1)[0])
@@ -179,8 +206,17 @@ def initialize_otel(
     # Setup traces
     _trace_provider = TracerProvider(resource=resource)
     trace_exporter = OTLPSpanExporter(endpoint=jaeger_endpoint)
-    trace_processor = BatchSpanProcessor(trace_exporter)
-    _trace_provider.add_span_processor(trace_processor)
+    if export_mode == "background":
+        # Kept traces are exported by a background thread; requests never
+        # wait on the collector (see trace_export.py)
+        _trace_processor = TailSamplingSpanProcessor(
+            BackgroundTraceFlusher(trace_exporter, max_queue_traces=max_queue_traces),
+            sampler=tail_sampler or TailSampler.from_env(),
+        )
+    else:
+        _trace_processor = BatchSpanProcessor(trace_exporter)
+    _export_mode = export_mode
+    _trace_provider.add_span_processor(_trace_processor)
     trace.set_tracer_provider(_trace_provider)
 
     # ====== LOGGING SETUP ======
@@ -250,6 +286,43 @@ def force_flush(timeout_millis: int = 30000) -> bool:
     return success
 
 
+def flush_after_request(timeout_millis: int = 5000) -> bool:
+    """
+    Flush telemetry at the end of a request, if the export mode needs it.
+    
+    In "sync" mode this blocks on force_flush() so spans reach Jaeger before
+    the response is returned. In "background" mode it returns immediately:
+    completed traces are already queued for the background flusher.
+    
+    Args:
+        timeout_millis: Maximum time to wait in "sync" mode
+        
+    Returns:
+        True if flush succeeded (or was not needed), False if timed out
+    """
+    if _export_mode == "background":
+        return True
+    return force_flush(timeout_millis)
+
+
+def get_export_mode() -> str:
+    """Get the active span export mode ("sync" or "background")."""
+    return _export_mode
+
+
+def get_export_stats() -> dict:
+    """
+    Get sampling and export counters for background mode.
+    
+    Returns:
+        Counters from TailSamplingSpanProcessor (kept/sampled-out/dropped
+        traces, exported spans, queue depth), or {} in "sync" mode
+    """
+    if isinstance(_trace_processor, TailSamplingSpanProcessor):
+        return _trace_processor.stats()
+    return {}
+
+
 def _setup_python_logging(service_name: str, log_level: int) -> None:
     """
     Configure Python logging to export to OpenTelemetry (and then to Jaeger).
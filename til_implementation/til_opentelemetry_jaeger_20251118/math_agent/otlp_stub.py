@@ -0,0 +1,97 @@
+"""
+In-process OTLP/HTTP trace receiver for tests and benchmarks.
+
+Accepts the same requests as Jaeger's OTLP endpoint (POST /v1/traces,
+protobuf body) and records the received spans. An artificial delay can be
+set to simulate a slow or overloaded collector.
+
+Usage:
+
+```python
+with OtlpStubReceiver(delay_s=0.2) as receiver:
+    exporter = OTLPSpanExporter(endpoint=receiver.endpoint)
+    ...
+    print(receiver.span_names)
+```
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+    ExportTraceServiceResponse,
+)
+
+
+class OtlpStubReceiver:
+    """Minimal OTLP/HTTP collector running on a background thread."""
+
+    def __init__(self, delay_s: float = 0.0, host: str = "127.0.0.1"):
+        """
+        Args:
+            delay_s: Seconds to wait before answering each export request
+            host: Interface to bind (an ephemeral port is chosen)
+        """
+        self.delay_s = delay_s
+        self.requests = 0
+        self.span_names: list[str] = []
+        self.trace_ids: set[bytes] = set()
+        self._lock = threading.Lock()
+
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                request = ExportTraceServiceRequest()
+                request.ParseFromString(body)
+                receiver._record(request)
+
+                if receiver.delay_s:
+                    time.sleep(receiver.delay_s)
+
+                payload = ExportTraceServiceResponse().SerializeToString()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-protobuf")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="otlp-stub", daemon=True
+        )
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1/traces"
+
+    def _record(self, request: ExportTraceServiceRequest) -> None:
+        with self._lock:
+            self.requests += 1
+            for resource_spans in request.resource_spans:
+                for scope_spans in resource_spans.scope_spans:
+                    for span in scope_spans.spans:
+                        self.span_names.append(span.name)
+                        self.trace_ids.add(span.trace_id)
+
+    def start(self) -> "OtlpStubReceiver":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "OtlpStubReceiver":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,312 @@
+"""
+Non-blocking span export with tail-based sampling.
+
+The default setup (BatchSpanProcessor + force_flush after every request)
+blocks each request for up to the flush timeout whenever the collector is
+slow, and exports 100% of traces.
+
+This module provides an alternative export path:
+
+1. TailSamplingSpanProcessor buffers the spans of each trace until its local
+   root span ends, then decides whether to keep the whole trace:
+   - traces with an ERROR span are always kept
+   - traces slower than a latency threshold are always kept
+   - a configurable percentage of the remaining traces is kept
+2. BackgroundTraceFlusher hands kept traces to a bounded queue drained by a
+   background thread. When the queue is full the trace is dropped and
+   counted - the request path never waits for the collector.
+
+Usage:
+
+```python
+from math_agent.otel_config import initialize_otel
+
+initialize_otel(export_mode="background")  # or OTEL_EXPORT_MODE=background
+```
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from opentelemetry.context import Context
+from opentelemetry.sdk.trace import ReadableSpan, Span, SpanProcessor
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import StatusCode
+
+logger = logging.getLogger("trace_export")
+
+# Sentinel pushed onto the queue to wake the worker up for shutdown
+_STOP = object()
+
+
+@dataclass
+class TailSampler:
+    """
+    Tail-based sampling policy, applied once a trace has completed.
+
+    Args:
+        sample_rate: Fraction (0.0-1.0) of normal traces to keep
+        latency_threshold_ms: Traces at least this slow are always kept
+        keep_errors: Always keep traces containing an ERROR span
+    """
+
+    sample_rate: float = 0.1
+    latency_threshold_ms: float = 2000.0
+    keep_errors: bool = True
+
+    @classmethod
+    def from_env(cls) -> "TailSampler":
+        """Build a sampler from OTEL_TAIL_SAMPLE_RATE / OTEL_TAIL_LATENCY_MS."""
+        return cls(
+            sample_rate=float(os.environ.get("OTEL_TAIL_SAMPLE_RATE", "0.1")),
+            latency_threshold_ms=float(
+                os.environ.get("OTEL_TAIL_LATENCY_MS", "2000")
+            ),
+        )
+
+    def decide(self, spans: Sequence[ReadableSpan], root: ReadableSpan) -> str:
+        """
+        Return why a trace is kept ("error", "slow", "sampled") or "dropped".
+
+        The percentage decision is derived from the trace id, so every
+        process sampling the same trace makes the same decision.
+        """
+        if self.keep_errors and any(
+            span.status.status_code == StatusCode.ERROR for span in spans
+        ):
+            return "error"
+
+        if root.end_time is not None and root.start_time is not None:
+            duration_ms = (root.end_time - root.start_time) / 1e6
+            if duration_ms >= self.latency_threshold_ms:
+                return "slow"
+
+        # Lower 64 bits of the trace id are uniformly random (W3C trace context)
+        bucket = (root.context.trace_id & 0xFFFFFFFFFFFFFFFF) / float(1 << 64)
+        if bucket < self.sample_rate:
+            return "sampled"
+
+        return "dropped"
+
+
+class BackgroundTraceFlusher:
+    """Exports completed traces from a bounded queue on a background thread."""
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_traces: int = 2048,
+        max_batch_spans: int = 512,
+        export_interval_s: float = 1.0,
+    ):
+        """
+        Args:
+            exporter: Span exporter (e.g. OTLPSpanExporter)
+            max_queue_traces: Traces buffered before new ones are dropped
+            max_batch_spans: Maximum spans per export call
+            export_interval_s: Maximum time a trace waits in the queue
+        """
+        self.exporter = exporter
+        self.max_batch_spans = max_batch_spans
+        self.export_interval_s = export_interval_s
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue_traces)
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._counters = {
+            "traces_enqueued": 0,
+            "traces_dropped_queue_full": 0,
+            "spans_exported": 0,
+            "export_failures": 0,
+        }
+
+        self._worker = threading.Thread(
+            target=self._run, name="otel-trace-flusher", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, spans: Sequence[ReadableSpan]) -> bool:
+        """Queue a completed trace for export. Never blocks."""
+        if self._shutdown:
+            return False
+
+        try:
+            self._queue.put_nowait(list(spans))
+        except queue.Full:
+            self._count("traces_dropped_queue_full")
+            return False
+
+        self._count("traces_enqueued")
+        return True
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self.export_interval_s)
+            except queue.Empty:
+                continue
+
+            if item is _STOP:
+                self._queue.task_done()
+                return
+
+            batch = list(item)
+            taken = 1
+            stop_after_batch = False
+
+            # Drain whatever else is already waiting, up to the batch size
+            while len(batch) < self.max_batch_spans:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is _STOP:
+                    stop_after_batch = True
+                    break
+                batch.extend(item)
+
+            self._export(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+
+            if stop_after_batch:
+                return
+
+    def _export(self, batch: list) -> None:
+        try:
+            result = self.exporter.export(batch)
+        except Exception as e:
+            logger.debug(f"Trace export raised: {e}")
+            result = SpanExportResult.FAILURE
+
+        if result == SpanExportResult.SUCCESS:
+            self._count("spans_exported", len(batch))
+        else:
+            self._count("export_failures")
+
+    def flush(self, timeout_millis: int = 30000) -> bool:
+        """Wait until every queued trace has been exported (or timeout)."""
+        deadline = time.monotonic() + timeout_millis / 1000
+        while self._queue.unfinished_tasks:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def shutdown(self, timeout_millis: int = 30000) -> None:
+        """Export what is queued, stop the worker and the exporter."""
+        if self._shutdown:
+            return
+        self.flush(timeout_millis)
+        self._shutdown = True
+
+        # The queue may be full of dropped-on-arrival traces; block briefly
+        try:
+            self._queue.put(_STOP, timeout=timeout_millis / 1000)
+        except queue.Full:
+            pass
+        self._worker.join(timeout_millis / 1000)
+        self.exporter.shutdown()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+        stats["queue_depth"] = self._queue.qsize()
+        return stats
+
+
+class TailSamplingSpanProcessor(SpanProcessor):
+    """Buffers spans per trace and forwards sampled traces to a flusher."""
+
+    def __init__(
+        self,
+        flusher: BackgroundTraceFlusher,
+        sampler: Optional[TailSampler] = None,
+        max_pending_traces: int = 10000,
+        max_spans_per_trace: int = 1000,
+    ):
+        """
+        Args:
+            flusher: Background flusher that exports kept traces
+            sampler: Tail sampling policy (TailSampler() if not provided)
+            max_pending_traces: In-flight traces buffered before the oldest
+                is dropped
+            max_spans_per_trace: Spans buffered per trace before extra spans
+                are dropped
+        """
+        self.flusher = flusher
+        self.sampler = sampler or TailSampler()
+        self.max_pending_traces = max_pending_traces
+        self.max_spans_per_trace = max_spans_per_trace
+
+        self._pending: "OrderedDict[int, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "traces_completed": 0,
+            "kept_error": 0,
+            "kept_slow": 0,
+            "kept_sampled": 0,
+            "sampled_out": 0,
+            "dropped_pending_overflow": 0,
+            "dropped_spans_overflow": 0,
+        }
+
+    def on_start(
+        self, span: Span, parent_context: Optional[Context] = None
+    ) -> None:
+        pass
+
+    def on_end(self, span: ReadableSpan) -> None:
+        trace_id = span.context.trace_id
+        is_local_root = span.parent is None or span.parent.is_remote
+
+        with self._lock:
+            spans = self._pending.get(trace_id)
+            if spans is None:
+                spans = self._pending[trace_id] = []
+                if len(self._pending) > self.max_pending_traces:
+                    self._pending.popitem(last=False)
+                    self._counters["dropped_pending_overflow"] += 1
+
+            if len(spans) < self.max_spans_per_trace:
+                spans.append(span)
+            else:
+                self._counters["dropped_spans_overflow"] += 1
+
+            if not is_local_root:
+                return
+
+            spans = self._pending.pop(trace_id, spans)
+            self._counters["traces_completed"] += 1
+            decision = self.sampler.decide(spans, span)
+            if decision == "dropped":
+                self._counters["sampled_out"] += 1
+                return
+            self._counters[f"kept_{decision}"] += 1
+
+        # Outside the lock: submit never blocks, but keep the section small
+        self.flusher.submit(spans)
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return self.flusher.flush(timeout_millis)
+
+    def shutdown(self) -> None:
+        self.flusher.shutdown()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["pending_traces"] = len(self._pending)
+        stats.update(self.flusher.stats())
+        return stats
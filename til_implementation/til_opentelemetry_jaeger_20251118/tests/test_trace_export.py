@@ -0,0 +1,272 @@
+"""
+Tests for non-blocking span export and tail-based sampling.
+Exports go to an in-process OTLP stub receiver instead of Jaeger.
+"""
+
+import threading
+import time
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+from opentelemetry.trace import Status, StatusCode
+
+from math_agent.otlp_stub import OtlpStubReceiver
+from math_agent.trace_export import (
+    BackgroundTraceFlusher,
+    TailSampler,
+    TailSamplingSpanProcessor,
+)
+
+
+class BlockingExporter(SpanExporter):
+    """Exporter that blocks until released, like an unreachable collector."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.exported = []
+
+    def export(self, spans):
+        self.release.wait(5)
+        self.exported.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        self.release.set()
+
+
+def _tracer(processor):
+    provider = TracerProvider()
+    provider.add_span_processor(processor)
+    return provider, provider.get_tracer("test")
+
+
+def _request(tracer, fail=False, duration_s=None):
+    """Emit invocation -> tool spans; optionally failing or with a fixed duration."""
+    start = time.time_ns()
+    root = tracer.start_span("invocation", start_time=start)
+    with trace.use_span(root, end_on_exit=False):
+        with tracer.start_as_current_span("execute_tool add_numbers") as child:
+            if fail:
+                child.set_status(Status(StatusCode.ERROR, "boom"))
+    end = start + int(duration_s * 1e9) if duration_s is not None else None
+    root.end(end_time=end)
+
+
+class TestTailSampler:
+    """Test tail-based sampling decisions."""
+
+    def _processor(self, sampler):
+        exporter = BlockingExporter()
+        exporter.release.set()
+        return TailSamplingSpanProcessor(BackgroundTraceFlusher(exporter), sampler)
+
+    def test_errors_always_kept(self):
+        """Test traces with an ERROR span are kept at a 0% sample rate."""
+        processor = self._processor(TailSampler(sample_rate=0.0))
+        provider, tracer = _tracer(processor)
+
+        _request(tracer, fail=True)
+        _request(tracer)
+
+        stats = processor.stats()
+        assert stats["kept_error"] == 1
+        assert stats["sampled_out"] == 1
+        provider.shutdown()
+
+    def test_slow_traces_always_kept(self):
+        """Test traces over the latency threshold are kept."""
+        processor = self._processor(
+            TailSampler(sample_rate=0.0, latency_threshold_ms=1000)
+        )
+        provider, tracer = _tracer(processor)
+
+        _request(tracer, duration_s=2.0)
+        _request(tracer, duration_s=0.1)
+
+        stats = processor.stats()
+        assert stats["kept_slow"] == 1
+        assert stats["sampled_out"] == 1
+        provider.shutdown()
+
+    def test_sample_rate_bounds(self):
+        """Test 100% keeps every normal trace and 0% keeps none."""
+        keep_all = self._processor(TailSampler(sample_rate=1.0))
+        provider, tracer = _tracer(keep_all)
+        for _ in range(20):
+            _request(tracer)
+        assert keep_all.stats()["kept_sampled"] == 20
+        provider.shutdown()
+
+        keep_none = self._processor(TailSampler(sample_rate=0.0))
+        provider, tracer = _tracer(keep_none)
+        for _ in range(20):
+            _request(tracer)
+        assert keep_none.stats()["sampled_out"] == 20
+        provider.shutdown()
+
+    def test_partial_traces_are_buffered(self):
+        """Test child spans wait for their root before any decision."""
+        processor = self._processor(TailSampler(sample_rate=1.0))
+        provider, tracer = _tracer(processor)
+
+        with tracer.start_as_current_span("invocation"):
+            with tracer.start_as_current_span("call_llm"):
+                pass
+            assert processor.stats()["pending_traces"] == 1
+            assert processor.stats()["traces_completed"] == 0
+
+        assert processor.stats()["pending_traces"] == 0
+        assert processor.stats()["kept_sampled"] == 1
+        provider.shutdown()
+
+    def test_pending_traces_are_bounded(self):
+        """Test the oldest unfinished trace is dropped when the buffer is full."""
+        exporter = BlockingExporter()
+        exporter.release.set()
+        processor = TailSamplingSpanProcessor(
+            BackgroundTraceFlusher(exporter), max_pending_traces=2
+        )
+        provider, tracer = _tracer(processor)
+
+        roots = [tracer.start_span("invocation") for _ in range(3)]
+        for root in roots:
+            with trace.use_span(root, end_on_exit=False):
+                with tracer.start_as_current_span("call_llm"):
+                    pass
+
+        stats = processor.stats()
+        assert stats["pending_traces"] == 2
+        assert stats["dropped_pending_overflow"] == 1
+        provider.shutdown()
+
+    def test_from_env(self, monkeypatch):
+        """Test the sampler reads its settings from the environment."""
+        monkeypatch.setenv("OTEL_TAIL_SAMPLE_RATE", "0.25")
+        monkeypatch.setenv("OTEL_TAIL_LATENCY_MS", "500")
+
+        sampler = TailSampler.from_env()
+
+        assert sampler.sample_rate == 0.25
+        assert sampler.latency_threshold_ms == 500
+
+
+class TestBackgroundTraceFlusher:
+    """Test the request path never waits for the collector."""
+
+    def test_request_does_not_block_on_slow_collector(self):
+        """Test spans end quickly while the exporter is blocked."""
+        exporter = BlockingExporter()
+        processor = TailSamplingSpanProcessor(
+            BackgroundTraceFlusher(exporter), TailSampler(sample_rate=1.0)
+        )
+        provider, tracer = _tracer(processor)
+
+        start = time.perf_counter()
+        for _ in range(10):
+            _request(tracer)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.5
+        exporter.release.set()
+        assert processor.force_flush(5000)
+        assert len(exporter.exported) == 20
+        provider.shutdown()
+
+    def test_queue_overflow_drops_and_counts(self):
+        """Test traces beyond the queue bound are dropped, not blocked on."""
+        exporter = BlockingExporter()
+        flusher = BackgroundTraceFlusher(exporter, max_queue_traces=2)
+        processor = TailSamplingSpanProcessor(flusher, TailSampler(sample_rate=1.0))
+        provider, tracer = _tracer(processor)
+
+        for _ in range(10):
+            _request(tracer)
+
+        stats = processor.stats()
+        assert stats["traces_dropped_queue_full"] >= 5
+        assert stats["queue_depth"] <= 2
+        exporter.release.set()
+        provider.shutdown()
+
+    def test_export_failures_are_counted(self):
+        """Test a failing exporter is counted without raising."""
+
+        class FailingExporter(SpanExporter):
+            def export(self, spans):
+                raise ConnectionError("collector down")
+
+            def shutdown(self):
+                pass
+
+        processor = TailSamplingSpanProcessor(
+            BackgroundTraceFlusher(FailingExporter()), TailSampler(sample_rate=1.0)
+        )
+        provider, tracer = _tracer(processor)
+
+        _request(tracer)
+        assert processor.force_flush(5000)
+
+        assert processor.stats()["export_failures"] == 1
+        provider.shutdown()
+
+    def test_exports_to_otlp_receiver(self):
+        """Test kept traces arrive at an OTLP endpoint with all their spans."""
+        with OtlpStubReceiver(delay_s=0.05) as receiver:
+            processor = TailSamplingSpanProcessor(
+                BackgroundTraceFlusher(OTLPSpanExporter(endpoint=receiver.endpoint)),
+                TailSampler(sample_rate=0.0),
+            )
+            provider, tracer = _tracer(processor)
+
+            _request(tracer, fail=True)
+            _request(tracer)
+            provider.shutdown()
+
+        assert len(receiver.trace_ids) == 1
+        assert sorted(receiver.span_names) == [
+            "execute_tool add_numbers",
+            "invocation",
+        ]
+
+
+class TestExportModes:
+    """Test export mode selection in otel_config."""
+
+    def test_background_mode_skips_request_flush(self):
+        """Test flush_after_request returns immediately in background mode."""
+        from math_agent import otel_config
+
+        otel_config.initialize_otel(
+            export_mode="background", enable_logging=False, force_reinit=True
+        )
+        try:
+            assert otel_config.get_export_mode() == "background"
+            assert otel_config.flush_after_request() is True
+            assert "kept_error" in otel_config.get_export_stats()
+        finally:
+            otel_config.initialize_otel(enable_logging=False, force_reinit=True)
+
+        assert otel_config.get_export_mode() == "sync"
+        assert otel_config.get_export_stats() == {}
+
+    def test_export_mode_from_env(self, monkeypatch):
+        """Test OTEL_EXPORT_MODE selects the export mode."""
+        from math_agent import otel_config
+
+        monkeypatch.setenv("OTEL_EXPORT_MODE", "background")
+        try:
+            otel_config.initialize_otel(enable_logging=False, force_reinit=True)
+            assert otel_config.get_export_mode() == "background"
+        finally:
+            monkeypatch.delenv("OTEL_EXPORT_MODE")
+            otel_config.initialize_otel(enable_logging=False, force_reinit=True)
+
+    def test_invalid_export_mode(self):
+        """Test an unknown export mode is rejected."""
+        from math_agent import otel_config
+
+        with pytest.raises(ValueError):
+            otel_config.initialize_otel(export_mode="eventually", force_reinit=True)
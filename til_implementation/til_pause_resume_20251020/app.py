@@ -1,7 +1,14 @@
 """ADK App configuration with Pause/Resume Invocation support."""
 
+import os
+
 from google.adk.apps import App, ResumabilityConfig
 from pause_resume_agent import root_agent
+from pause_resume_agent.checkpoint_store import (
+    DEFAULT_CHECKPOINT_DB,
+    CheckpointPlugin,
+    SQLiteCheckpointStore,
+)
 
 # Configure resumable invocations
 # This enables the agent to support pause/resume functionality
@@ -10,11 +17,18 @@ resumability_config = ResumabilityConfig(
     is_resumable=True,
 )
 
+# Durable checkpoints: completed tool results are stored in SQLite and
+# replayed (not re-executed) when an interrupted session is resumed
+checkpoint_store = SQLiteCheckpointStore(
+    os.environ.get("PAUSE_RESUME_CHECKPOINT_DB", DEFAULT_CHECKPOINT_DB)
+)
+
 # Create app with resumable invocation support enabled
 app = App(
     name="pause_resume_app",
     root_agent=root_agent,
     resumability_config=resumability_config,
+    plugins=[CheckpointPlugin(checkpoint_store)],
 )
 
 __all__ = ["app"]
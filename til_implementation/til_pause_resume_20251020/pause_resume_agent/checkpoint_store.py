@@ -0,0 +1,380 @@
+"""Durable checkpoint store for in-flight invocations.
+
+ResumabilityConfig lets ADK resume an invocation from the session's events,
+but anything not yet persisted is lost when the process dies: a long
+process_data_chunk workflow restarts from zero and re-executes every chunk.
+
+This module records each completed tool result in SQLite as soon as the
+tool returns. When the same session runs again - an ADK resume with the
+same invocation_id, or a retry after a crash - tool calls that already
+completed are replayed from the store instead of re-executed. Calls are
+matched by tool, arguments and occurrence (the nth identical call of the
+run), and only while resuming: a fresh run always executes its tools.
+
+Results are scoped to the session and only kept while the invocation is in
+flight: once a run completes, its checkpoints are cleared.
+
+Usage:
+
+    store = SQLiteCheckpointStore(".checkpoints/pause_resume.db")
+    app = App(
+        name="pause_resume_app",
+        root_agent=root_agent,
+        resumability_config=ResumabilityConfig(is_resumable=True),
+        plugins=[CheckpointPlugin(store)],
+    )
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.tool_context import ToolContext
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DB = ".checkpoints/pause_resume.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS invocations (
+    invocation_id TEXT PRIMARY KEY,
+    scope TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tool_results (
+    scope TEXT NOT NULL,
+    call_key TEXT NOT NULL,
+    invocation_id TEXT NOT NULL,
+    tool_name TEXT NOT NULL,
+    args_json TEXT NOT NULL,
+    result_json TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (scope, call_key)
+);
+CREATE INDEX IF NOT EXISTS invocations_scope ON invocations (scope, status);
+"""
+
+
+def session_scope(app_name: str, user_id: str, session_id: str) -> str:
+    """Scope key for checkpoints: one namespace per session."""
+    return f"{app_name}/{user_id}/{session_id}"
+
+
+def make_call_key(tool_name: str, args: dict, occurrence: int = 0) -> str:
+    """Stable key for a tool call: tool name, canonical JSON args, occurrence.
+
+    Function call ids are regenerated by the model on every run, so calls
+    are matched on what they do rather than on their id. `occurrence`
+    counts earlier identical calls in the run, so a repeated call gets its
+    own checkpoint instead of the first call's result.
+    """
+    payload = json.dumps(
+        {"tool": tool_name, "args": args, "n": occurrence},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SQLiteCheckpointStore:
+    """Tool-result checkpoints in a SQLite database.
+
+    Every write is committed before returning, so a result recorded by
+    after_tool_callback survives a crash on the very next line.
+    """
+
+    def __init__(self, path: str = DEFAULT_CHECKPOINT_DB):
+        """Create a store; the database is opened on first use.
+
+        Args:
+            path: SQLite file path (":memory:" for a non-durable store)
+        """
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory and self.path != ":memory:":
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def start_invocation(self, scope: str, invocation_id: str) -> None:
+        """Mark an invocation as in flight (idempotent on resume)."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT INTO invocations VALUES (?, ?, 'running', ?, ?) "
+                "ON CONFLICT(invocation_id) DO UPDATE SET "
+                "status = 'running', updated_at = excluded.updated_at",
+                (invocation_id, scope, now, now),
+            )
+            conn.commit()
+
+    def complete(self, scope: str) -> int:
+        """Mark the scope's in-flight invocations done and drop checkpoints.
+
+        Returns:
+            Number of checkpoints cleared
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE invocations SET status = 'completed', updated_at = ? "
+                "WHERE scope = ? AND status = 'running'",
+                (time.time(), scope),
+            )
+            cleared = conn.execute(
+                "DELETE FROM tool_results WHERE scope = ?", (scope,)
+            ).rowcount
+            conn.commit()
+        return cleared
+
+    def get_result(self, scope: str, call_key: str) -> Optional[dict]:
+        """Return the recorded result of a call, or None."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT result_json FROM tool_results "
+                "WHERE scope = ? AND call_key = ?",
+                (scope, call_key),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record_result(
+        self,
+        scope: str,
+        invocation_id: str,
+        tool_name: str,
+        args: dict,
+        result: Any,
+        occurrence: int = 0,
+    ) -> None:
+        """Durably record a completed tool call."""
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO tool_results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    scope,
+                    make_call_key(tool_name, args, occurrence),
+                    invocation_id,
+                    tool_name,
+                    json.dumps(args, sort_keys=True, default=str),
+                    json.dumps(result, default=str),
+                    time.time(),
+                ),
+            )
+            conn.commit()
+
+    def incomplete_invocations(self, scope: Optional[str] = None) -> list[dict]:
+        """List invocations that started but never completed.
+
+        Each entry has invocation_id, scope, started_at and the number of
+        checkpointed tool results - what a caller needs to resume.
+        """
+        query = (
+            "SELECT i.invocation_id, i.scope, i.started_at, "
+            "(SELECT COUNT(*) FROM tool_results t WHERE t.scope = i.scope) "
+            "FROM invocations i WHERE i.status = 'running'"
+        )
+        params: tuple = ()
+        if scope is not None:
+            query += " AND i.scope = ?"
+            params = (scope,)
+        query += " ORDER BY i.started_at"
+
+        with self._lock:
+            rows = self._connection().execute(query, params).fetchall()
+        return [
+            {
+                "invocation_id": invocation_id,
+                "scope": row_scope,
+                "started_at": started_at,
+                "checkpoints": checkpoints,
+            }
+            for invocation_id, row_scope, started_at, checkpoints in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@dataclass
+class _RunState:
+    """Per-invocation replay state."""
+
+    # The session had an unfinished invocation when this run started
+    resuming: bool
+    # Calls seen so far in this invocation, by make_call_key(tool, args)
+    occurrences: Counter = field(default_factory=Counter)
+    # Function call id -> occurrence, for after_tool_callback
+    calls: dict = field(default_factory=dict)
+
+
+class CheckpointPlugin(BasePlugin):
+    """Records tool results and replays them when a session is resumed."""
+
+    def __init__(
+        self,
+        store: SQLiteCheckpointStore,
+        name: str = "checkpoint",
+    ):
+        """Create the plugin.
+
+        Args:
+            store: Checkpoint store shared by all runs of the app
+            name: Plugin name
+        """
+        super().__init__(name=name)
+        self.store = store
+        self.replayed = 0
+        self.recorded = 0
+        # Function call ids answered from the store, so after_tool_callback
+        # does not record them a second time
+        self._replayed_call_ids: set[str] = set()
+        self._runs: dict[str, _RunState] = {}
+
+    @staticmethod
+    def _scope(session) -> str:
+        return session_scope(session.app_name, session.user_id, session.id)
+
+    async def before_run_callback(
+        self, *, invocation_context: InvocationContext
+    ) -> None:
+        scope = self._scope(invocation_context.session)
+        invocation_id = invocation_context.invocation_id
+        # The store does blocking SQLite I/O (fsync on every commit), so it
+        # is called from a worker thread to keep the event loop responsive
+        in_flight = await asyncio.to_thread(self.store.incomplete_invocations, scope)
+        run = _RunState(resuming=bool(in_flight))
+        if run.resuming:
+            # An ADK resume keeps the invocation's answered calls in the
+            # session and does not repeat them; count them so later calls
+            # keep the occurrence numbers they were recorded under
+            events = [
+                event
+                for event in invocation_context.session.events
+                if event.invocation_id == invocation_id
+            ]
+            answered = {
+                response.id
+                for event in events
+                for response in event.get_function_responses()
+            }
+            for event in events:
+                for call in event.get_function_calls():
+                    if call.id in answered:
+                        key = make_call_key(call.name, call.args or {})
+                        run.occurrences[key] += 1
+        self._runs[invocation_id] = run
+        await asyncio.to_thread(self.store.start_invocation, scope, invocation_id)
+        return None
+
+    def _occurrence(
+        self, tool_name: str, tool_args: dict, tool_context: ToolContext
+    ) -> tuple[_RunState, int]:
+        """Run state and occurrence number of this call (assigned once)."""
+        run = self._runs.setdefault(
+            tool_context.invocation_id, _RunState(resuming=False)
+        )
+        call_id = tool_context.function_call_id
+        if call_id not in run.calls:
+            key = make_call_key(tool_name, tool_args)
+            run.calls[call_id] = run.occurrences[key]
+            run.occurrences[key] += 1
+        return run, run.calls[call_id]
+
+    async def before_tool_callback(
+        self,
+        *,
+        tool: BaseTool,
+        tool_args: dict[str, Any],
+        tool_context: ToolContext,
+    ) -> Optional[dict]:
+        """Replay a completed call instead of executing the tool again."""
+        run, occurrence = self._occurrence(tool.name, tool_args, tool_context)
+        if not run.resuming:
+            return None
+        result = await asyncio.to_thread(
+            self.store.get_result,
+            self._scope(tool_context.session),
+            make_call_key(tool.name, tool_args, occurrence),
+        )
+        if result is None:
+            return None
+
+        self.replayed += 1
+        self._replayed_call_ids.add(tool_context.function_call_id)
+        logger.info(f"CHECKPOINT: replayed {tool.name} from store")
+        return result
+
+    async def after_tool_callback(
+        self,
+        *,
+        tool: BaseTool,
+        tool_args: dict[str, Any],
+        tool_context: ToolContext,
+        result: dict,
+    ) -> Optional[dict]:
+        """Record successful results; errors are retried on resume."""
+        if tool_context.function_call_id in self._replayed_call_ids:
+            self._replayed_call_ids.discard(tool_context.function_call_id)
+            return None
+        if isinstance(result, dict) and result.get("status") == "error":
+            return None
+
+        _, occurrence = self._occurrence(tool.name, tool_args, tool_context)
+        await asyncio.to_thread(
+            self.store.record_result,
+            self._scope(tool_context.session),
+            tool_context.invocation_id,
+            tool.name,
+            tool_args,
+            result,
+            occurrence,
+        )
+        self.recorded += 1
+        return None
+
+    async def after_run_callback(
+        self, *, invocation_context: InvocationContext
+    ) -> None:
+        """The run finished: its checkpoints are no longer needed.
+
+        A run that paused on a long-running tool is still in flight, so its
+        checkpoints are kept for the resume.
+        """
+        self._runs.pop(invocation_context.invocation_id, None)
+        events = [
+            event
+            for event in invocation_context.session.events
+            if event.invocation_id == invocation_context.invocation_id
+        ]
+        if events and events[-1].long_running_tool_ids:
+            return
+        await asyncio.to_thread(
+            self.store.complete, self._scope(invocation_context.session)
+        )
@@ -0,0 +1,124 @@
+"""Chunked workflow used by the crash-injection tests.
+
+Runs pause_resume_agent's process_data_chunk over N chunks through a real
+ADK Runner with CheckpointPlugin. A scripted model requests one chunk per
+turn, so no API key is needed. Every real tool execution is appended to a
+log file, which survives the process.
+
+Run as a separate process so it can be killed mid-way:
+
+    python -m tests.crash_workflow DB LOG CHUNKS [CRASH_AT]
+
+CRASH_AT kills the process (os._exit, like SIGKILL) when the CRASH_AT-th
+chunk starts executing in this process.
+"""
+
+import asyncio
+import os
+import sys
+from typing import AsyncGenerator
+
+from google.adk.agents import Agent
+from google.adk.apps import App, ResumabilityConfig
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from pause_resume_agent import agent as agent_module
+from pause_resume_agent.checkpoint_store import (
+    CheckpointPlugin,
+    SQLiteCheckpointStore,
+)
+
+SESSION_ID = "chunk-job-1"
+USER_ID = "worker"
+
+
+class ChunkWorkflowLlm(BaseLlm):
+    """Scripted model: calls process_data_chunk once per chunk, then stops.
+
+    With `identical`, every call sends chunk 1's data.
+    """
+
+    model: str = "scripted-chunk-llm"
+    chunks: int = 5
+    identical: bool = False
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        done = sum(
+            1
+            for content in llm_request.contents
+            for part in content.parts or []
+            if part.function_response
+        )
+        if done < self.chunks:
+            n = 1 if self.identical else done + 1
+            part = types.Part(
+                function_call=types.FunctionCall(
+                    name="process_data_chunk",
+                    args={"data": f"chunk {n}\nrecords for chunk {n}"},
+                )
+            )
+        else:
+            part = types.Part(text=f"Processed all {self.chunks} chunks.")
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def build_runner(db_path, log_path, chunks, crash_at=0, identical=False):
+    """Runner with a logging process_data_chunk and the checkpoint plugin."""
+    executed = []
+
+    def process_data_chunk(data: str) -> dict:
+        """Process a chunk of data (logs each real execution)."""
+        executed.append(data)
+        if crash_at and len(executed) == crash_at:
+            os._exit(137)
+        with open(log_path, "a") as log:
+            log.write(data.splitlines()[0] + "\n")
+        return agent_module.process_data_chunk(data)
+
+    plugin = CheckpointPlugin(SQLiteCheckpointStore(db_path))
+    app = App(
+        name="chunk_workflow",
+        root_agent=Agent(
+            name="chunk_worker",
+            model=ChunkWorkflowLlm(chunks=chunks, identical=identical),
+            instruction="Process every chunk.",
+            tools=[process_data_chunk],
+        ),
+        resumability_config=ResumabilityConfig(is_resumable=True),
+        plugins=[plugin],
+    )
+    return Runner(app=app, session_service=InMemorySessionService()), plugin
+
+
+async def run_workflow(db_path, log_path, chunks, crash_at=0, identical=False):
+    """Run the whole workflow in SESSION_ID; return (final text, plugin)."""
+    runner, plugin = build_runner(db_path, log_path, chunks, crash_at, identical)
+    await runner.session_service.create_session(
+        app_name="chunk_workflow", user_id=USER_ID, session_id=SESSION_ID
+    )
+
+    final = ""
+    async for event in runner.run_async(
+        user_id=USER_ID,
+        session_id=SESSION_ID,
+        new_message=types.Content(
+            role="user", parts=[types.Part(text="Process the dataset")]
+        ),
+    ):
+        if event.is_final_response() and event.content and event.content.parts:
+            final = event.content.parts[0].text or ""
+    return final, plugin
+
+
+if __name__ == "__main__":
+    db, log, chunk_count = sys.argv[1], sys.argv[2], int(sys.argv[3])
+    crash = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+    text, used_plugin = asyncio.run(run_workflow(db, log, chunk_count, crash))
+    print(f"{text} replayed={used_plugin.replayed}")
@@ -0,0 +1,264 @@
+"""Test suite for the durable checkpoint store.
+
+Tests SQLite persistence, replay of completed tool calls, and a
+crash-injection run that is killed mid-way and resumed.
+"""
+
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+from app import app
+from pause_resume_agent.checkpoint_store import (
+    CheckpointPlugin,
+    SQLiteCheckpointStore,
+    make_call_key,
+    session_scope,
+)
+from tests.crash_workflow import run_workflow
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCOPE = session_scope("app", "user", "session")
+
+
+def _run_process(db_path, log_path, chunks, crash_at=0):
+    """Run the chunked workflow in a separate process."""
+    args = [sys.executable, "-m", "tests.crash_workflow"]
+    args += [str(db_path), str(log_path), str(chunks)]
+    if crash_at:
+        args.append(str(crash_at))
+    return subprocess.run(
+        args, cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120
+    )
+
+
+def _executed(log_path):
+    if not log_path.exists():
+        return []
+    return log_path.read_text().splitlines()
+
+
+class TestCheckpointStore:
+    """Test the SQLite checkpoint store."""
+
+    def test_record_and_get(self, tmp_path):
+        """Test a recorded result is returned for the same call."""
+        store = SQLiteCheckpointStore(str(tmp_path / "db.sqlite"))
+        store.record_result(SCOPE, "inv-1", "tool", {"a": 1}, {"status": "success"})
+
+        assert store.get_result(SCOPE, make_call_key("tool", {"a": 1})) == {
+            "status": "success"
+        }
+        assert store.get_result(SCOPE, make_call_key("tool", {"a": 2})) is None
+
+    def test_results_survive_reopen(self, tmp_path):
+        """Test results persist across store instances (process restarts)."""
+        path = str(tmp_path / "nested" / "db.sqlite")
+        store = SQLiteCheckpointStore(path)
+        store.start_invocation(SCOPE, "inv-1")
+        store.record_result(SCOPE, "inv-1", "tool", {"a": 1}, {"n": 1})
+        store.close()
+
+        reopened = SQLiteCheckpointStore(path)
+        assert reopened.get_result(SCOPE, make_call_key("tool", {"a": 1})) == {
+            "n": 1
+        }
+        assert reopened.incomplete_invocations()[0]["checkpoints"] == 1
+
+    def test_call_key_ignores_arg_order(self):
+        """Test call keys are canonical over argument order."""
+        assert make_call_key("t", {"a": 1, "b": 2}) == make_call_key(
+            "t", {"b": 2, "a": 1}
+        )
+
+    def test_call_key_includes_occurrence(self):
+        """Test repeated identical calls get distinct keys."""
+        assert make_call_key("t", {"a": 1}) != make_call_key("t", {"a": 1}, 1)
+
+    def test_complete_clears_scope(self, tmp_path):
+        """Test completing a run drops only that session's checkpoints."""
+        store = SQLiteCheckpointStore(str(tmp_path / "db.sqlite"))
+        other = session_scope("app", "user", "other")
+        store.start_invocation(SCOPE, "inv-1")
+        store.start_invocation(other, "inv-2")
+        store.record_result(SCOPE, "inv-1", "tool", {}, {"n": 1})
+        store.record_result(other, "inv-2", "tool", {}, {"n": 2})
+
+        assert store.complete(SCOPE) == 1
+
+        assert store.get_result(SCOPE, make_call_key("tool", {})) is None
+        assert store.get_result(other, make_call_key("tool", {})) == {"n": 2}
+        assert [i["invocation_id"] for i in store.incomplete_invocations()] == [
+            "inv-2"
+        ]
+
+
+class TestCheckpointPlugin:
+    """Test replay through a real ADK Runner."""
+
+    @pytest.mark.asyncio
+    async def test_completed_run_clears_checkpoints(self, tmp_path):
+        """Test a finished workflow leaves nothing to resume."""
+        db, log = tmp_path / "db.sqlite", tmp_path / "executed.log"
+
+        final, plugin = await run_workflow(str(db), str(log), chunks=3)
+
+        assert final == "Processed all 3 chunks."
+        assert plugin.recorded == 3
+        assert plugin.replayed == 0
+        assert SQLiteCheckpointStore(str(db)).incomplete_invocations() == []
+
+    @pytest.mark.asyncio
+    async def test_in_flight_results_are_replayed(self, tmp_path):
+        """Test recorded results are replayed instead of re-executed."""
+        db, log = tmp_path / "db.sqlite", tmp_path / "executed.log"
+        store = SQLiteCheckpointStore(str(db))
+        scope = session_scope("chunk_workflow", "worker", "chunk-job-1")
+        store.start_invocation(scope, "crashed-invocation")
+        store.record_result(
+            scope,
+            "crashed-invocation",
+            "process_data_chunk",
+            {"data": "chunk 1\nrecords for chunk 1"},
+            {"status": "success", "report": "from checkpoint"},
+        )
+
+        _, plugin = await run_workflow(str(db), str(log), chunks=3)
+
+        assert plugin.replayed == 1
+        assert _executed(log) == ["chunk 2", "chunk 3"]
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_in_a_fresh_run_all_execute(self, tmp_path):
+        """Test a repeated call in a live run is executed, not replayed."""
+        db, log = tmp_path / "db.sqlite", tmp_path / "executed.log"
+
+        _, plugin = await run_workflow(str(db), str(log), chunks=3, identical=True)
+
+        assert plugin.replayed == 0
+        assert plugin.recorded == 3
+        assert _executed(log) == ["chunk 1"] * 3
+
+    @pytest.mark.asyncio
+    async def test_identical_calls_replayed_by_occurrence(self, tmp_path):
+        """Test a resume replays each recorded occurrence of a repeated call once."""
+        db, log = tmp_path / "db.sqlite", tmp_path / "executed.log"
+        store = SQLiteCheckpointStore(str(db))
+        scope = session_scope("chunk_workflow", "worker", "chunk-job-1")
+        store.start_invocation(scope, "crashed-invocation")
+        for occurrence in range(2):
+            store.record_result(
+                scope,
+                "crashed-invocation",
+                "process_data_chunk",
+                {"data": "chunk 1\nrecords for chunk 1"},
+                {"status": "success", "report": "from checkpoint"},
+                occurrence,
+            )
+
+        _, plugin = await run_workflow(str(db), str(log), chunks=3, identical=True)
+
+        assert plugin.replayed == 2
+        assert _executed(log) == ["chunk 1"]
+
+    @pytest.mark.asyncio
+    async def test_store_called_off_event_loop(self, tmp_path, monkeypatch):
+        """Test the plugin's blocking SQLite calls run in worker threads."""
+        db, log = tmp_path / "db.sqlite", tmp_path / "executed.log"
+        calls = []
+
+        def on_thread(method):
+            def wrapper(self, *args, **kwargs):
+                calls.append((method.__name__, threading.get_ident()))
+                return method(self, *args, **kwargs)
+
+            return wrapper
+
+        for name in (
+            "incomplete_invocations",
+            "start_invocation",
+            "get_result",
+            "record_result",
+            "complete",
+        ):
+            method = getattr(SQLiteCheckpointStore, name)
+            monkeypatch.setattr(SQLiteCheckpointStore, name, on_thread(method))
+        # Seed a checkpoint so the run resumes and looks results up
+        scope = session_scope("chunk_workflow", "worker", "chunk-job-1")
+        SQLiteCheckpointStore(str(db)).start_invocation(scope, "crashed-invocation")
+        calls.clear()
+
+        await run_workflow(str(db), str(log), chunks=2)
+
+        assert {name for name, _ in calls} == {
+            "incomplete_invocations",
+            "start_invocation",
+            "get_result",
+            "record_result",
+            "complete",
+        }
+        assert threading.get_ident() not in {ident for _, ident in calls}
+
+    @pytest.mark.asyncio
+    async def test_error_results_not_recorded(self, tmp_path):
+        """Test failed tool results are retried rather than replayed."""
+        store = SQLiteCheckpointStore(str(tmp_path / "db.sqlite"))
+        plugin = CheckpointPlugin(store)
+
+        class Context:
+            session = type(
+                "Session", (), {"app_name": "app", "user_id": "user", "id": "session"}
+            )()
+            invocation_id = "inv-1"
+            function_call_id = "call-1"
+
+        class Tool:
+            name = "process_data_chunk"
+
+        await plugin.after_tool_callback(
+            tool=Tool(),
+            tool_args={"data": ""},
+            tool_context=Context(),
+            result={"status": "error", "error": "Empty data string"},
+        )
+
+        assert plugin.recorded == 0
+        assert store.get_result(SCOPE, make_call_key(Tool.name, {"data": ""})) is None
+
+    def test_app_registers_plugin(self):
+        """Test the app ships with the checkpoint plugin."""
+        assert any(isinstance(p, CheckpointPlugin) for p in app.plugins)
+
+
+class TestCrashInjection:
+    """Test a killed run resumes without duplicate work."""
+
+    def test_killed_run_resumes_without_duplicate_work(self, tmp_path):
+        """Test chunks done before the crash are not executed again."""
+        db, log = tmp_path / "db.sqlite", tmp_path / "executed.log"
+
+        crashed = _run_process(db, log, chunks=5, crash_at=3)
+        assert crashed.returncode == 137
+        assert _executed(log) == ["chunk 1", "chunk 2"]
+        assert SQLiteCheckpointStore(str(db)).incomplete_invocations()[0][
+            "checkpoints"
+        ] == 2
+
+        resumed = _run_process(db, log, chunks=5)
+        assert resumed.returncode == 0, resumed.stderr
+        assert "Processed all 5 chunks. replayed=2" in resumed.stdout
+
+        assert _executed(log) == [f"chunk {i}" for i in range(1, 6)]
+        assert SQLiteCheckpointStore(str(db)).incomplete_invocations() == []
+
+    def test_without_checkpoints_work_is_repeated(self, tmp_path):
+        """Test the baseline: a fresh store re-executes every chunk."""
+        log = tmp_path / "executed.log"
+
+        _run_process(tmp_path / "first.sqlite", log, chunks=5, crash_at=3)
+        _run_process(tmp_path / "second.sqlite", log, chunks=5)
+
+        assert _executed(log).count("chunk 1") == 2
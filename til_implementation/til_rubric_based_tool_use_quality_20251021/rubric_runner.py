@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Parallel, cached rubric evaluation runner for tool use quality.
+
+`AgentEvaluator.evaluate` re-runs every agent trajectory and every judge call
+on each invocation. This runner splits the evaluation into two cached stages:
+
+1. Inference: run the agent on an eval case -> trajectory
+   cached by hash(agent source, eval case)
+2. Judging: score the trajectory against ONE rubric -> verdict
+   cached by hash(agent source, eval case, rubric, judge model options,
+   trajectory)
+
+Eval cases run concurrently (bounded by --workers) and only cases or rubrics
+whose inputs changed are re-evaluated. The result is a machine-readable
+per-rubric JSON report with timings, suitable for running on every commit.
+
+Usage:
+    python rubric_runner.py --workers 4 --report rubric_report.json
+
+Requirements:
+    - GOOGLE_API_KEY environment variable set (for uncached cases)
+    - google-adk[eval] installed
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional, Protocol
+
+RUBRIC_METRIC = "rubric_based_tool_use_quality_v1"
+
+BASE_DIR = Path(__file__).parent
+DEFAULT_EVALSET = BASE_DIR / "tool_use_quality.evalset.json"
+DEFAULT_CONFIG = BASE_DIR / "test_config.json"
+DEFAULT_AGENT_DIR = BASE_DIR / "tool_use_evaluator"
+DEFAULT_CACHE_DIR = BASE_DIR / ".rubric_cache"
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable SHA-256 of JSON-serializable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def agent_source_hash(agent_dir: Path) -> str:
+    """Hash every Python source file of the agent package."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(agent_dir).rglob("*.py")):
+        digest.update(path.relative_to(agent_dir).as_posix().encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """JSON-file cache: one file per key, grouped by namespace."""
+
+    def __init__(self, root: Path, enabled: bool = True):
+        self.root = Path(root)
+        self.enabled = enabled
+
+    def _path(self, namespace: str, key: str) -> Path:
+        return self.root / namespace / f"{key}.json"
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        path = self._path(namespace, key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        if not self.enabled:
+            return
+        path = self._path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temp file and rename, so concurrent workers or a crash
+        # never leave a half-written entry behind
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class EvaluationBackend(Protocol):
+    """Runs the two expensive stages of an evaluation."""
+
+    async def infer(self, eval_case: dict[str, Any]) -> dict[str, Any]:
+        """Run the agent on an eval case and return its trajectory."""
+        ...
+
+    async def judge(
+        self,
+        eval_case: dict[str, Any],
+        trajectory: dict[str, Any],
+        rubric: dict[str, Any],
+        criterion: dict[str, Any],
+    ) -> Optional[float]:
+        """Score a trajectory against a single rubric (None if not scored)."""
+        ...
+
+
+class AdkEvaluationBackend:
+    """Evaluation backend using ADK's LocalEvalService."""
+
+    def __init__(self, agent_module: str, eval_set: dict[str, Any]):
+        self.agent_module = agent_module
+        self.eval_set = eval_set
+        self.app_name = "rubric_runner"
+        self._service = None
+
+    async def _get_service(self):
+        if self._service is None:
+            from google.adk.evaluation.agent_evaluator import AgentEvaluator
+            from google.adk.evaluation.eval_set import EvalSet
+            from google.adk.evaluation.in_memory_eval_sets_manager import (
+                InMemoryEvalSetsManager,
+            )
+            from google.adk.evaluation.local_eval_service import LocalEvalService
+
+            eval_set = EvalSet.model_validate(self.eval_set)
+            eval_sets_manager = InMemoryEvalSetsManager()
+            eval_sets_manager.create_eval_set(
+                app_name=self.app_name, eval_set_id=eval_set.eval_set_id
+            )
+            for eval_case in eval_set.eval_cases:
+                eval_sets_manager.add_eval_case(
+                    app_name=self.app_name,
+                    eval_set_id=eval_set.eval_set_id,
+                    eval_case=eval_case,
+                )
+
+            agent, app = await AgentEvaluator._get_agent_for_eval(
+                module_name=self.agent_module
+            )
+            self._service = LocalEvalService(
+                root_agent=agent,
+                eval_sets_manager=eval_sets_manager,
+                app=app,
+            )
+        return self._service
+
+    async def infer(self, eval_case: dict[str, Any]) -> dict[str, Any]:
+        from google.adk.evaluation.base_eval_service import (
+            InferenceConfig,
+            InferenceRequest,
+        )
+
+        service = await self._get_service()
+        request = InferenceRequest(
+            app_name=self.app_name,
+            eval_set_id=self.eval_set["eval_set_id"],
+            eval_case_ids=[eval_case["eval_id"]],
+            inference_config=InferenceConfig(),
+        )
+
+        results = []
+        async for result in service.perform_inference(inference_request=request):
+            results.append(result)
+
+        if not results:
+            raise RuntimeError(f"No inference result for {eval_case['eval_id']}")
+
+        result = results[0]
+        if result.error_message:
+            raise RuntimeError(result.error_message)
+        return result.model_dump(mode="json")
+
+    async def judge(
+        self,
+        eval_case: dict[str, Any],
+        trajectory: dict[str, Any],
+        rubric: dict[str, Any],
+        criterion: dict[str, Any],
+    ) -> Optional[float]:
+        from google.adk.evaluation.base_eval_service import (
+            EvaluateConfig,
+            EvaluateRequest,
+            InferenceResult,
+        )
+        from google.adk.evaluation.eval_metrics import (
+            EvalMetric,
+            RubricsBasedCriterion,
+        )
+
+        service = await self._get_service()
+        single_rubric_criterion = RubricsBasedCriterion.model_validate(
+            {**criterion, "rubrics": [rubric]}
+        )
+        metric = EvalMetric(
+            metric_name=RUBRIC_METRIC,
+            threshold=single_rubric_criterion.threshold,
+            criterion=single_rubric_criterion,
+        )
+        request = EvaluateRequest(
+            inference_results=[InferenceResult.model_validate(trajectory)],
+            evaluate_config=EvaluateConfig(eval_metrics=[metric]),
+        )
+
+        async for case_result in service.evaluate(evaluate_request=request):
+            for metric_result in case_result.overall_eval_metric_results:
+                if metric_result.metric_name == RUBRIC_METRIC:
+                    return metric_result.score
+        return None
+
+
+@dataclass
+class RubricVerdict:
+    """One rubric's score for one eval case."""
+
+    score: Optional[float]
+    passed: bool
+    cached: bool
+    seconds: float
+
+
+@dataclass
+class CaseReport:
+    """Evaluation of one eval case across all rubrics."""
+
+    eval_id: str
+    status: str = "pending"
+    score: Optional[float] = None
+    trajectory_cached: bool = False
+    inference_seconds: float = 0.0
+    judge_seconds: float = 0.0
+    rubrics: dict[str, RubricVerdict] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+class RubricEvaluationRunner:
+    """Runs eval cases concurrently with on-disk trajectory/verdict caches."""
+
+    def __init__(
+        self,
+        backend: EvaluationBackend,
+        eval_set: dict[str, Any],
+        eval_config: dict[str, Any],
+        agent_hash: str,
+        cache: DiskCache,
+        workers: int = 4,
+    ):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+
+        self.backend = backend
+        self.eval_set = eval_set
+        self.criterion = eval_config["criteria"][RUBRIC_METRIC]
+        self.agent_hash = agent_hash
+        self.cache = cache
+        self.workers = workers
+        self.stats = {
+            "trajectory_hits": 0,
+            "trajectory_misses": 0,
+            "verdict_hits": 0,
+            "verdict_misses": 0,
+        }
+        self._semaphore = asyncio.Semaphore(workers)
+
+    @property
+    def threshold(self) -> float:
+        return self.criterion.get("threshold", 0.7)
+
+    @property
+    def rubrics(self) -> list[dict[str, Any]]:
+        return self.criterion.get("rubrics", [])
+
+    async def run(self) -> dict[str, Any]:
+        """Evaluate every case and return the report."""
+        started = time.perf_counter()
+        cases = await asyncio.gather(
+            *(self._run_case(case) for case in self.eval_set["eval_cases"])
+        )
+        return self._build_report(cases, time.perf_counter() - started)
+
+    async def _run_case(self, eval_case: dict[str, Any]) -> CaseReport:
+        report = CaseReport(eval_id=eval_case["eval_id"])
+
+        try:
+            trajectory = await self._get_trajectory(eval_case, report)
+            verdicts = await asyncio.gather(
+                *(
+                    self._get_verdict(eval_case, trajectory, rubric)
+                    for rubric in self.rubrics
+                )
+            )
+        except Exception as e:
+            report.status = "error"
+            report.error = str(e)
+            return report
+
+        for rubric, verdict in zip(self.rubrics, verdicts):
+            report.rubrics[rubric["rubric_id"]] = verdict
+            report.judge_seconds += verdict.seconds
+
+        scores = [v.score for v in verdicts if v.score is not None]
+        report.score = sum(scores) / len(scores) if scores else None
+        report.status = (
+            "passed"
+            if report.score is not None and report.score >= self.threshold
+            else "failed"
+        )
+        return report
+
+    async def _get_trajectory(
+        self, eval_case: dict[str, Any], report: CaseReport
+    ) -> dict[str, Any]:
+        key = fingerprint("trajectory", self.agent_hash, eval_case)
+
+        cached = self.cache.get("trajectories", key)
+        if cached is not None:
+            self.stats["trajectory_hits"] += 1
+            report.trajectory_cached = True
+            return cached
+
+        self.stats["trajectory_misses"] += 1
+        async with self._semaphore:
+            started = time.perf_counter()
+            trajectory = await self.backend.infer(eval_case)
+            report.inference_seconds = time.perf_counter() - started
+
+        self.cache.put("trajectories", key, trajectory)
+        return trajectory
+
+    async def _get_verdict(
+        self,
+        eval_case: dict[str, Any],
+        trajectory: dict[str, Any],
+        rubric: dict[str, Any],
+    ) -> RubricVerdict:
+        judge_options = self.criterion.get("judge_model_options", {})
+        # The trajectory is part of the key so a re-inferred case is re-judged
+        key = fingerprint(
+            "verdict",
+            self.agent_hash,
+            eval_case,
+            rubric,
+            judge_options,
+            fingerprint(trajectory),
+        )
+
+        cached = self.cache.get("verdicts", key)
+        if cached is not None:
+            self.stats["verdict_hits"] += 1
+            return RubricVerdict(
+                score=cached["score"],
+                passed=self._passed(cached["score"]),
+                cached=True,
+                seconds=0.0,
+            )
+
+        self.stats["verdict_misses"] += 1
+        async with self._semaphore:
+            started = time.perf_counter()
+            score = await self.backend.judge(
+                eval_case, trajectory, rubric, self.criterion
+            )
+            seconds = time.perf_counter() - started
+
+        # An unscored rubric (None) is not cached so it is retried next run
+        if score is not None:
+            self.cache.put("verdicts", key, {"score": score})
+
+        return RubricVerdict(
+            score=score,
+            passed=self._passed(score),
+            cached=False,
+            seconds=seconds,
+        )
+
+    def _passed(self, score: Optional[float]) -> bool:
+        return score is not None and score >= self.threshold
+
+    def _build_report(
+        self, cases: list[CaseReport], wall_seconds: float
+    ) -> dict[str, Any]:
+        rubric_summary = {}
+        for rubric in self.rubrics:
+            rubric_id = rubric["rubric_id"]
+            verdicts = [c.rubrics[rubric_id] for c in cases if rubric_id in c.rubrics]
+            scores = [v.score for v in verdicts if v.score is not None]
+            rubric_summary[rubric_id] = {
+                "mean_score": sum(scores) / len(scores) if scores else None,
+                "pass_rate": (
+                    sum(v.passed for v in verdicts) / len(verdicts)
+                    if verdicts
+                    else None
+                ),
+                "cases": len(verdicts),
+            }
+
+        return {
+            "eval_set_id": self.eval_set.get("eval_set_id"),
+            "metric": RUBRIC_METRIC,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "agent_source_hash": self.agent_hash,
+            "threshold": self.threshold,
+            "workers": self.workers,
+            "wall_seconds": wall_seconds,
+            "cache": dict(self.stats),
+            "summary": {
+                "passed": sum(c.status == "passed" for c in cases),
+                "failed": sum(c.status == "failed" for c in cases),
+                "errors": sum(c.status == "error" for c in cases),
+            },
+            "rubrics": rubric_summary,
+            "cases": [asdict(c) for c in cases],
+        }
+
+
+def load_json(path: Path) -> dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_report(report: dict[str, Any], path: Path) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def print_report(report: dict[str, Any]) -> None:
+    """Print a short human-readable summary of a report."""
+    cache = report["cache"]
+    summary = report["summary"]
+    print("\n📊 RUBRIC REPORT")
+    print("-" * 80)
+    print(
+        f"Cases: {summary['passed']} passed, {summary['failed']} failed, "
+        f"{summary['errors']} errors in {report['wall_seconds']:.2f}s "
+        f"({report['workers']} workers)"
+    )
+    print(
+        f"Cache: trajectories {cache['trajectory_hits']} hit / "
+        f"{cache['trajectory_misses']} miss, verdicts {cache['verdict_hits']} "
+        f"hit / {cache['verdict_misses']} miss"
+    )
+    for rubric_id, stats in report["rubrics"].items():
+        mean = stats["mean_score"]
+        mean_text = f"{mean:.2f}" if mean is not None else "n/a"
+        print(f"  • {rubric_id}: mean {mean_text}")
+
+
+async def main(argv: Optional[list[str]] = None) -> dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--evalset", type=Path, default=DEFAULT_EVALSET)
+    parser.add_argument("--config", type=Path, default=DEFAULT_CONFIG)
+    parser.add_argument("--agent-module", default="tool_use_evaluator")
+    parser.add_argument("--agent-dir", type=Path, default=DEFAULT_AGENT_DIR)
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--report", type=Path, default=Path("rubric_report.json"))
+    args = parser.parse_args(argv)
+
+    eval_set = load_json(args.evalset)
+    runner = RubricEvaluationRunner(
+        backend=AdkEvaluationBackend(args.agent_module, eval_set),
+        eval_set=eval_set,
+        eval_config=load_json(args.config),
+        agent_hash=agent_source_hash(args.agent_dir),
+        cache=DiskCache(args.cache_dir, enabled=not args.no_cache),
+        workers=args.workers,
+    )
+
+    report = await runner.run()
+    write_report(report, args.report)
+    print_report(report)
+    print(f"\n✓ Report written to {args.report}")
+    return report
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+"""Tests for the parallel, cached rubric evaluation runner."""
+
+import asyncio
+import copy
+import json
+
+import pytest
+
+from rubric_runner import (
+    DEFAULT_CONFIG,
+    DEFAULT_EVALSET,
+    DiskCache,
+    RubricEvaluationRunner,
+    agent_source_hash,
+    load_json,
+    write_report,
+)
+
+
+class FakeBackend:
+    """Offline backend: records calls and tracks concurrency."""
+
+    def __init__(self, delay=0.01, fail_case=None):
+        self.delay = delay
+        self.fail_case = fail_case
+        self.infer_calls = []
+        self.judge_calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _work(self):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+
+    async def infer(self, eval_case):
+        self.infer_calls.append(eval_case["eval_id"])
+        await self._work()
+        if eval_case["eval_id"] == self.fail_case:
+            raise RuntimeError("inference failed")
+        return {"eval_case_id": eval_case["eval_id"], "tools": ["analyze_data"]}
+
+    async def judge(self, eval_case, trajectory, rubric, criterion):
+        self.judge_calls.append((eval_case["eval_id"], rubric["rubric_id"]))
+        await self._work()
+        return 1.0 if eval_case["eval_id"].startswith("good") else 0.25
+
+
+def _runner(tmp_path, backend, eval_set=None, config=None, workers=4):
+    return RubricEvaluationRunner(
+        backend=backend,
+        eval_set=eval_set or load_json(DEFAULT_EVALSET),
+        eval_config=config or load_json(DEFAULT_CONFIG),
+        agent_hash="agent-v1",
+        cache=DiskCache(tmp_path / "cache"),
+        workers=workers,
+    )
+
+
+class TestRubricRunner:
+    """Test concurrent evaluation and per-rubric reporting."""
+
+    @pytest.mark.asyncio
+    async def test_report_has_per_rubric_scores(self, tmp_path):
+        """Test every case gets a score per rubric."""
+        report = await _runner(tmp_path, FakeBackend()).run()
+
+        assert report["summary"] == {"passed": 2, "failed": 1, "errors": 0}
+        assert set(report["rubrics"]) == {
+            "proper_tool_order",
+            "complete_pipeline",
+            "validation_before_model",
+            "no_tool_failures",
+        }
+        for case in report["cases"]:
+            assert len(case["rubrics"]) == 4
+            assert case["inference_seconds"] > 0
+
+    @pytest.mark.asyncio
+    async def test_workers_bound_concurrency(self, tmp_path):
+        """Test cases run concurrently, up to the worker count."""
+        backend = FakeBackend(delay=0.02)
+        await _runner(tmp_path, backend, workers=2).run()
+
+        assert backend.max_in_flight == 2
+
+    def test_invalid_worker_count(self, tmp_path):
+        """Test zero workers is rejected."""
+        with pytest.raises(ValueError):
+            _runner(tmp_path, FakeBackend(), workers=0)
+
+
+class TestRubricRunnerCaching:
+    """Test only changed inputs are re-evaluated."""
+
+    @pytest.mark.asyncio
+    async def test_rerun_is_fully_cached(self, tmp_path):
+        """Test an unchanged rerun makes no agent or judge calls."""
+        await _runner(tmp_path, FakeBackend()).run()
+
+        backend = FakeBackend()
+        report = await _runner(tmp_path, backend).run()
+
+        assert backend.infer_calls == []
+        assert backend.judge_calls == []
+        assert report["cache"]["trajectory_hits"] == 3
+        assert report["cache"]["verdict_hits"] == 12
+        assert report["summary"]["passed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_changed_rubric_rejudges_only_that_rubric(self, tmp_path):
+        """Test editing one rubric re-judges it without re-running the agent."""
+        await _runner(tmp_path, FakeBackend()).run()
+
+        config = copy.deepcopy(load_json(DEFAULT_CONFIG))
+        rubric = config["criteria"]["rubric_based_tool_use_quality_v1"]["rubrics"][0]
+        rubric["rubric_content"]["text_property"] += " Strictly."
+
+        backend = FakeBackend()
+        await _runner(tmp_path, backend, config=config).run()
+
+        assert backend.infer_calls == []
+        assert {rubric_id for _, rubric_id in backend.judge_calls} == {
+            "proper_tool_order"
+        }
+        assert len(backend.judge_calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_changed_case_reruns_only_that_case(self, tmp_path):
+        """Test editing one eval case re-runs only that case."""
+        await _runner(tmp_path, FakeBackend()).run()
+
+        eval_set = copy.deepcopy(load_json(DEFAULT_EVALSET))
+        eval_set["eval_cases"][1]["session_input"]["user_id"] = "other_user"
+
+        backend = FakeBackend()
+        await _runner(tmp_path, backend, eval_set=eval_set).run()
+
+        assert backend.infer_calls == ["bad_sequence_skipped_validation"]
+        assert len(backend.judge_calls) == 4
+
+    @pytest.mark.asyncio
+    async def test_errors_are_reported_and_not_cached(self, tmp_path):
+        """Test a failed case is reported and retried next run."""
+        failing = FakeBackend(fail_case="good_sequence_proper_analysis")
+        report = await _runner(tmp_path, failing).run()
+
+        errored = [c for c in report["cases"] if c["status"] == "error"]
+        assert [c["eval_id"] for c in errored] == ["good_sequence_proper_analysis"]
+        assert errored[0]["error"] == "inference failed"
+
+        backend = FakeBackend()
+        await _runner(tmp_path, backend).run()
+        assert backend.infer_calls == ["good_sequence_proper_analysis"]
+
+    def test_disabled_cache(self, tmp_path):
+        """Test a disabled cache never stores entries."""
+        cache = DiskCache(tmp_path, enabled=False)
+        cache.put("ns", "key", {"a": 1})
+        assert cache.get("ns", "key") is None
+
+
+class TestHelpers:
+    """Test hashing and report output."""
+
+    def test_agent_source_hash_tracks_changes(self, tmp_path):
+        """Test the agent hash changes when source changes."""
+        (tmp_path / "agent.py").write_text("x = 1\n")
+        before = agent_source_hash(tmp_path)
+
+        (tmp_path / "agent.py").write_text("x = 2\n")
+        assert agent_source_hash(tmp_path) != before
+
+    @pytest.mark.asyncio
+    async def test_write_report(self, tmp_path):
+        """Test the report is valid JSON on disk."""
+        report = await _runner(tmp_path, FakeBackend()).run()
+        path = tmp_path / "out" / "report.json"
+
+        write_report(report, path)
+
+        assert json.loads(path.read_text())["metric"] == report["metric"]
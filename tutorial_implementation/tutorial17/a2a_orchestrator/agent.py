@@ -10,33 +10,60 @@ from google.adk.agents.remote_a2a_agent import RemoteA2aAgent, AGENT_CARD_WELL_K
 from google.adk.tools import FunctionTool
 from google.genai import types
 
+from .card_cache import AgentCardCache
+from .parallel import dispatch_parallel
 
-def check_agent_availability(agent_name: str, base_url: str) -> dict:
+# Remote agent name -> base URL (served by start_a2a_servers.sh)
+REMOTE_AGENTS = {
+    "research_specialist": "http://localhost:8001",
+    "data_analyst": "http://localhost:8002",
+    "content_writer": "http://localhost:8003",
+}
+
+# Shared agent card cache; probes start on first use inside the event loop
+card_cache = AgentCardCache()
+
+
+async def check_agent_availability(agent_name: str, base_url: str) -> dict:
     """Check if a remote A2A agent is available."""
-    try:
-        import requests
-        card_url = f"{base_url}{AGENT_CARD_WELL_KNOWN_PATH}"
-        response = requests.get(card_url, timeout=5)
-        
-        if response.status_code == 200:
-            return {
-                "status": "success",
-                "available": True,
-                "report": f"Agent {agent_name} is available",
-                "agent_card": response.json()
-            }
-        else:
-            return {
-                "status": "error", 
-                "available": False,
-                "report": f"Agent {agent_name} returned status {response.status_code}"
-            }
-    except Exception as e:
+    card_cache.start_probes(REMOTE_AGENTS.values())
+    entry = await card_cache.get(base_url)
+
+    if entry.available:
+        return {
+            "status": "success",
+            "available": True,
+            "report": f"Agent {agent_name} is available",
+            "agent_card": entry.card,
+            "health": entry.to_dict(),
+        }
+    return {
+        "status": "error",
+        "available": False,
+        "report": f"Failed to check {agent_name}: {entry.error}",
+        "health": entry.to_dict(),
+    }
+
+
+async def dispatch_parallel_tasks(agent_names: list[str], requests: list[str]) -> dict:
+    """
+    Send independent subtasks to several remote agents at once and merge the results.
+
+    Args:
+        agent_names: Remote agent for each subtask (research_specialist,
+            data_analyst, content_writer)
+        requests: Request text for each subtask, in the same order as agent_names
+
+    Returns:
+        Dict with per-subtask results, the merged responses and timing
+    """
+    if len(agent_names) != len(requests):
         return {
             "status": "error",
-            "available": False, 
-            "report": f"Failed to check {agent_name}: {str(e)}"
+            "report": f"Got {len(agent_names)} agent names but {len(requests)} requests",
         }
+    card_cache.start_probes(REMOTE_AGENTS.values())
+    return await dispatch_parallel(list(zip(agent_names, requests)), REMOTE_AGENTS, card_cache)
 
 
 def log_coordination_step(step: str, agent_name: str = "") -> dict:
@@ -58,19 +85,19 @@ def log_coordination_step(step: str, agent_name: str = "") -> dict:
 research_agent = RemoteA2aAgent(
     name="research_specialist",
     description="Conducts web research and fact-checking",
-    agent_card=f"http://localhost:8001{AGENT_CARD_WELL_KNOWN_PATH}"
+    agent_card=f"{REMOTE_AGENTS['research_specialist']}{AGENT_CARD_WELL_KNOWN_PATH}"
 )
 
 analysis_agent = RemoteA2aAgent(
     name="data_analyst", 
     description="Analyzes data and generates insights",
-    agent_card=f"http://localhost:8002{AGENT_CARD_WELL_KNOWN_PATH}"
+    agent_card=f"{REMOTE_AGENTS['data_analyst']}{AGENT_CARD_WELL_KNOWN_PATH}"
 )
 
 content_agent = RemoteA2aAgent(
     name="content_writer",
     description="Creates written content and summaries", 
-    agent_card=f"http://localhost:8003{AGENT_CARD_WELL_KNOWN_PATH}"
+    agent_card=f"{REMOTE_AGENTS['content_writer']}{AGENT_CARD_WELL_KNOWN_PATH}"
 )
 
 # Main orchestrator agent using official ADK patterns
@@ -94,6 +121,10 @@ using the official ADK Agent-to-Agent (A2A) protocol.
 3. Delegate content creation to content_writer sub-agent
 4. Use log_coordination_step to track the orchestration process
 5. Use check_agent_availability to verify agent status
+6. When a request splits into independent subtasks for different agents
+   (e.g. research one topic while analyzing another), use
+   dispatch_parallel_tasks to run them at the same time, then combine the
+   merged results
 
 The remote agents are exposed using uvicorn + to_a2a() and work
 seamlessly as sub-agents in your orchestration workflow.
@@ -103,7 +134,8 @@ Always explain which remote agent you're delegating to and why.
     sub_agents=[research_agent, analysis_agent, content_agent],
     tools=[
         FunctionTool(check_agent_availability),
-        FunctionTool(log_coordination_step)
+        FunctionTool(log_coordination_step),
+        FunctionTool(dispatch_parallel_tasks)
     ],
     generate_content_config=types.GenerateContentConfig(
         temperature=0.5,
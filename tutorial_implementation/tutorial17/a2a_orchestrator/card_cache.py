@@ -0,0 +1,196 @@
+"""
+Async Agent Card Cache
+
+Caches remote agents' cards so availability checks and dispatch don't pay
+an HTTP round-trip each time. Entries are fresh for `ttl` seconds; after
+that they are revalidated with If-None-Match when the server sent an ETag
+(a 304 keeps the cached card). Concurrent lookups of the same agent share
+one request. Background health probes revalidate the registered agents
+periodically, so availability is usually answered from memory.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional
+
+import httpx
+from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH
+
+# Seconds a fetched card is served without revalidation
+DEFAULT_TTL = 60.0
+
+# Seconds a failed check is served before retrying
+DEFAULT_NEGATIVE_TTL = 5.0
+
+# Seconds between background health probes
+DEFAULT_PROBE_INTERVAL = 15.0
+
+# Per-request HTTP timeout in seconds
+DEFAULT_TIMEOUT = 5.0
+
+
+@dataclass
+class CardEntry:
+    """Last known card and health of one remote agent."""
+
+    base_url: str
+    card: Optional[Dict[str, Any]] = None
+    etag: Optional[str] = None
+    available: bool = False
+    error: Optional[str] = None
+    checked_at: float = 0.0
+    latency: float = 0.0
+    consecutive_failures: int = 0
+    fetches: int = 0
+    not_modified: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "available": self.available,
+            "error": self.error,
+            "checked_at": self.checked_at,
+            "latency_ms": round(self.latency * 1000, 2),
+            "consecutive_failures": self.consecutive_failures,
+            "name": (self.card or {}).get("name"),
+        }
+
+
+class AgentCardCache:
+    """
+    TTL/ETag cache of agent cards with background health probes.
+
+    Args:
+        ttl: Seconds a card is served from memory before revalidation
+        negative_ttl: Seconds a failed check is served before retrying
+        probe_interval: Seconds between background probes of known agents
+        timeout: HTTP timeout per request
+        client: Shared httpx.AsyncClient (created lazily if omitted)
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL,
+        timeout: float = DEFAULT_TIMEOUT,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.probe_interval = probe_interval
+        self.timeout = timeout
+        self.entries: Dict[str, CardEntry] = {}
+        self._client = client
+        self._owns_client = client is None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._probe_task: Optional[asyncio.Task] = None
+        self.probe_urls: set = set()
+        self.requests = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client; an owned client is recreated for a new event loop."""
+        loop = asyncio.get_running_loop()
+        stale = self._client is None or self._client.is_closed or self._client_loop is not loop
+        if self._owns_client and stale:
+            # Pooled connections belong to the loop that opened them
+            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._client_loop = loop
+        return self._client
+
+    async def get(self, base_url: str, force: bool = False) -> CardEntry:
+        """Return the entry for `base_url`, revalidating it if stale."""
+        base_url = base_url.rstrip("/")
+        entry = self.entries.get(base_url)
+        if entry is not None and not force and entry.checked_at:
+            ttl = self.ttl if entry.available else self.negative_ttl
+            if time.monotonic() - entry.checked_at < ttl:
+                return entry
+
+        pending = self._pending.get(base_url)
+        if pending is None:
+            # The check runs as its own task: cancelling the caller that
+            # started it must not fail the others waiting on the same agent
+            pending = self._pending[base_url] = asyncio.get_running_loop().create_task(
+                self._revalidate(base_url)
+            )
+            pending.add_done_callback(lambda _: self._pending.pop(base_url, None))
+        return await asyncio.shield(pending)
+
+    async def _revalidate(self, base_url: str) -> CardEntry:
+        entry = self.entries.setdefault(base_url, CardEntry(base_url))
+        headers = {"If-None-Match": entry.etag} if entry.etag and entry.card else {}
+        started = time.monotonic()
+        self.requests += 1
+        try:
+            response = await self.client.get(
+                f"{base_url}{AGENT_CARD_WELL_KNOWN_PATH}", headers=headers
+            )
+            if response.status_code == 304:
+                entry.not_modified += 1
+            elif response.status_code == 200:
+                entry.card = response.json()
+                entry.etag = response.headers.get("etag")
+                entry.fetches += 1
+            else:
+                raise httpx.HTTPStatusError(
+                    f"returned status {response.status_code}",
+                    request=response.request,
+                    response=response,
+                )
+        except (httpx.HTTPError, ValueError) as e:
+            # Keep the last good card; callers decide whether a stale card is usable
+            entry.available = False
+            entry.error = str(e) or type(e).__name__
+            entry.consecutive_failures += 1
+        else:
+            entry.available = True
+            entry.error = None
+            entry.consecutive_failures = 0
+        entry.latency = time.monotonic() - started
+        entry.checked_at = time.monotonic()
+        return entry
+
+    def status(self, base_url: str) -> Optional[CardEntry]:
+        """Cached entry without any I/O (None if never checked)."""
+        return self.entries.get(base_url.rstrip("/"))
+
+    # ------------------------------------------------------------------
+    # Background health probes
+    # ------------------------------------------------------------------
+
+    def start_probes(self, base_urls: Iterable[str] = ()) -> asyncio.Task:
+        """Probe `base_urls` (added to any already probed) on a background task. Idempotent."""
+        self.probe_urls.update(url.rstrip("/") for url in base_urls)
+        loop = asyncio.get_running_loop()
+        task = self._probe_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._probe_task = loop.create_task(self._probe_loop())
+        return self._probe_task
+
+    async def probe_all(self) -> Dict[str, CardEntry]:
+        """Revalidate every probed agent concurrently."""
+        urls = sorted(self.probe_urls)
+        entries = await asyncio.gather(*(self.get(url, force=True) for url in urls))
+        return dict(zip(urls, entries))
+
+    async def _probe_loop(self) -> None:
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self.probe_interval)
+
+    async def close(self) -> None:
+        """Stop probing and close the HTTP client."""
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            try:
+                await self._probe_task
+            except asyncio.CancelledError:
+                pass
+            self._probe_task = None
+        if self._owns_client and self._client is not None:
+            await self._client.aclose()
+            self._client = None
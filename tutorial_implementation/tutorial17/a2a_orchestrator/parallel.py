@@ -0,0 +1,273 @@
+"""
+Parallel A2A Dispatch
+
+Sends independent subtasks to several remote A2A agents at once and merges
+their replies, so a research + analysis + writing request costs the slowest
+agent's latency instead of the sum. Cards come from the AgentCardCache:
+once it is warm, dispatch makes no card requests, and agents the cache
+reports as down are skipped instead of waited on.
+"""
+
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from a2a.client import ClientConfig, ClientFactory, create_text_message_object
+from a2a.types import AgentCard, Message, TaskArtifactUpdateEvent
+
+from .card_cache import AgentCardCache
+
+# Seconds allowed for one remote subtask
+DEFAULT_TASK_TIMEOUT = 60.0
+
+# The tutorial's standalone A2A servers (`python -m research_agent` etc.)
+LOCAL_SERVERS = {
+    "research_specialist": ("research_agent", "http://localhost:9001"),
+    "data_analyst": ("analysis_agent", "http://localhost:9002"),
+    "content_writer": ("content_agent", "http://localhost:9003"),
+}
+
+
+def _parts_text(parts: Optional[Sequence[Any]]) -> str:
+    texts = []
+    for part in parts or []:
+        part = getattr(part, "root", part)
+        if getattr(part, "text", None):
+            texts.append(part.text)
+    return "".join(texts)
+
+
+def response_text(event: Any) -> str:
+    """Text of an A2A client event: a Message, or a (Task, update) pair."""
+    if isinstance(event, Message):
+        return _parts_text(event.parts)
+    task = event[0] if isinstance(event, tuple) else event
+    artifacts = "".join(_parts_text(a.parts) for a in (getattr(task, "artifacts", None) or []))
+    if artifacts:
+        return artifacts
+    status_message = getattr(getattr(task, "status", None), "message", None)
+    return _parts_text(status_message.parts) if status_message else ""
+
+
+async def send_task(card: Dict[str, Any], request: str, client: httpx.AsyncClient) -> str:
+    """Send one text request to the agent described by `card`; returns its reply text."""
+    a2a_client = ClientFactory(ClientConfig(streaming=False, httpx_client=client)).create(
+        AgentCard.model_validate(card)
+    )
+    reply = ""
+    async for event in a2a_client.send_message(create_text_message_object(content=request)):
+        reply = response_text(event) or reply
+    return reply
+
+
+async def stream_task(
+    card: Dict[str, Any], request: str, client: httpx.AsyncClient
+) -> AsyncIterator[str]:
+    """
+    Send one text request over a streaming connection, yielding reply chunks as they arrive.
+
+    The remote executors publish their output as artifact chunks, so the
+    first chunk is available well before the task completes.
+    """
+    a2a_client = ClientFactory(ClientConfig(streaming=True, httpx_client=client)).create(
+        AgentCard.model_validate(card)
+    )
+    async for event in a2a_client.send_message(create_text_message_object(content=request)):
+        if isinstance(event, Message):
+            text = _parts_text(event.parts)
+        elif isinstance(event[1], TaskArtifactUpdateEvent):
+            text = _parts_text(event[1].artifact.parts)
+        else:
+            continue
+        if text:
+            yield text
+
+
+async def dispatch_parallel(
+    subtasks: Sequence[Tuple[str, str]],
+    agents: Dict[str, str],
+    cache: AgentCardCache,
+    timeout: float = DEFAULT_TASK_TIMEOUT,
+) -> Dict[str, Any]:
+    """
+    Run (agent_name, request) subtasks concurrently and merge the replies.
+
+    Each subtask fails independently: unknown or unavailable agents and
+    timeouts are reported in its result without cancelling the others.
+    Results keep the order of `subtasks`.
+
+    Args:
+        subtasks: (agent name, request text) pairs
+        agents: Agent name -> base URL
+        cache: Card cache used to resolve and health-check agents
+        timeout: Seconds allowed per subtask
+    """
+    started = time.monotonic()
+
+    async def run_one(agent_name: str, request: str) -> Dict[str, Any]:
+        t0 = time.monotonic()
+        result: Dict[str, Any] = {"agent": agent_name, "request": request}
+        base_url = agents.get(agent_name)
+        if base_url is None:
+            result.update(status="error", error=f"Unknown agent {agent_name}")
+        else:
+            entry = await cache.get(base_url)
+            if not entry.available:
+                result.update(
+                    status="skipped", error=f"Agent {agent_name} is unavailable: {entry.error}"
+                )
+            else:
+                try:
+                    reply = await asyncio.wait_for(
+                        send_task(entry.card, request, cache.client), timeout
+                    )
+                    result.update(status="success", response=reply)
+                except asyncio.TimeoutError:
+                    result.update(status="error", error=f"Timed out after {timeout}s")
+                except Exception as e:
+                    result.update(status="error", error=str(e) or type(e).__name__)
+        result["latency_ms"] = round((time.monotonic() - t0) * 1000, 1)
+        return result
+
+    results: List[Dict[str, Any]] = await asyncio.gather(
+        *(run_one(name, req) for name, req in subtasks)
+    )
+    succeeded = [r for r in results if r["status"] == "success"]
+    elapsed_ms = round((time.monotonic() - started) * 1000, 1)
+
+    if len(succeeded) == len(results):
+        status = "success"
+    elif succeeded:
+        status = "partial"
+    else:
+        status = "error"
+    return {
+        "status": status,
+        "report": f"{len(succeeded)}/{len(results)} subtasks completed in {elapsed_ms}ms",
+        "results": results,
+        "merged": "\n\n".join(f"## {r['agent']}\n{r['response']}" for r in succeeded),
+        "elapsed_ms": elapsed_ms,
+        "sum_of_latencies_ms": round(sum(r["latency_ms"] for r in results), 1),
+    }
+
+
+# ----------------------------------------------------------------------
+# Benchmark against the local __main__ servers
+# ----------------------------------------------------------------------
+
+async def _wait_until_available(
+    cache: AgentCardCache, urls: Sequence[str], deadline_s: float = 30.0
+) -> None:
+    deadline = time.monotonic() + deadline_s
+    while True:
+        entries = await asyncio.gather(*(cache.get(url, force=True) for url in urls))
+        if all(e.available for e in entries):
+            return
+        if time.monotonic() > deadline:
+            down = [e.base_url for e in entries if not e.available]
+            raise RuntimeError(f"A2A servers did not start: {down}")
+        await asyncio.sleep(0.25)
+
+
+async def _benchmark(rounds: int) -> Dict[str, Any]:
+    import requests
+
+    agents = {name: url for name, (_, url) in LOCAL_SERVERS.items()}
+    subtasks = [
+        ("research_specialist", "Research quantum computing trends"),
+        ("data_analyst", "Analyze AI market growth data"),
+        ("content_writer", "Write a summary of AI adoption"),
+    ]
+    cache = AgentCardCache()
+    await _wait_until_available(cache, list(agents.values()))
+
+    # Availability checks: blocking request per check (before) vs cache hit
+    t0 = time.perf_counter()
+    for url in agents.values():
+        requests.get(f"{url}/.well-known/agent-card.json", timeout=5)
+    blocking_check_ms = (time.perf_counter() - t0) * 1000 / len(agents)
+    t0 = time.perf_counter()
+    for _ in range(100):
+        for url in agents.values():
+            await cache.get(url)
+    cached_check_ms = (time.perf_counter() - t0) * 1000 / (100 * len(agents))
+
+    warm_requests = cache.requests
+    sequential, parallel = [], []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for name, request in subtasks:
+            await send_task(cache.entries[agents[name]].card, request, cache.client)
+        sequential.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        result = await dispatch_parallel(subtasks, agents, cache)
+        parallel.append((time.perf_counter() - t0) * 1000)
+        assert result["status"] == "success", result
+
+    # Streaming: time to the first chunk vs the whole reply from the slowest agent
+    first_chunk, full_reply = [], []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        first = None
+        card = cache.entries[agents["data_analyst"]].card
+        async for _chunk in stream_task(card, subtasks[1][1], cache.client):
+            first = first or (time.perf_counter() - t0) * 1000
+        first_chunk.append(first)
+        full_reply.append((time.perf_counter() - t0) * 1000)
+
+    card_requests = cache.requests - warm_requests
+    await cache.close()
+    return {
+        "rounds": rounds,
+        "blocking_check_ms": blocking_check_ms,
+        "cached_check_ms": cached_check_ms,
+        "sequential_ms": statistics.median(sequential),
+        "parallel_ms": statistics.median(parallel),
+        "first_chunk_ms": statistics.median(first_chunk),
+        "full_reply_ms": statistics.median(full_reply),
+        "card_requests": card_requests,
+    }
+
+
+def benchmark_parallel_dispatch(rounds: int = 5) -> Dict[str, Any]:
+    """
+    Start the three local A2A servers, then time sequential vs parallel dispatch.
+
+    Servers run as subprocesses (`python -m research_agent` etc.) from the
+    tutorial directory and are stopped afterwards. Returns median wall times.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    servers = [
+        subprocess.Popen(
+            [sys.executable, "-m", module], cwd=root,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        for module, _ in LOCAL_SERVERS.values()
+    ]
+    try:
+        return asyncio.run(_benchmark(rounds))
+    finally:
+        for server in servers:
+            server.terminate()
+        for server in servers:
+            server.wait(timeout=10)
+
+
+def report_parallel_dispatch(rounds: int = 5) -> None:
+    """Print availability-check and dispatch timings against the local servers."""
+    r = benchmark_parallel_dispatch(rounds)
+    print(f"Median of {r['rounds']} rounds, 3 subtasks against the local A2A servers\n")
+    print(f"{'availability check (blocking GET)':<36}{r['blocking_check_ms']:>10.3f}ms")
+    print(f"{'availability check (card cache)':<36}{r['cached_check_ms']:>10.4f}ms")
+    print(f"{'sequential dispatch':<36}{r['sequential_ms']:>10.0f}ms")
+    print(f"{'parallel dispatch':<36}{r['parallel_ms']:>10.0f}ms"
+          f"  ({r['sequential_ms'] / r['parallel_ms']:.1f}x)")
+    print(f"{'streaming: first chunk':<36}{r['first_chunk_ms']:>10.0f}ms")
+    print(f"{'streaming: full reply':<36}{r['full_reply_ms']:>10.0f}ms")
+    print(f"{'card requests while dispatching':<36}{r['card_requests']:>10}")
@@ -0,0 +1,7 @@
+"""
+Shared streaming executor for the remote A2A agents.
+"""
+
+from .executor import StreamingAgentExecutor
+
+__all__ = ['StreamingAgentExecutor']
@@ -0,0 +1,203 @@
+"""
+Streaming A2A Agent Executor
+
+Shared base for the remote agents' executors. Output is streamed as
+artifact chunks while the agent produces it, so clients can start reading
+before the task completes. cancel() cancels the running work. Per-task
+timing is attached to the final status update's metadata and kept in
+`timings`.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional, Protocol
+
+from a2a.server.agent_execution import AgentExecutor, RequestContext
+from a2a.server.events import EventQueue
+from a2a.server.tasks import TaskUpdater
+from a2a.types import Part, Task, TaskState, TaskStatus, TextPart
+
+# Recently finished tasks whose timing is kept
+MAX_TIMINGS = 256
+
+
+class StreamingAgent(Protocol):
+    def stream(self, query: str) -> AsyncIterator[str]: ...
+
+
+class StreamingAgentExecutor(AgentExecutor):
+    """
+    A2A Agent Executor that streams an agent's output as artifact chunks.
+
+    Subclasses pass the agent and set the names and messages below.
+    """
+
+    # Artifact the output chunks are appended to
+    artifact_name = "result"
+    # Working status message, followed by the query
+    working_message = "Working"
+    # Failed status message, followed by the error
+    failure_message = "Task failed"
+    # Canceled status message
+    cancel_message = "Task cancelled"
+    # Query used when the request carries no text
+    default_query = ""
+
+    def __init__(self, agent: StreamingAgent):
+        self.agent = agent
+        self.running: Dict[str, asyncio.Task] = {}
+        self.updaters: Dict[str, TaskUpdater] = {}
+        self.timings: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._cancelling: Dict[str, asyncio.Event] = {}
+
+    async def execute(
+        self,
+        context: RequestContext,
+        event_queue: EventQueue,
+    ) -> None:
+        """Execute the task, streaming output as it is produced."""
+        # Extract query from the request message
+        query = ""
+        if context.message and context.message.parts:
+            for part in context.message.parts:
+                # Handle A2A SDK Part structure
+                part_data = part
+                if hasattr(part, 'root'):
+                    part_data = part.root
+
+                if hasattr(part_data, 'text') and part_data.text:
+                    query += part_data.text
+        query = query or self.default_query
+
+        task = context.current_task
+        if task is None:
+            task = Task(
+                id=context.task_id,
+                context_id=context.context_id,
+                status=TaskStatus(state=TaskState.submitted),
+                history=[context.message] if context.message else [],
+            )
+            await event_queue.enqueue_event(task)
+
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        timing = self._start_timing(task.id)
+        work = asyncio.create_task(self._stream(query, updater, timing))
+        self.running[task.id] = work
+        self.updaters[task.id] = updater
+        try:
+            await work
+        except asyncio.CancelledError:
+            cancelled = self._cancelling.get(task.id)
+            if cancelled is None:
+                raise
+            # Keep the queue open until cancel() has published the final status
+            await cancelled.wait()
+        finally:
+            self.running.pop(task.id, None)
+            self.updaters.pop(task.id, None)
+
+    async def _stream(self, query: str, updater: TaskUpdater, timing: Dict[str, Any]) -> None:
+        await updater.start_work(message=_text_message(updater, f"{self.working_message}: {query}"))
+        artifact_id = str(uuid.uuid4())
+        try:
+            async for chunk in self.agent.stream(query):
+                if timing["chunks"] == 0:
+                    timing["first_chunk_ms"] = _elapsed_ms(timing)
+                await updater.add_artifact(
+                    [Part(root=TextPart(text=chunk))],
+                    artifact_id=artifact_id,
+                    name=self.artifact_name,
+                    append=timing["chunks"] > 0,
+                    last_chunk=False,
+                )
+                timing["chunks"] += 1
+        except Exception as e:
+            self._finish_timing(timing, TaskState.failed)
+            await updater.update_status(
+                TaskState.failed,
+                message=_text_message(updater, f"{self.failure_message}: {str(e)}"),
+                final=True,
+                metadata={"timing": _report(timing)},
+            )
+            return
+
+        await updater.add_artifact(
+            [Part(root=TextPart(text=""))],
+            artifact_id=artifact_id,
+            name=self.artifact_name,
+            append=True,
+            last_chunk=True,
+        )
+        self._finish_timing(timing, TaskState.completed)
+        await updater.update_status(
+            TaskState.completed, final=True, metadata={"timing": _report(timing)}
+        )
+
+    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
+        """Cancel the running task, then publish its canceled status."""
+        task_id = context.task_id
+        work = self.running.get(task_id)
+        # Publish on the task's own queue when it is running, so streaming
+        # clients see the final status too (the cancel request reads a tap of it)
+        updater = self.updaters.get(task_id) or TaskUpdater(
+            event_queue, task_id, context.context_id
+        )
+        timing = self.timings.get(task_id) or self._start_timing(task_id)
+        cancelled = self._cancelling[task_id] = asyncio.Event()
+        try:
+            if work is not None:
+                # Stop the work first so nothing is published after the final status
+                work.cancel()
+                await asyncio.wait([work])
+                if not work.cancelled():
+                    # It finished before the cancellation landed
+                    return
+            self._finish_timing(timing, TaskState.canceled)
+            await updater.update_status(
+                TaskState.canceled,
+                message=_text_message(updater, self.cancel_message),
+                final=True,
+                metadata={"timing": _report(timing)},
+            )
+        finally:
+            cancelled.set()
+            self._cancelling.pop(task_id, None)
+
+    def timing(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Timing of a running or recently finished task."""
+        timing = self.timings.get(task_id)
+        return _report(timing) if timing else None
+
+    def _start_timing(self, task_id: str) -> Dict[str, Any]:
+        timing = {
+            "task_id": task_id,
+            "state": TaskState.working.value,
+            "started_at": time.time(),
+            "_started": time.monotonic(),
+            "first_chunk_ms": None,
+            "elapsed_ms": None,
+            "chunks": 0,
+        }
+        self.timings[task_id] = timing
+        while len(self.timings) > MAX_TIMINGS:
+            self.timings.popitem(last=False)
+        return timing
+
+    def _finish_timing(self, timing: Dict[str, Any], state: TaskState) -> None:
+        if timing["elapsed_ms"] is None:
+            timing["elapsed_ms"] = _elapsed_ms(timing)
+        timing["state"] = state.value
+
+
+def _text_message(updater: TaskUpdater, text: str):
+    return updater.new_agent_message([Part(root=TextPart(text=text))])
+
+
+def _elapsed_ms(timing: Dict[str, Any]) -> float:
+    return round((time.monotonic() - timing["_started"]) * 1000, 1)
+
+
+def _report(timing: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in timing.items() if not key.startswith("_")}
@@ -5,9 +5,13 @@ This agent specializes in data analysis, statistical insights, and quantitative
 """
 
 import asyncio
-from a2a.server.agent_execution import AgentExecutor, RequestContext
-from a2a.server.events import EventQueue
-from a2a.utils import new_agent_text_message
+import re
+from typing import AsyncIterator
+
+from a2a_streaming import StreamingAgentExecutor
+
+# Simulated seconds of analysis per query
+PROCESSING_TIME = 0.7
 
 
 class AnalysisAgent:
@@ -15,9 +19,18 @@ class AnalysisAgent:
 
     async def invoke(self, query: str = "") -> str:
         """Process analysis queries and return insights."""
-        # Simulate analysis process
-        await asyncio.sleep(0.7)  # Simulate processing time
-
+        return "".join([chunk async for chunk in self.stream(query)])
+
+    async def stream(self, query: str = "") -> AsyncIterator[str]:
+        """Yield the insights a section at a time as they are produced."""
+        sections = re.split(r"(?<=\n\n)", self.compose(query))
+        for section in sections:
+            # Simulate analysis process, spread across the sections
+            await asyncio.sleep(PROCESSING_TIME / len(sections))
+            yield section
+
+    def compose(self, query: str = "") -> str:
+        """Full insights for a query."""
         if "growth" in query.lower() or "trend" in query.lower():
             return """Data Analysis Report: Growth Trends
 
@@ -121,45 +134,13 @@ Comprehensive analysis performed on the requested topic with statistical rigor.
 I specialize in data analysis, statistical insights, and quantitative research. Please provide specific data or metrics to analyze for detailed statistical insights and recommendations."""
 
 
-class AnalysisAgentExecutor(AgentExecutor):
+class AnalysisAgentExecutor(StreamingAgentExecutor):
     """A2A Agent Executor for the Analysis Agent."""
 
+    artifact_name = "analysis_report"
+    working_message = "Analyzing"
+    failure_message = "Analysis failed"
+    cancel_message = "Analysis task cancelled"
+
     def __init__(self):
-        self.agent = AnalysisAgent()
-
-    async def execute(
-        self,
-        context: RequestContext,
-        event_queue: EventQueue,
-    ) -> None:
-        """Execute analysis tasks."""
-        try:
-            # Extract query from the request message
-            query = ""
-            if context.message and context.message.parts:
-                for part in context.message.parts:
-                    # Handle A2A SDK Part structure
-                    part_data = part
-                    if hasattr(part, 'root'):
-                        part_data = part.root
-                        
-                    if hasattr(part_data, 'text') and part_data.text:
-                        query += part_data.text
-
-            # Process the analysis query
-            result = await self.agent.invoke(query)
-
-            # Send the result as a text message
-            message = new_agent_text_message(result)
-            await event_queue.enqueue_event(message)
-
-        except Exception as e:
-            # Send error message
-            error_message = new_agent_text_message(f"Analysis failed: {str(e)}")
-            await event_queue.enqueue_event(error_message)
-
-    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
-        """Cancel the current analysis task."""
-        # Send cancellation acknowledgment
-        message = new_agent_text_message("Analysis task cancelled")
-        await event_queue.enqueue_event(message)
\ No newline at end of file
+        super().__init__(AnalysisAgent())
@@ -5,19 +5,32 @@ This agent specializes in content creation, writing, and summarization.
 """
 
 import asyncio
-from a2a.server.agent_execution import AgentExecutor, RequestContext
-from a2a.server.events import EventQueue
-from a2a.utils import new_agent_text_message
+import re
+from typing import AsyncIterator
+
+from a2a_streaming import StreamingAgentExecutor
+
+# Simulated seconds of content creation per query
+PROCESSING_TIME = 0.5
 
 
 class ContentAgent:
     """Content Agent that creates written content and summaries."""
 
-    async def invoke(self, query: str) -> str:
+    async def invoke(self, query: str = "") -> str:
         """Process content creation queries and return written content."""
-        # Simulate content creation process
-        await asyncio.sleep(0.5)  # Simulate processing time
-
+        return "".join([chunk async for chunk in self.stream(query)])
+
+    async def stream(self, query: str = "") -> AsyncIterator[str]:
+        """Yield the written content a section at a time as it is produced."""
+        sections = re.split(r"(?<=\n\n)", self.compose(query))
+        for section in sections:
+            # Simulate content creation process, spread across the sections
+            await asyncio.sleep(PROCESSING_TIME / len(sections))
+            yield section
+
+    def compose(self, query: str = "") -> str:
+        """Full written content for a query."""
         if "summary" in query.lower() or "executive" in query.lower():
             return """# Executive Summary
 
@@ -129,48 +142,14 @@ The analysis suggests a positive outlook with clear strategic directions for suc
 *Content generated based on comprehensive research and analysis.*"""
 
 
-class ContentAgentExecutor(AgentExecutor):
+class ContentAgentExecutor(StreamingAgentExecutor):
     """A2A Agent Executor for the Content Agent."""
 
+    artifact_name = "written_content"
+    working_message = "Writing"
+    failure_message = "Content creation failed"
+    cancel_message = "Content creation task cancelled"
+    default_query = "general content creation inquiry"
+
     def __init__(self):
-        self.agent = ContentAgent()
-
-    async def execute(
-        self,
-        context: RequestContext,
-        event_queue: EventQueue,
-    ) -> None:
-        """Execute content creation tasks."""
-        try:
-            # Extract query from the request
-            query = ""
-            if context.message and context.message.parts:
-                for part in context.message.parts:
-                    # Handle nested root structure in A2A SDK
-                    part_data = part
-                    if hasattr(part, 'root'):
-                        part_data = part.root
-                        
-                    if hasattr(part_data, 'text'):
-                        query += part_data.text
-
-            if not query:
-                query = "general content creation inquiry"
-
-            # Process the content creation query
-            result = await self.agent.invoke(query)
-
-            # Send the result as a text message
-            message = new_agent_text_message(result)
-            await event_queue.enqueue_event(message)
-
-        except Exception as e:
-            # Send error message
-            error_message = new_agent_text_message(f"Content creation failed: {str(e)}")
-            await event_queue.enqueue_event(error_message)
-
-    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
-        """Cancel the current content creation task."""
-        # Send cancellation acknowledgment
-        message = new_agent_text_message("Content creation task cancelled")
-        await event_queue.enqueue_event(message)
\ No newline at end of file
+        super().__init__(ContentAgent())
@@ -5,10 +5,13 @@ This agent specializes in research, fact-checking, and information gathering.
 """
 
 import asyncio
+import re
+from typing import AsyncIterator
 
-from a2a.server.agent_execution import AgentExecutor, RequestContext
-from a2a.server.events import EventQueue
-from a2a.utils import new_agent_text_message
+from a2a_streaming import StreamingAgentExecutor
+
+# Simulated seconds of research per query
+PROCESSING_TIME = 0.5
 
 
 class ResearchAgent:
@@ -16,9 +19,18 @@ class ResearchAgent:
 
     async def invoke(self, query: str = "") -> str:
         """Process research queries and return findings."""
-        # Simulate research process
-        await asyncio.sleep(0.5)  # Simulate processing time
-
+        return "".join([chunk async for chunk in self.stream(query)])
+
+    async def stream(self, query: str = "") -> AsyncIterator[str]:
+        """Yield the findings a section at a time as they are produced."""
+        sections = re.split(r"(?<=\n\n)", self.compose(query))
+        for section in sections:
+            # Simulate research process, spread across the sections
+            await asyncio.sleep(PROCESSING_TIME / len(sections))
+            yield section
+
+    def compose(self, query: str = "") -> str:
+        """Full findings for a query."""
         if "quantum" in query.lower():
             return """Research Results for: quantum computing
 
@@ -72,45 +84,13 @@ Based on comprehensive web research:
 I specialize in research, fact-checking, and information gathering. Please provide a specific research query to get detailed findings with citations."""
 
 
-class ResearchAgentExecutor(AgentExecutor):
+class ResearchAgentExecutor(StreamingAgentExecutor):
     """A2A Agent Executor for the Research Agent."""
 
+    artifact_name = "research_findings"
+    working_message = "Researching"
+    failure_message = "Research failed"
+    cancel_message = "Research task cancelled"
+
     def __init__(self):
-        self.agent = ResearchAgent()
-
-    async def execute(
-        self,
-        context: RequestContext,
-        event_queue: EventQueue,
-    ) -> None:
-        """Execute research tasks."""
-        try:
-            # Extract query from the request message
-            query = ""
-            if context.message and context.message.parts:
-                for part in context.message.parts:
-                    # Handle A2A SDK Part structure
-                    part_data = part
-                    if hasattr(part, 'root'):
-                        part_data = part.root
-                        
-                    if hasattr(part_data, 'text') and part_data.text:
-                        query += part_data.text
-
-            # Process the research query
-            result = await self.agent.invoke(query)
-
-            # Send the result as a text message
-            message = new_agent_text_message(result)
-            await event_queue.enqueue_event(message)
-
-        except Exception as e:
-            # Send error message
-            error_message = new_agent_text_message(f"Research failed: {str(e)}")
-            await event_queue.enqueue_event(error_message)
-
-    async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
-        """Cancel the current research task."""
-        # Send cancellation acknowledgment
-        message = new_agent_text_message("Research task cancelled")
-        await event_queue.enqueue_event(message)
\ No newline at end of file
+        super().__init__(ResearchAgent())
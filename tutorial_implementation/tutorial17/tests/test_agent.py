@@ -3,6 +3,8 @@ Test suite for the A2A Agent implementation.
 Tests agent configuration, tools, and A2A setup.
 """
 
+import asyncio
+
 import pytest
 from google.adk.agents import Agent
 from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
@@ -48,7 +50,7 @@ class TestA2AAgent:
         from a2a_orchestrator.agent import check_agent_availability
         
         # Test with invalid URL (should return error)
-        result = check_agent_availability("test_agent", "http://invalid-url:9999")
+        result = asyncio.run(check_agent_availability("test_agent", "http://invalid-url:9999"))
         assert result["status"] == "error"
         assert result["available"] is False
 
@@ -89,7 +91,7 @@ class TestTools:
         """Test that check_agent_availability returns proper format."""
         from a2a_orchestrator.agent import check_agent_availability
         
-        result = check_agent_availability("test", "http://invalid:9999")
+        result = asyncio.run(check_agent_availability("test", "http://invalid:9999"))
         
         assert isinstance(result, dict)
         assert "status" in result
@@ -0,0 +1,131 @@
+"""
+Test streaming, cancellation and timing in the remote agents' executors.
+"""
+
+import asyncio
+import time
+
+import pytest
+from a2a.client import create_text_message_object
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import (
+    MessageSendParams,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskState,
+    TaskStatusUpdateEvent,
+)
+
+from analysis_agent import AnalysisAgentExecutor
+from content_agent import ContentAgentExecutor
+from research_agent import ResearchAgentExecutor
+
+EXECUTORS = [ResearchAgentExecutor, AnalysisAgentExecutor, ContentAgentExecutor]
+
+
+def send_params(text):
+    return MessageSendParams(message=create_text_message_object(content=text))
+
+
+def chunk_text(event):
+    """Text of an artifact chunk.
+
+    Read it on arrival: the task store appends later chunks to it in place.
+    """
+    return "".join(part.root.text for part in event.artifact.parts)
+
+
+@pytest.mark.parametrize("executor_class", EXECUTORS)
+class TestStreamingExecution:
+    """Test output is streamed as artifact chunks with a final status."""
+
+    @pytest.mark.asyncio
+    async def test_streams_chunks_before_completion(self, executor_class):
+        """Test chunks arrive incrementally and join into the full reply."""
+        executor = executor_class()
+        handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+        query = "Research AI growth trends summary"
+
+        started = time.monotonic()
+        events, arrivals, text = [], [], ""
+        async for event in handler.on_message_send_stream(send_params(query)):
+            events.append(event)
+            arrivals.append(time.monotonic() - started)
+            if isinstance(event, TaskArtifactUpdateEvent):
+                text += chunk_text(event)
+
+        assert isinstance(events[0], Task)
+        assert events[1].status.state == TaskState.working
+        final = events[-1]
+        assert isinstance(final, TaskStatusUpdateEvent) and final.final
+        assert final.status.state == TaskState.completed
+
+        chunks = [i for i, e in enumerate(events) if isinstance(e, TaskArtifactUpdateEvent)]
+        assert len(chunks) > 2
+        assert events[chunks[-1]].last_chunk
+        # The first chunk lands well before the task finishes
+        assert arrivals[chunks[0]] < arrivals[-1] / 2
+        assert text == await executor.agent.invoke(query)
+
+    @pytest.mark.asyncio
+    async def test_timing_exposed(self, executor_class):
+        """Test per-task timing is in the final status metadata and on the executor."""
+        executor = executor_class()
+        handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+
+        events = [e async for e in handler.on_message_send_stream(send_params("Analyze AI trends"))]
+        timing = events[-1].metadata["timing"]
+
+        assert timing["state"] == "completed"
+        assert 0 < timing["first_chunk_ms"] < timing["elapsed_ms"]
+        chunks = [e for e in events if isinstance(e, TaskArtifactUpdateEvent)]
+        assert timing["chunks"] == len(chunks) - 1
+        assert executor.timing(events[0].id) == timing
+
+    @pytest.mark.asyncio
+    async def test_blocking_send_returns_full_reply(self, executor_class):
+        """Test non-streaming clients still get the whole reply on the task."""
+        executor = executor_class()
+        handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+
+        task = await handler.on_message_send(send_params("Write about quantum computing"))
+
+        assert task.status.state == TaskState.completed
+        text = "".join(part.root.text for part in task.artifacts[0].parts)
+        assert text == await executor.agent.invoke("Write about quantum computing")
+
+
+@pytest.mark.parametrize("executor_class", EXECUTORS)
+class TestCancellation:
+    """Test cancel() stops work already in flight."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_running_task(self, executor_class):
+        """Test a cancelled task stops streaming and reports canceled to both callers."""
+        executor = executor_class()
+        handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+        stream = handler.on_message_send_stream(send_params("Research AI growth trends summary"))
+
+        events = []
+        async for event in stream:
+            events.append(event)
+            if isinstance(event, TaskArtifactUpdateEvent):
+                break
+        task_id = events[0].id
+        work = executor.running[task_id]
+
+        cancelled = await handler.on_cancel_task(TaskIdParams(id=task_id))
+        events += [event async for event in stream]
+
+        assert cancelled.status.state == TaskState.canceled
+        assert events[-1].status.state == TaskState.canceled and events[-1].final
+        # Nothing is published after the final status
+        finals = [e for e in events if isinstance(e, TaskStatusUpdateEvent) and e.final]
+        assert finals == [events[-1]]
+        await asyncio.sleep(0)
+        assert work.cancelled()
+        assert executor.timing(task_id)["state"] == "canceled"
+        # Stopped part-way: fewer chunks than the complete reply
+        assert not any(isinstance(e, TaskArtifactUpdateEvent) and e.last_chunk for e in events)
@@ -0,0 +1,238 @@
+"""
+Test the agent card cache and parallel A2A dispatch.
+
+The remote agents' executors are served in-process through httpx's ASGI
+transport, so no ports are opened.
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCapabilities, AgentCard
+
+from a2a_orchestrator.card_cache import AgentCardCache
+from a2a_orchestrator.parallel import dispatch_parallel, stream_task
+from analysis_agent import AnalysisAgentExecutor
+from content_agent import ContentAgentExecutor
+from research_agent import ResearchAgentExecutor
+
+AGENTS = {
+    "research_specialist": "http://localhost:9001",
+    "data_analyst": "http://localhost:9002",
+    "content_writer": "http://localhost:9003",
+}
+
+
+def a2a_app(name, url, executor):
+    card = AgentCard(
+        name=name,
+        description=name,
+        url=f"{url}/",
+        version="1.0.0",
+        default_input_modes=["text"],
+        default_output_modes=["text"],
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[],
+    )
+    handler = DefaultRequestHandler(agent_executor=executor, task_store=InMemoryTaskStore())
+    return A2AStarletteApplication(agent_card=card, http_handler=handler).build()
+
+
+class HostRouter(httpx.AsyncBaseTransport):
+    """Route requests to an ASGI app by host:port; unknown hosts fail to connect."""
+
+    def __init__(self, apps):
+        self.transports = {
+            httpx.URL(url).port: httpx.ASGITransport(app=app) for url, app in apps.items()
+        }
+
+    async def handle_async_request(self, request):
+        transport = self.transports.get(request.url.port)
+        if transport is None:
+            raise httpx.ConnectError("connection refused", request=request)
+        return await transport.handle_async_request(request)
+
+
+def remote_agents_client():
+    executors = {
+        "research_specialist": ("Research", ResearchAgentExecutor),
+        "data_analyst": ("Analysis", AnalysisAgentExecutor),
+        "content_writer": ("Content", ContentAgentExecutor),
+    }
+    return httpx.AsyncClient(transport=HostRouter({
+        AGENTS[name]: a2a_app(title, AGENTS[name], executor())
+        for name, (title, executor) in executors.items()
+    }))
+
+
+def card_server(calls, etag='"v1"'):
+    """Mock card endpoint honouring If-None-Match; records request headers."""
+
+    def handler(request):
+        calls.append(dict(request.headers))
+        if request.url.host == "down":
+            raise httpx.ConnectError("connection refused", request=request)
+        if etag and request.headers.get("if-none-match") == etag:
+            return httpx.Response(304)
+        headers = {"ETag": etag} if etag else {}
+        card = {"name": "Research", "url": "http://agent/"}
+        return httpx.Response(200, json=card, headers=headers)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestAgentCardCache:
+    """Test TTL, ETag revalidation and health probes."""
+
+    @pytest.mark.asyncio
+    async def test_fresh_entries_served_from_memory(self):
+        """Test repeated lookups within the TTL make one request."""
+        calls = []
+        cache = AgentCardCache(ttl=60, client=card_server(calls))
+
+        for _ in range(10):
+            entry = await cache.get("http://agent")
+
+        assert entry.available and entry.card["name"] == "Research"
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_revalidated_with_etag(self):
+        """Test a stale entry sends If-None-Match and keeps the card on 304."""
+        calls = []
+        cache = AgentCardCache(ttl=0, client=card_server(calls))
+
+        await cache.get("http://agent")
+        entry = await cache.get("http://agent")
+
+        assert calls[1]["if-none-match"] == '"v1"'
+        assert (entry.fetches, entry.not_modified) == (1, 1)
+        assert entry.card["name"] == "Research"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_lookups_share_one_request(self):
+        """Test simultaneous cold lookups of one agent are coalesced."""
+        calls = []
+        cache = AgentCardCache(client=card_server(calls))
+
+        entries = await asyncio.gather(*(cache.get("http://agent") for _ in range(20)))
+
+        assert len(calls) == 1
+        assert all(e is entries[0] for e in entries)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_fail_waiters(self):
+        """Test cancelling the lookup that started a check leaves the others intact."""
+        calls = []
+
+        async def slow_card(request):
+            calls.append(request)
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"name": "Research", "url": "http://agent/"})
+
+        cache = AgentCardCache(client=httpx.AsyncClient(transport=httpx.MockTransport(slow_card)))
+        leader = asyncio.ensure_future(cache.get("http://agent"))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(cache.get("http://agent")) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        entries = await asyncio.gather(*waiters)
+
+        assert leader.cancelled()
+        assert all(e.available for e in entries)
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_cached_briefly(self):
+        """Test an unreachable agent is reported without retrying every call."""
+        calls = []
+        cache = AgentCardCache(negative_ttl=60, client=card_server(calls))
+
+        first = await cache.get("http://down")
+        second = await cache.get("http://down")
+
+        assert not second.available and "refused" in second.error
+        assert second.consecutive_failures == 1
+        assert first is second and len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_background_probes(self):
+        """Test probes revalidate registered agents without callers asking."""
+        calls = []
+        cache = AgentCardCache(probe_interval=0.01, client=card_server(calls, etag=None))
+
+        cache.start_probes(["http://agent", "http://down"])
+        await asyncio.sleep(0.1)
+        await cache.close()
+
+        assert cache.status("http://agent").available
+        assert not cache.status("http://down").available
+        assert cache.status("http://agent").fetches >= 3
+
+
+class TestParallelDispatch:
+    """Test concurrent subtasks against in-process A2A servers."""
+
+    @pytest.mark.asyncio
+    async def test_subtasks_run_concurrently(self):
+        """Test three subtasks take about as long as the slowest one."""
+        cache = AgentCardCache(client=remote_agents_client())
+        subtasks = [
+            ("research_specialist", "Research quantum computing trends"),
+            ("data_analyst", "Analyze AI market data"),
+            ("content_writer", "Write a summary of AI adoption"),
+        ]
+
+        started = time.monotonic()
+        result = await dispatch_parallel(subtasks, AGENTS, cache)
+        elapsed = time.monotonic() - started
+
+        assert result["status"] == "success"
+        assert [r["agent"] for r in result["results"]] == [name for name, _ in subtasks]
+        assert "quantum computing" in result["results"][0]["response"]
+        assert "## data_analyst" in result["merged"]
+        # Executors take 0.5s, 0.7s and 0.5s; sequential would be ~1.7s
+        assert elapsed < 1.4
+        assert result["sum_of_latencies_ms"] > result["elapsed_ms"]
+
+    @pytest.mark.asyncio
+    async def test_failures_are_isolated(self):
+        """Test unknown and unavailable agents don't sink the other subtasks."""
+        cache = AgentCardCache(client=remote_agents_client())
+        agents = {**AGENTS, "offline_agent": "http://localhost:9999"}
+
+        result = await dispatch_parallel(
+            [("research_specialist", "Research AI"), ("offline_agent", "hi"), ("nobody", "hi")],
+            agents, cache,
+        )
+
+        assert result["status"] == "partial"
+        assert [r["status"] for r in result["results"]] == ["success", "skipped", "error"]
+
+    @pytest.mark.asyncio
+    async def test_stream_task_yields_chunks(self):
+        """Test a streaming request yields the reply in several chunks."""
+        client = remote_agents_client()
+        cache = AgentCardCache(client=client)
+        entry = await cache.get(AGENTS["research_specialist"])
+
+        chunks = [
+            chunk async for chunk in stream_task(entry.card, "Research quantum computing", client)
+        ]
+
+        assert len(chunks) > 2
+        assert "".join(chunks).startswith("Research Results for: quantum computing")
+
+    @pytest.mark.asyncio
+    async def test_orchestrator_tool_validates_arguments(self):
+        """Test the orchestrator tool rejects mismatched argument lists."""
+        from a2a_orchestrator.agent import dispatch_parallel_tasks
+
+        result = await dispatch_parallel_tasks(["research_specialist"], [])
+        assert result["status"] == "error"
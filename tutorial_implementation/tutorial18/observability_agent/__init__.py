@@ -11,6 +11,8 @@ from .agent import (
     AgentMetrics,
     root_agent
 )
+from .alerting import Alert, AlertDispatcher, Rule
+from .event_store import EventStore
 
 __all__ = [
     'CustomerServiceMonitor',
@@ -18,5 +20,9 @@ __all__ = [
     'MetricsCollector',
     'EventAlerter',
     'AgentMetrics',
+    'EventStore',
+    'Rule',
+    'Alert',
+    'AlertDispatcher',
     'root_agent'
 ]
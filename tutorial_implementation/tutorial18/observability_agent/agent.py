@@ -15,7 +15,7 @@ Based on Google ADK official Event and EventActions implementation.
 import asyncio
 import logging
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Callable
+from typing import Dict, Any, Optional
 from dataclasses import dataclass
 
 from google.adk.agents import Agent
@@ -24,6 +24,9 @@ from google.adk.sessions import Session, InMemorySessionService
 from google.adk.events import Event, EventActions
 from google.genai import types
 
+from .alerting import EventAlerter
+from .event_store import DEFAULT_CAPACITY, EventStore
+
 
 # Setup logging
 logging.basicConfig(
@@ -42,13 +45,21 @@ class CustomerServiceMonitor:
     - Escalation handling
     - Metrics collection
     - Detailed reporting
+
+    Events are kept in a bounded EventStore, so a long-running process holds
+    at most `max_events` in memory and summaries stay constant-time.
     """
 
-    def __init__(self):
-        """Initialize customer service monitoring system."""
+    def __init__(self, max_events: int = DEFAULT_CAPACITY, spill_path: Optional[str] = None):
+        """Initialize customer service monitoring system.
+
+        Args:
+            max_events: Events kept in memory for the timeline
+            spill_path: JSON Lines file for events evicted from memory (optional)
+        """
         
-        # Event log storage
-        self.events: List[Dict[str, Any]] = []
+        # Event log storage: ring buffer with running counters
+        self.events = EventStore(capacity=max_events, spill_path=spill_path)
         
         # Create tools with event tracking
         
@@ -292,59 +303,49 @@ Always call the appropriate tool to get accurate information.
         return result
 
     def get_event_summary(self) -> str:
-        """Generate event summary report."""
-        
-        total_events = len(self.events)
-        
-        event_types: Dict[str, int] = {}
-        for event in self.events:
-            event_type = event['type']
-            event_types[event_type] = event_types.get(event_type, 0) + 1
+        """Generate event summary report from the store's running counters."""
         
-        tool_calls = [e for e in self.events if e['type'] == 'tool_call']
-        escalations = [e for e in self.events if e['type'] == 'escalation']
+        stats = self.events.summary()
         
         summary = f"""
 EVENT SUMMARY REPORT
 {'='*70}
 
-Total Events: {total_events}
+Total Events: {stats['total_events']}
 
 Event Types:
 """
         
-        for event_type, count in event_types.items():
+        for event_type, count in stats['event_types'].items():
             summary += f"  - {event_type}: {count}\n"
         
-        summary += f"\nTool Calls: {len(tool_calls)}\n"
+        summary += f"\nTool Calls: {stats['tool_calls']}\n"
         
-        if tool_calls:
+        if stats['tool_usage']:
             summary += "  Tools Used:\n"
-            tool_usage: Dict[str, int] = {}
-            for call in tool_calls:
-                tool = call['tool']
-                tool_usage[tool] = tool_usage.get(tool, 0) + 1
-            
-            for tool, count in tool_usage.items():
+            for tool, count in stats['tool_usage'].items():
                 summary += f"    - {tool}: {count} calls\n"
         
-        summary += f"\nEscalations: {len(escalations)}\n"
+        summary += f"\nEscalations: {stats['escalations']}\n"
         
-        if escalations:
-            summary += "  Escalation Reasons:\n"
-            for esc in escalations:
-                summary += f"    - {esc['data']['reason']}\n"
+        if stats['recent_escalations']:
+            shown = len(stats['recent_escalations'])
+            label = "Escalation Reasons" if shown == stats['escalations'] else f"Escalation Reasons (last {shown})"
+            summary += f"  {label}:\n"
+            for reason in stats['recent_escalations']:
+                summary += f"    - {reason}\n"
         
         summary += f"\n{'='*70}"
         
         return summary
 
     def get_detailed_timeline(self) -> str:
-        """Get detailed event timeline."""
+        """Get detailed event timeline of the events still in memory."""
         
         timeline = f"\nDETAILED EVENT TIMELINE\n{'='*70}\n"
         
-        for i, event in enumerate(self.events, 1):
+        first = self.events.total - len(self.events) + 1
+        for i, event in enumerate(self.events, first):
             timeline += f"\n[{i}] {event['timestamp']}\n"
             timeline += f"    Type: {event['type']}\n"
             
@@ -444,27 +445,6 @@ class MetricsCollector:
         }
 
 
-class EventAlerter:
-    """Alert on specific event patterns."""
-
-    def __init__(self):
-        self.rules: List[tuple[Callable[[Event], bool], Callable[[Event], None]]] = []
-
-    def add_rule(
-        self, 
-        condition: Callable[[Event], bool],
-        alert_fn: Callable[[Event], None]
-    ):
-        """Add alerting rule."""
-        self.rules.append((condition, alert_fn))
-
-    def check_event(self, event: Event):
-        """Check event against all rules."""
-        for condition, alert_fn in self.rules:
-            if condition(event):
-                alert_fn(event)
-
-
 async def main():
     """Main entry point for demo."""
     
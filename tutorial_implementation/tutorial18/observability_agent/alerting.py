@@ -0,0 +1,499 @@
+"""
+Indexed alert rule engine for ADK events.
+
+Rules are declarative: an optional author and event type (used as index
+keys), field conditions (equality and thresholds), and an optional
+windowed count or rate. Each event is only evaluated against the rules
+indexed under its author and types, so adding rules for other agents or
+event types costs nothing on the hot path.
+
+Alerts are not run inline: inside an event loop they are queued to a
+background dispatcher that can deduplicate (per-rule cooldown) and rate
+limit (token bucket) before calling the alert functions. Both are opt-in.
+
+Run `python -m observability_agent.alerting` to benchmark 1k rules.
+"""
+
+import asyncio
+import inspect
+import logging
+import math
+import operator
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from google.adk.events import Event
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    'in': lambda value, options: value in options,
+    'contains': lambda value, part: value is not None and part in value,
+}
+
+# Event types derived from an event's content and actions
+EVENT_TYPES = (
+    'error', 'function_call', 'function_response', 'escalation',
+    'transfer', 'state_delta', 'message',
+)
+
+# Cooldown keys and pending alerts kept before the oldest are dropped
+MAX_DEDUP_KEYS = 10_000
+MAX_PENDING_ALERTS = 1_000
+
+# Merged candidate lists cached per (author, event types)
+MAX_CANDIDATE_CACHE = 4096
+
+
+def event_types(event: Event) -> Tuple[str, ...]:
+    """Types of an event, e.g. ('function_call',) or ('message', 'escalation')."""
+    kinds = []
+    if event.error_code:
+        kinds.append('error')
+    calls = responses = False
+    text = False
+    if event.content and event.content.parts:
+        for part in event.content.parts:
+            if part.function_call:
+                calls = True
+            elif part.function_response:
+                responses = True
+            elif part.text:
+                text = True
+    if calls:
+        kinds.append('function_call')
+    if responses:
+        kinds.append('function_response')
+    if text and not (calls or responses):
+        kinds.append('message')
+    actions = event.actions
+    if actions:
+        if actions.escalate:
+            kinds.append('escalation')
+        if actions.transfer_to_agent:
+            kinds.append('transfer')
+        if actions.state_delta:
+            kinds.append('state_delta')
+    return tuple(kinds)
+
+
+def _first_part_attr(event: Event, attr: str) -> Any:
+    if event.content and event.content.parts:
+        for part in event.content.parts:
+            value = getattr(part, attr)
+            if value is not None:
+                return value
+    return None
+
+
+def _event_text(event: Event) -> str:
+    if not (event.content and event.content.parts):
+        return ''
+    return ''.join(p.text for p in event.content.parts if p.text)
+
+
+_ROOTS: Dict[str, Callable[[Event], Any]] = {
+    'function_call': lambda e: _first_part_attr(e, 'function_call'),
+    'function_response': lambda e: _first_part_attr(e, 'function_response'),
+    'text': _event_text,
+}
+
+
+def compile_path(path: str) -> Callable[[Event], Any]:
+    """
+    Compile a dotted field path into an accessor.
+
+    Paths walk attributes, dict keys and list indexes, e.g. 'author',
+    'actions.escalate', 'usage_metadata.total_token_count'. The roots
+    'function_call' and 'function_response' select the event's first call
+    or response ('function_call.args.amount'), and 'text' is the event's
+    text. Missing fields resolve to None.
+    """
+    head, *rest = path.split('.')
+    root = _ROOTS.get(head) or (lambda e, name=head: getattr(e, name, None))
+    if not rest:
+        return root
+
+    def get(event: Event) -> Any:
+        value = root(event)
+        for key in rest:
+            if value is None:
+                return None
+            if isinstance(value, dict):
+                value = value.get(key)
+            elif isinstance(value, (list, tuple)) and key.lstrip('-').isdigit():
+                index = int(key)
+                value = value[index] if -len(value) <= index < len(value) else None
+            else:
+                value = getattr(value, key, None)
+        return value
+
+    return get
+
+
+@dataclass
+class Alert:
+    """A fired rule."""
+    rule: str
+    event: Event
+    message: str
+    count: int = 1
+    time: float = field(default_factory=time.time)
+
+
+@dataclass
+class Rule:
+    """
+    Declarative alert rule.
+
+    Args:
+        name: Rule name, also the dedup key prefix
+        alert_fn: Called with an Alert; plain function or coroutine function
+        author: Only events from this author (index key)
+        event_type: Only events of this type, see EVENT_TYPES (index key)
+        equals: Field path -> required value
+        conditions: (field path, operator, value) tuples, see OPERATORS
+        count: Fire when this many matching events fall within window_s
+        rate: Fire when matching events reach this many per second over window_s
+        window_s: Window for count and rate
+        cooldown_s: Suppress repeats of this rule (per dedup_by value) for this long
+        dedup_by: Field path whose value separates cooldowns, e.g. 'author'
+        message: Alert text; may use {rule}, {count} and {author}
+        predicate: Extra callable check on the event (runs last)
+    """
+    name: str
+    alert_fn: Callable[[Alert], Any]
+    author: Optional[str] = None
+    event_type: Optional[str] = None
+    equals: Dict[str, Any] = field(default_factory=dict)
+    conditions: List[Tuple[str, str, Any]] = field(default_factory=list)
+    count: Optional[int] = None
+    rate: Optional[float] = None
+    window_s: float = 60.0
+    cooldown_s: float = 0.0
+    dedup_by: Optional[str] = None
+    message: str = "{rule} matched"
+    predicate: Optional[Callable[[Event], bool]] = None
+
+    def __post_init__(self):
+        if self.event_type is not None and self.event_type not in EVENT_TYPES:
+            raise ValueError(f"Unknown event type {self.event_type!r}; expected one of {EVENT_TYPES}")
+        checks = [(path, '==', value) for path, value in self.equals.items()] + list(self.conditions)
+        for _, op, _ in checks:
+            if op not in OPERATORS:
+                raise ValueError(f"Unknown operator {op!r} in rule {self.name}")
+        self._checks = [(compile_path(path), OPERATORS[op], value) for path, op, value in checks]
+        self._dedup = compile_path(self.dedup_by) if self.dedup_by else None
+
+        # A rate is a count over the window; keep only that many timestamps
+        needed = self.count
+        if self.rate is not None:
+            needed = max(1, math.ceil(self.rate * self.window_s))
+        self._needed = needed or 1
+        self._times: Deque[float] = deque(maxlen=self._needed)
+
+    @property
+    def index_key(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.author, self.event_type
+
+    def matches(self, event: Event) -> bool:
+        for get, op, expected in self._checks:
+            try:
+                if not op(get(event), expected):
+                    return False
+            except TypeError:
+                # e.g. comparing None with a number
+                return False
+        return self.predicate is None or bool(self.predicate(event))
+
+    def observe(self, event: Event) -> Optional[int]:
+        """Record a matching event; return the windowed count if the rule fires."""
+        if self._needed == 1:
+            return 1
+        times = self._times
+        times.append(event.timestamp)
+        if len(times) == self._needed and event.timestamp - times[0] <= self.window_s:
+            times.clear()
+            return self._needed
+        return None
+
+
+class AlertDispatcher:
+    """
+    Deduplicating, rate-limited alert delivery.
+
+    submit() is O(1) and never calls alert functions itself when an event
+    loop is running: alerts are queued and delivered by a background task.
+    Without a running loop (e.g. plain scripts and sync tests) they are
+    delivered inline. Nothing is rate limited unless `max_per_second` is set.
+
+    Args:
+        max_per_second: Sustained alert rate; bursts up to `burst`
+            (None for no limit)
+        burst: Token bucket size (defaults to max_per_second)
+        max_pending: Queued alerts kept; the oldest are dropped beyond this
+    """
+
+    def __init__(
+        self,
+        max_per_second: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_pending: int = MAX_PENDING_ALERTS,
+    ):
+        self.max_per_second = max_per_second
+        if burst is None and max_per_second is not None:
+            burst = max(1, math.ceil(max_per_second))
+        self.burst = burst
+        self._tokens = float(burst or 0)
+        self._refilled = time.monotonic()
+        self._last_fired: 'OrderedDict[Tuple[str, Any], float]' = OrderedDict()
+        self._pending: Deque[Tuple[Callable[[Alert], Any], Alert]] = deque(maxlen=max_pending)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._idle: Optional[asyncio.Event] = None
+        self.stats = {'submitted': 0, 'delivered': 0, 'deduplicated': 0, 'rate_limited': 0, 'failed': 0}
+
+    def submit(self, rule: Rule, alert: Alert, dedup_value: Any = None) -> bool:
+        """Queue an alert; returns False if dedup or rate limiting dropped it."""
+        self.stats['submitted'] += 1
+        now = time.monotonic()
+
+        if rule.cooldown_s > 0:
+            key = (rule.name, dedup_value)
+            last = self._last_fired.get(key)
+            if last is not None and now - last < rule.cooldown_s:
+                self.stats['deduplicated'] += 1
+                return False
+            self._last_fired[key] = now
+            self._last_fired.move_to_end(key)
+            if len(self._last_fired) > MAX_DEDUP_KEYS:
+                self._last_fired.popitem(last=False)
+
+        if self.max_per_second is not None:
+            elapsed = now - self._refilled
+            self._tokens = min(self.burst, self._tokens + elapsed * self.max_per_second)
+            self._refilled = now
+            if self._tokens < 1:
+                self.stats['rate_limited'] += 1
+                return False
+            self._tokens -= 1
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._deliver_sync(rule.alert_fn, alert)
+            return True
+
+        self._pending.append((rule.alert_fn, alert))
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._wakeup = asyncio.Event()
+            self._idle = asyncio.Event()
+            self._worker = loop.create_task(self._run())
+        self._idle.clear()
+        self._wakeup.set()
+        return True
+
+    def _deliver_sync(self, alert_fn: Callable[[Alert], Any], alert: Alert) -> None:
+        try:
+            result = alert_fn(alert)
+            if inspect.isawaitable(result):
+                asyncio.run(result)
+            self.stats['delivered'] += 1
+        except Exception:  # noqa: BLE001 - a broken alert must not break the agent
+            self.stats['failed'] += 1
+            logger.exception("Alert %s failed", alert.rule)
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                alert_fn, alert = self._pending.popleft()
+                try:
+                    result = alert_fn(alert)
+                    if inspect.isawaitable(result):
+                        await result
+                    self.stats['delivered'] += 1
+                except Exception:  # noqa: BLE001
+                    self.stats['failed'] += 1
+                    logger.exception("Alert %s failed", alert.rule)
+            self._idle.set()
+
+    async def drain(self) -> None:
+        """Wait until every queued alert has been delivered."""
+        while self._pending or (self._idle is not None and not self._idle.is_set()):
+            if self._worker is None or self._worker.done():
+                break
+            await self._idle.wait()
+
+    async def close(self) -> None:
+        await self.drain()
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+
+class EventAlerter:
+    """
+    Alert on specific event patterns.
+
+    Rules are indexed by (author, event type), with None as a wildcard, so
+    check_event only evaluates rules that can apply to the event.
+    Callable (condition, alert_fn) pairs from add_rule are still accepted;
+    they have no index key and are checked against every event.
+    """
+
+    def __init__(self, dispatcher: Optional[AlertDispatcher] = None):
+        self.rules: List[Rule] = []
+        self.dispatcher = dispatcher or AlertDispatcher()
+        self._index: Dict[Tuple[Optional[str], Optional[str]], List[Rule]] = {}
+        self._candidates: Dict[Tuple[Optional[str], Tuple[str, ...]], List[Rule]] = {}
+        self.rules_evaluated = 0
+
+    def add_rule(
+        self,
+        condition: Any,
+        alert_fn: Optional[Callable[[Event], None]] = None
+    ) -> Rule:
+        """Add a Rule, or a (condition, alert_fn) pair called with the event."""
+        if isinstance(condition, Rule):
+            rule = condition
+        else:
+            rule = Rule(
+                name=getattr(condition, '__name__', 'rule'),
+                alert_fn=lambda alert, fn=alert_fn: fn(alert.event),
+                predicate=condition,
+            )
+        self.rules.append(rule)
+        self._index.setdefault(rule.index_key, []).append(rule)
+        self._candidates.clear()
+        return rule
+
+    def add_rules(self, rules: Iterable[Rule]) -> None:
+        for rule in rules:
+            self.add_rule(rule)
+
+    def candidate_rules(self, event: Event) -> List[Rule]:
+        """Rules indexed under the event's author and types (or wildcards)."""
+        key = (event.author, event_types(event))
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = []
+            for kind in key[1] + (None,):
+                for index_key in ((key[0], kind), (None, kind)):
+                    candidates.extend(self._index.get(index_key, ()))
+            if len(self._candidates) >= MAX_CANDIDATE_CACHE:
+                self._candidates.clear()
+            self._candidates[key] = candidates
+        return candidates
+
+    def check_event(self, event: Event) -> List[Alert]:
+        """Evaluate relevant rules and submit alerts for those that fire."""
+        fired = []
+        candidates = self.candidate_rules(event)
+        self.rules_evaluated += len(candidates)
+        for rule in candidates:
+            if not rule.matches(event):
+                continue
+            count = rule.observe(event)
+            if count is None:
+                continue
+            alert = Alert(
+                rule=rule.name,
+                event=event,
+                message=rule.message.format(rule=rule.name, count=count, author=event.author),
+                count=count,
+            )
+            dedup_value = rule._dedup(event) if rule._dedup else None
+            if self.dispatcher.submit(rule, alert, dedup_value):
+                fired.append(alert)
+        return fired
+
+    async def drain(self) -> None:
+        """Wait for queued alerts to be delivered."""
+        await self.dispatcher.drain()
+
+
+def benchmark_rule_engine(rules: int = 1000, events: int = 20_000) -> Dict[str, float]:
+    """
+    Time check_event with `rules` indexed rules against a linear scan.
+
+    Rules are spread over 50 authors and the event types, with token
+    thresholds that a few percent of events exceed; events come from random
+    authors. Returns microseconds per event for both.
+    """
+    import random
+
+    rng = random.Random(0)
+    authors = [f'agent_{i}' for i in range(50)]
+    kinds = ('function_call', 'message', 'escalation', 'error')
+    noop = lambda alert: None
+
+    alerter = EventAlerter(AlertDispatcher(max_per_second=1e9, burst=10**9))
+    linear: List[Tuple[Callable[[Event], bool], Callable[[Event], None]]] = []
+    for i in range(rules):
+        author, kind = authors[i % len(authors)], kinds[i // len(authors) % len(kinds)]
+        threshold = 250 + i % 50
+        alerter.add_rule(Rule(
+            name=f'rule_{i}', alert_fn=noop, author=author, event_type=kind,
+            conditions=[('usage_metadata.total_token_count', '>', threshold)],
+        ))
+        linear.append((
+            lambda e, a=author, k=kind, t=threshold: (
+                e.author == a and k in event_types(e)
+                and (e.usage_metadata.total_token_count if e.usage_metadata else 0) > t
+            ),
+            noop,
+        ))
+
+    sample = []
+    for i in range(events):
+        sample.append(Event(
+            invocation_id=f'inv-{i}',
+            author=rng.choice(authors),
+            content=types.Content(role='model', parts=[types.Part.from_text(text='ok')]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(total_token_count=rng.randint(0, 300)),
+        ))
+
+    fired = 0
+    t0 = time.perf_counter()
+    for event in sample:
+        fired += len(alerter.check_event(event))
+    indexed = (time.perf_counter() - t0) / events * 1e6
+
+    t0 = time.perf_counter()
+    for event in sample:
+        for condition, alert_fn in linear:
+            if condition(event):
+                alert_fn(event)
+    scanned = (time.perf_counter() - t0) / events * 1e6
+
+    return {
+        'rules': rules,
+        'events': events,
+        'indexed_us_per_event': indexed,
+        'linear_us_per_event': scanned,
+        'rules_evaluated_per_event': alerter.rules_evaluated / events,
+        'alerts_per_event': fired / events,
+    }
+
+
+if __name__ == '__main__':
+    result = benchmark_rule_engine()
+    print(f"Rules:                    {result['rules']:,}")
+    print(f"Events:                   {result['events']:,}")
+    print(f"Indexed check_event:      {result['indexed_us_per_event']:.2f}µs/event "
+          f"({result['rules_evaluated_per_event']:.1f} rules evaluated, "
+          f"{result['alerts_per_event']:.2f} alerts)")
+    print(f"Linear lambda scan:       {result['linear_us_per_event']:.2f}µs/event")
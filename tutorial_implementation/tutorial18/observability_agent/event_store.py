@@ -0,0 +1,291 @@
+"""
+Bounded event store for long-running observability.
+
+EventStore keeps the most recent events in a fixed-size ring buffer and
+maintains counters (per event type, per tool, escalations) as events
+arrive, so summaries cost the same after a million events as after ten.
+Events evicted from the ring can optionally spill to a JSON Lines file,
+which is indexed sparsely by timestamp for time-range queries.
+
+Run `python -m observability_agent.event_store` to benchmark 1M events.
+"""
+
+import bisect
+import json
+import os
+import tempfile
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
+
+# Events kept in memory by default
+DEFAULT_CAPACITY = 10_000
+
+# Escalation reasons kept for the summary
+RECENT_ESCALATIONS = 10
+
+# One (timestamp, byte offset) index entry per this many spilled lines
+SPILL_INDEX_EVERY = 1024
+
+Timestamp = Union[str, datetime, None]
+
+
+def _iso(value: Timestamp) -> Optional[str]:
+    """Normalise a query bound to the ISO format events are stored with."""
+    if value is None or isinstance(value, str):
+        return value
+    return value.isoformat()
+
+
+class EventStore:
+    """
+    Ring buffer of event dicts with incrementally maintained counters.
+
+    Events are dicts with at least 'timestamp' (ISO 8601) and 'type'; tool
+    calls carry 'tool' and escalations carry data['reason']. Counters cover
+    every event ever appended, not just those still in memory.
+
+    Args:
+        capacity: Events kept in memory; older ones are dropped or spilled
+        spill_path: JSON Lines file that receives evicted events (optional)
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, spill_path: Optional[str] = None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=capacity)
+
+        self.total = 0
+        self.type_counts: Counter = Counter()
+        self.tool_counts: Counter = Counter()
+        self.escalation_count = 0
+        self.recent_escalations: Deque[str] = deque(maxlen=RECENT_ESCALATIONS)
+
+        self.spill_path = spill_path
+        self.spilled = 0
+        self._spill_file = None
+        self._spill_offset = 0
+        self._spill_index: List[Tuple[str, int]] = []
+        if spill_path:
+            self._open_spill(spill_path)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, event: Dict[str, Any]) -> None:
+        """Add an event, evicting (and spilling) the oldest if full. O(1)."""
+        if len(self._events) == self.capacity:
+            evicted = self._events[0]
+            if self._spill_file is not None:
+                self._spill(evicted)
+        self._events.append(event)
+
+        self.total += 1
+        event_type = event['type']
+        self.type_counts[event_type] += 1
+        if event_type == 'tool_call':
+            self.tool_counts[event.get('tool')] += 1
+        elif event_type == 'escalation':
+            self.escalation_count += 1
+            self.recent_escalations.append(str(event.get('data', {}).get('reason', '')))
+
+    def _open_spill(self, path: str) -> None:
+        """Open the spill file for appending, indexing any existing lines."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                for line in f:
+                    if self.spilled % SPILL_INDEX_EVERY == 0:
+                        self._spill_index.append((json.loads(line)['timestamp'], self._spill_offset))
+                    self._spill_offset += len(line)
+                    self.spilled += 1
+        self._spill_file = open(path, 'ab')
+
+    def _spill(self, event: Dict[str, Any]) -> None:
+        line = (json.dumps(event, default=str) + '\n').encode('utf-8')
+        if self.spilled % SPILL_INDEX_EVERY == 0:
+            self._spill_index.append((event['timestamp'], self._spill_offset))
+        self._spill_file.write(line)
+        self._spill_offset += len(line)
+        self.spilled += 1
+
+    def flush(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.flush()
+
+    def close(self) -> None:
+        """Flush and close the spill file; in-memory events are kept."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        """Events currently in memory."""
+        return len(self._events)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._events)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self._events[index]
+
+    def summary(self) -> Dict[str, Any]:
+        """Counters as a dict; cost depends on distinct types and tools only."""
+        return {
+            'total_events': self.total,
+            'in_memory': len(self._events),
+            'spilled': self.spilled,
+            'event_types': dict(self.type_counts),
+            'tool_calls': self.type_counts['tool_call'],
+            'tool_usage': dict(self.tool_counts),
+            'escalations': self.escalation_count,
+            'recent_escalations': list(self.recent_escalations),
+        }
+
+    def query(
+        self,
+        start: Timestamp = None,
+        end: Timestamp = None,
+        event_type: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield events with start <= timestamp <= end, oldest first.
+
+        Spilled events are read from disk starting at the nearest index entry
+        before `start`; in-memory events follow. Timestamps are assumed to
+        be appended in non-decreasing order.
+
+        Args:
+            start: Earliest timestamp (ISO string or datetime), inclusive
+            end: Latest timestamp, inclusive
+            event_type: Only yield events of this type
+        """
+        start, end = _iso(start), _iso(end)
+
+        def wanted(event: Dict[str, Any]) -> bool:
+            return event_type is None or event['type'] == event_type
+
+        if self.spilled and self.spill_path:
+            for event in self._query_spill(start, end):
+                if wanted(event):
+                    yield event
+
+        for event in self._events:
+            ts = event['timestamp']
+            if start is not None and ts < start:
+                continue
+            if end is not None and ts > end:
+                return
+            if wanted(event):
+                yield event
+
+    def _query_spill(self, start: Optional[str], end: Optional[str]) -> Iterator[Dict[str, Any]]:
+        self.flush()
+        offset = 0
+        if start is not None and self._spill_index:
+            # Last index entry strictly before start; earlier lines can be skipped
+            i = bisect.bisect_left(self._spill_index, (start,)) - 1
+            offset = self._spill_index[max(i, 0)][1]
+        with open(self.spill_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                event = json.loads(line)
+                ts = event['timestamp']
+                if start is not None and ts < start:
+                    continue
+                if end is not None and ts > end:
+                    return
+                yield event
+
+
+def benchmark_event_store(events: int = 1_000_000, capacity: int = DEFAULT_CAPACITY) -> Dict[str, Any]:
+    """
+    Append `events` events and time summaries and a time-range query.
+
+    Compares against the unbounded list plus full-rescan summary the monitor
+    used before. Returns timings in seconds.
+    """
+    tools = ('check_order_status', 'process_refund', 'check_inventory')
+    base = datetime(2026, 1, 1).timestamp()
+
+    def make(i: int) -> Dict[str, Any]:
+        ts = datetime.fromtimestamp(base + i / 1000).isoformat()
+        if i % 3 == 0:
+            return {'timestamp': ts, 'type': 'tool_call', 'tool': tools[i % 9 // 3], 'arguments': {}}
+        if i % 1000 == 1:
+            return {'timestamp': ts, 'type': 'escalation', 'data': {'reason': f'refund {i}'}}
+        return {'timestamp': ts, 'type': 'agent_response', 'data': {}}
+
+    generated = [make(i) for i in range(events)]
+
+    # Baseline: unbounded list, summary rescans every event
+    baseline: List[Dict[str, Any]] = []
+    t0 = time.perf_counter()
+    for event in generated:
+        baseline.append(event)
+    list_append = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    by_type = Counter(e['type'] for e in baseline)
+    tool_usage = Counter(e['tool'] for e in baseline if e['type'] == 'tool_call')
+    escalations = [e for e in baseline if e['type'] == 'escalation']
+    list_summary = time.perf_counter() - t0
+    del baseline
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = EventStore(capacity=capacity, spill_path=os.path.join(tmp, 'events.jsonl'))
+        t0 = time.perf_counter()
+        for event in generated:
+            store.append(event)
+        store.flush()
+        append = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for _ in range(1000):
+            summary = store.summary()
+        summary_time = (time.perf_counter() - t0) / 1000
+
+        # One second of events from the middle of the spilled range
+        mid = events // 2
+        window = (generated[mid]['timestamp'], generated[mid + 999]['timestamp'])
+        t0 = time.perf_counter()
+        matched = sum(1 for _ in store.query(*window))
+        query_time = time.perf_counter() - t0
+        spill_bytes = os.path.getsize(store.spill_path)
+        store.close()
+
+    assert summary['event_types'] == dict(by_type)
+    assert summary['tool_usage'] == dict(tool_usage)
+    assert summary['escalations'] == len(escalations)
+
+    return {
+        'events': events,
+        'capacity': capacity,
+        'list_append_s': list_append,
+        'list_summary_s': list_summary,
+        'store_append_s': append,
+        'store_summary_s': summary_time,
+        'store_in_memory': summary['in_memory'],
+        'spill_bytes': spill_bytes,
+        'range_query_s': query_time,
+        'range_query_matches': matched,
+    }
+
+
+if __name__ == '__main__':
+    result = benchmark_event_store()
+    print(f"Events:                     {result['events']:,} (ring capacity {result['capacity']:,})")
+    print(f"List append / summary:      {result['list_append_s']:.3f}s / {result['list_summary_s'] * 1000:.1f}ms")
+    print(f"Store append (with spill):  {result['store_append_s']:.3f}s "
+          f"({result['store_append_s'] / result['events'] * 1e6:.2f}µs/event)")
+    print(f"Store summary:              {result['store_summary_s'] * 1e6:.1f}µs")
+    print(f"Events kept in memory:      {result['store_in_memory']:,}")
+    print(f"Spill file:                 {result['spill_bytes'] / 1e6:.1f} MB")
+    print(f"1s time-range query:        {result['range_query_s'] * 1000:.2f}ms "
+          f"({result['range_query_matches']} events)")
@@ -16,7 +16,7 @@ class TestAgentConfiguration:
         
         assert monitor is not None
         assert isinstance(monitor.agent, Agent)
-        assert monitor.events == []
+        assert len(monitor.events) == 0
         assert monitor.runner is not None
 
     def test_agent_name(self):
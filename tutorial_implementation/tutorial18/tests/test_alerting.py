@@ -0,0 +1,213 @@
+"""
+Tests for the indexed alert rule engine.
+"""
+
+import asyncio
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from observability_agent import AlertDispatcher, EventAlerter, Rule
+from observability_agent.alerting import benchmark_rule_engine, compile_path, event_types
+
+
+def refund_call(author='customer_service', amount=50.0, timestamp=None):
+    """Event carrying a process_refund function call."""
+    event = Event(
+        invocation_id='inv-1',
+        author=author,
+        content=types.Content(role='model', parts=[
+            types.Part.from_function_call(name='process_refund', args={'order_id': 'ORD-1', 'amount': amount})
+        ]),
+    )
+    if timestamp is not None:
+        event.timestamp = timestamp
+    return event
+
+
+def message(author='customer_service', text='hello', escalate=None):
+    return Event(
+        invocation_id='inv-1',
+        author=author,
+        content=types.Content(role='model', parts=[types.Part.from_text(text=text)]),
+        actions=EventActions(escalate=escalate),
+    )
+
+
+def collector():
+    alerts = []
+    return alerts, alerts.append
+
+
+class TestEventFields:
+    """Test event typing and field paths."""
+
+    def test_event_types(self):
+        """Test types are derived from content and actions."""
+        assert event_types(refund_call()) == ('function_call',)
+        assert event_types(message(escalate=True)) == ('message', 'escalation')
+        assert event_types(Event(invocation_id='x', author='a')) == ()
+
+    def test_compile_path(self):
+        """Test paths reach function call arguments and tolerate gaps."""
+        event = refund_call(amount=150.0)
+
+        assert compile_path('function_call.name')(event) == 'process_refund'
+        assert compile_path('function_call.args.amount')(event) == 150.0
+        assert compile_path('content.parts.0.function_call.args.order_id')(event) == 'ORD-1'
+        assert compile_path('usage_metadata.total_token_count')(event) is None
+
+
+class TestRules:
+    """Test declarative conditions, windows and indexing."""
+
+    def test_equality_and_threshold(self):
+        """Test a rule fires only when every condition holds."""
+        alerts, sink = collector()
+        alerter = EventAlerter()
+        alerter.add_rule(Rule(
+            name='large_refund', alert_fn=sink, event_type='function_call',
+            equals={'function_call.name': 'process_refund'},
+            conditions=[('function_call.args.amount', '>', 100)],
+            message='{rule} by {author}',
+        ))
+
+        alerter.check_event(refund_call(amount=50))
+        alerter.check_event(refund_call(amount=150))
+        alerter.check_event(message(text='process_refund 150'))
+
+        assert [a.message for a in alerts] == ['large_refund by customer_service']
+
+    def test_rules_indexed_by_author_and_type(self):
+        """Test rules for other authors and types are never evaluated."""
+        alerter = EventAlerter()
+        for i in range(100):
+            alerter.add_rule(Rule(name=f'other_{i}', alert_fn=print, author=f'agent_{i}'))
+        alerter.add_rule(Rule(name='escalations', alert_fn=lambda a: None, event_type='escalation'))
+        alerter.add_rule(Rule(name='mine', alert_fn=lambda a: None, author='customer_service'))
+
+        alerter.check_event(refund_call())
+        assert alerter.rules_evaluated == 1
+
+        alerter.check_event(message(escalate=True))
+        assert alerter.rules_evaluated == 3
+
+    def test_windowed_count(self):
+        """Test a count rule fires when enough events fall inside the window."""
+        alerts, sink = collector()
+        alerter = EventAlerter()
+        alerter.add_rule(Rule(name='refund_burst', alert_fn=sink, event_type='function_call', count=3, window_s=10))
+
+        for t in (0, 20, 40, 41, 42):
+            alerter.check_event(refund_call(timestamp=1000 + t))
+
+        assert [a.count for a in alerts] == [3]
+        assert alerts[0].event.timestamp == 1042
+
+    def test_rate(self):
+        """Test a rate rule is a count over its window."""
+        alerts, sink = collector()
+        alerter = EventAlerter()
+        alerter.add_rule(Rule(name='fast', alert_fn=sink, rate=2.0, window_s=1.0))
+
+        for t in (0.0, 1.5, 5.0, 5.2):
+            alerter.check_event(refund_call(timestamp=t))
+
+        assert len(alerts) == 1
+
+    def test_invalid_rules(self):
+        """Test unknown event types and operators are rejected."""
+        with pytest.raises(ValueError):
+            Rule(name='bad', alert_fn=print, event_type='tool_call')
+        with pytest.raises(ValueError):
+            Rule(name='bad', alert_fn=print, conditions=[('author', '~=', 'x')])
+
+
+class TestDispatch:
+    """Test dedup, rate limiting and async delivery."""
+
+    def test_cooldown_deduplicates_per_key(self):
+        """Test repeats within the cooldown are dropped per dedup value."""
+        alerts, sink = collector()
+        alerter = EventAlerter()
+        alerter.add_rule(Rule(name='any', alert_fn=sink, cooldown_s=60, dedup_by='author'))
+
+        for author in ('a', 'a', 'b', 'a', 'b'):
+            alerter.check_event(message(author=author))
+
+        assert [a.event.author for a in alerts] == ['a', 'b']
+        assert alerter.dispatcher.stats['deduplicated'] == 3
+
+    def test_rate_limited(self):
+        """Test the token bucket caps bursts."""
+        alerts, sink = collector()
+        alerter = EventAlerter(AlertDispatcher(max_per_second=0.001, burst=5))
+        alerter.add_rule(Rule(name='any', alert_fn=sink))
+
+        for _ in range(20):
+            alerter.check_event(message())
+
+        assert len(alerts) == 5
+        assert alerter.dispatcher.stats['rate_limited'] == 15
+
+    def test_no_limits_by_default(self):
+        """Test legacy pair rules deliver every alert unless limits are configured."""
+        alerted = []
+        alerter = EventAlerter()
+        alerter.add_rule(lambda e: True, alerted.append)
+
+        for _ in range(100):
+            alerter.check_event(message())
+
+        assert len(alerted) == 100
+        assert alerter.dispatcher.stats['rate_limited'] == 0
+
+    @pytest.mark.asyncio
+    async def test_async_dispatch_off_hot_path(self):
+        """Test alerts run after check_event returns when a loop is running."""
+        delivered = []
+
+        async def slow_alert(alert):
+            await asyncio.sleep(0.01)
+            delivered.append(alert.rule)
+
+        alerter = EventAlerter()
+        alerter.add_rule(Rule(name='slow', alert_fn=slow_alert))
+        alerter.add_rule(Rule(name='sync', alert_fn=lambda a: delivered.append(a.rule)))
+
+        fired = alerter.check_event(message())
+        assert [a.rule for a in fired] == ['slow', 'sync']
+        assert delivered == []
+
+        await alerter.drain()
+        assert delivered == ['slow', 'sync']
+
+    @pytest.mark.asyncio
+    async def test_failing_alert_isolated(self):
+        """Test an exception in one alert does not stop the others."""
+        delivered = []
+
+        def broken(alert):
+            raise RuntimeError('pager down')
+
+        alerter = EventAlerter()
+        alerter.add_rule(Rule(name='broken', alert_fn=broken))
+        alerter.add_rule(Rule(name='ok', alert_fn=lambda a: delivered.append(a.rule)))
+
+        alerter.check_event(message())
+        await alerter.drain()
+
+        assert delivered == ['ok']
+        assert alerter.dispatcher.stats['failed'] == 1
+
+
+class TestBenchmark:
+    """Test the rule engine micro-benchmark."""
+
+    def test_thousand_rules_touch_few(self):
+        """Test 1k rules evaluate only the handful indexed for each event."""
+        result = benchmark_rule_engine(rules=1000, events=500)
+
+        assert result['rules_evaluated_per_event'] <= 10
+        assert result['indexed_us_per_event'] < result['linear_us_per_event']
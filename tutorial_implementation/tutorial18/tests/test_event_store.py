@@ -0,0 +1,143 @@
+"""
+Tests for the bounded event store.
+"""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from observability_agent import CustomerServiceMonitor, EventStore
+from observability_agent.event_store import benchmark_event_store
+
+BASE = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def make_event(i, event_type='agent_response', **extra):
+    """Event i, one second after event i-1."""
+    event = {'timestamp': (BASE + timedelta(seconds=i)).isoformat(), 'type': event_type}
+    event.update(extra)
+    return event
+
+
+class TestRingBuffer:
+    """Test bounded storage and running counters."""
+
+    def test_capacity_bounds_memory(self):
+        """Test only the newest `capacity` events are kept."""
+        store = EventStore(capacity=5)
+
+        for i in range(12):
+            store.append(make_event(i))
+
+        assert len(store) == 5
+        assert store[0]['timestamp'] == make_event(7)['timestamp']
+        assert store.total == 12
+
+    def test_counters_cover_evicted_events(self):
+        """Test counts include events no longer in memory."""
+        store = EventStore(capacity=3)
+
+        for i in range(10):
+            store.append(make_event(i, 'tool_call', tool='tool1' if i % 2 else 'tool2'))
+        store.append(make_event(10, 'escalation', data={'reason': 'big refund'}))
+
+        summary = store.summary()
+        assert summary['event_types'] == {'tool_call': 10, 'escalation': 1}
+        assert summary['tool_usage'] == {'tool2': 5, 'tool1': 5}
+        assert summary['escalations'] == 1
+        assert summary['recent_escalations'] == ['big refund']
+
+    def test_recent_escalations_bounded(self):
+        """Test only the latest escalation reasons are kept."""
+        store = EventStore(capacity=100)
+
+        for i in range(30):
+            store.append(make_event(i, 'escalation', data={'reason': f'r{i}'}))
+
+        summary = store.summary()
+        assert summary['escalations'] == 30
+        assert summary['recent_escalations'] == [f'r{i}' for i in range(20, 30)]
+
+    def test_invalid_capacity(self):
+        """Test a zero capacity is rejected."""
+        with pytest.raises(ValueError):
+            EventStore(capacity=0)
+
+
+class TestSpillToDisk:
+    """Test JSON Lines spill and time-range queries."""
+
+    def test_evicted_events_spilled(self, tmp_path):
+        """Test events leaving memory are written to disk, once each."""
+        path = tmp_path / 'events.jsonl'
+        store = EventStore(capacity=10, spill_path=str(path))
+
+        for i in range(25):
+            store.append(make_event(i, data={'n': i}))
+        store.close()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [e['data']['n'] for e in lines] == list(range(15))
+        assert store.spilled == 15
+
+    def test_range_query_spans_disk_and_memory(self, tmp_path):
+        """Test a query returns spilled and in-memory events in order."""
+        store = EventStore(capacity=100, spill_path=str(tmp_path / 'events.jsonl'))
+        for i in range(5000):
+            store.append(make_event(i, 'tool_call' if i % 2 else 'agent_response', data={'n': i}))
+
+        hits = list(store.query(BASE + timedelta(seconds=4890), BASE + timedelta(seconds=4910)))
+        tools = list(store.query(make_event(1000)['timestamp'], make_event(1010)['timestamp'], 'tool_call'))
+
+        assert [e['data']['n'] for e in hits] == list(range(4890, 4911))
+        assert [e['data']['n'] for e in tools] == [1001, 1003, 1005, 1007, 1009]
+        store.close()
+
+    def test_unbounded_query(self, tmp_path):
+        """Test a query without bounds returns every event."""
+        store = EventStore(capacity=10, spill_path=str(tmp_path / 'events.jsonl'))
+        for i in range(30):
+            store.append(make_event(i))
+
+        assert len(list(store.query())) == 30
+        store.close()
+
+    def test_reopen_existing_spill(self, tmp_path):
+        """Test a restarted store keeps querying the existing file."""
+        path = str(tmp_path / 'events.jsonl')
+        first = EventStore(capacity=10, spill_path=path)
+        for i in range(3000):
+            first.append(make_event(i, data={'n': i}))
+        first.close()
+
+        second = EventStore(capacity=10, spill_path=path)
+        hits = list(second.query(make_event(2500)['timestamp'], make_event(2502)['timestamp']))
+
+        assert second.spilled == 2990
+        assert [e['data']['n'] for e in hits] == [2500, 2501, 2502]
+        second.close()
+
+
+class TestMonitorIntegration:
+    """Test CustomerServiceMonitor on top of the store."""
+
+    def test_monitor_events_bounded(self):
+        """Test the monitor keeps max_events but reports every event."""
+        monitor = CustomerServiceMonitor(max_events=50)
+
+        for i in range(200):
+            monitor._log_tool_call('check_inventory', {'product_id': f'P{i}'})
+
+        summary = monitor.get_event_summary()
+        timeline = monitor.get_detailed_timeline()
+        assert len(monitor.events) == 50
+        assert 'Total Events: 200' in summary
+        assert 'check_inventory: 200 calls' in summary
+        assert '[151]' in timeline and '[150]' not in timeline
+
+    def test_benchmark_runs(self):
+        """Test the benchmark agrees with the list baseline on a small run."""
+        result = benchmark_event_store(events=20_000, capacity=1000)
+
+        assert result['store_in_memory'] == 1000
+        assert result['range_query_matches'] == 1000
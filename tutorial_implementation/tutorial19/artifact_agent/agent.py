@@ -12,12 +12,121 @@ Features:
 - Built-in artifact loading tool for conversational access
 """
 
+import asyncio
+import os
 from typing import Dict, Any, Optional
 from google.adk.agents import Agent
 from google.adk.tools.load_artifacts_tool import load_artifacts_tool
 from google.adk.tools.tool_context import ToolContext
 from google.genai import types
 
+from .chunking import (
+    CHUNK_THRESHOLD_CHARS,
+    DEFAULT_CHUNK_CHARS,
+    DEFAULT_CONCURRENCY,
+    MULTIPART_MIME_TYPE,
+    MultipartWriter,
+    aiter_chunks,
+    is_multipart,
+    is_part_filename,
+    iter_artifact_text,
+    iter_chunks,
+    iter_lines,
+    map_ordered,
+    process_chunks,
+    read_manifest,
+    reduce_hierarchical,
+)
+
+
+# ============================================================================
+# Text Operations
+# ============================================================================
+
+
+def _summarize_text(text: str) -> str:
+    """Basic summarization (in practice, this would use LLM)."""
+    words = text.split()
+    if len(words) <= 50:
+        return text
+    return ' '.join(words[:50]) + '...'
+
+
+def _translate_text(text: str, target_language: str) -> str:
+    """Basic translation simulation (in practice, this would use translation API)."""
+    return f"[Translated to {target_language}] {text}"
+
+
+def _preview(text: str, limit: int = 1000) -> str:
+    return text if len(text) <= limit else text[:limit] + '...'
+
+
+async def _summarize_chunks(chunks: Any) -> Dict[str, Any]:
+    """Summarize chunks concurrently, then combine the summaries hierarchically."""
+    input_characters = 0
+    chunk_summaries = []
+
+    async def summarize(chunk: str) -> str:
+        nonlocal input_characters
+        input_characters += len(chunk)
+        return _summarize_text(chunk)
+
+    async def combine(summaries: list) -> str:
+        return _summarize_text(' '.join(summaries))
+
+    async for chunk_summary in map_ordered(chunks, summarize, DEFAULT_CONCURRENCY):
+        chunk_summaries.append(chunk_summary)
+    return {
+        'summary': await reduce_hierarchical(chunk_summaries, combine),
+        'chunks': len(chunk_summaries),
+        'input_characters': input_characters,
+    }
+
+
+async def _translate_chunks(
+    chunks: Any,
+    target_language: str,
+    filename: str,
+    tool_context: ToolContext
+) -> Dict[str, Any]:
+    """Translate chunks concurrently, streaming them into a multi-part artifact."""
+    async def translate(chunk: str) -> str:
+        return _translate_text(chunk, target_language)
+
+    writer = MultipartWriter(tool_context, filename)
+    stats = await process_chunks(chunks, translate, writer, DEFAULT_CONCURRENCY)
+    version = await writer.close(target_language=target_language)
+    return {**stats, 'version': version, 'parts': len(writer.parts)}
+
+
+def _documents_dir() -> str:
+    """Directory local documents may be read from."""
+    return os.path.realpath(os.environ.get('DOCUMENTS_DIR', 'documents'))
+
+
+def _document_path(source: str) -> Optional[str]:
+    """Resolve `source` to a file under the documents directory, or None."""
+    root = _documents_dir()
+    path = os.path.realpath(os.path.join(root, source))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        return None
+    return path
+
+
+async def _file_chunks(path: str, max_chars: int = DEFAULT_CHUNK_CHARS):
+    """Chunks of a local text file, read line by line in a worker thread."""
+    f = await asyncio.to_thread(open, path, encoding='utf-8')
+    try:
+        # Cap each read so a file without newlines is still read in pieces
+        chunks = iter_chunks(iter(lambda: f.readline(max_chars), ''), max_chars)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        f.close()
+
 
 async def extract_text_tool(document_content: str, tool_context: ToolContext) -> Dict[str, Any]:
     """
@@ -45,6 +154,25 @@ async def extract_text_tool(document_content: str, tool_context: ToolContext) ->
                 'report': 'Failed to extract text from document'
             }
 
+        # Large documents are stored as a multi-part artifact, one chunk per part
+        if len(extracted_text) > CHUNK_THRESHOLD_CHARS:
+            writer = MultipartWriter(tool_context, 'document_extracted.txt')
+            for chunk in iter_chunks(iter_lines(extracted_text)):
+                await writer.write(chunk)
+            version = await writer.close()
+            return {
+                'status': 'success',
+                'report': f'Successfully extracted {len(extracted_text)} characters of text and saved as version {version} in {len(writer.parts)} parts',
+                'data': {
+                    'filename': 'document_extracted.txt',
+                    'version': version,
+                    'mode': 'chunked',
+                    'parts': len(writer.parts),
+                    'preview': _preview(extracted_text),
+                    'character_count': len(extracted_text)
+                }
+            }
+
         # Create artifact part
         text_part = types.Part.from_text(text=extracted_text)
 
@@ -90,10 +218,17 @@ async def summarize_document_tool(document_text: Optional[str], tool_context: To
         Dict with status, report, and summary information
     """
     try:
+        chunked = None
+
         # If no text provided, try to load the extracted document
         if not document_text:
             artifact = await tool_context.load_artifact('document_extracted.txt')
-            if artifact and artifact.text:
+            if is_multipart(artifact):
+                # Stream the parts rather than reassembling the document
+                chunked = await _summarize_chunks(
+                    aiter_chunks(iter_artifact_text(tool_context, 'document_extracted.txt'))
+                )
+            elif artifact and artifact.text:
                 document_text = artifact.text
             else:
                 return {
@@ -101,13 +236,15 @@ async def summarize_document_tool(document_text: Optional[str], tool_context: To
                     'error': 'No document text provided',
                     'report': 'Please provide document text or ensure extracted text is available'
                 }
+        elif len(document_text) > CHUNK_THRESHOLD_CHARS:
+            chunked = await _summarize_chunks(iter_chunks(iter_lines(document_text)))
 
-        # Basic summarization (in practice, this would use LLM)
-        words = document_text.split()
-        if len(words) <= 50:
-            summary = document_text
+        if chunked:
+            summary = chunked['summary']
+            original_length = chunked['input_characters']
         else:
-            summary = ' '.join(words[:50]) + '...'
+            summary = _summarize_text(document_text)
+            original_length = len(document_text)
 
         # Create artifact part
         summary_part = types.Part.from_text(text=summary)
@@ -125,8 +262,9 @@ async def summarize_document_tool(document_text: Optional[str], tool_context: To
                 'filename': 'document_summary.txt',
                 'version': version,
                 'content': summary,
-                'original_length': len(document_text),
-                'summary_length': len(summary)
+                'original_length': original_length,
+                'summary_length': len(summary),
+                **({'mode': 'chunked', 'chunks': chunked['chunks']} if chunked else {})
             }
         }
 
@@ -158,15 +296,32 @@ async def translate_document_tool(text: str, target_language: str, tool_context:
                 'report': 'Please provide text to translate'
             }
 
-        # Basic translation simulation (in practice, this would use translation API)
+        filename = f'document_{target_language.lower()}.txt'
+
+        if len(text) > CHUNK_THRESHOLD_CHARS:
+            result = await _translate_chunks(
+                iter_chunks(iter_lines(text)), target_language, filename, tool_context
+            )
+            return {
+                'status': 'success',
+                'report': f'Translated {len(text)} characters to {target_language} in {result["chunks"]} chunks and saved as version {result["version"]}',
+                'data': {
+                    'filename': filename,
+                    'version': result['version'],
+                    'mode': 'chunked',
+                    'parts': result['parts'],
+                    'source_language': 'English',
+                    'target_language': target_language
+                }
+            }
+
         # For demo purposes, we'll just mark the text as "translated"
-        translated_text = f"[Translated to {target_language}] {text}"
+        translated_text = _translate_text(text, target_language)
 
         # Create artifact part
         translation_part = types.Part.from_text(text=translated_text)
 
         # Save as artifact
-        filename = f'document_{target_language.lower()}.txt'
         version = await tool_context.save_artifact(
             filename=filename,
             artifact=translation_part
@@ -192,6 +347,127 @@ async def translate_document_tool(text: str, target_language: str, tool_context:
         }
 
 
+async def process_large_document_tool(
+    source: str,
+    operation: str,
+    tool_context: ToolContext,
+    target_language: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Summarize or translate a large document in chunks, without loading it whole.
+
+    The document is read from a text file in the documents directory
+    (DOCUMENTS_DIR) or an existing artifact (plain or multi-part), split on headings and paragraphs, and processed
+    a few chunks at a time. Translations are written as a multi-part
+    artifact as chunks complete.
+
+    Args:
+        source: Path of a text file under the documents directory, or an
+            artifact filename. Paths outside that directory are not read.
+        operation: 'summarize' or 'translate'
+        tool_context: Tool context for artifact operations
+        target_language: Target language when translating
+
+    Returns:
+        Dict with status, report, and processing statistics
+    """
+    try:
+        if operation not in ('summarize', 'translate'):
+            return {
+                'status': 'error',
+                'error': f'Unknown operation: {operation}',
+                'report': "Operation must be 'summarize' or 'translate'"
+            }
+        if operation == 'translate' and not target_language:
+            return {
+                'status': 'error',
+                'error': 'No target language provided',
+                'report': 'Please specify a target language for translation'
+            }
+
+        path = _document_path(source)
+        if path is not None:
+            chunks = _file_chunks(path)
+        else:
+            chunks = aiter_chunks(iter_artifact_text(tool_context, source))
+
+        if operation == 'summarize':
+            result = await _summarize_chunks(chunks)
+            version = await tool_context.save_artifact(
+                filename='document_summary.txt',
+                artifact=types.Part.from_text(text=result['summary'])
+            )
+            return {
+                'status': 'success',
+                'report': f'Summarized {result["input_characters"]} characters in {result["chunks"]} chunks and saved as version {version}',
+                'data': {
+                    'filename': 'document_summary.txt',
+                    'version': version,
+                    'mode': 'chunked',
+                    'chunks': result['chunks'],
+                    'original_length': result['input_characters'],
+                    'content': result['summary']
+                }
+            }
+
+        filename = f'document_{target_language.lower()}.txt'
+        result = await _translate_chunks(chunks, target_language, filename, tool_context)
+        return {
+            'status': 'success',
+            'report': f'Translated {result["input_characters"]} characters to {target_language} in {result["chunks"]} chunks and saved as version {result["version"]}',
+            'data': {
+                'filename': filename,
+                'version': result['version'],
+                'mode': 'chunked',
+                'chunks': result['chunks'],
+                'parts': result['parts'],
+                'target_language': target_language
+            }
+        }
+
+    except FileNotFoundError as e:
+        return {
+            'status': 'error',
+            'error': str(e),
+            'report': f'Document not found: {source}'
+        }
+    except Exception as e:
+        return {
+            'status': 'error',
+            'error': str(e),
+            'report': f'Failed to process document: {str(e)}'
+        }
+
+
+async def _artifact_size(tool_context: ToolContext, filename: str) -> Optional[str]:
+    """
+    Describe an artifact's size, from index metadata when the service has it.
+
+    Artifact services that record sizes (ContentAddressedArtifactService)
+    answer from their index; others fall back to loading the payload.
+    """
+    version = await tool_context.get_artifact_version(filename)
+    if getattr(version, 'mime_type', None) != MULTIPART_MIME_TYPE:
+        characters = getattr(version, 'characters', None)
+        size_bytes = getattr(version, 'size_bytes', None)
+        if isinstance(characters, int):
+            return f"{characters} characters"
+        if isinstance(size_bytes, int) and getattr(version, 'kind', None) == 'bytes':
+            return f"{size_bytes} bytes"
+
+    artifact = await tool_context.load_artifact(filename)
+    if not artifact:
+        return None
+    if is_multipart(artifact):
+        manifest = read_manifest(artifact)
+        return f"{manifest['characters']} characters in {len(manifest['parts'])} parts"
+    if artifact.text is not None:
+        return f"{len(artifact.text)} characters"
+    if artifact.inline_data is not None and artifact.inline_data.data is not None:
+        return f"{len(artifact.inline_data.data)} bytes"
+    return None
+
+
 async def create_final_report_tool(tool_context: ToolContext) -> Dict[str, Any]:
     """
     Create a comprehensive final report combining all document artifacts.
@@ -220,13 +496,20 @@ This report combines all document processing artifacts from the current session.
 
 """
         
+        documents = [
+            filename for filename in all_artifacts
+            if filename.startswith('document_')
+            and not filename.endswith('FINAL_REPORT.md')
+            and not is_part_filename(filename)
+        ]
+        # Size lookups are independent, so run them concurrently
+        sizes = await asyncio.gather(*(_artifact_size(tool_context, f) for f in documents))
+
         artifacts_list = []
-        for filename in all_artifacts:
-            if filename.startswith('document_') and not filename.endswith('FINAL_REPORT.md'):
-                artifact = await tool_context.load_artifact(filename)
-                if artifact:
-                    report_content += f"- {filename}: {len(artifact.text)} characters\n"
-                    artifacts_list.append(filename)
+        for filename, size in zip(documents, sizes):
+            if size is not None:
+                report_content += f"- {filename}: {size}\n"
+                artifacts_list.append(filename)
 
         report_content += """
 ## Recommendations
@@ -350,14 +633,15 @@ async def load_artifact_tool(filename: str, tool_context: ToolContext, version:
 
 def main():
     """Main entry point for running the agent directly."""
-    import asyncio
     from google.adk.runners import Runner
-    from google.adk.artifacts import InMemoryArtifactService
     from google.adk.sessions import InMemorySessionService
+    from .artifact_store import ContentAddressedArtifactService
 
     async def run_agent():
-        # Configure artifact service
-        artifact_service = InMemoryArtifactService()
+        # Configure artifact service: persisted on disk, deduplicated by content
+        artifact_service = ContentAddressedArtifactService(
+            os.environ.get('ARTIFACT_STORE_DIR', 'artifact_store')
+        )
 
         # Create runner with artifact support
         runner = Runner(
@@ -374,7 +658,7 @@ def main():
         # For now, just show that the agent is configured
         print(f"Agent: {root_agent.name}")
         print(f"Tools: {len(root_agent.tools)} available")
-        print("Artifact service: Configured ✓")
+        print(f"Artifact service: {artifact_service.root_dir} ✓")
 
     asyncio.run(run_agent())
 
@@ -403,6 +687,9 @@ When processing documents:
 - Save translations as 'document_LANGUAGE.txt' (where LANGUAGE is the target language)
 - Create final reports as 'document_FINAL_REPORT.md'
 
+For large documents (files in the documents directory or multi-part artifacts), use
+process_large_document_tool instead of passing the whole text as an argument.
+
 Use the load_artifacts tool when users ask about previously processed documents.
 Maintain artifact provenance by referencing previous versions in new artifacts.
 
@@ -416,6 +703,7 @@ Available tools:
         extract_text_tool,
         summarize_document_tool,
         translate_document_tool,
+        process_large_document_tool,
         create_final_report_tool,
         list_artifacts_tool,
         load_artifact_tool,
@@ -0,0 +1,682 @@
+"""
+Content-addressed filesystem artifact service.
+
+Stores every artifact version as a blob named by the SHA-256 of its payload,
+so saving identical content again (a re-run, an unchanged summary) costs an
+index row rather than another copy. A small SQLite index records each
+version's size, MIME type, hash and creation time; listing artifacts and
+asking how big they are never reads a payload. Large payloads are read
+through mmap, and batches of artifacts can be loaded concurrently.
+
+Layout:
+    root/
+    ├── index.sqlite3          # one row per artifact version
+    └── blobs/
+        └── ab/
+            └── ab12...ef      # payload, named by its SHA-256
+"""
+
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from google.adk.artifacts import artifact_util
+from google.adk.artifacts.base_artifact_service import ArtifactVersion
+from google.adk.artifacts.base_artifact_service import BaseArtifactService
+from google.adk.artifacts.base_artifact_service import ensure_part
+from google.adk.errors.input_validation_error import InputValidationError
+from google.genai import types
+from pydantic import Field
+
+
+# Payloads at least this large are read through mmap
+MMAP_THRESHOLD_BYTES = 1024 * 1024
+
+# Scope value for user-scoped artifacts (session IDs are never empty)
+USER_SCOPE = ''
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    scope TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    sha256 TEXT,
+    size_bytes INTEGER NOT NULL,
+    characters INTEGER,
+    mime_type TEXT,
+    file_uri TEXT,
+    display_name TEXT,
+    custom_metadata TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, scope, filename, version)
+);
+CREATE INDEX IF NOT EXISTS versions_by_blob ON versions (sha256);
+"""
+
+_COLUMNS = (
+    'filename, version, kind, sha256, size_bytes, characters, mime_type, '
+    'file_uri, display_name, custom_metadata, created_at'
+)
+
+
+class IndexedArtifactVersion(ArtifactVersion):
+    """ArtifactVersion plus the index fields that avoid reading payloads."""
+
+    filename: str = Field(description="Artifact filename.")
+    kind: str = Field(description="'text', 'bytes' or 'file' (a URI reference).")
+    sha256: Optional[str] = Field(default=None, description="Payload hash.")
+    size_bytes: int = Field(default=0, description="Stored payload size.")
+    characters: Optional[int] = Field(
+        default=None, description="Length of text artifacts in characters."
+    )
+    display_name: Optional[str] = Field(default=None)
+
+
+def _is_user_scoped(session_id: Optional[str], filename: str) -> bool:
+    return session_id is None or filename.startswith('user:')
+
+
+class ContentAddressedArtifactService(BaseArtifactService):
+    """
+    Filesystem artifact service with deduplicated blobs and a metadata index.
+
+    Index-only operations (listing, versions, metadata) are single indexed
+    SQLite queries and run inline; payload reads and writes run in worker
+    threads. Safe to share between coroutines and threads of one process.
+    Several processes may read the same root, but only one should write.
+    """
+
+    def __init__(
+        self,
+        root_dir: Union[str, Path],
+        mmap_threshold_bytes: int = MMAP_THRESHOLD_BYTES,
+        max_concurrent_reads: int = 16
+    ):
+        """
+        Args:
+            root_dir: Directory holding the index and blobs (created if missing)
+            mmap_threshold_bytes: Payload size from which reads use mmap
+            max_concurrent_reads: Payload reads in flight during batch loads
+        """
+        self.root_dir = Path(root_dir).expanduser().resolve()
+        self.blob_dir = self.root_dir / 'blobs'
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.mmap_threshold_bytes = mmap_threshold_bytes
+        self.max_concurrent_reads = max_concurrent_reads
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.root_dir / 'index.sqlite3', check_same_thread=False, isolation_level=None
+        )
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(_SCHEMA)
+        self._stats = {'saves': 0, 'deduplicated': 0, 'blob_reads': 0, 'mmap_reads': 0}
+
+    def close(self) -> None:
+        """Close the index connection."""
+        with self._lock:
+            self._db.close()
+
+    # ------------------------------------------------------------------
+    # Scoping
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _scope(app_name: str, user_id: str, session_id: Optional[str], filename: str) -> str:
+        artifact_util.validate_path_segment(app_name, 'app_name')
+        artifact_util.validate_path_segment(user_id, 'user_id')
+        if _is_user_scoped(session_id, filename):
+            return USER_SCOPE
+        artifact_util.validate_path_segment(session_id, 'session_id')
+        return session_id
+
+    @staticmethod
+    def _scopes(session_id: Optional[str]) -> tuple:
+        if session_id is None:
+            return (USER_SCOPE,)
+        artifact_util.validate_path_segment(session_id, 'session_id')
+        return (USER_SCOPE, session_id)
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / sha256[:2] / sha256
+
+    def _write_blob(self, sha256: str, data: bytes) -> bool:
+        """Write a blob unless it exists; returns True if it was written."""
+        path = self._blob_path(sha256)
+        if path.exists():
+            return False
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        return True
+
+    def _read_blob(self, sha256: str, size: int, as_text: bool) -> Union[bytes, str]:
+        path = self._blob_path(sha256)
+        self._stats['blob_reads'] += 1
+        if size < self.mmap_threshold_bytes:
+            data = path.read_bytes()
+            return data.decode('utf-8') if as_text else data
+
+        self._stats['mmap_reads'] += 1
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # Decode straight from the mapping: no intermediate bytes copy
+            return str(mapped, 'utf-8') if as_text else mapped[:]
+
+    # ------------------------------------------------------------------
+    # Index
+    # ------------------------------------------------------------------
+
+    def _to_version(self, row: tuple, app_name: str, user_id: str, scope: str) -> IndexedArtifactVersion:
+        (filename, version, kind, sha256, size_bytes, characters, mime_type,
+         file_uri, display_name, custom_metadata, created_at) = row
+        if kind == 'file':
+            canonical_uri = file_uri
+        else:
+            canonical_uri = artifact_util.get_artifact_uri(
+                app_name, user_id, filename, version, session_id=scope or None
+            )
+        return IndexedArtifactVersion(
+            version=version,
+            canonical_uri=canonical_uri,
+            custom_metadata=json.loads(custom_metadata) if custom_metadata else {},
+            create_time=created_at,
+            mime_type=mime_type,
+            filename=filename,
+            kind=kind,
+            sha256=sha256,
+            size_bytes=size_bytes,
+            characters=characters,
+            display_name=display_name,
+        )
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def _version_rows(
+        self, app_name: str, user_id: str, scope: str, filename: str, version: Optional[int]
+    ) -> List[tuple]:
+        sql = f'SELECT {_COLUMNS} FROM versions WHERE app_name=? AND user_id=? AND scope=? AND filename=?'
+        params: tuple = (app_name, user_id, scope, filename)
+        if version is None:
+            sql += ' ORDER BY version DESC LIMIT 1'
+        else:
+            sql += ' AND version=?'
+            params += (version,)
+        return self._query(sql, params)
+
+    # ------------------------------------------------------------------
+    # Save
+    # ------------------------------------------------------------------
+
+    def _save_sync(
+        self,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        artifact: types.Part,
+        session_id: Optional[str],
+        custom_metadata: Optional[Dict[str, Any]]
+    ) -> int:
+        scope = self._scope(app_name, user_id, session_id, filename)
+        data: Optional[bytes] = None
+        characters = file_uri = display_name = mime_type = None
+
+        if artifact.inline_data is not None:
+            data = artifact.inline_data.data
+            if data is None:
+                raise InputValidationError("Artifact inline_data must contain data.")
+            kind = 'bytes'
+            mime_type = artifact.inline_data.mime_type or 'application/octet-stream'
+            display_name = artifact.inline_data.display_name
+        elif artifact.text is not None:
+            data = artifact.text.encode('utf-8')
+            kind = 'text'
+            mime_type = 'text/plain'
+            characters = len(artifact.text)
+        elif artifact.file_data is not None and artifact.file_data.file_uri:
+            kind = 'file'
+            file_uri = artifact.file_data.file_uri
+            if artifact_util.is_artifact_ref(artifact):
+                parsed = artifact_util.parse_artifact_uri(file_uri)
+                if not parsed:
+                    raise InputValidationError(f"Invalid artifact reference URI: {file_uri}")
+                artifact_util.validate_artifact_reference_scope(
+                    app_name=app_name, user_id=user_id, session_id=session_id, parsed_uri=parsed
+                )
+            else:
+                mime_type = artifact.file_data.mime_type
+        else:
+            raise InputValidationError("Not supported artifact type.")
+
+        sha256 = hashlib.sha256(data).hexdigest() if data is not None else None
+        # Outside the lock: hashing and writing large payloads shouldn't block
+        # readers, and writing an existing blob is a no-op
+        deduplicated = bool(sha256) and not self._write_blob(sha256, data)
+
+        with self._lock:
+            if sha256:
+                # A concurrent delete may have collected the blob meanwhile
+                self._write_blob(sha256, data)
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                (latest,) = self._db.execute(
+                    'SELECT MAX(version) FROM versions '
+                    'WHERE app_name=? AND user_id=? AND scope=? AND filename=?',
+                    (app_name, user_id, scope, filename),
+                ).fetchone()
+                version = 0 if latest is None else latest + 1
+                self._db.execute(
+                    f'INSERT INTO versions (app_name, user_id, scope, {_COLUMNS}) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        app_name, user_id, scope, filename, version, kind, sha256,
+                        len(data) if data is not None else 0, characters, mime_type,
+                        file_uri, display_name,
+                        json.dumps(custom_metadata) if custom_metadata else None,
+                        time.time(),
+                    ),
+                )
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+            self._stats['saves'] += 1
+            self._stats['deduplicated'] += deduplicated
+        return version
+
+    async def save_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        artifact: Union[types.Part, Dict[str, Any]],
+        session_id: Optional[str] = None,
+        custom_metadata: Optional[Dict[str, Any]] = None,
+    ) -> int:
+        return await asyncio.to_thread(
+            self._save_sync, app_name, user_id, filename,
+            ensure_part(artifact), session_id, custom_metadata,
+        )
+
+    # ------------------------------------------------------------------
+    # Load
+    # ------------------------------------------------------------------
+
+    def _part_from_row(self, row: tuple) -> Optional[types.Part]:
+        _, _, kind, sha256, size_bytes, _, mime_type, file_uri, display_name, _, _ = row
+        if kind == 'file':
+            return types.Part(file_data=types.FileData(file_uri=file_uri, mime_type=mime_type))
+        try:
+            payload = self._read_blob(sha256, size_bytes, as_text=kind == 'text')
+        except FileNotFoundError:
+            return None
+        if kind == 'text':
+            return types.Part(text=payload)
+        part = types.Part(inline_data=types.Blob(
+            mime_type=mime_type, data=payload, display_name=display_name
+        ))
+        if artifact_util._is_rewind_tombstone(part):
+            return None
+        return part
+
+    async def _resolve(
+        self,
+        part: Optional[types.Part],
+        app_name: str,
+        user_id: str,
+        session_id: Optional[str],
+        remaining_depth: int
+    ) -> Optional[types.Part]:
+        """Follow artifact:// references to the part they point at."""
+        if part is None or not artifact_util.is_artifact_ref(part):
+            return part
+        parsed = artifact_util.resolve_artifact_reference(
+            file_uri=part.file_data.file_uri,
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            remaining_depth=remaining_depth,
+        )
+        return await self._load(
+            parsed.app_name, parsed.user_id, parsed.filename,
+            parsed.session_id, parsed.version, remaining_depth - 1,
+        )
+
+    async def _load(
+        self,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str],
+        version: Optional[int],
+        remaining_depth: int
+    ) -> Optional[types.Part]:
+        scope = self._scope(app_name, user_id, session_id, filename)
+
+        def load_sync():
+            rows = self._version_rows(app_name, user_id, scope, filename, version)
+            return self._part_from_row(rows[0]) if rows else None
+
+        part = await asyncio.to_thread(load_sync)
+        return await self._resolve(part, app_name, user_id, session_id, remaining_depth)
+
+    async def load_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[types.Part]:
+        return await self._load(
+            app_name, user_id, filename, session_id, version,
+            artifact_util._MAX_ARTIFACT_REFERENCE_DEPTH,
+        )
+
+    async def load_artifacts(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filenames: List[str],
+        session_id: Optional[str] = None,
+    ) -> Dict[str, Optional[types.Part]]:
+        """
+        Load the latest version of many artifacts at once.
+
+        One index query finds every version; payloads are then read
+        concurrently, at most max_concurrent_reads at a time.
+
+        Returns:
+            Dict of filename to Part (None if not found)
+        """
+        latest = self._latest_rows(app_name, user_id, session_id, filenames)
+        semaphore = asyncio.Semaphore(self.max_concurrent_reads)
+
+        async def load(filename: str) -> Optional[types.Part]:
+            row = latest.get(filename)
+            if row is None:
+                return None
+            async with semaphore:
+                part = await asyncio.to_thread(self._part_from_row, row)
+            return await self._resolve(
+                part, app_name, user_id, session_id,
+                artifact_util._MAX_ARTIFACT_REFERENCE_DEPTH,
+            )
+
+        parts = await asyncio.gather(*(load(f) for f in filenames))
+        return dict(zip(filenames, parts))
+
+    # ------------------------------------------------------------------
+    # Listing and metadata (index only)
+    # ------------------------------------------------------------------
+
+    def _latest_rows(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: Optional[str],
+        filenames: Optional[List[str]] = None
+    ) -> Dict[str, tuple]:
+        """Latest version row per filename visible from session_id."""
+        artifact_util.validate_path_segment(app_name, 'app_name')
+        artifact_util.validate_path_segment(user_id, 'user_id')
+        scopes = self._scopes(session_id)
+        placeholders = ', '.join('?' * len(scopes))
+        rows = self._query(
+            f'SELECT {_COLUMNS}, scope FROM versions v '
+            f'WHERE app_name=? AND user_id=? AND scope IN ({placeholders}) '
+            'AND version = (SELECT MAX(version) FROM versions w WHERE w.app_name=v.app_name '
+            'AND w.user_id=v.user_id AND w.scope=v.scope AND w.filename=v.filename)',
+            (app_name, user_id, *scopes),
+        )
+        wanted = set(filenames) if filenames is not None else None
+        latest = {}
+        for row in rows:
+            filename, scope = row[0], row[-1]
+            if wanted is not None and filename not in wanted:
+                continue
+            # Keep the row load_artifact would return for this name
+            expected = USER_SCOPE if _is_user_scoped(session_id, filename) else session_id
+            if scope == expected:
+                latest[filename] = row[:-1]
+        return latest
+
+    async def list_artifact_keys(
+        self, *, app_name: str, user_id: str, session_id: Optional[str] = None
+    ) -> List[str]:
+        artifact_util.validate_path_segment(app_name, 'app_name')
+        artifact_util.validate_path_segment(user_id, 'user_id')
+        scopes = self._scopes(session_id)
+        placeholders = ', '.join('?' * len(scopes))
+        rows = self._query(
+            f'SELECT DISTINCT filename FROM versions WHERE app_name=? AND user_id=? '
+            f'AND scope IN ({placeholders}) ORDER BY filename',
+            (app_name, user_id, *scopes),
+        )
+        return [filename for (filename,) in rows]
+
+    async def list_artifact_metadata(
+        self, *, app_name: str, user_id: str, session_id: Optional[str] = None
+    ) -> Dict[str, IndexedArtifactVersion]:
+        """
+        Latest version metadata (size, MIME type, hash, created time) for
+        every artifact visible from the session, without reading payloads.
+        """
+        latest = self._latest_rows(app_name, user_id, session_id)
+        return {
+            filename: self._to_version(
+                row, app_name, user_id, self._scope(app_name, user_id, session_id, filename)
+            )
+            for filename, row in sorted(latest.items())
+        }
+
+    async def delete_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> None:
+        scope = self._scope(app_name, user_id, session_id, filename)
+
+        def delete_sync():
+            with self._lock:
+                key = (app_name, user_id, scope, filename)
+                hashes = {h for (h,) in self._db.execute(
+                    'SELECT DISTINCT sha256 FROM versions WHERE app_name=? AND user_id=? '
+                    'AND scope=? AND filename=? AND sha256 IS NOT NULL', key,
+                )}
+                self._db.execute(
+                    'DELETE FROM versions WHERE app_name=? AND user_id=? AND scope=? AND filename=?',
+                    key,
+                )
+                # Collect blobs no other version still references
+                for sha256 in hashes:
+                    if not self._db.execute(
+                        'SELECT 1 FROM versions WHERE sha256=? LIMIT 1', (sha256,)
+                    ).fetchone():
+                        self._blob_path(sha256).unlink(missing_ok=True)
+
+        await asyncio.to_thread(delete_sync)
+
+    async def list_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> List[int]:
+        scope = self._scope(app_name, user_id, session_id, filename)
+        rows = self._query(
+            'SELECT version FROM versions WHERE app_name=? AND user_id=? AND scope=? '
+            'AND filename=? ORDER BY version',
+            (app_name, user_id, scope, filename),
+        )
+        return [version for (version,) in rows]
+
+    async def list_artifact_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> List[ArtifactVersion]:
+        scope = self._scope(app_name, user_id, session_id, filename)
+        rows = self._query(
+            f'SELECT {_COLUMNS} FROM versions WHERE app_name=? AND user_id=? AND scope=? '
+            'AND filename=? ORDER BY version',
+            (app_name, user_id, scope, filename),
+        )
+        return [self._to_version(row, app_name, user_id, scope) for row in rows]
+
+    async def get_artifact_version(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[ArtifactVersion]:
+        scope = self._scope(app_name, user_id, session_id, filename)
+        rows = self._version_rows(app_name, user_id, scope, filename, version)
+        return self._to_version(rows[0], app_name, user_id, scope) if rows else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Save, deduplication and read counters plus blob storage totals."""
+        with self._lock:
+            stats = dict(self._stats)
+            versions, logical, blobs, stored = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size_bytes), 0), '
+                '(SELECT COUNT(DISTINCT sha256) FROM versions), '
+                '(SELECT COALESCE(SUM(size_bytes), 0) FROM '
+                '(SELECT sha256, MAX(size_bytes) AS size_bytes FROM versions '
+                'WHERE sha256 IS NOT NULL GROUP BY sha256)) FROM versions'
+            ).fetchone()
+        return {
+            **stats,
+            'versions': versions,
+            'blobs': blobs,
+            'logical_bytes': logical,
+            'stored_bytes': stored,
+            'bytes_deduplicated': logical - stored,
+        }
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+
+class _SessionArtifacts:
+    """The artifact methods of a ToolContext, bound to one session."""
+
+    def __init__(self, service: BaseArtifactService, app_name: str, user_id: str, session_id: str):
+        self._service = service
+        self._scope = dict(app_name=app_name, user_id=user_id, session_id=session_id)
+
+    async def list_artifacts(self) -> List[str]:
+        return await self._service.list_artifact_keys(**self._scope)
+
+    async def get_artifact_version(self, filename: str, version: Optional[int] = None):
+        return await self._service.get_artifact_version(filename=filename, version=version, **self._scope)
+
+    async def load_artifact(self, filename: str, version: Optional[int] = None):
+        return await self._service.load_artifact(filename=filename, version=version, **self._scope)
+
+    async def save_artifact(self, filename: str, artifact: types.Part, custom_metadata=None) -> int:
+        return await self._service.save_artifact(
+            filename=filename, artifact=artifact, custom_metadata=custom_metadata, **self._scope
+        )
+
+
+async def benchmark_artifact_services(artifacts: int = 10_000, root_dir: Optional[str] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Time listing and final-report generation for a session with many artifacts.
+
+    Compares InMemoryArtifactService with ContentAddressedArtifactService.
+
+    Returns:
+        Dict of service name to {operation: seconds}
+    """
+    from google.adk.artifacts import InMemoryArtifactService
+    from .agent import create_final_report_tool
+
+    text = "The quick brown fox jumps over the lazy dog. " * 40
+    root = Path(root_dir or tempfile.mkdtemp(prefix='artifact_bench_'))
+    services = {
+        'in_memory': InMemoryArtifactService(),
+        'content_addressed': ContentAddressedArtifactService(root),
+    }
+    results = {}
+    for name, service in services.items():
+        context = _SessionArtifacts(service, 'bench', 'user', 'session')
+        timings = {}
+
+        start = time.perf_counter()
+        for i in range(artifacts):
+            # Every tenth document repeats earlier content
+            body = text if i % 10 == 0 else f"{i}: {text}"
+            await context.save_artifact(f"document_{i:05d}.txt", types.Part.from_text(text=body))
+        timings['save_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await context.list_artifacts()
+        timings['list_s'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await create_final_report_tool(context)
+        timings['report_s'] = time.perf_counter() - start
+
+        if isinstance(service, ContentAddressedArtifactService):
+            start = time.perf_counter()
+            await service.list_artifact_metadata(app_name='bench', user_id='user', session_id='session')
+            timings['metadata_s'] = time.perf_counter() - start
+
+            filenames = [f"document_{i:05d}.txt" for i in range(0, artifacts, 10)]
+            start = time.perf_counter()
+            await service.load_artifacts(
+                app_name='bench', user_id='user', session_id='session', filenames=filenames
+            )
+            timings['batch_load_s'] = time.perf_counter() - start
+            timings['bytes_deduplicated'] = service.stats()['bytes_deduplicated']
+            service.close()
+        results[name] = timings
+    return results
+
+
+if __name__ == '__main__':
+    for service_name, timings in asyncio.run(benchmark_artifact_services()).items():
+        print(service_name)
+        for operation, value in timings.items():
+            print(f"  {operation:20} {value:.4f}" if isinstance(value, float) else f"  {operation:20} {value}")
@@ -0,0 +1,342 @@
+"""
+Chunked, streaming document processing for large artifacts.
+
+Large documents are never held whole: they are read line by line, split on
+structure (headings, then paragraphs, then sentences), mapped through an
+operation with bounded concurrency, and written back as multi-part
+artifacts one part at a time. Peak memory stays around
+chunk size x concurrency regardless of document size.
+
+A multi-part artifact is a small JSON manifest saved under the artifact's
+own filename, listing part artifacts named ``<filename>.part00000``,
+``<filename>.part00001``, ...
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from google.genai import types
+
+
+# Characters per chunk; a few model-sized requests' worth of text
+DEFAULT_CHUNK_CHARS = 32_000
+
+# Inputs above this size are processed in chunked mode
+CHUNK_THRESHOLD_CHARS = 100_000
+
+DEFAULT_CONCURRENCY = 4
+
+MULTIPART_MIME_TYPE = 'application/vnd.adk.multipart+json'
+
+_HEADING = re.compile(r'^(#{1,6}\s|[A-Z][A-Z0-9 ,:\-]{3,}$)')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+# ============================================================================
+# Splitting
+# ============================================================================
+
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Yield lines of text (with newlines) without copying the whole string."""
+    start = 0
+    while start < len(text):
+        end = text.find('\n', start)
+        end = len(text) if end == -1 else end + 1
+        yield text[start:end]
+        start = end
+
+
+def _split_block(block: str, max_chars: int) -> Iterator[str]:
+    """Split an oversized block on sentence boundaries, then hard-cut."""
+    piece = ''
+    for sentence in _SENTENCE_END.split(block):
+        while len(sentence) > max_chars:
+            if piece:
+                yield piece
+                piece = ''
+            yield sentence[:max_chars]
+            sentence = sentence[max_chars:]
+        candidate = f"{piece} {sentence}" if piece else sentence
+        if len(candidate) > max_chars:
+            yield piece
+            piece = sentence
+        else:
+            piece = candidate
+    if piece:
+        yield piece
+
+
+def iter_chunks(lines: Iterable[str], max_chars: int = DEFAULT_CHUNK_CHARS) -> Iterator[str]:
+    """
+    Group lines into chunks of at most max_chars, splitting on structure.
+
+    Blocks are separated by blank lines, and a heading always starts a new
+    block. Blocks are packed into chunks; a chunk is closed before a heading
+    once it is half full, so sections tend to start chunks. Blocks longer
+    than max_chars are split on sentences as their lines arrive, so a
+    document without blank lines is held a chunk at a time, not whole.
+
+    Args:
+        lines: Lines of the document (e.g. an open file)
+        max_chars: Maximum characters per chunk
+
+    Yields:
+        Chunks of text in document order
+    """
+    chunk: List[str] = []
+    chunk_len = 0
+    block: List[str] = []
+    block_len = 0
+
+    def pack(pieces):
+        nonlocal chunk, chunk_len
+        for piece in pieces:
+            if chunk_len + len(piece) > max_chars and chunk:
+                yield ''.join(chunk)
+                chunk, chunk_len = [], 0
+            chunk.append(piece)
+            chunk_len += len(piece)
+
+    def flush_block():
+        nonlocal block_len
+        text = ''.join(block)
+        block.clear()
+        block_len = 0
+        if not text.strip():
+            return
+        yield from pack([text] if len(text) <= max_chars else _split_block(text, max_chars))
+
+    def spill_block():
+        # Pack the sentences of an oversized block, keeping the last one
+        # open since the next line may continue it
+        nonlocal block_len
+        pieces = list(_split_block(''.join(block), max_chars))
+        tail = pieces.pop()
+        block[:] = [tail]
+        block_len = len(tail)
+        yield from pack(pieces)
+
+    for line in lines:
+        if not line.strip():
+            block.append(line)
+            yield from flush_block()
+            continue
+        if _HEADING.match(line):
+            yield from flush_block()
+            if chunk_len >= max_chars // 2:
+                yield ''.join(chunk)
+                chunk, chunk_len = [], 0
+        block.append(line)
+        block_len += len(line)
+        if block_len > max_chars:
+            yield from spill_block()
+    yield from flush_block()
+    if chunk:
+        yield ''.join(chunk)
+
+
+# ============================================================================
+# Map and Reduce
+# ============================================================================
+
+
+async def _aiter(items: Any) -> AsyncIterator[Any]:
+    if hasattr(items, '__aiter__'):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def map_ordered(
+    items: Any,
+    fn: Callable[[T], Awaitable[R]],
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> AsyncIterator[R]:
+    """
+    Apply fn to items concurrently, yielding results in input order.
+
+    Items (an iterable or async iterable) are pulled lazily: at most
+    `concurrency` items are in flight or waiting to be yielded, so a slow
+    item holds back the window rather than letting completed results pile up.
+    """
+    window: deque = deque()
+    try:
+        async for item in _aiter(items):
+            window.append(asyncio.ensure_future(fn(item)))
+            if len(window) >= concurrency:
+                yield await window.popleft()
+        while window:
+            yield await window.popleft()
+    finally:
+        for task in window:
+            task.cancel()
+
+
+async def reduce_hierarchical(
+    texts: List[str],
+    combine: Callable[[List[str]], Awaitable[str]],
+    fan_in: int = 8,
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> str:
+    """
+    Combine texts in groups of fan_in, level by level, until one remains.
+
+    Groups are contiguous and keep document order.
+    """
+    if not texts:
+        return ''
+    level = list(texts)
+    while len(level) > 1:
+        groups = [level[i:i + fan_in] for i in range(0, len(level), fan_in)]
+        level = [result async for result in map_ordered(groups, combine, concurrency)]
+    return level[0]
+
+
+# ============================================================================
+# Multi-part Artifacts
+# ============================================================================
+
+
+_PART_SUFFIX = re.compile(r'\.part\d{5}$')
+
+
+def part_filename(filename: str, index: int) -> str:
+    return f"{filename}.part{index:05d}"
+
+
+def is_part_filename(filename: str) -> bool:
+    """True for the part artifacts of a multi-part artifact."""
+    return _PART_SUFFIX.search(filename) is not None
+
+
+def is_multipart(artifact: Optional[types.Part]) -> bool:
+    return bool(
+        artifact is not None
+        and artifact.inline_data is not None
+        and artifact.inline_data.mime_type == MULTIPART_MIME_TYPE
+    )
+
+
+class MultipartWriter:
+    """
+    Write a text artifact as numbered parts, then its manifest.
+
+    Parts are saved as they are written, so nothing but the current part is
+    held in memory. The manifest goes last: until it is saved, readers of
+    the filename still see the previous version.
+    """
+
+    def __init__(self, tool_context: Any, filename: str):
+        self.tool_context = tool_context
+        self.filename = filename
+        self.parts: List[Dict[str, Any]] = []
+        self.characters = 0
+        self._hash = hashlib.sha256()
+
+    async def write(self, text: str) -> None:
+        name = part_filename(self.filename, len(self.parts))
+        version = await self.tool_context.save_artifact(
+            filename=name, artifact=types.Part.from_text(text=text)
+        )
+        self.parts.append({'filename': name, 'version': version, 'characters': len(text)})
+        self.characters += len(text)
+        self._hash.update(text.encode('utf-8'))
+
+    async def close(self, **metadata: Any) -> int:
+        """Save the manifest and return its version."""
+        manifest = {
+            'multipart': True,
+            'parts': self.parts,
+            'characters': self.characters,
+            'sha256': self._hash.hexdigest(),
+            **metadata,
+        }
+        return await self.tool_context.save_artifact(
+            filename=self.filename,
+            artifact=types.Part.from_bytes(
+                data=json.dumps(manifest).encode('utf-8'), mime_type=MULTIPART_MIME_TYPE
+            ),
+        )
+
+
+def read_manifest(artifact: types.Part) -> Dict[str, Any]:
+    return json.loads(artifact.inline_data.data.decode('utf-8'))
+
+
+async def iter_artifact_text(tool_context: Any, filename: str) -> AsyncIterator[str]:
+    """
+    Yield an artifact's text one part at a time.
+
+    Plain text artifacts are yielded whole; multi-part artifacts are loaded
+    part by part.
+
+    Raises:
+        FileNotFoundError: If the artifact or one of its parts is missing
+    """
+    artifact = await tool_context.load_artifact(filename)
+    if artifact is None:
+        raise FileNotFoundError(f"Artifact {filename} not found")
+    if not is_multipart(artifact):
+        if artifact.text is None:
+            raise ValueError(f"Artifact {filename} is not text")
+        yield artifact.text
+        return
+
+    for part in read_manifest(artifact)['parts']:
+        loaded = await tool_context.load_artifact(part['filename'], version=part['version'])
+        if loaded is None or loaded.text is None:
+            raise FileNotFoundError(f"Part {part['filename']} of {filename} is missing")
+        yield loaded.text
+
+
+async def aiter_chunks(
+    texts: AsyncIterator[str],
+    max_chars: int = DEFAULT_CHUNK_CHARS
+) -> AsyncIterator[str]:
+    """Re-chunk a stream of text pieces (e.g. artifact parts) on structure."""
+    async for text in texts:
+        for chunk in iter_chunks(iter_lines(text), max_chars):
+            yield chunk
+
+
+async def process_chunks(
+    chunks: Any,
+    fn: Callable[[str], Awaitable[str]],
+    writer: Optional[MultipartWriter] = None,
+    concurrency: int = DEFAULT_CONCURRENCY
+) -> Dict[str, Any]:
+    """
+    Map chunks through fn and stream the results into a multi-part artifact.
+
+    Args:
+        chunks: Iterable or async iterable of chunks
+        fn: Async operation applied to each chunk
+        writer: Where to write results, in order (None to only collect stats)
+        concurrency: Chunks processed at once
+
+    Returns:
+        Dict with chunk count and input/output character totals
+    """
+    stats = {'chunks': 0, 'input_characters': 0, 'output_characters': 0}
+
+    async def apply(chunk: str) -> str:
+        stats['input_characters'] += len(chunk)
+        return await fn(chunk)
+
+    async for result in map_ordered(chunks, apply, concurrency):
+        stats['chunks'] += 1
+        stats['output_characters'] += len(result)
+        if writer is not None:
+            await writer.write(result)
+    return stats
+
@@ -0,0 +1,215 @@
+"""
+Test the content-addressed artifact service.
+"""
+
+import pytest
+from google.adk.artifacts import artifact_util
+from google.genai import types
+
+from artifact_agent.agent import create_final_report_tool
+from artifact_agent.artifact_store import ContentAddressedArtifactService
+
+SCOPE = dict(app_name='app', user_id='user', session_id='s1')
+
+
+@pytest.fixture
+def service(tmp_path):
+    """Create a service rooted in a temporary directory."""
+    service = ContentAddressedArtifactService(tmp_path / 'store')
+    yield service
+    service.close()
+
+
+def text(value):
+    return types.Part.from_text(text=value)
+
+
+class SessionContext:
+    """Minimal ToolContext stand-in bound to one session."""
+
+    def __init__(self, service):
+        self.service = service
+
+    async def list_artifacts(self):
+        return await self.service.list_artifact_keys(**SCOPE)
+
+    async def get_artifact_version(self, filename, version=None):
+        return await self.service.get_artifact_version(filename=filename, version=version, **SCOPE)
+
+    async def load_artifact(self, filename, version=None):
+        return await self.service.load_artifact(filename=filename, version=version, **SCOPE)
+
+    async def save_artifact(self, filename, artifact, custom_metadata=None):
+        return await self.service.save_artifact(filename=filename, artifact=artifact, **SCOPE)
+
+
+class TestSaveAndLoad:
+    """Test versioned saves and loads."""
+
+    @pytest.mark.asyncio
+    async def test_versions_increment(self, service):
+        """Test each save returns the next version and loads round-trip."""
+        assert await service.save_artifact(filename='a.txt', artifact=text('one'), **SCOPE) == 0
+        assert await service.save_artifact(filename='a.txt', artifact=text('two'), **SCOPE) == 1
+
+        assert (await service.load_artifact(filename='a.txt', **SCOPE)).text == 'two'
+        assert (await service.load_artifact(filename='a.txt', version=0, **SCOPE)).text == 'one'
+        assert await service.load_artifact(filename='a.txt', version=5, **SCOPE) is None
+        assert await service.list_versions(filename='a.txt', **SCOPE) == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_binary_round_trip(self, service):
+        """Test inline bytes keep their MIME type."""
+        part = types.Part.from_bytes(data=b'\x89PNG...', mime_type='image/png')
+        await service.save_artifact(filename='img.png', artifact=part, **SCOPE)
+
+        loaded = await service.load_artifact(filename='img.png', **SCOPE)
+
+        assert loaded.inline_data.data == b'\x89PNG...'
+        assert loaded.inline_data.mime_type == 'image/png'
+
+    @pytest.mark.asyncio
+    async def test_persists_across_instances(self, tmp_path):
+        """Test artifacts survive a restart."""
+        first = ContentAddressedArtifactService(tmp_path / 'store')
+        await first.save_artifact(filename='a.txt', artifact=text('kept'), **SCOPE)
+        first.close()
+
+        second = ContentAddressedArtifactService(tmp_path / 'store')
+
+        assert (await second.load_artifact(filename='a.txt', **SCOPE)).text == 'kept'
+        assert await second.save_artifact(filename='a.txt', artifact=text('next'), **SCOPE) == 1
+        second.close()
+
+    @pytest.mark.asyncio
+    async def test_large_payload_read_through_mmap(self, tmp_path):
+        """Test payloads over the threshold are mapped, not read."""
+        service = ContentAddressedArtifactService(tmp_path / 'store', mmap_threshold_bytes=1024)
+        body = 'é' * 5000
+        await service.save_artifact(filename='big.txt', artifact=text(body), **SCOPE)
+
+        loaded = await service.load_artifact(filename='big.txt', **SCOPE)
+
+        assert loaded.text == body
+        assert service.stats()['mmap_reads'] == 1
+        service.close()
+
+    @pytest.mark.asyncio
+    async def test_rewind_tombstone_loads_as_absent(self, service):
+        """Test the rewind marker hides the artifact."""
+        await service.save_artifact(filename='a.txt', artifact=text('x'), **SCOPE)
+        await service.save_artifact(
+            filename='a.txt', artifact=artifact_util._new_rewind_tombstone(), **SCOPE
+        )
+
+        assert await service.load_artifact(filename='a.txt', **SCOPE) is None
+
+    @pytest.mark.asyncio
+    async def test_artifact_reference_resolved(self, service):
+        """Test artifact:// references load their target."""
+        await service.save_artifact(filename='a.txt', artifact=text('target'), **SCOPE)
+        uri = artifact_util.get_artifact_uri('app', 'user', 'a.txt', 0, session_id='s1')
+        ref = types.Part(file_data=types.FileData(file_uri=uri))
+        await service.save_artifact(filename='ref.txt', artifact=ref, **SCOPE)
+
+        assert (await service.load_artifact(filename='ref.txt', **SCOPE)).text == 'target'
+
+
+class TestDeduplication:
+    """Test content-addressed storage."""
+
+    @pytest.mark.asyncio
+    async def test_identical_content_stored_once(self, service):
+        """Test equal payloads share one blob across files and versions."""
+        for filename in ('a.txt', 'b.txt', 'a.txt'):
+            await service.save_artifact(filename=filename, artifact=text('same body'), **SCOPE)
+
+        stats = service.stats()
+
+        assert stats['versions'] == 3
+        assert stats['blobs'] == 1
+        assert stats['deduplicated'] == 2
+        assert stats['bytes_deduplicated'] == 2 * len('same body')
+        assert len(list(service.blob_dir.rglob('*'))) == 2  # prefix dir + blob
+
+    @pytest.mark.asyncio
+    async def test_delete_keeps_shared_blobs(self, service):
+        """Test deleting one artifact keeps blobs others still reference."""
+        await service.save_artifact(filename='a.txt', artifact=text('shared'), **SCOPE)
+        await service.save_artifact(filename='b.txt', artifact=text('shared'), **SCOPE)
+        await service.save_artifact(filename='a.txt', artifact=text('only a'), **SCOPE)
+
+        await service.delete_artifact(filename='a.txt', **SCOPE)
+
+        assert await service.load_artifact(filename='a.txt', **SCOPE) is None
+        assert (await service.load_artifact(filename='b.txt', **SCOPE)).text == 'shared'
+        assert service.stats()['blobs'] == 1
+        assert len([p for p in service.blob_dir.rglob('*') if p.is_file()]) == 1
+
+
+class TestIndex:
+    """Test listing and metadata served from the index."""
+
+    @pytest.mark.asyncio
+    async def test_list_includes_user_scope(self, service):
+        """Test a session sees its own and user-scoped artifacts only."""
+        await service.save_artifact(filename='a.txt', artifact=text('a'), **SCOPE)
+        await service.save_artifact(filename='user:prefs.json', artifact=text('{}'), **SCOPE)
+        await service.save_artifact(
+            filename='other.txt', artifact=text('x'), app_name='app', user_id='user', session_id='s2'
+        )
+
+        keys = await service.list_artifact_keys(**SCOPE)
+
+        assert keys == ['a.txt', 'user:prefs.json']
+
+    @pytest.mark.asyncio
+    async def test_metadata_without_reading_payloads(self, service):
+        """Test sizes, hashes and MIME types come from the index."""
+        await service.save_artifact(filename='a.txt', artifact=text('héllo'), **SCOPE)
+        await service.save_artifact(
+            filename='b.bin', artifact=types.Part.from_bytes(data=b'1234', mime_type='application/pdf'),
+            custom_metadata={'source': 'upload'}, **SCOPE
+        )
+
+        metadata = await service.list_artifact_metadata(**SCOPE)
+        version = await service.get_artifact_version(filename='b.bin', **SCOPE)
+
+        assert metadata['a.txt'].characters == 5
+        assert metadata['a.txt'].size_bytes == 6
+        assert metadata['b.bin'].mime_type == 'application/pdf'
+        assert len(metadata['b.bin'].sha256) == 64
+        assert version.custom_metadata == {'source': 'upload'}
+        assert version.create_time > 0
+        assert service.stats()['blob_reads'] == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_load(self, service):
+        """Test batch loads return latest versions and None for missing names."""
+        for i in range(20):
+            await service.save_artifact(filename=f'doc{i}.txt', artifact=text(f'v0 {i}'), **SCOPE)
+            await service.save_artifact(filename=f'doc{i}.txt', artifact=text(f'v1 {i}'), **SCOPE)
+
+        loaded = await service.load_artifacts(filenames=['doc3.txt', 'missing.txt', 'doc0.txt'], **SCOPE)
+
+        assert list(loaded) == ['doc3.txt', 'missing.txt', 'doc0.txt']
+        assert loaded['doc3.txt'].text == 'v1 3'
+        assert loaded['missing.txt'] is None
+
+
+class TestFinalReport:
+    """Test report generation against the service."""
+
+    @pytest.mark.asyncio
+    async def test_report_uses_index_sizes(self, service):
+        """Test the report lists sizes without loading any artifact."""
+        context = SessionContext(service)
+        await context.save_artifact('document_extracted.txt', text('x' * 120))
+        await context.save_artifact('document_summary.txt', text('short'))
+
+        result = await create_final_report_tool(context)
+
+        assert result['status'] == 'success'
+        assert '- document_extracted.txt: 120 characters' in result['data']['content']
+        assert result['data']['artifacts_combined'] == ['document_extracted.txt', 'document_summary.txt']
+        assert service.stats()['blob_reads'] == 0
@@ -0,0 +1,326 @@
+"""
+Test chunked, streaming document processing.
+"""
+
+import asyncio
+import random
+import tracemalloc
+
+import pytest
+
+from artifact_agent.agent import (
+    create_final_report_tool,
+    extract_text_tool,
+    process_large_document_tool,
+    summarize_document_tool,
+    translate_document_tool,
+)
+from artifact_agent.artifact_store import ContentAddressedArtifactService
+from artifact_agent.chunking import (
+    CHUNK_THRESHOLD_CHARS,
+    MultipartWriter,
+    is_multipart,
+    is_part_filename,
+    iter_artifact_text,
+    iter_chunks,
+    iter_lines,
+    map_ordered,
+    reduce_hierarchical,
+)
+
+SCOPE = dict(app_name='app', user_id='user', session_id='s1')
+
+
+class SessionContext:
+    """Minimal ToolContext stand-in bound to one session."""
+
+    def __init__(self, service):
+        self.service = service
+
+    async def list_artifacts(self):
+        return await self.service.list_artifact_keys(**SCOPE)
+
+    async def get_artifact_version(self, filename, version=None):
+        return await self.service.get_artifact_version(filename=filename, version=version, **SCOPE)
+
+    async def load_artifact(self, filename, version=None):
+        return await self.service.load_artifact(filename=filename, version=version, **SCOPE)
+
+    async def save_artifact(self, filename, artifact, custom_metadata=None):
+        return await self.service.save_artifact(filename=filename, artifact=artifact, **SCOPE)
+
+
+@pytest.fixture
+def context(tmp_path):
+    """Create a session context over an on-disk artifact service."""
+    service = ContentAddressedArtifactService(tmp_path / 'store')
+    yield SessionContext(service)
+    service.close()
+
+
+def _document(sections, paragraphs=5, sentences=12):
+    lines = []
+    for s in range(sections):
+        lines.append(f"# Section {s}\n\n")
+        for p in range(paragraphs):
+            body = ' '.join(f"Sentence {s}.{p}.{i} talks about artifacts." for i in range(sentences))
+            lines.append(body + "\n\n")
+    return ''.join(lines)
+
+
+class TestSplitting:
+    """Test structure-aware splitting."""
+
+    def test_chunks_respect_limit_and_keep_text(self):
+        """Test chunks fit the limit and rejoin to the original."""
+        text = _document(20)
+
+        chunks = list(iter_chunks(iter_lines(text), max_chars=3000))
+
+        assert len(chunks) > 5
+        assert all(len(c) <= 3000 for c in chunks)
+        assert ''.join(chunks) == text
+
+    def test_headings_start_chunks(self):
+        """Test a section starts a new chunk once the current one is half full."""
+        text = _document(6, paragraphs=2)
+
+        chunks = list(iter_chunks(iter_lines(text), max_chars=2500))
+
+        assert all(c.startswith('# Section') for c in chunks)
+
+    def test_long_paragraph_split_on_sentences(self):
+        """Test an oversized paragraph breaks at sentence ends."""
+        paragraph = ' '.join(f"This is sentence {i}." for i in range(400))
+
+        chunks = list(iter_chunks([paragraph], max_chars=500))
+
+        assert all(len(c) <= 500 for c in chunks)
+        assert all(c.rstrip().endswith('.') for c in chunks)
+
+    def test_unbroken_text_hard_cut(self):
+        """Test text with no boundaries is still bounded."""
+        chunks = list(iter_chunks(['x' * 2500], max_chars=1000))
+
+        assert [len(c) for c in chunks] == [1000, 1000, 500]
+
+    def test_block_without_blank_lines_split_as_read(self):
+        """Test a block with no blank lines yields chunks before it ends."""
+        pulled = []
+
+        def lines():
+            for i in range(1000):
+                pulled.append(i)
+                yield f"Line {i} talks about artifacts.\n"
+
+        chunks = iter_chunks(lines(), max_chars=500)
+        first = next(chunks)
+        pulled_for_first = len(pulled)
+        rest = list(chunks)
+
+        assert pulled_for_first < 50
+        assert all(len(c) <= 500 for c in [first] + rest)
+        assert 'Line 999 ' in rest[-1]
+
+
+class TestMapReduce:
+    """Test ordered concurrent mapping and hierarchical reduction."""
+
+    @pytest.mark.asyncio
+    async def test_order_preserved(self):
+        """Test results come back in input order despite random latency."""
+        async def work(i):
+            await asyncio.sleep(random.random() / 200)
+            return i
+
+        results = [r async for r in map_ordered(range(50), work, concurrency=8)]
+
+        assert results == list(range(50))
+
+    @pytest.mark.asyncio
+    async def test_input_pulled_lazily(self):
+        """Test at most `concurrency` items are pulled ahead of the consumer."""
+        pulled = []
+
+        def source():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        async def work(i):
+            await asyncio.sleep(0)
+            return i
+
+        consumed = 0
+        async for _ in map_ordered(source(), work, concurrency=4):
+            consumed += 1
+            assert len(pulled) - consumed <= 4
+
+    @pytest.mark.asyncio
+    async def test_reduce_hierarchical(self):
+        """Test reduction runs in levels of fan_in and keeps order."""
+        calls = []
+
+        async def combine(group):
+            calls.append(len(group))
+            return '+'.join(group)
+
+        result = await reduce_hierarchical([str(i) for i in range(20)], combine, fan_in=4)
+
+        assert result == '+'.join(str(i) for i in range(20))
+        assert calls == [4, 4, 4, 4, 4, 4, 1, 2]
+
+
+class TestMultipartArtifacts:
+    """Test multi-part artifact writing and reading."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip(self, context):
+        """Test parts are saved in order and read back one at a time."""
+        writer = MultipartWriter(context, 'doc.txt')
+        for piece in ('alpha ', 'beta ', 'gamma'):
+            await writer.write(piece)
+        await writer.close()
+
+        manifest = await context.load_artifact('doc.txt')
+        pieces = [p async for p in iter_artifact_text(context, 'doc.txt')]
+
+        assert is_multipart(manifest)
+        assert pieces == ['alpha ', 'beta ', 'gamma']
+        assert is_part_filename('doc.txt.part00002')
+        assert not is_part_filename('doc.txt')
+
+    @pytest.mark.asyncio
+    async def test_plain_artifact_read_whole(self, context):
+        """Test plain text artifacts are yielded as one piece."""
+        from google.genai import types
+        await context.save_artifact('plain.txt', types.Part.from_text(text='hello'))
+
+        assert [p async for p in iter_artifact_text(context, 'plain.txt')] == ['hello']
+
+
+class TestChunkedTools:
+    """Test tools switch to chunked mode for large documents."""
+
+    @pytest.mark.asyncio
+    async def test_extract_then_summarize_large_document(self, context):
+        """Test a large extract is stored in parts and summarized by streaming."""
+        text = _document(60)
+        assert len(text) > CHUNK_THRESHOLD_CHARS
+
+        extracted = await extract_text_tool(text, context)
+        summary = await summarize_document_tool(None, context)
+
+        assert extracted['data']['mode'] == 'chunked'
+        assert extracted['data']['parts'] > 1
+        assert 'content' not in extracted['data']
+        assert summary['status'] == 'success'
+        assert summary['data']['mode'] == 'chunked'
+        assert summary['data']['original_length'] == len(text.strip())
+        assert summary['data']['content'].startswith('# Section 0')
+
+    @pytest.mark.asyncio
+    async def test_translate_large_text_streams_parts(self, context):
+        """Test large translations are written as a multi-part artifact."""
+        text = _document(60)
+
+        result = await translate_document_tool(text, 'Spanish', context)
+        pieces = [p async for p in iter_artifact_text(context, 'document_spanish.txt')]
+
+        assert result['data']['mode'] == 'chunked'
+        assert len(pieces) == result['data']['parts']
+        assert all(p.startswith('[Translated to Spanish]') for p in pieces)
+
+    @pytest.mark.asyncio
+    async def test_small_documents_unchanged(self, context):
+        """Test small inputs keep the single-artifact behaviour."""
+        result = await translate_document_tool('Hello world', 'French', context)
+
+        assert result['data']['content'] == '[Translated to French] Hello world'
+        assert not is_multipart(await context.load_artifact('document_french.txt'))
+
+    @pytest.mark.asyncio
+    async def test_process_file_and_report(self, context, tmp_path, monkeypatch):
+        """Test a file is processed from disk and reported as one artifact."""
+        monkeypatch.setenv('DOCUMENTS_DIR', str(tmp_path))
+        path = tmp_path / 'big.md'
+        path.write_text(_document(30))
+
+        translated = await process_large_document_tool(str(path), 'translate', context, 'German')
+        summarized = await process_large_document_tool('big.md', 'summarize', context)
+        report = await create_final_report_tool(context)
+
+        assert translated['status'] == summarized['status'] == 'success'
+        assert translated['data']['chunks'] == translated['data']['parts'] > 1
+        combined = report['data']['artifacts_combined']
+        assert combined == ['document_german.txt', 'document_summary.txt']
+        assert f"in {translated['data']['parts']} parts" in report['data']['content']
+
+    @pytest.mark.asyncio
+    async def test_process_validates_input(self, context):
+        """Test unknown operations and missing sources are reported."""
+        bad_op = await process_large_document_tool('x', 'shred', context)
+        missing = await process_large_document_tool('nope.txt', 'summarize', context)
+
+        assert bad_op['status'] == 'error'
+        assert missing['status'] == 'error'
+        assert 'not found' in missing['report'].lower()
+
+    @pytest.mark.asyncio
+    async def test_files_outside_documents_dir_not_read(self, context, tmp_path, monkeypatch):
+        """Test paths escaping the documents directory are treated as artifact names."""
+        docs = tmp_path / 'docs'
+        docs.mkdir()
+        monkeypatch.setenv('DOCUMENTS_DIR', str(docs))
+        secret = tmp_path / 'secret.txt'
+        secret.write_text('password=hunter2')
+
+        absolute = await process_large_document_tool(str(secret), 'summarize', context)
+        relative = await process_large_document_tool('../secret.txt', 'summarize', context)
+
+        assert absolute['status'] == relative['status'] == 'error'
+        assert 'not found' in absolute['report'].lower()
+        assert await context.list_artifacts() == []
+
+    @pytest.mark.asyncio
+    async def test_peak_memory_bounded_by_chunks(self, context, tmp_path, monkeypatch):
+        """Test translating a file holds a few chunks, not the document."""
+        monkeypatch.setenv('DOCUMENTS_DIR', str(tmp_path))
+        path = tmp_path / 'huge.md'
+        with open(path, 'w') as f:
+            for _ in range(60):
+                f.write(_document(40))
+        size = path.stat().st_size
+
+        tracemalloc.start()
+        try:
+            result = await process_large_document_tool(str(path), 'translate', context, 'Italian')
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert result['status'] == 'success'
+        assert size > 5_000_000
+        assert peak < size / 5
+
+    @pytest.mark.asyncio
+    async def test_peak_memory_bounded_without_blank_lines(self, context, tmp_path, monkeypatch):
+        """Test a file with no blank lines is not held whole either."""
+        monkeypatch.setenv('DOCUMENTS_DIR', str(tmp_path))
+        path = tmp_path / 'dense.txt'
+        sentence = 'This sentence talks about artifacts. '
+        with open(path, 'w') as f:
+            for _ in range(200_000):
+                f.write(sentence * 3 + '\n')
+        size = path.stat().st_size
+
+        tracemalloc.start()
+        try:
+            result = await process_large_document_tool(str(path), 'translate', context, 'Italian')
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert result['status'] == 'success'
+        assert size > 20_000_000
+        assert peak < size / 5
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Bulk-ingest product images into catalog entries.
+
+Takes a directory of images or a CSV/JSONL manifest (image_path,
+product_id, name) and runs vision analysis and catalog generation as an
+overlapping pipeline with bounded concurrency. Progress is checkpointed, so
+re-running the same command after a crash resumes where it stopped.
+
+Examples:
+    python ingest_catalog.py _sample_images
+    python ingest_catalog.py products.csv --output catalog_output --concurrency 16
+    python ingest_catalog.py products.csv --fresh   # ignore the checkpoint
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from vision_catalog_agent.ingest import CatalogIngestor, GeminiCatalogStages, load_items
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Bulk catalog ingestion")
+    parser.add_argument('source', help="Image directory or .csv/.jsonl manifest")
+    parser.add_argument('--output', default='catalog_output', help="Catalog entry directory")
+    parser.add_argument('--concurrency', type=int, default=8, help="Vision calls in flight")
+    parser.add_argument('--catalog-concurrency', type=int, default=4, help="Catalog calls in flight")
+    parser.add_argument('--max-attempts', type=int, default=3, help="Attempts per stage")
+    parser.add_argument('--fresh', action='store_true', help="Start over, discarding the checkpoint")
+    return parser.parse_args()
+
+
+async def ingest(args):
+    items = load_items(args.source)
+    if not items:
+        print(f"❌ No images found in {args.source}")
+        return
+
+    output_dir = Path(args.output)
+    checkpoint = output_dir / 'ingest_checkpoint.jsonl'
+    if args.fresh and checkpoint.exists():
+        checkpoint.unlink()
+
+    print("=" * 80)
+    print("Vision Catalog Agent - Bulk Ingestion")
+    print("=" * 80)
+    print(f"Source: {args.source} ({len(items)} images)")
+    print(f"Output: {output_dir}")
+    print(f"Concurrency: {args.concurrency} vision / {args.catalog_concurrency} catalog")
+    print()
+
+    def on_progress(item, status, report):
+        finished = report.succeeded + report.failed
+        if status == 'failed' or finished % 25 == 0:
+            icon = '✅' if status == 'done' else '❌'
+            print(f"{icon} [{finished + report.skipped}/{report.total}] {item.product_id}")
+
+    stages = GeminiCatalogStages(output_dir=str(output_dir))
+    ingestor = CatalogIngestor(
+        analyze_fn=stages.analyze,
+        catalog_fn=stages.catalog,
+        checkpoint_path=str(checkpoint),
+        analysis_concurrency=args.concurrency,
+        catalog_concurrency=args.catalog_concurrency,
+        max_attempts=args.max_attempts,
+        on_progress=on_progress,
+    )
+    report = await ingestor.run(items)
+
+    report_path = output_dir / 'ingest_report.json'
+    report_path.write_text(json.dumps(report.to_dict(), indent=2))
+
+    print()
+    print("=" * 80)
+    print(f"✅ {report.summary()}")
+    stats = report.to_dict()['stages']
+    for stage, s in stats.items():
+        print(f"   {stage:9} p50 {s['p50_s']}s  p95 {s['p95_s']}s  ({s['count']} calls)")
+    if report.failed:
+        print(f"⚠️  {report.failed} failed - re-run the same command to retry them")
+    print(f"📊 Report: {report_path}")
+    print("=" * 80)
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.source):
+        print(f"❌ Source not found: {args.source}")
+        sys.exit(1)
+    try:
+        asyncio.run(ingest(args))
+    except KeyboardInterrupt:
+        print("\n\n⚠️  Interrupted - progress is checkpointed, re-run to resume")
+
+
+if __name__ == '__main__':
+    main()
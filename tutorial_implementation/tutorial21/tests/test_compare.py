@@ -0,0 +1,274 @@
+"""
+Test batched multi-image comparison
+"""
+
+import asyncio
+import io
+import random
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from PIL import Image
+
+from vision_catalog_agent.agent import compare_product_images, create_sample_image
+from vision_catalog_agent.compare import (
+    ComparisonEngine,
+    balanced_chunks,
+    build_contact_sheet,
+    plan_comparison,
+    sheet_layout,
+)
+from vision_catalog_agent.image_prep import ImagePreparer
+
+
+def _images(tmp_path, n):
+    return [
+        create_sample_image(str(tmp_path / f"sku{i:03d}.jpg"), (i * 5 % 256, 80, 120))
+        for i in range(n)
+    ]
+
+
+def _jpeg(size, color=(200, 50, 50)):
+    buf = io.BytesIO()
+    Image.new('RGB', size, color).save(buf, format='JPEG')
+    return buf.getvalue()
+
+
+class FakeModel:
+    """Records requests and returns text naming what it was sent."""
+
+    def __init__(self, delay=0.0, jitter=False):
+        self.delay = delay
+        self.jitter = jitter
+        self.requests = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, parts):
+        self.requests.append(parts)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            delay = self.delay * random.random() if self.jitter else self.delay
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+        images = sum(1 for p in parts if p.inline_data is not None)
+        return f"compared {images} image part(s): {parts[0].text.splitlines()[0]}"
+
+
+class TestSheetLayout:
+    """Test contact sheet geometry."""
+
+    def test_near_square_grid(self):
+        """Test 12 images fill a 4x3 grid with gaps."""
+        layout = sheet_layout(12, cell_size=240, gap=8)
+
+        assert (layout.columns, layout.rows) == (4, 3)
+        assert (layout.width, layout.height) == (1000, 752)
+        assert layout.estimated_tokens == 258 * 2
+
+    def test_partial_last_row(self):
+        """Test counts that don't fill the grid round rows up."""
+        layout = sheet_layout(10, cell_size=100, gap=0)
+
+        assert (layout.columns, layout.rows) == (4, 3)
+        assert layout.cell_origin(9) == (100, 200)
+
+    def test_fixed_columns(self):
+        """Test an explicit column count is respected."""
+        layout = sheet_layout(5, cell_size=50, columns=5, gap=10)
+
+        assert (layout.width, layout.height) == (5 * 50 + 6 * 10, 50 + 2 * 10)
+
+    def test_sheet_image_matches_layout(self):
+        """Test the rendered sheet has the layout's dimensions."""
+        images = [_jpeg((800, 600)), _jpeg((300, 900)), _jpeg((100, 100))]
+
+        data, layout = build_contact_sheet(images, ["1", "2", "3"], cell_size=200)
+
+        sheet = Image.open(io.BytesIO(data))
+        assert sheet.format == 'JPEG'
+        assert sheet.size == (layout.width, layout.height) == (424, 424)
+
+    def test_images_fit_their_cells(self):
+        """Test each image is scaled into its own cell, leaving gaps white."""
+        data, layout = build_contact_sheet([_jpeg((1000, 500), (0, 0, 255))] * 2, ["", ""], cell_size=100)
+
+        sheet = Image.open(io.BytesIO(data)).convert('RGB')
+        x, y = layout.cell_origin(1)
+        assert sheet.getpixel((x + 50, y + 50))[2] > 200  # centre of the image
+        assert min(sheet.getpixel((x + 50, y + 10))) > 240  # letterbox above it
+        assert min(sheet.getpixel((x - layout.gap // 2, y + 50))) > 240  # gap
+
+    def test_label_count_must_match(self):
+        """Test mismatched labels are rejected."""
+        with pytest.raises(ValueError):
+            build_contact_sheet([_jpeg((10, 10))], ["1", "2"])
+
+
+class TestPlanning:
+    """Test batch and merge planning."""
+
+    def test_balanced_chunks(self):
+        """Test chunks are contiguous and differ in size by at most one."""
+        chunks = balanced_chunks(50, 12)
+
+        assert [len(c) for c in chunks] == [10, 10, 10, 10, 10]
+        assert sum(chunks, []) == list(range(50))
+
+    def test_small_set_single_request(self):
+        """Test sets within one batch need one request."""
+        plan = plan_comparison(8, batch_size=12)
+
+        assert plan.rounds == [[list(range(8))]]
+        assert plan.requests == 1
+
+    def test_fifty_skus(self):
+        """Test 50 images take 5 batches and one merge."""
+        plan = plan_comparison(50, batch_size=12, fan_in=8)
+
+        assert len(plan.batches) == 5
+        assert plan.rounds[1] == [[0, 1, 2, 3, 4]]
+        assert plan.requests == 6
+
+    def test_merge_tree_for_large_sets(self):
+        """Test large sets merge in a tree that ends in one request."""
+        plan = plan_comparison(500, batch_size=12, fan_in=8)
+
+        assert [len(r) for r in plan.rounds] == [42, 6, 1]
+        assert all(len(group) <= 8 for r in plan.rounds[1:] for group in r)
+        assert plan.to_dict()['merge_rounds'] == 2
+
+    def test_plan_is_deterministic(self):
+        """Test the same count always gives the same plan."""
+        assert plan_comparison(77).rounds == plan_comparison(77).rounds
+
+    def test_invalid_limits(self):
+        """Test batch sizes below 2 are rejected."""
+        with pytest.raises(ValueError):
+            plan_comparison(10, batch_size=1)
+
+
+class TestComparisonEngine:
+    """Test engine execution with a fake model."""
+
+    @pytest.mark.asyncio
+    async def test_small_set_sends_prepared_images(self, tmp_path):
+        """Test small comparisons send each prepared image in one request."""
+        model = FakeModel()
+        engine = ComparisonEngine(model, ImagePreparer())
+
+        result = await engine.compare(_images(tmp_path, 3))
+
+        assert len(model.requests) == 1
+        assert result.tiling == 'prepared'
+        assert result.comparison.startswith("compared 3 image part(s)")
+
+    @pytest.mark.asyncio
+    async def test_fifty_skus_one_sheet_per_batch(self, tmp_path):
+        """Test 50 images take 5 sheet requests plus a text-only merge."""
+        model = FakeModel()
+        engine = ComparisonEngine(model, ImagePreparer(), batch_size=12)
+
+        result = await engine.compare(_images(tmp_path, 50))
+
+        batch_requests, merge_request = model.requests[:5], model.requests[5]
+        assert len(model.requests) == 6
+        assert all(sum(p.inline_data is not None for p in r) == 1 for r in batch_requests)
+        assert all(p.inline_data is None for p in merge_request)
+        assert result.comparison.startswith("compared 0 image part(s): Merge")
+        assert [b['images'] for b in result.batch_results][1] == list(range(11, 21))
+        # Five sheets cost far less than fifty separately sent images (one tile each here)
+        assert result.estimated_image_tokens <= 5 * 516
+        assert result.to_dict()['direct_estimated_tokens'] >= 5 * result.estimated_image_tokens
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("tiling", ['sheet', 'thumbnails'])
+    async def test_undecodable_images_sent_separately(self, tmp_path, tiling):
+        """Test a HEIC image Pillow can't decode is sent as its own part."""
+        paths = _images(tmp_path, 5)
+        heic = tmp_path / "sku999.heic"
+        heic.write_bytes(b"\x00\x00\x00\x18ftypheic" + b"\x00" * 64)
+        paths.append(str(heic))
+        model = FakeModel()
+        engine = ComparisonEngine(model, ImagePreparer(), batch_size=6, tiling=tiling)
+
+        await engine.compare(paths)
+
+        images = [p for p in model.requests[0] if p.inline_data is not None]
+        assert images[-1].inline_data.mime_type == 'image/heic'
+        assert images[-1].inline_data.data == heic.read_bytes()
+        assert len(images) == (2 if tiling == 'sheet' else 6)
+
+    @pytest.mark.asyncio
+    async def test_thumbnail_tiling(self, tmp_path):
+        """Test thumbnail mode sends small per-image parts."""
+        model = FakeModel()
+        engine = ComparisonEngine(model, ImagePreparer(), batch_size=6, tiling='thumbnails', cell_size=128)
+
+        await engine.compare(_images(tmp_path, 6))
+
+        parts = [p for p in model.requests[0] if p.inline_data is not None]
+        assert len(parts) == 6
+        assert all(max(Image.open(io.BytesIO(p.inline_data.data)).size) <= 128 for p in parts)
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self, tmp_path):
+        """Test no more than `concurrency` requests are in flight."""
+        model = FakeModel(delay=0.02)
+        engine = ComparisonEngine(model, ImagePreparer(), batch_size=5, concurrency=3)
+
+        await engine.compare(_images(tmp_path, 40))
+
+        assert model.peak == 3
+
+    @pytest.mark.asyncio
+    async def test_merge_order_ignores_completion_order(self, tmp_path):
+        """Test results merge in batch order however requests finish."""
+        paths = _images(tmp_path, 30)
+        merges = []
+        for _ in range(3):
+            model = FakeModel(delay=0.02, jitter=True)
+            await ComparisonEngine(model, ImagePreparer(), batch_size=5, concurrency=6).compare(paths)
+            merges.append(model.requests[-1][0].text)
+
+        assert merges[0] == merges[1] == merges[2]
+        assert merges[0].index("## Images 1-5") < merges[0].index("## Images 26-30")
+
+    @pytest.mark.asyncio
+    async def test_invalid_tiling(self):
+        """Test unknown tiling modes are rejected."""
+        with pytest.raises(ValueError):
+            ComparisonEngine(AsyncMock(), ImagePreparer(), tiling='mosaic')
+
+
+class TestCompareTool:
+    """Test compare_product_images uses the engine."""
+
+    @pytest.mark.asyncio
+    async def test_large_comparison_is_batched(self, tmp_path):
+        """Test 50 images go through batched requests and report cost."""
+        mock_context = MagicMock()
+        mock_result = MagicMock()
+        mock_result.content.parts = [MagicMock(text="Comparison")]
+        mock_context.run_agent = AsyncMock(return_value=mock_result)
+
+        result = await compare_product_images(_images(tmp_path, 50), mock_context)
+
+        assert result['status'] == 'success'
+        assert result['image_count'] == 50
+        assert mock_context.run_agent.call_count == 6
+        assert len(result['batches']) == 5
+        assert result['cost']['requests'] == 6
+
+    @pytest.mark.asyncio
+    async def test_too_many_images(self, tmp_path):
+        """Test oversized comparisons are rejected before any work."""
+        mock_context = MagicMock()
+
+        result = await compare_product_images(['x.jpg'] * 501, mock_context)
+
+        assert result['status'] == 'error'
+        assert 'at most' in result['report']
@@ -0,0 +1,255 @@
+"""
+Test the image preparation pipeline
+"""
+
+import io
+import os
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from PIL import Image
+
+from vision_catalog_agent.agent import analyze_product_image, optimize_image
+from vision_catalog_agent.image_prep import (
+    ImagePreparer,
+    downscale_image,
+    estimate_image_tokens,
+    target_dimension,
+)
+
+
+def _noisy_jpeg(path, size=(3000, 2000), quality=95):
+    """Write a photo-like JPEG that does not compress to nothing."""
+    image = Image.effect_noise(size, 64).convert('RGB')
+    image.save(path, format='JPEG', quality=quality)
+    return str(path)
+
+
+class TestTokenBudget:
+    """Test token estimates and budget-driven sizing."""
+
+    def test_small_image_is_one_tile(self):
+        """Test images up to 384px cost a single tile."""
+        assert estimate_image_tokens(384, 200) == 258
+
+    def test_large_image_tiles(self):
+        """Test larger images cost one tile per 768px block."""
+        assert estimate_image_tokens(1024, 1024) == 258 * 4
+        assert estimate_image_tokens(768, 768) == 258
+
+    def test_target_dimension_fits_token_budget(self):
+        """Test the target side fits the token budget."""
+        longest = target_dimension(3000, 2000, max_dimension=2048, max_tokens=258)
+
+        assert longest == 768
+        assert target_dimension(3000, 2000, max_dimension=1024) == 1024
+
+
+class TestDownscale:
+    """Test downscaling and re-encoding."""
+
+    def test_respects_dimension_and_bytes(self, tmp_path):
+        """Test output fits both the pixel and byte budget."""
+        path = _noisy_jpeg(tmp_path / "big.jpg")
+        with open(path, 'rb') as f:
+            original = f.read()
+
+        data, mime_type, (width, height) = downscale_image(
+            original, max_dimension=1024, max_bytes=150 * 1024
+        )
+
+        assert mime_type == 'image/jpeg'
+        assert max(width, height) <= 1024
+        assert len(data) <= 150 * 1024
+        assert Image.open(io.BytesIO(data)).size == (width, height)
+
+    def test_alpha_flattened(self):
+        """Test transparent images become RGB JPEGs."""
+        buf = io.BytesIO()
+        Image.new('RGBA', (500, 500), (255, 0, 0, 0)).save(buf, format='PNG')
+
+        data, _, _ = downscale_image(buf.getvalue())
+
+        assert Image.open(io.BytesIO(data)).mode == 'RGB'
+
+    def test_optimize_image_honours_max_size(self, tmp_path):
+        """Test optimize_image applies the byte limit it is given."""
+        path = _noisy_jpeg(tmp_path / "big.jpg")
+        with open(path, 'rb') as f:
+            original = f.read()
+
+        optimized = optimize_image(original, max_size_kb=100)
+
+        assert len(optimized) <= 100 * 1024
+
+
+class TestImagePreparer:
+    """Test content-hash caching of prepared images."""
+
+    def test_prepare_reports_savings(self, tmp_path):
+        """Test a large photo is shrunk and the savings are reported."""
+        preparer = ImagePreparer(cache_dir=str(tmp_path / "cache"))
+        path = _noisy_jpeg(tmp_path / "photo.jpg")
+
+        prepared = preparer.prepare(path)
+
+        assert prepared.source == 'prepared'
+        assert prepared.prepared_bytes <= 500 * 1024
+        assert prepared.bytes_saved == os.path.getsize(path) - prepared.prepared_bytes
+        assert prepared.latency_ms > 0
+        assert prepared.stats()['dimensions'] == f"{prepared.width}x{prepared.height}"
+
+    def test_small_image_passes_through(self, tmp_path):
+        """Test images already within budget are not re-encoded."""
+        preparer = ImagePreparer()
+        path = tmp_path / "small.png"
+        Image.new('RGB', (200, 200), (10, 20, 30)).save(path)
+
+        prepared = preparer.prepare(str(path))
+
+        assert prepared.mime_type == 'image/png'
+        assert prepared.data == path.read_bytes()
+
+    def test_memory_cache_hit(self, tmp_path):
+        """Test the second prepare of an unchanged file skips all work."""
+        preparer = ImagePreparer()
+        path = _noisy_jpeg(tmp_path / "photo.jpg", size=(1600, 1200))
+
+        first = preparer.prepare(path)
+        second = preparer.prepare(path)
+
+        assert second.source == 'memory'
+        assert second.data == first.data
+        assert second.latency_ms < first.latency_ms
+
+    def test_same_content_different_path(self, tmp_path):
+        """Test identical bytes under another name reuse the prepared image."""
+        preparer = ImagePreparer()
+        path = _noisy_jpeg(tmp_path / "a.jpg", size=(1600, 1200))
+        copy = tmp_path / "b.jpg"
+        copy.write_bytes(open(path, 'rb').read())
+
+        preparer.prepare(path)
+
+        assert preparer.prepare(str(copy)).source == 'memory'
+
+    def test_disk_cache_survives_restart(self, tmp_path):
+        """Test a new preparer reads variants prepared by an earlier one."""
+        cache_dir = str(tmp_path / "cache")
+        path = _noisy_jpeg(tmp_path / "photo.jpg", size=(1600, 1200))
+        first = ImagePreparer(cache_dir=cache_dir).prepare(path)
+
+        second = ImagePreparer(cache_dir=cache_dir).prepare(path)
+
+        assert second.source == 'disk'
+        assert second.data == first.data
+        assert second.content_hash == first.content_hash
+
+    def test_budget_change_creates_new_variant(self, tmp_path):
+        """Test a different budget never serves the old variant."""
+        cache_dir = str(tmp_path / "cache")
+        path = _noisy_jpeg(tmp_path / "photo.jpg", size=(1600, 1200))
+        ImagePreparer(cache_dir=cache_dir, max_dimension=1024).prepare(path)
+
+        prepared = ImagePreparer(cache_dir=cache_dir, max_dimension=512).prepare(path)
+
+        assert prepared.source == 'prepared'
+        assert max(prepared.width, prepared.height) <= 512
+
+    def test_modified_file_is_reprepared(self, tmp_path):
+        """Test editing a file invalidates the path index."""
+        preparer = ImagePreparer()
+        path = tmp_path / "photo.jpg"
+        Image.new('RGB', (100, 100), (1, 2, 3)).save(path)
+        first = preparer.prepare(str(path))
+
+        Image.new('RGB', (120, 100), (4, 5, 6)).save(path)
+        os.utime(path, ns=(1, 1))
+        second = preparer.prepare(str(path))
+
+        assert second.content_hash != first.content_hash
+
+    def test_undecodable_format_passed_through(self, tmp_path):
+        """Test formats Pillow can't decode are sent unchanged, not rejected."""
+        path = tmp_path / "photo.heic"
+        path.write_bytes(b"\x00\x00\x00\x18ftypheic" + b"\x00" * 64)
+
+        part, prepared = ImagePreparer().prepare_part(str(path))
+
+        assert prepared.mime_type == 'image/heic'
+        assert prepared.data == path.read_bytes()
+        assert not prepared.decoded
+        assert part.inline_data.mime_type == 'image/heic'
+
+    def test_path_index_bounded(self, tmp_path):
+        """Test the path index keeps no more entries than the memory cache."""
+        preparer = ImagePreparer(max_memory_entries=2)
+        for i in range(5):
+            path = tmp_path / f"photo{i}.png"
+            Image.new('RGB', (10, 10), (i, i, i)).save(path)
+            preparer.prepare(str(path))
+
+        assert len(preparer._paths) == 2
+
+    def test_failed_disk_write_leaves_no_temp_file(self, tmp_path, monkeypatch):
+        """Test a write error removes the temporary file it created."""
+        cache_dir = tmp_path / "cache"
+        path = _noisy_jpeg(tmp_path / "photo.jpg", size=(800, 600))
+
+        def fail(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, 'replace', fail)
+        with pytest.raises(OSError):
+            ImagePreparer(cache_dir=str(cache_dir)).prepare(path)
+
+        assert not list(cache_dir.rglob('*.tmp'))
+
+    def test_files_api_upload_once(self, tmp_path):
+        """Test uploads happen once and the file URI is reused."""
+        client = MagicMock()
+        client.files.upload.return_value = MagicMock(uri="https://files/abc")
+        cache_dir = str(tmp_path / "cache")
+        path = _noisy_jpeg(tmp_path / "photo.jpg", size=(800, 600))
+
+        part, _ = ImagePreparer(cache_dir=cache_dir, upload=True, client=client).prepare_part(path)
+        ImagePreparer(cache_dir=cache_dir, upload=True, client=client).prepare(path)
+
+        assert client.files.upload.call_count == 1
+        assert part.file_data.file_uri == "https://files/abc"
+        assert part.inline_data is None
+
+    def test_stats(self, tmp_path):
+        """Test totals include hits and bytes saved."""
+        preparer = ImagePreparer()
+        path = _noisy_jpeg(tmp_path / "photo.jpg", size=(1600, 1200))
+        preparer.prepare(path)
+        preparer.prepare(path)
+
+        stats = preparer.stats()
+
+        assert stats['images'] == 2
+        assert stats['memory_hits'] == 1
+        assert stats['cache_hit_ratio'] == 0.5
+        assert stats['bytes_saved'] > 0
+
+
+class TestToolIntegration:
+    """Test tools send prepared images."""
+
+    @pytest.mark.asyncio
+    async def test_analyze_sends_downscaled_image(self, tmp_path):
+        """Test analyze_product_image sends the prepared bytes and reports stats."""
+        path = _noisy_jpeg(tmp_path / "photo.jpg")
+        mock_context = MagicMock()
+        mock_result = MagicMock()
+        mock_result.content.parts = [MagicMock(text="analysis")]
+        mock_context.run_agent = AsyncMock(return_value=mock_result)
+
+        result = await analyze_product_image('PROD-001', path, mock_context)
+
+        sent = mock_context.run_agent.call_args_list[0].args[1][1]
+        assert len(sent.inline_data.data) <= 500 * 1024
+        assert result['image_stats']['bytes_saved'] > 0
+        assert 'latency_ms' in result['image_stats']
@@ -0,0 +1,277 @@
+"""
+Test bulk catalog ingestion
+"""
+
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from vision_catalog_agent.agent import create_sample_image
+from vision_catalog_agent.ingest import (
+    CatalogIngestor,
+    GeminiCatalogStages,
+    IngestCheckpoint,
+    IngestItem,
+    discover_images,
+    load_items,
+    load_manifest,
+)
+
+
+class Crash(BaseException):
+    """Simulates the process dying mid-run."""
+
+
+class FakeStages:
+    """Stage functions that record calls and concurrency."""
+
+    def __init__(self, delay=0.01, fail_ids=(), crash_after=None):
+        self.delay = delay
+        self.fail_ids = set(fail_ids)
+        self.crash_after = crash_after
+        self.analyzed = []
+        self.cataloged = []
+        self.in_flight = {'analysis': 0, 'catalog': 0}
+        self.peak = {'analysis': 0, 'catalog': 0}
+        self.events = []
+
+    async def _enter(self, stage, item):
+        self.in_flight[stage] += 1
+        self.peak[stage] = max(self.peak[stage], self.in_flight[stage])
+        self.events.append((stage, 'start', item.product_id))
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight[stage] -= 1
+
+    async def analyze(self, item):
+        if self.crash_after is not None and len(self.analyzed) >= self.crash_after:
+            raise Crash()
+        await self._enter('analysis', item)
+        if item.product_id in self.fail_ids:
+            raise ConnectionError("vision backend down")
+        self.analyzed.append(item.product_id)
+        return f"analysis of {item.product_id}"
+
+    async def catalog(self, item, analysis):
+        await self._enter('catalog', item)
+        self.cataloged.append(item.product_id)
+        return f"{item.product_id}_catalog.md"
+
+
+def _items(n):
+    return [IngestItem(product_id=f"P{i:04d}", image_path=f"/img/{i}.jpg") for i in range(n)]
+
+
+def _ingestor(stages, checkpoint, **kwargs):
+    settings = dict(analysis_concurrency=4, catalog_concurrency=2, retry_delay_seconds=0.001)
+    settings.update(kwargs)
+    return CatalogIngestor(stages.analyze, stages.catalog, str(checkpoint), **settings)
+
+
+class TestInputs:
+    """Test directory and manifest loading."""
+
+    def test_discover_images_recursively(self, tmp_path):
+        """Test nested images keep distinct product IDs."""
+        create_sample_image(str(tmp_path / "chairs" / "oak.jpg"))
+        create_sample_image(str(tmp_path / "tables" / "oak.png"))
+        (tmp_path / "notes.txt").write_text("not an image")
+
+        items = discover_images(str(tmp_path))
+
+        assert [i.product_id for i in items] == ["chairs/oak", "tables/oak"]
+
+    def test_csv_manifest(self, tmp_path):
+        """Test CSV rows resolve relative paths and default IDs."""
+        manifest = tmp_path / "products.csv"
+        manifest.write_text("image_path,product_id,name\nimg/a.jpg,SKU-1,Lamp\nimg/b.jpg,,\n")
+
+        items = load_manifest(str(manifest))
+
+        assert items[0] == IngestItem("SKU-1", str(tmp_path / "img/a.jpg"), "Lamp")
+        assert items[1].product_id == "b"
+
+    def test_jsonl_manifest(self, tmp_path):
+        """Test JSONL manifests load through load_items."""
+        manifest = tmp_path / "products.jsonl"
+        manifest.write_text(json.dumps({"image_path": "/abs/x.jpg", "product_id": "X"}) + "\n")
+
+        assert load_items(str(manifest)) == [IngestItem("X", "/abs/x.jpg")]
+
+    def test_manifest_requires_image_path(self, tmp_path):
+        """Test rows without an image path are rejected."""
+        manifest = tmp_path / "bad.csv"
+        manifest.write_text("product_id\nSKU-1\n")
+
+        with pytest.raises(ValueError, match="image_path"):
+            load_manifest(str(manifest))
+
+
+class TestPipeline:
+    """Test concurrency, overlap and failure handling."""
+
+    @pytest.mark.asyncio
+    async def test_all_items_ingested_with_bounded_concurrency(self, tmp_path):
+        """Test each stage respects its own concurrency limit."""
+        stages = FakeStages()
+
+        report = await _ingestor(stages, tmp_path / "cp.jsonl").run(_items(40))
+
+        assert report.succeeded == 40
+        assert sorted(stages.cataloged) == [i.product_id for i in _items(40)]
+        assert stages.peak == {'analysis': 4, 'catalog': 2}
+
+    @pytest.mark.asyncio
+    async def test_stages_overlap(self, tmp_path):
+        """Test catalog work starts before analysis has finished."""
+        stages = FakeStages()
+
+        await _ingestor(stages, tmp_path / "cp.jsonl").run(_items(20))
+
+        first_catalog = stages.events.index(next(e for e in stages.events if e[0] == 'catalog'))
+        last_analysis = max(i for i, e in enumerate(stages.events) if e[0] == 'analysis')
+        assert first_catalog < last_analysis
+
+    @pytest.mark.asyncio
+    async def test_parallel_throughput(self, tmp_path):
+        """Test wall time reflects concurrency, not the item count."""
+        stages = FakeStages(delay=0.02)
+
+        report = await _ingestor(
+            stages, tmp_path / "cp.jsonl", analysis_concurrency=10, catalog_concurrency=10
+        ).run(_items(50))
+
+        # Serially: 50 x (20ms + 20ms) = 2s
+        assert report.elapsed_s < 0.8
+        assert report.images_per_minute > 50 / 0.8 * 60 * 0.9
+
+    @pytest.mark.asyncio
+    async def test_failures_are_recorded_not_fatal(self, tmp_path):
+        """Test a failing item is retried, then reported, without stopping others."""
+        stages = FakeStages(fail_ids={"P0003"})
+
+        report = await _ingestor(stages, tmp_path / "cp.jsonl", max_attempts=2).run(_items(10))
+
+        assert report.succeeded == 9
+        assert report.failed == 1
+        assert report.failures[0]['product_id'] == "P0003"
+        assert report.failures[0]['stage'] == 'analysis'
+        assert [e for e in stages.events if e[2] == "P0003"] == [('analysis', 'start', 'P0003')] * 2
+
+    @pytest.mark.asyncio
+    async def test_checkpoint_fsync_off_event_loop(self, tmp_path, monkeypatch):
+        """Test journal writes are fsynced in worker threads, not on the loop."""
+        fsync, threads = os.fsync, set()
+
+        def tracking_fsync(fd):
+            threads.add(threading.get_ident())
+            fsync(fd)
+
+        monkeypatch.setattr(os, 'fsync', tracking_fsync)
+        report = await _ingestor(FakeStages(), tmp_path / "cp.jsonl").run(_items(5))
+
+        assert report.succeeded == 5
+        assert threads and threading.get_ident() not in threads
+
+    @pytest.mark.asyncio
+    async def test_duplicate_ids_processed_once(self, tmp_path):
+        """Test repeated product IDs are ingested once and reported."""
+        stages = FakeStages()
+        items = _items(3) + _items(2)
+
+        report = await _ingestor(stages, tmp_path / "cp.jsonl").run(items)
+
+        assert report.succeeded == 3
+        assert report.duplicates == 2
+
+
+class TestCheckpointResume:
+    """Test crash recovery from the journal."""
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_finished_items(self, tmp_path):
+        """Test a crash at item N does not redo the first N."""
+        checkpoint = tmp_path / "cp.jsonl"
+        crashing = FakeStages(crash_after=30)
+
+        with pytest.raises(Crash):
+            await _ingestor(crashing, checkpoint).run(_items(100))
+
+        done, analyzed = IngestCheckpoint(str(checkpoint)).load()
+        resumed = FakeStages()
+        report = await _ingestor(resumed, checkpoint).run(_items(100))
+
+        assert report.skipped == len(done) > 0
+        assert report.resumed_at_catalog == len(analyzed)
+        assert report.succeeded == 100 - len(done)
+        # Nothing analyzed before the crash is analyzed again
+        assert not set(resumed.analyzed) & set(crashing.analyzed)
+        assert set(crashing.cataloged) | set(resumed.cataloged) == {i.product_id for i in _items(100)}
+
+    @pytest.mark.asyncio
+    async def test_completed_run_is_a_no_op(self, tmp_path):
+        """Test re-running a finished ingestion does no work."""
+        checkpoint = tmp_path / "cp.jsonl"
+        await _ingestor(FakeStages(), checkpoint).run(_items(10))
+        stages = FakeStages()
+
+        report = await _ingestor(stages, checkpoint).run(_items(10))
+
+        assert report.skipped == 10
+        assert stages.events == []
+
+    @pytest.mark.asyncio
+    async def test_failed_items_retried_on_next_run(self, tmp_path):
+        """Test failures from an earlier run are attempted again."""
+        checkpoint = tmp_path / "cp.jsonl"
+        await _ingestor(FakeStages(fail_ids={"P0001"}), checkpoint, max_attempts=1).run(_items(3))
+        stages = FakeStages()
+
+        report = await _ingestor(stages, checkpoint).run(_items(3))
+
+        assert stages.analyzed == ["P0001"]
+        assert report.succeeded == 1
+
+    def test_torn_last_line_ignored(self, tmp_path):
+        """Test a partially written record from a crash is skipped."""
+        checkpoint = tmp_path / "cp.jsonl"
+        checkpoint.write_text(
+            json.dumps({'id': 'A', 'stage': 'done'}) + "\n"
+            + json.dumps({'id': 'B', 'stage': 'analysis', 'analysis': 'x'}) + "\n"
+            + '{"id": "C", "stage": "do'
+        )
+
+        done, analyzed = IngestCheckpoint(str(checkpoint)).load()
+
+        assert done == {'A'}
+        assert analyzed == {'B': 'x'}
+
+
+class TestGeminiStages:
+    """Test the model-backed stages without calling the model."""
+
+    @pytest.mark.asyncio
+    async def test_stages_send_prepared_image_and_write_entry(self, tmp_path):
+        """Test analysis sends one image part and catalog writes markdown."""
+        image = create_sample_image(str(tmp_path / "lamp.jpg"))
+        client = MagicMock()
+        client.aio.models.generate_content = AsyncMock(
+            side_effect=[MagicMock(text="A lamp"), MagicMock(text="# Lamp entry")]
+        )
+        stages = GeminiCatalogStages(output_dir=str(tmp_path / "out"), client=client)
+        item = IngestItem("lamps/LAMP-1", image, "Desk Lamp")
+
+        analysis = await stages.analyze(item)
+        output = await stages.catalog(item, analysis)
+
+        vision_call = client.aio.models.generate_content.call_args_list[0].kwargs
+        parts = vision_call['contents'][0].parts
+        assert parts[1].inline_data.mime_type == 'image/jpeg'
+        assert vision_call['config'].system_instruction
+        assert output.endswith("lamps_LAMP-1_catalog.md")
+        assert (tmp_path / "out" / "lamps_LAMP-1_catalog.md").read_text() == "# Lamp entry"
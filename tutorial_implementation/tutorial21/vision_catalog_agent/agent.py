@@ -1,8 +1,9 @@
 """
 Vision Catalog Agent - Tutorial 21: Multimodal and Image Processing
 """
-import io
+import asyncio
 import os
+import tempfile
 from typing import List, Dict, Any
 from pathlib import Path
 
@@ -16,6 +17,9 @@ try:
 except ImportError:
     Image = None
 
+from .compare import ComparisonEngine
+from .image_prep import ImagePreparer, downscale_image, mime_type_for
+
 
 # ============================================================================
 # Image Utilities
@@ -39,23 +43,11 @@ def load_image_from_file(path: str) -> types.Part:
     if not os.path.exists(path):
         raise FileNotFoundError(f"Image file not found: {path}")
     
-    with open(path, 'rb') as f:
-        image_bytes = f.read()
-    
     # Determine MIME type from extension
-    extension = path.lower().split('.')[-1]
-    mime_types = {
-        'png': 'image/png',
-        'jpg': 'image/jpeg',
-        'jpeg': 'image/jpeg',
-        'webp': 'image/webp',
-        'heic': 'image/heic',
-        'heif': 'image/heif',
-    }
+    mime_type = mime_type_for(path)
     
-    mime_type = mime_types.get(extension)
-    if not mime_type:
-        raise ValueError(f"Unsupported image format: {extension}")
+    with open(path, 'rb') as f:
+        image_bytes = f.read()
     
     return types.Part(
         inline_data=types.Blob(
@@ -79,27 +71,14 @@ def optimize_image(image_bytes: bytes, max_size_kb: int = 500) -> bytes:
     if Image is None:
         return image_bytes
     
-    image = Image.open(io.BytesIO(image_bytes))
-    
-    # Resize if too large
-    max_dimension = 1024
-    if max(image.size) > max_dimension:
-        image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
-    
-    # Convert to RGB if necessary
-    if image.mode in ('RGBA', 'P'):
-        background = Image.new('RGB', image.size, (255, 255, 255))
-        if image.mode == 'RGBA':
-            background.paste(image, mask=image.split()[3])
-        else:
-            background.paste(image)
-        image = background
-    
-    # Save with compression
-    output = io.BytesIO()
-    image.save(output, format='JPEG', quality=85, optimize=True)
+    # Resize to 1024px, convert to RGB and compress until under max_size_kb
+    optimized, _, _ = downscale_image(
+        image_bytes,
+        max_dimension=1024,
+        max_bytes=max_size_kb * 1024
+    )
     
-    return output.getvalue()
+    return optimized
 
 
 def create_sample_image(path: str, color: tuple = (73, 109, 137)) -> str:
@@ -122,6 +101,19 @@ def create_sample_image(path: str, color: tuple = (73, 109, 137)) -> str:
     return path
 
 
+# Shared image preparation: each image is downscaled once per content hash
+# and reused across analyze/compare calls (and restarts, via the disk cache)
+image_preparer = ImagePreparer(
+    cache_dir=os.environ.get(
+        'VISION_IMAGE_CACHE_DIR',
+        os.path.join(tempfile.gettempdir(), 'vision_catalog_image_cache')
+    ),
+    max_dimension=1024,
+    max_bytes=500 * 1024,
+    upload=os.environ.get('VISION_USE_FILES_API', '').lower() in ('1', 'true', 'yes')
+)
+
+
 # ============================================================================
 # Vision Catalog Agent Components
 # ============================================================================
@@ -273,7 +265,7 @@ async def analyze_product_image(
                 'error': 'File not found'
             }
         
-        image_part = load_image_from_file(image_path)
+        image_part, prepared = await asyncio.to_thread(image_preparer.prepare_part, image_path)
         
         # Step 1: Vision analysis
         analysis_query = [
@@ -314,7 +306,8 @@ Use the generate_catalog_entry tool to save the entry.
             'report': f'Successfully analyzed {product_id}',
             'product_id': product_id,
             'analysis': analysis_text,
-            'catalog_result': catalog_result.content.parts[0].text if catalog_result.content else ''
+            'catalog_result': catalog_result.content.parts[0].text if catalog_result.content else '',
+            'image_stats': prepared.stats()
         }
     
     except Exception as e:
@@ -326,6 +319,9 @@ Use the generate_catalog_entry tool to save the entry.
 
 
 # Tool for comparing multiple images
+MAX_COMPARE_IMAGES = 500
+
+
 async def compare_product_images(
     image_paths: List[str],
     tool_context: ToolContext
@@ -348,39 +344,40 @@ async def compare_product_images(
                 'error': 'Insufficient images'
             }
         
-        # Load all images
-        query_parts = [
-            types.Part.from_text(text="Compare these product images and identify similarities and differences:")
-        ]
+        if len(image_paths) > MAX_COMPARE_IMAGES:
+            return {
+                'status': 'error',
+                'report': f'Can compare at most {MAX_COMPARE_IMAGES} images at once',
+                'error': 'Too many images'
+            }
         
-        for i, path in enumerate(image_paths, 1):
+        for path in image_paths:
             if not os.path.exists(path):
                 return {
                     'status': 'error',
                     'report': f'Image not found: {path}',
                     'error': 'File not found'
                 }
-            
-            query_parts.append(types.Part.from_text(text=f"\nImage {i}:"))
-            query_parts.append(load_image_from_file(path))
-        
-        query_parts.append(types.Part.from_text(text="\nProvide a structured comparison."))
         
-        # Run comparison
-        result = await tool_context.run_agent(vision_analyzer, query_parts)
+        async def run_comparison(parts: List[types.Part]) -> str:
+            result = await tool_context.run_agent(vision_analyzer, parts)
+            if not result.content or not result.content.parts:
+                raise RuntimeError('No comparison result')
+            return result.content.parts[0].text
         
-        if not result.content or not result.content.parts:
-            return {
-                'status': 'error',
-                'report': 'Failed to compare images',
-                'error': 'No comparison result'
-            }
+        # Large sets are tiled into contact sheets and compared in batches
+        engine = ComparisonEngine(run_comparison, image_preparer)
+        outcome = await engine.compare(image_paths)
         
         return {
             'status': 'success',
-            'report': f'Successfully compared {len(image_paths)} images',
-            'comparison': result.content.parts[0].text,
-            'image_count': len(image_paths)
+            'report': f'Successfully compared {len(image_paths)} images in {outcome.plan.requests} request(s)',
+            'comparison': outcome.comparison,
+            'image_count': len(image_paths),
+            'batches': outcome.batch_results if len(outcome.batch_results) > 1 else [],
+            'cost': outcome.to_dict(),
+            'image_stats': [p.stats() for p in outcome.images],
+            'bytes_saved': outcome.bytes_saved
         }
     
     except Exception as e:
@@ -0,0 +1,469 @@
+"""
+Batched multi-image comparison for the Vision Catalog Agent.
+
+Sending every product photo as its own full-size part in one request does
+not scale: request size and token cost grow with each image, and large sets
+time out. For large sets the comparison engine:
+
+1. Splits the images into balanced batches
+2. Tiles each batch into one labelled contact sheet (or small thumbnails)
+3. Compares the batches concurrently, with a bound on requests in flight
+4. Merges the batch comparisons in a fixed tree of text-only requests
+
+The plan depends only on the image count, and results are merged in batch
+order rather than completion order, so the same input always produces the
+same requests.
+"""
+import asyncio
+import io
+import math
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from google.genai import types
+
+from .image_prep import ImagePreparer, PreparedImage, downscale_image, estimate_image_tokens
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:
+    Image = None
+    ImageDraw = None
+
+
+# Comparisons up to this size send the prepared images directly
+DIRECT_COMPARE_LIMIT = 4
+
+# 12 cells of 240px in a 4x3 grid come to 1000x752, which is two 768px
+# tiles (516 tokens) for the whole batch
+DEFAULT_BATCH_SIZE = 12
+DEFAULT_CELL_SIZE = 240
+DEFAULT_GAP = 8
+
+TILING_MODES = ('sheet', 'thumbnails')
+
+
+# ============================================================================
+# Contact Sheets
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class SheetLayout:
+    """Grid geometry of a contact sheet."""
+    count: int
+    columns: int
+    rows: int
+    cell_size: int
+    gap: int
+
+    @property
+    def width(self) -> int:
+        return self.columns * self.cell_size + (self.columns + 1) * self.gap
+
+    @property
+    def height(self) -> int:
+        return self.rows * self.cell_size + (self.rows + 1) * self.gap
+
+    @property
+    def estimated_tokens(self) -> int:
+        return estimate_image_tokens(self.width, self.height)
+
+    def cell_origin(self, index: int) -> Tuple[int, int]:
+        """Top-left pixel of the cell for the index-th image (row-major)."""
+        row, column = divmod(index, self.columns)
+        return (
+            self.gap + column * (self.cell_size + self.gap),
+            self.gap + row * (self.cell_size + self.gap),
+        )
+
+
+def sheet_layout(
+    count: int,
+    cell_size: int = DEFAULT_CELL_SIZE,
+    columns: Optional[int] = None,
+    gap: int = DEFAULT_GAP
+) -> SheetLayout:
+    """
+    Lay out count images in a near-square grid.
+
+    Args:
+        count: Number of images on the sheet
+        cell_size: Width and height of each cell in pixels
+        columns: Fixed column count (None for ceil(sqrt(count)))
+        gap: Border between cells in pixels
+
+    Raises:
+        ValueError: If count or cell_size is not positive
+    """
+    if count < 1 or cell_size < 1:
+        raise ValueError("count and cell_size must be positive")
+    columns = min(columns or math.ceil(math.sqrt(count)), count)
+    rows = math.ceil(count / columns)
+    return SheetLayout(count=count, columns=columns, rows=rows, cell_size=cell_size, gap=gap)
+
+
+def build_contact_sheet(
+    images: Sequence[bytes],
+    labels: Sequence[str],
+    cell_size: int = DEFAULT_CELL_SIZE,
+    columns: Optional[int] = None,
+    gap: int = DEFAULT_GAP,
+    quality: int = 85
+) -> Tuple[bytes, SheetLayout]:
+    """
+    Tile images into one labelled JPEG contact sheet.
+
+    Each image is scaled to fit its cell, centred on white, and the label is
+    drawn in the cell's top-left corner so the model can refer to it.
+
+    Args:
+        images: Encoded image bytes, in sheet order
+        labels: One label per image
+        cell_size: Width and height of each cell in pixels
+        columns: Fixed column count (None for a near-square grid)
+        gap: Border between cells in pixels
+        quality: JPEG quality of the sheet
+
+    Returns:
+        Tuple of (JPEG bytes, layout)
+    """
+    if Image is None:
+        raise ImportError("PIL/Pillow required for contact sheets")
+    if len(images) != len(labels):
+        raise ValueError("Need one label per image")
+
+    layout = sheet_layout(len(images), cell_size, columns, gap)
+    sheet = Image.new('RGB', (layout.width, layout.height), (255, 255, 255))
+    draw = ImageDraw.Draw(sheet)
+
+    for index, (image_bytes, label) in enumerate(zip(images, labels)):
+        with Image.open(io.BytesIO(image_bytes)) as source:
+            thumb = source.convert('RGB')
+        thumb.thumbnail((cell_size, cell_size), Image.Resampling.LANCZOS)
+        x, y = layout.cell_origin(index)
+        sheet.paste(thumb, (x + (cell_size - thumb.width) // 2, y + (cell_size - thumb.height) // 2))
+
+        left, top, right, bottom = draw.textbbox((x + 4, y + 4), label)
+        draw.rectangle((left - 3, top - 3, right + 3, bottom + 3), fill=(0, 0, 0))
+        draw.text((x + 4, y + 4), label, fill=(255, 255, 255))
+
+    output = io.BytesIO()
+    sheet.save(output, format='JPEG', quality=quality, optimize=True)
+    return output.getvalue(), layout
+
+
+# ============================================================================
+# Planning
+# ============================================================================
+
+
+def balanced_chunks(count: int, max_size: int) -> List[List[int]]:
+    """
+    Split range(count) into the fewest contiguous chunks of at most max_size,
+    with sizes differing by at most one.
+    """
+    if count < 1:
+        return []
+    chunks = math.ceil(count / max_size)
+    base, extra = divmod(count, chunks)
+    result, start = [], 0
+    for i in range(chunks):
+        size = base + (1 if i < extra else 0)
+        result.append(list(range(start, start + size)))
+        start += size
+    return result
+
+
+@dataclass
+class ComparisonPlan:
+    """
+    Requests needed to compare a set of images.
+
+    rounds[0] holds batches of image indices; each later round holds groups
+    of indices into the previous round's results. The last round always has
+    exactly one group, whose result is the final comparison.
+    """
+    image_count: int
+    batch_size: int
+    fan_in: int
+    rounds: List[List[List[int]]]
+
+    @property
+    def requests(self) -> int:
+        return sum(len(r) for r in self.rounds)
+
+    @property
+    def batches(self) -> List[List[int]]:
+        return self.rounds[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'image_count': self.image_count,
+            'batch_size': self.batch_size,
+            'fan_in': self.fan_in,
+            'batches': len(self.batches),
+            'merge_rounds': len(self.rounds) - 1,
+            'requests': self.requests,
+        }
+
+
+def plan_comparison(
+    image_count: int,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    fan_in: int = 8
+) -> ComparisonPlan:
+    """
+    Plan batch comparisons and a merge tree for image_count images.
+
+    Args:
+        image_count: Number of images to compare
+        batch_size: Most images compared in one request
+        fan_in: Most batch results merged in one request
+
+    Raises:
+        ValueError: If there are no images or a limit is below 2
+    """
+    if image_count < 1:
+        raise ValueError("Nothing to compare")
+    if batch_size < 2 or fan_in < 2:
+        raise ValueError("batch_size and fan_in must be at least 2")
+
+    rounds = [balanced_chunks(image_count, batch_size)]
+    while len(rounds[-1]) > 1:
+        rounds.append(balanced_chunks(len(rounds[-1]), fan_in))
+    return ComparisonPlan(image_count=image_count, batch_size=batch_size, fan_in=fan_in, rounds=rounds)
+
+
+# ============================================================================
+# Comparison Engine
+# ============================================================================
+
+
+@dataclass
+class ComparisonResult:
+    """Final comparison plus per-batch results and what it cost."""
+    comparison: str
+    plan: ComparisonPlan
+    tiling: str
+    batch_results: List[Dict[str, Any]]
+    images: List[PreparedImage]
+    estimated_image_tokens: int
+    elapsed_s: float
+    round_latencies: List[float] = field(default_factory=list)
+
+    @property
+    def bytes_saved(self) -> int:
+        return sum(p.bytes_saved for p in self.images)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'plan': self.plan.to_dict(),
+            'tiling': self.tiling,
+            'requests': self.plan.requests,
+            'estimated_image_tokens': self.estimated_image_tokens,
+            # What sending every prepared image in one request would cost
+            'direct_estimated_tokens': sum(p.estimated_tokens for p in self.images),
+            'elapsed_s': round(self.elapsed_s, 3),
+            'round_latencies_s': [round(s, 3) for s in self.round_latencies],
+        }
+
+
+class ComparisonEngine:
+    """
+    Compare any number of product images at bounded cost and latency.
+
+    Sets of up to direct_limit images are sent as prepared images in one
+    request. Larger sets follow a ComparisonPlan: each batch becomes one
+    request with a labelled contact sheet (tiling='sheet') or small
+    per-image thumbnails (tiling='thumbnails'), at most `concurrency`
+    requests run at once, and batch results are merged in plan order.
+    """
+
+    def __init__(
+        self,
+        run_fn: Callable[[List[types.Part]], Awaitable[str]],
+        preparer: ImagePreparer,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        fan_in: int = 8,
+        concurrency: int = 4,
+        tiling: str = 'sheet',
+        cell_size: int = DEFAULT_CELL_SIZE,
+        direct_limit: int = DIRECT_COMPARE_LIMIT
+    ):
+        """
+        Args:
+            run_fn: Sends parts to the model and returns its text
+            preparer: Shared image preparer (sheets are built from its output)
+            batch_size: Most images per batch request
+            fan_in: Most batch results per merge request
+            concurrency: Most requests in flight at once
+            tiling: 'sheet' or 'thumbnails'
+            cell_size: Sheet cell or thumbnail size in pixels
+            direct_limit: Largest set sent without batching
+        """
+        if tiling not in TILING_MODES:
+            raise ValueError(f"tiling must be one of {TILING_MODES}")
+        self.run_fn = run_fn
+        self.preparer = preparer
+        self.batch_size = batch_size
+        self.fan_in = fan_in
+        self.concurrency = concurrency
+        self.tiling = tiling if Image is not None else 'prepared'
+        self.cell_size = cell_size
+        self.direct_limit = direct_limit
+
+    # ------------------------------------------------------------------
+    # Request building
+    # ------------------------------------------------------------------
+
+    def _direct_parts(self, images: List[PreparedImage]) -> Tuple[List[types.Part], int]:
+        parts = [types.Part.from_text(
+            text="Compare these product images and identify similarities and differences:"
+        )]
+        for i, prepared in enumerate(images, 1):
+            parts.append(types.Part.from_text(text=f"\nImage {i}:"))
+            parts.append(prepared.to_part())
+        parts.append(types.Part.from_text(text="\nProvide a structured comparison."))
+        return parts, sum(p.estimated_tokens for p in images)
+
+    def _batch_parts(
+        self,
+        batch: List[int],
+        paths: List[str],
+        images: List[PreparedImage]
+    ) -> Tuple[List[types.Part], int]:
+        numbers = [i + 1 for i in batch]
+        legend = "\n".join(f"Image {n}: {os.path.basename(paths[n - 1])}" for n in numbers)
+        header = (
+            f"Compare these {len(batch)} products (images {numbers[0]}-{numbers[-1]}). "
+            f"Refer to each product by its image number.\n{legend}"
+        )
+        parts = [types.Part.from_text(text=header)]
+
+        tokens = 0
+        separate = batch
+        if self.tiling == 'sheet':
+            # Images that couldn't be decoded can't be tiled; they follow the
+            # sheet as their own parts
+            tiled = [i for i in batch if images[i].decoded]
+            separate = [i for i in batch if not images[i].decoded]
+            if tiled:
+                sheet, layout = build_contact_sheet(
+                    [images[i].data for i in tiled],
+                    [str(i + 1) for i in tiled],
+                    cell_size=self.cell_size,
+                )
+                parts.append(types.Part(inline_data=types.Blob(data=sheet, mime_type='image/jpeg')))
+                tokens = layout.estimated_tokens
+        for i in separate:
+            if self.tiling == 'thumbnails' and images[i].decoded:
+                data, mime_type, size = downscale_image(images[i].data, max_dimension=self.cell_size)
+                part = types.Part(inline_data=types.Blob(data=data, mime_type=mime_type))
+                tokens += estimate_image_tokens(*size)
+            else:
+                part = images[i].to_part()
+                tokens += images[i].estimated_tokens
+            parts.append(types.Part.from_text(text=f"\nImage {i + 1}:"))
+            parts.append(part)
+
+        parts.append(types.Part.from_text(text="\nProvide a structured comparison."))
+        return parts, tokens
+
+    @staticmethod
+    def _merge_parts(group: List[int], previous: List[Dict[str, Any]]) -> List[types.Part]:
+        sections = []
+        for i in group:
+            numbers = previous[i]['images']
+            sections.append(f"## Images {numbers[0]}-{numbers[-1]}\n{previous[i]['comparison']}")
+        first, last = previous[group[0]]['images'][0], previous[group[-1]]['images'][-1]
+        text = (
+            f"Merge these comparisons of product groups into one structured comparison "
+            f"of images {first}-{last}. Keep referring to products by image number.\n\n"
+            + "\n\n".join(sections)
+        )
+        return [types.Part.from_text(text=text)]
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    async def _run_round(self, requests: List[Any]) -> List[str]:
+        """Run one round; each request is a parts list or a function building one."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(build):
+            async with semaphore:
+                parts = await asyncio.to_thread(build) if callable(build) else build
+                return await self.run_fn(parts)
+
+        # gather keeps plan order regardless of completion order
+        return list(await asyncio.gather(*(run(build) for build in requests)))
+
+    async def compare(self, image_paths: List[str]) -> ComparisonResult:
+        """
+        Compare images following the plan for their count.
+
+        Raises:
+            FileNotFoundError: If an image doesn't exist
+            ValueError: If fewer than 2 images or unsupported format
+        """
+        if len(image_paths) < 2:
+            raise ValueError("Need at least 2 images to compare")
+        start = time.perf_counter()
+        images = await asyncio.to_thread(lambda: [self.preparer.prepare(p) for p in image_paths])
+
+        if len(images) <= self.direct_limit:
+            plan = plan_comparison(len(images), batch_size=max(len(images), 2), fan_in=self.fan_in)
+            parts, tokens = self._direct_parts(images)
+            (text,) = await self._run_round([parts])
+            return ComparisonResult(
+                comparison=text, plan=plan, tiling='prepared',
+                batch_results=[{'images': list(range(1, len(images) + 1)), 'comparison': text}],
+                images=images, estimated_image_tokens=tokens,
+                elapsed_s=time.perf_counter() - start,
+                round_latencies=[time.perf_counter() - start],
+            )
+
+        plan = plan_comparison(len(images), self.batch_size, self.fan_in)
+        token_counts: List[int] = [0] * len(plan.batches)
+
+        def builder(index: int, batch: List[int]):
+            def build():
+                parts, token_counts[index] = self._batch_parts(batch, image_paths, images)
+                return parts
+            return build
+
+        round_start = time.perf_counter()
+        texts = await self._run_round([builder(i, b) for i, b in enumerate(plan.batches)])
+        round_latencies = [time.perf_counter() - round_start]
+        batch_results = [
+            {'images': [i + 1 for i in batch], 'comparison': text}
+            for batch, text in zip(plan.batches, texts)
+        ]
+
+        previous = batch_results
+        for groups in plan.rounds[1:]:
+            round_start = time.perf_counter()
+            texts = await self._run_round([self._merge_parts(g, previous) for g in groups])
+            round_latencies.append(time.perf_counter() - round_start)
+            previous = [
+                {
+                    'images': previous[g[0]]['images'][:1] + previous[g[-1]]['images'][-1:],
+                    'comparison': text,
+                }
+                for g, text in zip(groups, texts)
+            ]
+
+        return ComparisonResult(
+            comparison=previous[0]['comparison'],
+            plan=plan,
+            tiling=self.tiling,
+            batch_results=batch_results,
+            images=images,
+            estimated_image_tokens=sum(token_counts),
+            elapsed_s=time.perf_counter() - start,
+            round_latencies=round_latencies,
+        )
@@ -0,0 +1,496 @@
+"""
+Image preparation pipeline for the Vision Catalog Agent.
+
+Downscales and re-encodes each image once to a pixel, byte and token
+budget, keyed by a hash of its content. Prepared variants are kept in an
+in-memory LRU and an on-disk cache, and can optionally be uploaded once
+through the Gemini Files API so later requests send a file URI instead of
+the image bytes.
+"""
+import hashlib
+import io
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from google.genai import types
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    ImageOps = None
+
+
+MIME_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'webp': 'image/webp',
+    'heic': 'image/heic',
+    'heif': 'image/heif',
+}
+
+# Gemini bills an image at 258 tokens per 768x768 tile; images with both
+# sides <= 384px are a single tile
+TOKENS_PER_TILE = 258
+TILE_SIZE = 768
+SMALL_IMAGE_SIZE = 384
+
+# Files API uploads expire after 48 hours; stop reusing them a bit earlier
+FILE_URI_TTL_SECONDS = 46 * 3600
+
+
+# ============================================================================
+# Encoding
+# ============================================================================
+
+
+def mime_type_for(path: str) -> str:
+    """
+    MIME type from a file extension.
+
+    Raises:
+        ValueError: If unsupported format
+    """
+    extension = path.lower().split('.')[-1]
+    mime_type = MIME_TYPES.get(extension)
+    if not mime_type:
+        raise ValueError(f"Unsupported image format: {extension}")
+    return mime_type
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Approximate input tokens Gemini charges for an image of this size."""
+    if width <= SMALL_IMAGE_SIZE and height <= SMALL_IMAGE_SIZE:
+        return TOKENS_PER_TILE
+    return TOKENS_PER_TILE * math.ceil(width / TILE_SIZE) * math.ceil(height / TILE_SIZE)
+
+
+def _fit(width: int, height: int, longest: int) -> Tuple[int, int]:
+    scale = min(1.0, longest / max(width, height))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def target_dimension(
+    width: int,
+    height: int,
+    max_dimension: int = 1024,
+    max_tokens: Optional[int] = None
+) -> int:
+    """
+    Longest side to scale an image to so it fits max_dimension and max_tokens.
+
+    Token cost only changes at tile boundaries, so the candidates are
+    max_dimension and each multiple of the tile size below it.
+    """
+    longest = min(max_dimension, max(width, height))
+    if max_tokens is None:
+        return longest
+
+    candidates = [longest] + [
+        k * TILE_SIZE for k in range(longest // TILE_SIZE, 0, -1) if k * TILE_SIZE < longest
+    ] + [SMALL_IMAGE_SIZE]
+    for candidate in candidates:
+        if estimate_image_tokens(*_fit(width, height, candidate)) <= max_tokens:
+            return candidate
+    return SMALL_IMAGE_SIZE
+
+
+def downscale_image(
+    image_bytes: bytes,
+    max_dimension: int = 1024,
+    max_bytes: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    quality: int = 85,
+    min_quality: int = 50
+) -> Tuple[bytes, str, Tuple[int, int]]:
+    """
+    Downscale and re-encode an image as JPEG within the given budgets.
+
+    Quality is lowered in steps down to min_quality, then the image is
+    shrunk further, until the encoded size fits max_bytes.
+
+    Args:
+        image_bytes: Original image bytes
+        max_dimension: Maximum width or height in pixels
+        max_bytes: Maximum encoded size (None for no limit)
+        max_tokens: Maximum estimated image tokens (None for no limit)
+        quality: Initial JPEG quality
+        min_quality: Lowest JPEG quality before shrinking further
+
+    Returns:
+        Tuple of (encoded bytes, MIME type, (width, height))
+    """
+    if Image is None:
+        raise ImportError("PIL/Pillow required for image downscaling")
+
+    image = Image.open(io.BytesIO(image_bytes))
+    # Camera photos store rotation in EXIF; apply it before resizing
+    image = ImageOps.exif_transpose(image)
+
+    longest = target_dimension(image.width, image.height, max_dimension, max_tokens)
+    if max(image.size) > longest:
+        image.thumbnail((longest, longest), Image.Resampling.LANCZOS)
+
+    # Convert to RGB if necessary
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[3])
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    while True:
+        output = io.BytesIO()
+        image.save(output, format='JPEG', quality=quality, optimize=True)
+        data = output.getvalue()
+        if max_bytes is None or len(data) <= max_bytes:
+            break
+        if quality > min_quality:
+            quality = max(min_quality, quality - 10)
+        elif max(image.size) > 64:
+            image = image.resize(_fit(image.width, image.height, int(max(image.size) * 0.75)),
+                                 Image.Resampling.LANCZOS)
+        else:
+            break
+
+    return data, 'image/jpeg', image.size
+
+
+# ============================================================================
+# Prepared Images
+# ============================================================================
+
+
+def _passthrough(key: str, image_bytes: bytes, mime_type: str) -> 'PreparedImage':
+    """The original bytes, unmeasured and unresized."""
+    return PreparedImage(
+        content_hash=key, mime_type=mime_type, width=0, height=0,
+        original_bytes=len(image_bytes), prepared_bytes=len(image_bytes),
+        estimated_tokens=0, data=image_bytes,
+    )
+
+
+@dataclass
+class PreparedImage:
+    """An image ready to send to the model, plus what preparing it cost."""
+    content_hash: str
+    mime_type: str
+    width: int
+    height: int
+    original_bytes: int
+    prepared_bytes: int
+    estimated_tokens: int
+    data: Optional[bytes] = None
+    file_uri: Optional[str] = None
+    uploaded_at: Optional[float] = None
+    source: str = 'prepared'  # 'prepared', 'memory' or 'disk'
+    latency_ms: float = 0.0
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(self.original_bytes - self.prepared_bytes, 0)
+
+    @property
+    def decoded(self) -> bool:
+        """False when the original was passed through undecoded (e.g. HEIC)."""
+        return self.width > 0
+
+    def to_part(self) -> types.Part:
+        """Part referencing the uploaded file if there is one, else inline bytes."""
+        if self.file_uri:
+            return types.Part.from_uri(file_uri=self.file_uri, mime_type=self.mime_type)
+        return types.Part(inline_data=types.Blob(data=self.data, mime_type=self.mime_type))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'content_hash': self.content_hash[:12],
+            'dimensions': f"{self.width}x{self.height}",
+            'original_bytes': self.original_bytes,
+            'prepared_bytes': self.prepared_bytes,
+            'bytes_saved': self.bytes_saved,
+            'estimated_tokens': self.estimated_tokens,
+            'source': self.source,
+            'uploaded': self.file_uri is not None,
+            'latency_ms': round(self.latency_ms, 2),
+        }
+
+
+class ImagePreparer:
+    """
+    Prepare images once per content hash and budget.
+
+    Lookups go through three levels: a (path, mtime, size) index that skips
+    re-reading unchanged files, an in-memory LRU of prepared images, and an
+    on-disk cache that survives restarts and is shared between processes.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_dimension: int = 1024,
+        max_bytes: Optional[int] = 500 * 1024,
+        max_tokens: Optional[int] = None,
+        quality: int = 85,
+        max_memory_entries: int = 256,
+        upload: bool = False,
+        client: Any = None
+    ):
+        """
+        Args:
+            cache_dir: Directory for prepared variants (None for memory only)
+            max_dimension: Maximum width or height in pixels
+            max_bytes: Maximum prepared size in bytes
+            max_tokens: Maximum estimated image tokens
+            quality: JPEG quality for re-encoded images
+            max_memory_entries: Prepared images kept in memory
+            upload: Upload prepared images through the Files API and reuse
+                the file URI instead of sending bytes inline
+            client: google.genai Client for uploads (created lazily)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_dimension = max_dimension
+        self.max_bytes = max_bytes
+        self.max_tokens = max_tokens
+        self.quality = quality
+        self.max_memory_entries = max_memory_entries
+        self.upload = upload
+        self._client = client
+
+        self._memory: 'OrderedDict[str, PreparedImage]' = OrderedDict()
+        self._paths: 'OrderedDict[Tuple[str, int, int], str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._totals = {
+            'images': 0, 'memory_hits': 0, 'disk_hits': 0, 'prepared': 0,
+            'uploads': 0, 'bytes_in': 0, 'bytes_out': 0, 'latency_ms': 0.0,
+        }
+
+    @property
+    def variant(self) -> str:
+        """Identifies the budget, so changing it never serves a stale variant."""
+        return f"d{self.max_dimension}-b{self.max_bytes}-t{self.max_tokens}-q{self.quality}"
+
+    # ------------------------------------------------------------------
+    # Caches
+    # ------------------------------------------------------------------
+
+    def _disk_paths(self, key: str) -> Tuple[Path, Path]:
+        folder = self.cache_dir / key[:2]
+        stem = f"{key}-{self.variant}"
+        return folder / f"{stem}.bin", folder / f"{stem}.json"
+
+    def _read_disk(self, key: str) -> Optional[PreparedImage]:
+        if self.cache_dir is None:
+            return None
+        data_path, meta_path = self._disk_paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            data = data_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if len(data) != meta.get('prepared_bytes'):
+            return None
+        return PreparedImage(data=data, **meta)
+
+    def _write_disk(self, key: str, prepared: PreparedImage) -> None:
+        if self.cache_dir is None:
+            return
+        data_path, meta_path = self._disk_paths(key)
+        data_path.parent.mkdir(parents=True, exist_ok=True)
+        meta = asdict(prepared)
+        for field_name in ('data', 'source', 'latency_ms'):
+            meta.pop(field_name)
+        # Write then rename, so concurrent readers never see a partial file
+        for path, payload in ((data_path, prepared.data), (meta_path, json.dumps(meta).encode())):
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    def _index_path(self, path_key: Tuple[str, int, int], key: str) -> None:
+        # Bounded like the memory cache; a dropped path is just re-hashed
+        with self._lock:
+            self._paths[path_key] = key
+            self._paths.move_to_end(path_key)
+            while len(self._paths) > self.max_memory_entries:
+                self._paths.popitem(last=False)
+
+    def _remember(self, key: str, prepared: PreparedImage) -> None:
+        with self._lock:
+            self._memory[key] = prepared
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Preparation
+    # ------------------------------------------------------------------
+
+    def _prepare_bytes(self, key: str, image_bytes: bytes, mime_type: str) -> PreparedImage:
+        if Image is None:
+            # No Pillow: send the original unchanged
+            return _passthrough(key, image_bytes, mime_type)
+
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as image:
+                width, height = image.size
+                rotated = (image.getexif() or {}).get(0x0112, 1) != 1
+        except OSError:
+            # Formats Pillow can't decode (HEIC/HEIF without a plugin) are
+            # still accepted by the model: send the original unchanged
+            return _passthrough(key, image_bytes, mime_type)
+
+        longest = target_dimension(width, height, self.max_dimension, self.max_tokens)
+        within_budget = (
+            max(width, height) <= longest
+            and (self.max_bytes is None or len(image_bytes) <= self.max_bytes)
+            and mime_type in ('image/jpeg', 'image/png', 'image/webp')
+            and not rotated
+        )
+        if within_budget:
+            # Re-encoding a small image can only lose quality
+            data, prepared_mime = image_bytes, mime_type
+        else:
+            data, prepared_mime, (width, height) = downscale_image(
+                image_bytes,
+                max_dimension=self.max_dimension,
+                max_bytes=self.max_bytes,
+                max_tokens=self.max_tokens,
+                quality=self.quality,
+            )
+
+        return PreparedImage(
+            content_hash=key,
+            mime_type=prepared_mime,
+            width=width,
+            height=height,
+            original_bytes=len(image_bytes),
+            prepared_bytes=len(data),
+            estimated_tokens=estimate_image_tokens(width, height),
+            data=data,
+        )
+
+    def _get_client(self):
+        if self._client is None:
+            from google import genai
+            self._client = genai.Client()
+        return self._client
+
+    def _ensure_uploaded(self, key: str, prepared: PreparedImage) -> PreparedImage:
+        fresh = (
+            prepared.file_uri
+            and prepared.uploaded_at
+            and time.time() - prepared.uploaded_at < FILE_URI_TTL_SECONDS
+        )
+        if fresh:
+            return prepared
+
+        uploaded = self._get_client().files.upload(
+            file=io.BytesIO(prepared.data),
+            config=types.UploadFileConfig(
+                mime_type=prepared.mime_type,
+                display_name=f"{key[:16]}.{prepared.mime_type.split('/')[-1]}",
+            ),
+        )
+        prepared = replace(prepared, file_uri=uploaded.uri, uploaded_at=time.time())
+        self._write_disk(key, prepared)
+        with self._lock:
+            self._totals['uploads'] += 1
+        return prepared
+
+    def prepare(self, path: str) -> PreparedImage:
+        """
+        Prepare an image file, reusing any earlier work on the same content.
+
+        Args:
+            path: Path to image file
+
+        Returns:
+            PreparedImage with this call's latency and cache source
+
+        Raises:
+            FileNotFoundError: If file doesn't exist
+            ValueError: If unsupported format
+        """
+        start = time.perf_counter()
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Image file not found: {path}")
+        mime_type = mime_type_for(path)
+
+        stat = os.stat(path)
+        path_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            key = self._paths.get(path_key)
+            prepared = self._memory.get(key) if key else None
+            if prepared is not None:
+                self._paths.move_to_end(path_key)
+                self._memory.move_to_end(key)
+        source = 'memory'
+
+        if prepared is None:
+            with open(path, 'rb') as f:
+                image_bytes = f.read()
+            key = hashlib.sha256(image_bytes).hexdigest()
+            self._index_path(path_key, key)
+            with self._lock:
+                prepared = self._memory.get(key)
+            if prepared is None:
+                prepared = self._read_disk(key)
+                source = 'disk'
+                if prepared is None:
+                    prepared = self._prepare_bytes(key, image_bytes, mime_type)
+                    self._write_disk(key, prepared)
+                    source = 'prepared'
+
+        if self.upload:
+            prepared = self._ensure_uploaded(key, prepared)
+        self._remember(key, prepared)
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            totals = self._totals
+            totals['images'] += 1
+            totals['bytes_in'] += prepared.original_bytes
+            totals['bytes_out'] += prepared.prepared_bytes
+            totals['latency_ms'] += latency_ms
+            if source == 'memory':
+                totals['memory_hits'] += 1
+            elif source == 'disk':
+                totals['disk_hits'] += 1
+            else:
+                totals['prepared'] += 1
+        return replace(prepared, source=source, latency_ms=latency_ms)
+
+    def prepare_part(self, path: str) -> Tuple[types.Part, PreparedImage]:
+        """Prepare an image file and return the Part to send with its stats."""
+        prepared = self.prepare(path)
+        return prepared.to_part(), prepared
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals across every prepare() call."""
+        with self._lock:
+            totals = dict(self._totals)
+            memory_entries = len(self._memory)
+        images = totals['images']
+        return {
+            **totals,
+            'latency_ms': round(totals['latency_ms'], 2),
+            'bytes_saved': totals['bytes_in'] - totals['bytes_out'],
+            'cache_hit_ratio': round((totals['memory_hits'] + totals['disk_hits']) / images, 4) if images else 0.0,
+            'avg_latency_ms': round(totals['latency_ms'] / images, 2) if images else 0.0,
+            'memory_entries': memory_entries,
+            'variant': self.variant,
+        }
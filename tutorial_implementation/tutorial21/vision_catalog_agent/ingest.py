@@ -0,0 +1,468 @@
+"""
+Bulk catalog ingestion for the Vision Catalog Agent.
+
+Processes a directory or manifest of thousands of product images through
+the two catalog stages (vision analysis, then catalog generation) as a
+pipeline: each stage has its own bounded worker pool and the stages overlap,
+so catalog entries are written while later images are still being analyzed.
+
+Progress is journaled to an append-only JSONL checkpoint after every stage,
+so an interrupted run resumes where it stopped: finished products are
+skipped and analyzed-but-not-cataloged products go straight to the catalog
+stage.
+"""
+import asyncio
+import csv
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from google.genai import types
+
+from .image_prep import MIME_TYPES, ImagePreparer
+
+
+IMAGE_EXTENSIONS = {f'.{ext}' for ext in MIME_TYPES}
+
+
+# ============================================================================
+# Inputs
+# ============================================================================
+
+
+@dataclass
+class IngestItem:
+    """One product image to ingest."""
+    product_id: str
+    image_path: str
+    name: Optional[str] = None
+
+
+def discover_images(directory: str) -> List[IngestItem]:
+    """
+    Find every supported image under a directory, recursively.
+
+    The product ID is the path relative to the directory without its
+    extension, so images with the same name in different folders stay
+    distinct.
+    """
+    root = Path(directory)
+    items = []
+    for path in sorted(root.rglob('*')):
+        if path.is_file() and path.suffix.lower() in IMAGE_EXTENSIONS:
+            product_id = path.relative_to(root).with_suffix('').as_posix()
+            items.append(IngestItem(product_id=product_id, image_path=str(path)))
+    return items
+
+
+def load_manifest(path: str) -> List[IngestItem]:
+    """
+    Load items from a CSV or JSONL manifest.
+
+    Each row needs `image_path` and may have `product_id` (defaults to the
+    file stem) and `name`. Relative image paths resolve against the
+    manifest's directory.
+
+    Raises:
+        ValueError: If a row has no image_path
+    """
+    base = Path(path).parent
+    if path.endswith('.jsonl'):
+        with open(path) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+
+    items = []
+    for i, row in enumerate(rows, 1):
+        image_path = (row.get('image_path') or '').strip()
+        if not image_path:
+            raise ValueError(f"Manifest row {i} has no image_path")
+        if not os.path.isabs(image_path):
+            image_path = str(base / image_path)
+        items.append(IngestItem(
+            product_id=(row.get('product_id') or '').strip() or Path(image_path).stem,
+            image_path=image_path,
+            name=(row.get('name') or '').strip() or None,
+        ))
+    return items
+
+
+def load_items(source: str) -> List[IngestItem]:
+    """Items from a directory or a .csv/.jsonl manifest."""
+    if os.path.isdir(source):
+        return discover_images(source)
+    return load_manifest(source)
+
+
+# ============================================================================
+# Checkpoint
+# ============================================================================
+
+
+class IngestCheckpoint:
+    """
+    Append-only JSONL journal of stage completions.
+
+    Every record is flushed and fsynced before the pipeline moves on, and a
+    torn last line from a crash is ignored on load. The pipeline writes
+    through arecord(), which does the write and fsync in a worker thread.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+        self._lock = threading.Lock()
+
+    def load(self) -> Tuple[Set[str], Dict[str, str]]:
+        """
+        Returns:
+            Tuple of (finished product IDs, {product ID: analysis} for
+            products analyzed but not yet cataloged)
+        """
+        done: Set[str] = set()
+        analyzed: Dict[str, str] = {}
+        if not os.path.exists(self.path):
+            return done, analyzed
+
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                product_id = record.get('id')
+                stage = record.get('stage')
+                if stage == 'analysis':
+                    analyzed[product_id] = record['analysis']
+                elif stage == 'done':
+                    done.add(product_id)
+                    analyzed.pop(product_id, None)
+        return done, analyzed
+
+    def record(self, product_id: str, stage: str, **fields: Any) -> None:
+        line = json.dumps({'id': product_id, 'stage': stage, 'ts': time.time(), **fields}) + '\n'
+        with self._lock:
+            if self._file is None:
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a')
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    async def arecord(self, product_id: str, stage: str, **fields: Any) -> None:
+        """record() in a worker thread, so the fsync doesn't block the loop."""
+        write = asyncio.ensure_future(asyncio.to_thread(self.record, product_id, stage, **fields))
+        try:
+            await asyncio.shield(write)
+        except asyncio.CancelledError:
+            # The stage already finished: journal it before stopping
+            await write
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+@dataclass
+class IngestReport:
+    """Outcome and throughput of an ingestion run."""
+    total: int = 0
+    skipped: int = 0
+    duplicates: int = 0
+    resumed_at_catalog: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed_s: float = 0.0
+    failures: List[Dict[str, str]] = field(default_factory=list)
+    stage_latencies: Dict[str, List[float]] = field(
+        default_factory=lambda: {'analysis': [], 'catalog': []}
+    )
+
+    @property
+    def images_per_minute(self) -> float:
+        return self.succeeded / self.elapsed_s * 60 if self.elapsed_s > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'skipped': self.skipped,
+            'duplicates': self.duplicates,
+            'resumed_at_catalog': self.resumed_at_catalog,
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'elapsed_s': round(self.elapsed_s, 2),
+            'images_per_minute': round(self.images_per_minute, 1),
+            'stages': {
+                stage: {
+                    'count': len(values),
+                    'mean_s': round(sum(values) / len(values), 3) if values else 0.0,
+                    'p50_s': round(_percentile(values, 50), 3),
+                    'p95_s': round(_percentile(values, 95), 3),
+                }
+                for stage, values in self.stage_latencies.items()
+            },
+            'failures': self.failures,
+        }
+
+    def summary(self) -> str:
+        return (
+            f"{self.succeeded} ingested, {self.failed} failed, {self.skipped} skipped "
+            f"(already done) in {self.elapsed_s:.1f}s - {self.images_per_minute:.1f} images/min"
+        )
+
+
+AnalyzeFn = Callable[[IngestItem], Awaitable[str]]
+CatalogFn = Callable[[IngestItem, str], Awaitable[str]]
+
+
+class CatalogIngestor:
+    """
+    Two-stage, checkpointed, bounded-concurrency ingestion pipeline.
+
+    `analyze_fn(item)` returns the vision analysis; `catalog_fn(item,
+    analysis)` writes the catalog entry and returns where it went. Each
+    stage retries transient failures with jittered backoff before the item
+    is recorded as failed; failed items are retried on the next run.
+    """
+
+    def __init__(
+        self,
+        analyze_fn: AnalyzeFn,
+        catalog_fn: CatalogFn,
+        checkpoint_path: str,
+        analysis_concurrency: int = 8,
+        catalog_concurrency: int = 4,
+        max_attempts: int = 3,
+        retry_delay_seconds: float = 1.0,
+        on_progress: Optional[Callable[[IngestItem, str, IngestReport], None]] = None,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        """
+        Args:
+            analyze_fn: Vision stage coroutine
+            catalog_fn: Catalog stage coroutine
+            checkpoint_path: JSONL journal used to resume
+            analysis_concurrency: Vision calls in flight
+            catalog_concurrency: Catalog calls in flight
+            max_attempts: Attempts per stage before giving up on an item
+            retry_delay_seconds: Base backoff between attempts
+            on_progress: Called with (item, 'done' or 'failed', report)
+            clock: Time source
+        """
+        if analysis_concurrency < 1 or catalog_concurrency < 1:
+            raise ValueError("Concurrency must be at least 1")
+
+        self.analyze_fn = analyze_fn
+        self.catalog_fn = catalog_fn
+        self.checkpoint = IngestCheckpoint(checkpoint_path)
+        self.analysis_concurrency = analysis_concurrency
+        self.catalog_concurrency = catalog_concurrency
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay_seconds
+        self.on_progress = on_progress
+        self.clock = clock
+
+    async def _attempt(self, stage: str, report: IngestReport, fn: Callable, *args: Any) -> Any:
+        for attempt in range(1, self.max_attempts + 1):
+            start = self.clock()
+            try:
+                result = await fn(*args)
+                report.stage_latencies[stage].append(self.clock() - start)
+                return result
+            except Exception:
+                if attempt == self.max_attempts:
+                    raise
+                await asyncio.sleep(random.uniform(0, self.retry_delay * 2 ** (attempt - 1)))
+
+    def _finish(self, item: IngestItem, status: str, report: IngestReport) -> None:
+        if status == 'done':
+            report.succeeded += 1
+        else:
+            report.failed += 1
+        if self.on_progress is not None:
+            self.on_progress(item, status, report)
+
+    async def _fail(self, item: IngestItem, stage: str, error: Exception, report: IngestReport) -> None:
+        message = f"{type(error).__name__}: {error}"
+        await self.checkpoint.arecord(item.product_id, 'failed', failed_stage=stage, error=message)
+        report.failures.append({'product_id': item.product_id, 'stage': stage, 'error': message})
+        self._finish(item, 'failed', report)
+
+    async def run(self, items: List[IngestItem]) -> IngestReport:
+        """Ingest every item not already finished in the checkpoint."""
+        start = self.clock()
+        report = IngestReport(total=len(items))
+        done, analyzed = await asyncio.to_thread(self.checkpoint.load)
+
+        pending, seen = [], set()
+        for item in items:
+            if item.product_id in done:
+                report.skipped += 1
+            elif item.product_id in seen:
+                report.duplicates += 1
+            else:
+                seen.add(item.product_id)
+                pending.append(item)
+
+        # Bounded queues give backpressure: analysis never runs far ahead
+        analysis_queue: asyncio.Queue = asyncio.Queue(maxsize=2 * self.analysis_concurrency)
+        catalog_queue: asyncio.Queue = asyncio.Queue(maxsize=2 * self.catalog_concurrency)
+
+        async def feed():
+            for item in pending:
+                if item.product_id in analyzed:
+                    report.resumed_at_catalog += 1
+                    await catalog_queue.put((item, analyzed[item.product_id]))
+                else:
+                    await analysis_queue.put(item)
+            for _ in range(self.analysis_concurrency):
+                await analysis_queue.put(None)
+
+        async def analysis_worker():
+            while (item := await analysis_queue.get()) is not None:
+                try:
+                    analysis = await self._attempt('analysis', report, self.analyze_fn, item)
+                except Exception as e:
+                    await self._fail(item, 'analysis', e, report)
+                    continue
+                await self.checkpoint.arecord(item.product_id, 'analysis', analysis=analysis)
+                await catalog_queue.put((item, analysis))
+
+        analysis_tasks = [
+            asyncio.create_task(analysis_worker()) for _ in range(self.analysis_concurrency)
+        ]
+
+        async def close_catalog_queue():
+            await asyncio.gather(*analysis_tasks)
+            for _ in range(self.catalog_concurrency):
+                await catalog_queue.put(None)
+
+        async def catalog_worker():
+            while (entry := await catalog_queue.get()) is not None:
+                item, analysis = entry
+                try:
+                    output = await self._attempt('catalog', report, self.catalog_fn, item, analysis)
+                except Exception as e:
+                    await self._fail(item, 'catalog', e, report)
+                    continue
+                await self.checkpoint.arecord(item.product_id, 'done', output=output)
+                self._finish(item, 'done', report)
+
+        tasks = [asyncio.create_task(feed()), asyncio.create_task(close_catalog_queue())]
+        tasks += analysis_tasks
+        tasks += [asyncio.create_task(catalog_worker()) for _ in range(self.catalog_concurrency)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # On error or cancellation stop every stage; the journal already
+            # holds everything that finished
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.checkpoint.close()
+            report.elapsed_s = self.clock() - start
+
+        return report
+
+
+# ============================================================================
+# Gemini Stages
+# ============================================================================
+
+
+CATALOG_INSTRUCTION = """
+You are a product catalog content creator. Turn the visual analysis into a
+professional, marketing-ready catalog entry in markdown with sections:
+Product Overview, Key Features, Specifications, Description, Target Market.
+Use customer-friendly language and a professional tone.
+""".strip()
+
+
+def _safe_filename(product_id: str) -> str:
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', product_id).strip('_') or 'product'
+
+
+class GeminiCatalogStages:
+    """
+    Stage implementations calling Gemini directly with the agents' settings.
+
+    Bulk runs skip the coordinator agent: each stage is one model call,
+    using the same model, instruction and generation config as the
+    vision_analyzer and catalog_generator sub-agents.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        client: Any = None,
+        preparer: Optional[ImagePreparer] = None
+    ):
+        from .agent import catalog_generator, image_preparer, vision_analyzer
+
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.preparer = preparer or image_preparer
+        self.vision = vision_analyzer
+        self.catalog_agent = catalog_generator
+        if client is None:
+            from google import genai
+            client = genai.Client()
+        self.client = client
+
+    def _config(self, agent: Any, instruction: str) -> types.GenerateContentConfig:
+        return agent.generate_content_config.model_copy(update={'system_instruction': instruction})
+
+    async def analyze(self, item: IngestItem) -> str:
+        # Downscaling is CPU-bound; keep it off the event loop
+        image_part, _ = await asyncio.to_thread(self.preparer.prepare_part, item.image_path)
+        label = f"{item.product_id}" + (f" ({item.name})" if item.name else "")
+        response = await self.client.aio.models.generate_content(
+            model=self.vision.model,
+            contents=[types.Content(role='user', parts=[
+                types.Part.from_text(text=f"Analyze this product image for {label}:"),
+                image_part,
+            ])],
+            config=self._config(self.vision, self.vision.instruction),
+        )
+        if not response.text:
+            raise ValueError("No analysis result")
+        return response.text
+
+    async def catalog(self, item: IngestItem, analysis: str) -> str:
+        response = await self.client.aio.models.generate_content(
+            model=self.catalog_agent.model,
+            contents=(
+                f"Based on this visual analysis, create a professional catalog entry "
+                f"for {item.name or item.product_id}:\n\n{analysis}"
+            ),
+            config=self._config(self.catalog_agent, CATALOG_INSTRUCTION),
+        )
+        if not response.text:
+            raise ValueError("No catalog result")
+        path = self.output_dir / f"{_safe_filename(item.product_id)}_catalog.md"
+        await asyncio.to_thread(path.write_text, response.text)
+        return str(path)
@@ -4,12 +4,20 @@ A framework for selecting, benchmarking, and comparing AI models.
 """
 
 import asyncio
-import time
 from dataclasses import dataclass
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from google.adk.agents import Agent
 from google.adk.tools.tool_context import ToolContext
-from google.genai import types
+
+from .benchmark import (
+    BenchmarkConfig,
+    BenchmarkEngine,
+    BenchmarkResult,
+    ModelReport,
+    export_json,
+    export_samples_csv,
+)
+from .router import ModelRouter, default_profiles
 
 
 # ============================================================================
@@ -25,6 +33,21 @@ class ModelBenchmark:
     quality_score: float
     cost_estimate: float
     success_rate: float
+    p50_latency: float = 0.0
+    p90_latency: float = 0.0
+    p99_latency: float = 0.0
+    ttft: float = 0.0
+    tokens_per_second: float = 0.0
+
+
+# Simplified pricing as of 2025
+COST_PER_1K_TOKENS = {
+    'gemini-2.5-flash': 0.00008,
+    'gemini-2.5-flash-lite': 0.00004,
+    'gemini-2.5-pro': 0.0005,
+    'gemini-2.0-flash': 0.0001,
+    'gemini-2.0-flash-live': 0.00015,
+}
 
 
 # ============================================================================
@@ -34,9 +57,73 @@ class ModelBenchmark:
 class ModelSelector:
     """Framework for selecting and benchmarking models."""
 
-    def __init__(self):
-        """Initialize model selector."""
+    def __init__(self, client: Any = None, config: Optional[BenchmarkConfig] = None):
+        """
+        Initialize model selector.
+
+        Args:
+            client: Model client shared by all benchmarks (defaults to
+                google.genai.Client(); use FakeModelClient offline)
+            config: Benchmark settings (concurrency, rate, warmup, repetitions)
+        """
         self.benchmarks: Dict[str, ModelBenchmark] = {}
+        self.reports: Dict[str, ModelReport] = {}
+        self.last_result: Optional[BenchmarkResult] = None
+        self.client = client
+        self.config = config or BenchmarkConfig()
+        self._engine: Optional[BenchmarkEngine] = None
+
+    @property
+    def engine(self) -> BenchmarkEngine:
+        """Benchmark engine (one client for all models, created on first use)."""
+        if self._engine is None:
+            self._engine = BenchmarkEngine(self.client, self.config)
+        return self._engine
+
+    def _to_benchmark(self, report: ModelReport) -> ModelBenchmark:
+        """Derive cost and quality estimates from an engine report."""
+        cost_estimate = (report.avg_total_tokens / 1000) * COST_PER_1K_TOKENS.get(
+            report.model, COST_PER_1K_TOKENS['gemini-2.5-flash']
+        )
+        # Quality score (based on success rate and latency)
+        quality_score = report.success_rate * (1.0 / (1.0 + report.latency_mean_s))
+
+        return ModelBenchmark(
+            model=report.model,
+            avg_latency=report.latency_mean_s,
+            avg_tokens=int(report.avg_total_tokens),
+            quality_score=quality_score,
+            cost_estimate=cost_estimate,
+            success_rate=report.success_rate,
+            p50_latency=report.latency_p50_s,
+            p90_latency=report.latency_p90_s,
+            p99_latency=report.latency_p99_s,
+            ttft=report.ttft_p50_s,
+            tokens_per_second=report.tokens_per_s,
+        )
+
+    def _record(self, result: BenchmarkResult) -> None:
+        self.last_result = result
+        for model, report in result.reports.items():
+            self.reports[model] = report
+            self.benchmarks[model] = self._to_benchmark(report)
+
+    def _print_results(self, model: str) -> None:
+        bench = self.benchmarks[model]
+        report = self.reports[model]
+        low, high = report.latency_mean_ci_s
+
+        print(f"\n📊 RESULTS: {model} ({report.requests} requests)")
+        print(f"   Avg Latency: {bench.avg_latency:.2f}s "
+              f"({self.config.confidence*100:.0f}% CI {low:.2f}-{high:.2f}s)")
+        print(f"   p50/p90/p99: {bench.p50_latency:.2f}s / "
+              f"{bench.p90_latency:.2f}s / {bench.p99_latency:.2f}s")
+        print(f"   TTFT (p50): {bench.ttft:.2f}s")
+        print(f"   Throughput: {bench.tokens_per_second:.1f} tokens/s")
+        print(f"   Avg Tokens: {bench.avg_tokens}")
+        print(f"   Success Rate: {bench.success_rate*100:.1f}%")
+        print(f"   Cost Estimate: ${bench.cost_estimate:.6f} per query")
+        print(f"   Quality Score: {bench.quality_score:.3f}")
 
     async def benchmark_model(
         self,
@@ -47,6 +134,9 @@ class ModelSelector:
         """
         Benchmark a model on test queries.
 
+        Queries run concurrently (streaming, to measure time-to-first-token),
+        after warmup and repeated per the selector's BenchmarkConfig.
+
         Args:
             model: Model to test
             test_queries: List of test queries
@@ -55,96 +145,21 @@ class ModelSelector:
         Returns:
             ModelBenchmark with results
         """
-        from google.genai import Client
-
         print(f"\n{'='*70}")
         print(f"BENCHMARKING: {model}")
-        print(f"{'='*70}\n")
-
-        # Create client for direct model calls (simpler than Runner for benchmarking)
-        client = Client()
-
-        latencies = []
-        token_counts = []
-        successes = 0
-
-        for query in test_queries:
-            try:
-                start = time.time()
-
-                # Direct model call for benchmarking
-                response = await client.aio.models.generate_content(
-                    model=model,
-                    contents=f"{instruction}\n\n{query}",
-                    config=types.GenerateContentConfig(
-                        temperature=0.5,
-                        max_output_tokens=1024
-                    )
-                )
-
-                latency = time.time() - start
-                latencies.append(latency)
-
-                # Use actual token count from response metadata if available, else estimate
-                text = response.text if hasattr(response, 'text') else ""
-                if hasattr(response, "usage_metadata") and response.usage_metadata and "total_tokens" in response.usage_metadata:
-                    token_count = response.usage_metadata["total_tokens"]
-                else:
-                    token_count = len(text.split())
-                token_counts.append(token_count)
-
-                successes += 1
-
-                print(f"✅ Query: {query[:50]}...")
-                print(f"   Latency: {latency:.2f}s, Tokens: ~{token_count}")
-
-            except Exception as e:
-                print(f"❌ Query failed: {query[:50]}... - {e}")
-
-        # Calculate metrics
-        avg_latency = sum(latencies) / len(latencies) if latencies else 0
-        avg_tokens = sum(token_counts) / len(token_counts) if token_counts else 0
-        success_rate = successes / len(test_queries)
-
-        # Estimate cost (simplified pricing as of 2025)
-        cost_per_1k_tokens = {
-            'gemini-2.5-flash': 0.00008,
-            'gemini-2.5-flash-lite': 0.00004,
-            'gemini-2.5-pro': 0.0005,
-            'gemini-2.0-flash': 0.0001,
-            'gemini-2.0-flash-live': 0.00015,
-        }
-
-        cost_estimate = (avg_tokens / 1000) * cost_per_1k_tokens.get(model, cost_per_1k_tokens['gemini-2.5-flash'])
-        # Quality score (based on success rate and latency)
-        quality_score = success_rate * (1.0 / (1.0 + avg_latency))
-
-        benchmark = ModelBenchmark(
-            model=model,
-            avg_latency=avg_latency,
-            avg_tokens=int(avg_tokens),
-            quality_score=quality_score,
-            cost_estimate=cost_estimate,
-            success_rate=success_rate
-        )
-
-        self.benchmarks[model] = benchmark
+        print(f"{'='*70}")
 
-        print("\n📊 RESULTS:")
-        print(f"   Avg Latency: {avg_latency:.2f}s")
-        print(f"   Avg Tokens: {avg_tokens:.0f}")
-        print(f"   Success Rate: {success_rate*100:.1f}%")
-        print(f"   Cost Estimate: ${cost_estimate:.6f} per query")
-        print(f"   Quality Score: {quality_score:.3f}")
+        self._record(await self.engine.run([model], test_queries, instruction))
+        self._print_results(model)
 
-        return benchmark
+        return self.benchmarks[model]
 
     async def compare_models(
         self,
         models: List[str],
         test_queries: List[str],
         instruction: str
-    ):
+    ) -> BenchmarkResult:
         """
         Compare multiple models on same queries.
 
@@ -152,17 +167,34 @@ class ModelSelector:
             models: List of models to compare
             test_queries: Test queries
             instruction: Agent instruction
+
+        Returns:
+            BenchmarkResult with per-model reports and raw samples
         """
 
         print(f"\n{'#'*70}")
         print("MODEL COMPARISON")
-        print(f"{'#'*70}\n")
+        print(f"{'#'*70}")
 
+        result = await self.engine.run(models, test_queries, instruction)
+        self._record(result)
         for model in models:
-            await self.benchmark_model(model, test_queries, instruction)
-            await asyncio.sleep(2)
+            self._print_results(model)
 
         self._print_comparison()
+        return result
+
+    def build_router(self, **kwargs) -> ModelRouter:
+        """
+        Create a runtime model router seeded with this selector's benchmarks.
+
+        Args:
+            **kwargs: ModelRouter settings (latency_slo_s, max_cost_per_request, ...)
+
+        Returns:
+            ModelRouter whose latency priors come from the benchmark p90s
+        """
+        return ModelRouter.from_benchmarks(self.benchmarks, COST_PER_1K_TOKENS, **kwargs)
 
     def _print_comparison(self):
         """Print comparison table."""
@@ -171,12 +203,14 @@ class ModelSelector:
         print("COMPARISON SUMMARY")
         print(f"{'='*70}\n")
 
-        print(f"{'Model':<30} {'Latency':>10} {'Tokens':>8} {'Cost':>10} {'Quality':>10}")
+        print(f"{'Model':<24} {'p50':>7} {'p99':>7} {'TTFT':>7} {'Tok/s':>7} "
+              f"{'Cost':>10} {'Quality':>8}")
         print(f"{'-'*70}")
 
         for model, bench in self.benchmarks.items():
-            print(f"{model:<30} {bench.avg_latency:>9.2f}s {bench.avg_tokens:>8} "
-                  f"${bench.cost_estimate:>9.6f} {bench.quality_score:>10.3f}")
+            print(f"{model:<24} {bench.p50_latency:>6.2f}s {bench.p99_latency:>6.2f}s "
+                  f"{bench.ttft:>6.2f}s {bench.tokens_per_second:>7.1f} "
+                  f"${bench.cost_estimate:>9.6f} {bench.quality_score:>8.3f}")
 
         print(f"\n{'='*70}")
 
@@ -315,6 +349,15 @@ def get_model_info(
     }
 
 
+# ============================================================================
+# MODEL ROUTER
+# ============================================================================
+
+# Routes each model call to flash-lite, flash or pro based on the request's
+# complexity and live latency/error statistics (see router.py)
+model_router = ModelRouter(default_profiles(COST_PER_1K_TOKENS))
+
+
 # ============================================================================
 # ROOT AGENT (required by ADK)
 # ============================================================================
@@ -348,7 +391,10 @@ Always be helpful, clear, and provide actionable recommendations.
     tools=[
         recommend_model_for_use_case,
         get_model_info
-    ]
+    ],
+    before_model_callback=model_router.before_model_callback,
+    after_model_callback=model_router.after_model_callback,
+    on_model_error_callback=model_router.on_model_error_callback
 )
 
 
@@ -451,6 +497,56 @@ def compare_models_detailed():
     return asyncio.run(run_comparison())
 
 
+def benchmark_models(
+    models: Optional[List[str]] = None,
+    config: Optional[BenchmarkConfig] = None,
+    client: Any = None,
+    output_path: str = "benchmark_results.json",
+    samples_path: Optional[str] = "benchmark_samples.csv",
+) -> Dict[str, Any]:
+    """
+    Run the benchmark suite and export the results.
+
+    Args:
+        models: Models to benchmark (defaults to the Gemini 2.x flash family)
+        config: Benchmark settings (defaults to 4 concurrent requests,
+            1 warmup, 3 repetitions)
+        client: Model client (defaults to google.genai.Client())
+        output_path: JSON file with config, per-model reports and raw samples
+        samples_path: CSV file with one row per request (None to skip)
+
+    Returns:
+        Dict mapping each model to its benchmark results
+    """
+    selector = ModelSelector(client=client, config=config)
+
+    test_queries = [
+        "What is the capital of France?",
+        "Explain quantum computing in simple terms",
+        "Write a haiku about artificial intelligence",
+        "Calculate the compound interest on $10,000 at 5% for 10 years",
+        "List the top 5 programming languages in 2025"
+    ]
+
+    instruction = "You are a helpful assistant. Answer questions accurately and concisely."
+
+    models_to_test = models or [
+        'gemini-2.5-flash',
+        'gemini-2.0-flash',
+        'gemini-2.5-flash-lite'
+    ]
+
+    result = asyncio.run(
+        selector.compare_models(models_to_test, test_queries, instruction)
+    )
+
+    export_json(result, output_path)
+    if samples_path:
+        export_samples_csv(result, samples_path)
+
+    return {k: v.__dict__ for k, v in selector.benchmarks.items()}
+
+
 if __name__ == '__main__':
     # Run standalone demo
     asyncio.run(demo_model_comparison())
@@ -0,0 +1,433 @@
+"""
+Tutorial 22: Concurrent model benchmark engine.
+
+Runs each model's queries concurrently at a configurable rate, with warmup
+and repetitions, and reports latency percentiles, time-to-first-token
+(via streaming), tokens/sec and bootstrap confidence intervals.
+
+Any client exposing `client.aio.models.generate_content_stream(...)` works:
+`google.genai.Client()` for real runs, `FakeModelClient` for offline runs.
+"""
+
+import asyncio
+import csv
+import json
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from google.genai import types
+
+
+# ============================================================================
+# CONFIGURATION & RESULTS
+# ============================================================================
+
+@dataclass
+class BenchmarkConfig:
+    """Benchmark run settings."""
+    concurrency: int = 4               # In-flight requests per model
+    rate_per_s: Optional[float] = None  # Request launch rate per model (None = unlimited)
+    warmup: int = 1                    # Unrecorded requests per model before measuring
+    repetitions: int = 3               # Times each query is sent
+    parallel_models: bool = True       # Benchmark all models at the same time
+    temperature: float = 0.5
+    max_output_tokens: int = 1024
+    timeout_s: float = 60.0
+    bootstrap_samples: int = 1000
+    confidence: float = 0.95
+    seed: int = 0
+
+
+@dataclass
+class Sample:
+    """One measured request."""
+    model: str
+    query_index: int
+    repetition: int
+    started_at_s: float                 # Offset from the start of the model's run
+    latency_s: float
+    ttft_s: Optional[float]
+    output_tokens: int
+    total_tokens: int
+    tokens_per_s: float
+    success: bool
+    error: str = ""
+
+
+@dataclass
+class ModelReport:
+    """Aggregated statistics for one model."""
+    model: str
+    requests: int
+    success_rate: float
+    latency_mean_s: float
+    latency_p50_s: float
+    latency_p90_s: float
+    latency_p99_s: float
+    ttft_p50_s: float
+    ttft_p90_s: float
+    tokens_per_s: float
+    avg_output_tokens: float
+    avg_total_tokens: float
+    # Bootstrap confidence intervals as (low, high)
+    latency_mean_ci_s: Tuple[float, float] = (0.0, 0.0)
+    latency_p50_ci_s: Tuple[float, float] = (0.0, 0.0)
+    tokens_per_s_ci: Tuple[float, float] = (0.0, 0.0)
+
+
+@dataclass
+class BenchmarkResult:
+    """Reports and raw samples of a benchmark run."""
+    config: BenchmarkConfig
+    reports: Dict[str, ModelReport] = field(default_factory=dict)
+    samples: List[Sample] = field(default_factory=list)
+    wall_time_s: float = 0.0
+
+
+# ============================================================================
+# STATISTICS
+# ============================================================================
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Percentile with linear interpolation (pct in 0-100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _mean(values: Sequence[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def bootstrap_ci(
+    values: Sequence[float],
+    statistic: Callable[[Sequence[float]], float],
+    samples: int = 1000,
+    confidence: float = 0.95,
+    rng: Optional[random.Random] = None,
+) -> Tuple[float, float]:
+    """
+    Percentile bootstrap confidence interval of a statistic.
+
+    Args:
+        values: Observed values
+        statistic: Function of a sample (e.g. mean, median)
+        samples: Number of bootstrap resamples
+        confidence: Interval coverage (e.g. 0.95)
+        rng: Random generator (seed it for reproducible intervals)
+
+    Returns:
+        (low, high) bounds
+    """
+    if not values:
+        return (0.0, 0.0)
+    if len(values) == 1:
+        return (values[0], values[0])
+
+    rng = rng or random.Random()
+    n = len(values)
+    estimates = [
+        statistic([values[rng.randrange(n)] for _ in range(n)])
+        for _ in range(samples)
+    ]
+    tail = (1 - confidence) / 2 * 100
+    return (percentile(estimates, tail), percentile(estimates, 100 - tail))
+
+
+def summarize(model: str, samples: List[Sample], config: BenchmarkConfig) -> ModelReport:
+    """Aggregate a model's samples into a report."""
+    ok = [s for s in samples if s.success]
+    latencies = [s.latency_s for s in ok]
+    ttfts = [s.ttft_s for s in ok if s.ttft_s is not None]
+    throughput = [s.tokens_per_s for s in ok]
+    rng = random.Random(config.seed)
+
+    def ci(values, statistic):
+        return bootstrap_ci(
+            values, statistic, config.bootstrap_samples, config.confidence, rng
+        )
+
+    return ModelReport(
+        model=model,
+        requests=len(samples),
+        success_rate=len(ok) / len(samples) if samples else 0.0,
+        latency_mean_s=_mean(latencies),
+        latency_p50_s=percentile(latencies, 50),
+        latency_p90_s=percentile(latencies, 90),
+        latency_p99_s=percentile(latencies, 99),
+        ttft_p50_s=percentile(ttfts, 50),
+        ttft_p90_s=percentile(ttfts, 90),
+        tokens_per_s=_mean(throughput),
+        avg_output_tokens=_mean([s.output_tokens for s in ok]),
+        avg_total_tokens=_mean([s.total_tokens for s in ok]),
+        latency_mean_ci_s=ci(latencies, _mean),
+        latency_p50_ci_s=ci(latencies, lambda v: percentile(v, 50)),
+        tokens_per_s_ci=ci(throughput, _mean),
+    )
+
+
+# ============================================================================
+# BENCHMARK ENGINE
+# ============================================================================
+
+class BenchmarkEngine:
+    """Runs concurrent, rate-limited, repeated benchmarks over a client."""
+
+    def __init__(self, client: Any = None, config: Optional[BenchmarkConfig] = None):
+        """
+        Args:
+            client: Object with `aio.models.generate_content_stream`
+                (defaults to google.genai.Client())
+            config: Benchmark settings
+        """
+        if client is None:
+            from google.genai import Client
+            client = Client()
+        self.client = client
+        self.config = config or BenchmarkConfig()
+
+    async def _measure(
+        self, model: str, contents: str, query_index: int, repetition: int, t0: float
+    ) -> Sample:
+        """Send one streaming request and time it."""
+        cfg = self.config
+        started = time.perf_counter()
+        ttft = None
+        text_parts = []
+        output_tokens = 0
+        total_tokens = 0
+
+        async def consume():
+            nonlocal ttft, output_tokens, total_tokens
+            stream = await self.client.aio.models.generate_content_stream(
+                model=model,
+                contents=contents,
+                config=types.GenerateContentConfig(
+                    temperature=cfg.temperature,
+                    max_output_tokens=cfg.max_output_tokens,
+                ),
+            )
+            async for chunk in stream:
+                text = getattr(chunk, "text", None)
+                if text:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    text_parts.append(text)
+                usage = getattr(chunk, "usage_metadata", None)
+                if usage is not None:
+                    output_tokens = usage.candidates_token_count or output_tokens
+                    total_tokens = usage.total_token_count or total_tokens
+
+        try:
+            await asyncio.wait_for(consume(), timeout=cfg.timeout_s)
+        except Exception as e:
+            return Sample(
+                model=model,
+                query_index=query_index,
+                repetition=repetition,
+                started_at_s=started - t0,
+                latency_s=time.perf_counter() - started,
+                ttft_s=ttft,
+                output_tokens=0,
+                total_tokens=0,
+                tokens_per_s=0.0,
+                success=False,
+                error=f"{type(e).__name__}: {e}",
+            )
+
+        latency = time.perf_counter() - started
+        if not output_tokens:
+            # No usage metadata: estimate from the streamed text
+            output_tokens = len("".join(text_parts).split())
+        total_tokens = total_tokens or output_tokens
+
+        # Generation throughput: output tokens over the time after the first token
+        generation_s = latency - (ttft or 0.0)
+        tokens_per_s = output_tokens / generation_s if generation_s > 0 else 0.0
+
+        return Sample(
+            model=model,
+            query_index=query_index,
+            repetition=repetition,
+            started_at_s=started - t0,
+            latency_s=latency,
+            ttft_s=ttft,
+            output_tokens=output_tokens,
+            total_tokens=total_tokens,
+            tokens_per_s=tokens_per_s,
+            success=True,
+        )
+
+    async def run_model(
+        self, model: str, queries: List[str], instruction: str
+    ) -> List[Sample]:
+        """Benchmark one model: warmup, then queries x repetitions concurrently.
+
+        Raises:
+            ValueError: If there are no queries
+        """
+        if not queries:
+            raise ValueError("Benchmark needs at least one query")
+        cfg = self.config
+        prompts = [f"{instruction}\n\n{query}" for query in queries]
+
+        # Warmup requests prime connections and caches; results are discarded
+        t0 = time.perf_counter()
+        for i in range(cfg.warmup):
+            await self._measure(model, prompts[i % len(prompts)], i, -1, t0)
+
+        jobs = [
+            (query_index, repetition)
+            for repetition in range(cfg.repetitions)
+            for query_index in range(len(prompts))
+        ]
+        semaphore = asyncio.Semaphore(cfg.concurrency)
+        t0 = time.perf_counter()
+
+        async def launch(slot: int, query_index: int, repetition: int) -> Sample:
+            if cfg.rate_per_s:
+                # Open-loop schedule: request `slot` starts at slot / rate
+                delay = t0 + slot / cfg.rate_per_s - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            async with semaphore:
+                return await self._measure(
+                    model, prompts[query_index], query_index, repetition, t0
+                )
+
+        return list(
+            await asyncio.gather(
+                *(launch(slot, q, r) for slot, (q, r) in enumerate(jobs))
+            )
+        )
+
+    async def run(
+        self, models: List[str], queries: List[str], instruction: str
+    ) -> BenchmarkResult:
+        """Benchmark several models and aggregate the results."""
+        result = BenchmarkResult(config=self.config)
+        start = time.perf_counter()
+
+        if self.config.parallel_models:
+            per_model = await asyncio.gather(
+                *(self.run_model(model, queries, instruction) for model in models)
+            )
+        else:
+            per_model = [
+                await self.run_model(model, queries, instruction) for model in models
+            ]
+
+        for model, samples in zip(models, per_model):
+            result.samples.extend(samples)
+            result.reports[model] = summarize(model, samples, self.config)
+
+        result.wall_time_s = time.perf_counter() - start
+        return result
+
+
+# ============================================================================
+# EXPORT
+# ============================================================================
+
+def export_samples_csv(result: BenchmarkResult, path: str) -> None:
+    """Write one row per measured request."""
+    fieldnames = list(Sample.__dataclass_fields__)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for sample in result.samples:
+            writer.writerow(asdict(sample))
+
+
+def export_json(result: BenchmarkResult, path: str) -> None:
+    """Write config, per-model reports and raw samples."""
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "config": asdict(result.config),
+                "wall_time_s": result.wall_time_s,
+                "reports": {m: asdict(r) for m, r in result.reports.items()},
+                "samples": [asdict(s) for s in result.samples],
+            },
+            f,
+            indent=2,
+        )
+
+
+# ============================================================================
+# FAKE CLIENT (offline runs and tests)
+# ============================================================================
+
+@dataclass
+class FakeModelProfile:
+    """Synthetic latency behaviour of one model."""
+    ttft_s: float = 0.05
+    tokens_per_s: float = 500.0
+    output_tokens: int = 40
+    chunk_tokens: int = 10
+    jitter: float = 0.1          # Relative random variation of timings
+    error_rate: float = 0.0
+
+
+class FakeModelClient:
+    """
+    Offline stand-in for google.genai.Client streaming.
+
+    Exposes `aio.models.generate_content_stream` and yields chunks with text
+    and usage metadata after simulated delays. Tracks call start times and
+    peak concurrency so the harness itself can be tested.
+    """
+
+    def __init__(
+        self,
+        profiles: Optional[Dict[str, FakeModelProfile]] = None,
+        seed: int = 0,
+    ):
+        self.profiles = profiles or {}
+        self.rng = random.Random(seed)
+        self.calls: List[Tuple[str, float]] = []
+        self.in_flight: Dict[str, int] = {}
+        self.max_in_flight: Dict[str, int] = {}
+        self.aio = SimpleNamespace(models=self)
+
+    def _scaled(self, seconds: float, profile: FakeModelProfile) -> float:
+        return max(0.0, seconds * (1 + self.rng.uniform(-profile.jitter, profile.jitter)))
+
+    async def generate_content_stream(self, model: str, contents: Any, config: Any = None):
+        profile = self.profiles.get(model, FakeModelProfile())
+        self.calls.append((model, time.perf_counter()))
+        return self._stream(model, profile)
+
+    async def _stream(self, model: str, profile: FakeModelProfile):
+        self.in_flight[model] = self.in_flight.get(model, 0) + 1
+        self.max_in_flight[model] = max(
+            self.max_in_flight.get(model, 0), self.in_flight[model]
+        )
+        try:
+            await asyncio.sleep(self._scaled(profile.ttft_s, profile))
+            if self.rng.random() < profile.error_rate:
+                raise RuntimeError(f"{model}: simulated server error")
+
+            emitted = 0
+            while emitted < profile.output_tokens:
+                n = min(profile.chunk_tokens, profile.output_tokens - emitted)
+                if emitted:
+                    await asyncio.sleep(self._scaled(n / profile.tokens_per_s, profile))
+                emitted += n
+                done = emitted >= profile.output_tokens
+                yield SimpleNamespace(
+                    text=" ".join(["tok"] * n) + " ",
+                    usage_metadata=SimpleNamespace(
+                        candidates_token_count=emitted,
+                        total_token_count=emitted + 20,
+                    ) if done else None,
+                )
+        finally:
+            self.in_flight[model] -= 1
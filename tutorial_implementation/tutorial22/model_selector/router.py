@@ -0,0 +1,367 @@
+"""
+Tutorial 22: Latency/cost-aware model router.
+
+Picks the model for each request from a request-complexity estimate, live
+rolling latency/error statistics and a per-request latency SLO and cost
+ceiling. Cheap models take the requests they can handle; pro is used only
+when the request needs it. A model whose error rate or latency degrades
+stops receiving traffic until its bad samples age out of the window.
+
+Plug it into an agent through its callbacks:
+
+    router = ModelRouter.from_benchmarks(selector.benchmarks, COST_PER_1K_TOKENS)
+    agent = Agent(
+        ...,
+        before_model_callback=router.before_model_callback,
+        after_model_callback=router.after_model_callback,
+        on_model_error_callback=router.on_model_error_callback,
+    )
+"""
+
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from .benchmark import percentile
+
+
+# ============================================================================
+# MODEL PROFILES
+# ============================================================================
+
+# Capability tiers: a request needing tier N can use any model of tier >= N
+MODEL_TIERS = {
+    'gemini-2.5-flash-lite': 0,
+    'gemini-2.5-flash': 1,
+    'gemini-2.5-pro': 2,
+}
+
+# p90 latency seeds used until live statistics are available
+PRIOR_P90_LATENCY_S = {
+    'gemini-2.5-flash-lite': 1.0,
+    'gemini-2.5-flash': 2.5,
+    'gemini-2.5-pro': 8.0,
+}
+
+REASONING_KEYWORDS = (
+    'prove', 'derive', 'step by step', 'analyze', 'analyse', 'architecture',
+    'trade-off', 'tradeoff', 'optimize', 'debug', 'algorithm', 'strategy',
+    'complex', 'reasoning', 'design', 'plan',
+)
+
+
+@dataclass
+class ModelProfile:
+    """Static properties of a routable model."""
+    name: str
+    tier: int
+    cost_per_1k_tokens: float
+    prior_p90_latency_s: float
+
+
+@dataclass
+class RouteDecision:
+    """Why a model was picked for a request."""
+    model: str
+    complexity: float
+    required_tier: int
+    predicted_latency_s: float
+    estimated_cost: float
+    reason: str
+    fallback: bool = False
+
+
+def default_profiles(cost_per_1k_tokens: Dict[str, float]) -> List[ModelProfile]:
+    """Profiles for the Gemini 2.5 family from a pricing table."""
+    return [
+        ModelProfile(
+            name=name,
+            tier=tier,
+            cost_per_1k_tokens=cost_per_1k_tokens[name],
+            prior_p90_latency_s=PRIOR_P90_LATENCY_S[name],
+        )
+        for name, tier in MODEL_TIERS.items()
+    ]
+
+
+# ============================================================================
+# REQUEST COMPLEXITY
+# ============================================================================
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return len(text) // 4
+
+
+def estimate_complexity(text: str, turns: int = 1) -> float:
+    """
+    Score how demanding a request is, from 0 (trivial) to 1 (hard).
+
+    Args:
+        text: Latest user message
+        turns: Number of contents in the conversation so far
+
+    Returns:
+        Complexity score in [0, 1]
+    """
+    lowered = text.lower()
+    score = min(estimate_tokens(text) / 400, 1.0) * 0.35
+    score += min(sum(0.15 for k in REASONING_KEYWORDS if k in lowered), 0.45)
+    if '```' in text or 'def ' in text or 'class ' in text:
+        score += 0.1
+    score += min(turns / 20, 1.0) * 0.1
+    return min(score, 1.0)
+
+
+def _latest_user_text(llm_request: LlmRequest) -> str:
+    for content in reversed(llm_request.contents or []):
+        if content.role == 'user':
+            text = ''.join(p.text or '' for p in content.parts or [])
+            if text:
+                return text
+    return ''
+
+
+# ============================================================================
+# ROLLING STATISTICS
+# ============================================================================
+
+class RollingStats:
+    """Latency and error samples of one model over a sliding time window."""
+
+    def __init__(self, window_s: float, max_samples: int):
+        self.window_s = window_s
+        self.samples: Deque[Tuple[float, float, bool]] = deque(maxlen=max_samples)
+
+    def add(self, now: float, latency_s: float, success: bool) -> None:
+        self.samples.append((now, latency_s, success))
+
+    def prune(self, now: float) -> None:
+        while self.samples and now - self.samples[0][0] > self.window_s:
+            self.samples.popleft()
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, _, ok in self.samples if not ok) / len(self.samples)
+
+    @property
+    def p90_latency_s(self) -> float:
+        return percentile([lat for _, lat, ok in self.samples if ok], 90)
+
+
+# ============================================================================
+# ROUTER
+# ============================================================================
+
+class ModelRouter:
+    """Routes each model request to the cheapest model that meets its needs."""
+
+    def __init__(
+        self,
+        profiles: List[ModelProfile],
+        latency_slo_s: float = 10.0,
+        max_cost_per_request: float = 0.001,
+        expected_output_tokens: int = 500,
+        window_s: float = 300.0,
+        max_samples: int = 200,
+        min_samples: int = 5,
+        max_error_rate: float = 0.2,
+        tier_thresholds: Tuple[float, float] = (0.3, 0.6),
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            profiles: Routable models
+            latency_slo_s: Per-request p90 latency objective
+            max_cost_per_request: Cost ceiling per request (USD)
+            expected_output_tokens: Output tokens assumed for cost estimates
+            window_s: Age after which samples are forgotten
+            max_samples: Samples kept per model
+            min_samples: Samples needed before live stats override priors
+            max_error_rate: Error rate above which a model is degraded
+            tier_thresholds: Complexity scores at which tiers 1 and 2 are required
+            clock: Time source (injectable for simulations)
+        """
+        if not profiles:
+            raise ValueError("ModelRouter needs at least one model profile")
+        self.profiles = {p.name: p for p in profiles}
+        self.latency_slo_s = latency_slo_s
+        self.max_cost_per_request = max_cost_per_request
+        self.expected_output_tokens = expected_output_tokens
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.tier_thresholds = tier_thresholds
+        self.clock = clock
+        self.stats = {p.name: RollingStats(window_s, max_samples) for p in profiles}
+        self.routed: Counter = Counter()
+        self.last_decision: Optional[RouteDecision] = None
+        self._pending: Dict[Tuple[str, str], Tuple[str, float]] = {}
+
+    @classmethod
+    def from_benchmarks(
+        cls,
+        benchmarks: Dict[str, Any],
+        cost_per_1k_tokens: Dict[str, float],
+        **kwargs,
+    ) -> "ModelRouter":
+        """
+        Build a router seeded with ModelSelector benchmark results.
+
+        Benchmarked p90 latencies replace the static priors; models without
+        a benchmark keep them.
+        """
+        profiles = default_profiles(cost_per_1k_tokens)
+        for profile in profiles:
+            bench = benchmarks.get(profile.name)
+            if bench is not None and bench.success_rate > 0:
+                profile.prior_p90_latency_s = bench.p90_latency or bench.avg_latency
+        return cls(profiles, **kwargs)
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def record(self, model: str, latency_s: float, success: bool) -> None:
+        """Add an observed request outcome for a model."""
+        if model in self.stats:
+            self.stats[model].add(self.clock(), latency_s, success)
+
+    def _live(self, model: str) -> RollingStats:
+        stats = self.stats[model]
+        stats.prune(self.clock())
+        return stats
+
+    def predicted_latency_s(self, model: str) -> float:
+        """Rolling p90 latency, or the prior until enough samples exist."""
+        stats = self._live(model)
+        successes = sum(1 for _, _, ok in stats.samples if ok)
+        if successes >= self.min_samples:
+            return stats.p90_latency_s
+        return self.profiles[model].prior_p90_latency_s
+
+    def is_healthy(self, model: str) -> bool:
+        """A model is degraded while its windowed error rate is too high."""
+        stats = self._live(model)
+        return len(stats) < self.min_samples or stats.error_rate <= self.max_error_rate
+
+    def estimated_cost(self, model: str, prompt_tokens: int) -> float:
+        tokens = prompt_tokens + self.expected_output_tokens
+        return tokens / 1000 * self.profiles[model].cost_per_1k_tokens
+
+    def required_tier(self, complexity: float) -> int:
+        return sum(1 for threshold in self.tier_thresholds if complexity >= threshold)
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def choose(self, complexity: float, prompt_tokens: int = 0) -> RouteDecision:
+        """
+        Pick a model for a request.
+
+        Preference order:
+        1. Cheapest healthy model of the required tier within SLO and budget
+        2. Fallback: most capable healthy model within SLO and budget
+        3. Fallback: fastest healthy model within budget
+        4. Fallback: model with the lowest error rate
+        """
+        tier = self.required_tier(complexity)
+        healthy = [m for m in self.profiles if self.is_healthy(m)]
+        affordable = [
+            m for m in healthy
+            if self.estimated_cost(m, prompt_tokens) <= self.max_cost_per_request
+        ]
+        in_slo = [
+            m for m in affordable
+            if self.predicted_latency_s(m) <= self.latency_slo_s
+        ]
+        capable = [m for m in in_slo if self.profiles[m].tier >= tier]
+
+        if capable:
+            model = min(capable, key=lambda m: (
+                self.estimated_cost(m, prompt_tokens), self.profiles[m].tier
+            ))
+            reason, fallback = f"cheapest tier>={tier} model within SLO and budget", False
+        elif in_slo:
+            model = max(in_slo, key=lambda m: self.profiles[m].tier)
+            reason, fallback = f"no tier>={tier} model within SLO and budget", True
+        elif affordable:
+            model = min(affordable, key=self.predicted_latency_s)
+            reason, fallback = "no model within SLO; using fastest", True
+        else:
+            model = min(self.profiles, key=lambda m: self._live(m).error_rate)
+            reason, fallback = "no healthy model within budget", True
+
+        decision = RouteDecision(
+            model=model,
+            complexity=complexity,
+            required_tier=tier,
+            predicted_latency_s=self.predicted_latency_s(model),
+            estimated_cost=self.estimated_cost(model, prompt_tokens),
+            reason=reason,
+            fallback=fallback,
+        )
+        self.routed[model] += 1
+        self.last_decision = decision
+        return decision
+
+    def route(self, llm_request: LlmRequest) -> RouteDecision:
+        """Estimate a request's complexity and size, then choose a model."""
+        text = _latest_user_text(llm_request)
+        contents = llm_request.contents or []
+        prompt_tokens = sum(
+            estimate_tokens(p.text or '') for c in contents for p in c.parts or []
+        )
+        return self.choose(estimate_complexity(text, len(contents)), prompt_tokens)
+
+    # ------------------------------------------------------------------
+    # ADK callbacks
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _key(callback_context: CallbackContext) -> Tuple[str, str]:
+        return (callback_context.invocation_id, callback_context.agent_name)
+
+    def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        """Rewrite the request's model and start timing the call."""
+        decision = self.route(llm_request)
+        llm_request.model = decision.model
+        self._pending[self._key(callback_context)] = (decision.model, self.clock())
+        return None
+
+    def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        """Record latency and outcome of the routed call."""
+        if llm_response.partial:
+            return None
+        pending = self._pending.pop(self._key(callback_context), None)
+        if pending is not None:
+            model, started = pending
+            self.record(model, self.clock() - started, not llm_response.error_code)
+        return None
+
+    def on_model_error_callback(
+        self,
+        callback_context: CallbackContext,
+        llm_request: LlmRequest,
+        error: Exception,
+    ) -> Optional[LlmResponse]:
+        """Count a failed call against the routed model."""
+        pending = self._pending.pop(self._key(callback_context), None)
+        if pending is not None:
+            model, started = pending
+            self.record(model, self.clock() - started, False)
+        return None
@@ -0,0 +1,198 @@
+# Tutorial 22: Model Selection & Optimization - Benchmark Engine Tests
+# Validates the concurrent benchmark harness offline with FakeModelClient
+
+import csv
+import json
+import random
+
+import pytest
+
+from model_selector.benchmark import (
+    BenchmarkConfig,
+    BenchmarkEngine,
+    FakeModelClient,
+    FakeModelProfile,
+    bootstrap_ci,
+    percentile,
+)
+
+QUERIES = ["q1", "q2", "q3", "q4"]
+INSTRUCTION = "Answer concisely."
+
+
+def _config(**overrides):
+    settings = dict(concurrency=4, warmup=0, repetitions=2, bootstrap_samples=200)
+    settings.update(overrides)
+    return BenchmarkConfig(**settings)
+
+
+class TestStatistics:
+    """Test percentile and bootstrap helpers."""
+
+    def test_percentile_interpolates(self):
+        """Test percentiles use linear interpolation."""
+        values = [1.0, 2.0, 3.0, 4.0, 5.0]
+
+        assert percentile(values, 50) == 3.0
+        assert percentile(values, 90) == pytest.approx(4.6)
+        assert percentile([], 50) == 0.0
+
+    def test_bootstrap_ci_contains_mean(self):
+        """Test the bootstrap interval brackets the sample mean."""
+        rng = random.Random(1)
+        values = [rng.gauss(10, 1) for _ in range(200)]
+        mean = sum(values) / len(values)
+
+        low, high = bootstrap_ci(
+            values, lambda v: sum(v) / len(v), samples=500, rng=random.Random(0)
+        )
+
+        assert low < mean < high
+        assert high - low < 1.0
+
+    def test_bootstrap_ci_reproducible(self):
+        """Test a seeded generator gives identical intervals."""
+        values = [0.1, 0.5, 0.2, 0.9, 0.4]
+        mean = lambda v: sum(v) / len(v)  # noqa: E731
+
+        assert bootstrap_ci(values, mean, rng=random.Random(3)) == bootstrap_ci(
+            values, mean, rng=random.Random(3)
+        )
+
+
+class TestBenchmarkEngine:
+    """Test the engine against the fake client."""
+
+    @pytest.mark.asyncio
+    async def test_runs_queries_concurrently(self):
+        """Test requests overlap up to the concurrency limit."""
+        client = FakeModelClient({"m": FakeModelProfile(ttft_s=0.05)})
+        engine = BenchmarkEngine(client, _config(concurrency=3, repetitions=3))
+
+        result = await engine.run(["m"], QUERIES, INSTRUCTION)
+
+        assert len(result.samples) == len(QUERIES) * 3
+        assert client.max_in_flight["m"] == 3
+        serial_time = sum(s.latency_s for s in result.samples)
+        assert result.wall_time_s < serial_time / 2
+
+    @pytest.mark.asyncio
+    async def test_warmup_not_recorded(self):
+        """Test warmup requests are sent but excluded from samples."""
+        client = FakeModelClient()
+        engine = BenchmarkEngine(client, _config(warmup=2, repetitions=1))
+
+        result = await engine.run(["m"], QUERIES, INSTRUCTION)
+
+        assert len(client.calls) == len(QUERIES) + 2
+        assert len(result.samples) == len(QUERIES)
+        assert all(s.repetition >= 0 for s in result.samples)
+
+    @pytest.mark.asyncio
+    async def test_no_queries_rejected(self):
+        """Test an empty query list is a clear error, even with warmup."""
+        client = FakeModelClient()
+        engine = BenchmarkEngine(client, _config(warmup=2))
+
+        with pytest.raises(ValueError, match="at least one query"):
+            await engine.run(["m"], [], INSTRUCTION)
+        assert client.calls == []
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_spaces_launches(self):
+        """Test request starts follow the configured rate."""
+        client = FakeModelClient({"m": FakeModelProfile(ttft_s=0.001)})
+        engine = BenchmarkEngine(client, _config(rate_per_s=50, repetitions=2))
+
+        await engine.run(["m"], QUERIES, INSTRUCTION)
+
+        starts = sorted(t for _, t in client.calls)
+        # 8 launches at 50/s span at least 7 intervals of 20ms
+        assert starts[-1] - starts[0] >= 7 / 50 * 0.9
+
+    @pytest.mark.asyncio
+    async def test_reports_streaming_metrics(self):
+        """Test TTFT, percentiles and throughput reflect the model profile."""
+        profiles = {
+            "fast": FakeModelProfile(ttft_s=0.01, tokens_per_s=2000, jitter=0.0),
+            "slow": FakeModelProfile(ttft_s=0.08, tokens_per_s=400, jitter=0.0),
+        }
+        engine = BenchmarkEngine(FakeModelClient(profiles), _config())
+
+        result = await engine.run(["fast", "slow"], QUERIES, INSTRUCTION)
+
+        fast, slow = result.reports["fast"], result.reports["slow"]
+        assert fast.ttft_p50_s < slow.ttft_p50_s
+        assert slow.ttft_p50_s >= 0.08
+        assert fast.latency_p50_s <= fast.latency_p90_s <= fast.latency_p99_s
+        assert fast.tokens_per_s > slow.tokens_per_s
+        assert fast.avg_output_tokens == 40
+        low, high = slow.latency_mean_ci_s
+        assert low <= slow.latency_mean_s <= high
+
+    @pytest.mark.asyncio
+    async def test_failures_counted(self):
+        """Test failed requests lower the success rate without raising."""
+        client = FakeModelClient({"m": FakeModelProfile(error_rate=1.0)})
+        engine = BenchmarkEngine(client, _config())
+
+        result = await engine.run(["m"], QUERIES, INSTRUCTION)
+
+        assert result.reports["m"].success_rate == 0.0
+        assert all("simulated server error" in s.error for s in result.samples)
+
+    @pytest.mark.asyncio
+    async def test_timeout_recorded_as_failure(self):
+        """Test requests exceeding the timeout are failed samples."""
+        client = FakeModelClient({"m": FakeModelProfile(ttft_s=1.0)})
+        engine = BenchmarkEngine(client, _config(timeout_s=0.05, repetitions=1))
+
+        result = await engine.run(["m"], QUERIES, INSTRUCTION)
+
+        assert not any(s.success for s in result.samples)
+        assert all("TimeoutError" in s.error for s in result.samples)
+
+
+class TestModelSelectorIntegration:
+    """Test ModelSelector and exports on top of the engine."""
+
+    @pytest.mark.asyncio
+    async def test_compare_models_fills_benchmarks(self):
+        """Test compare_models records percentile fields per model."""
+        from model_selector.agent import ModelSelector
+
+        selector = ModelSelector(client=FakeModelClient(), config=_config())
+
+        await selector.compare_models(["gemini-2.5-flash", "gemini-2.5-pro"],
+                                      QUERIES, INSTRUCTION)
+
+        bench = selector.benchmarks["gemini-2.5-pro"]
+        assert bench.success_rate == 1.0
+        assert bench.p50_latency > 0
+        assert bench.ttft > 0
+        assert bench.avg_tokens == 60
+        assert (selector.benchmarks["gemini-2.5-pro"].cost_estimate
+                > selector.benchmarks["gemini-2.5-flash"].cost_estimate)
+
+    def test_benchmark_models_exports(self, tmp_path):
+        """Test benchmark_models writes JSON reports and CSV samples."""
+        from model_selector.agent import benchmark_models
+
+        json_path, csv_path = tmp_path / "results.json", tmp_path / "samples.csv"
+
+        results = benchmark_models(
+            models=["gemini-2.5-flash"],
+            config=_config(repetitions=1),
+            client=FakeModelClient(),
+            output_path=str(json_path),
+            samples_path=str(csv_path),
+        )
+
+        data = json.loads(json_path.read_text())
+        assert data["reports"]["gemini-2.5-flash"]["requests"] == 5
+        assert len(data["samples"]) == 5
+        with open(csv_path) as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == 5
+        assert {"latency_s", "ttft_s", "tokens_per_s"} <= set(rows[0])
+        assert results["gemini-2.5-flash"]["success_rate"] == 1.0
@@ -0,0 +1,218 @@
+# Tutorial 22: Model Selection & Optimization - Router Tests
+# Simulates routed traffic against a synthetic latency model
+
+import random
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from model_selector.agent import COST_PER_1K_TOKENS, ModelBenchmark
+from model_selector.benchmark import percentile
+from model_selector.router import ModelRouter, default_profiles, estimate_complexity
+
+LITE, FLASH, PRO = 'gemini-2.5-flash-lite', 'gemini-2.5-flash', 'gemini-2.5-pro'
+
+SIMPLE = "What is the capital of France?"
+MEDIUM = ("Explain step by step how to plan a migration from a monolith to "
+          "microservices for a small web app with a single Postgres database.")
+HARD = ("Analyze the architecture of this distributed system, derive the "
+        "failure modes step by step and design a strategy to optimize it:\n"
+        "```\nclass Cluster: ...\n```\n" * 3)
+
+
+class Clock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SyntheticModels:
+    """Per-model latency (lognormal around a median) and error behaviour."""
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.median_s = {LITE: 0.6, FLASH: 1.5, PRO: 5.0}
+        self.error_rate = {LITE: 0.0, FLASH: 0.0, PRO: 0.0}
+
+    def call(self, model):
+        latency = self.median_s[model] * self.rng.lognormvariate(0, 0.25)
+        return latency, self.rng.random() >= self.error_rate[model]
+
+
+def _router(clock, **kwargs):
+    return ModelRouter(default_profiles(COST_PER_1K_TOKENS), clock=clock, **kwargs)
+
+
+def _simulate(router, models, clock, prompts, interval_s=1.0):
+    """Route each prompt, 'execute' it on the synthetic model, record it."""
+    chosen, latencies = [], []
+    for text in prompts:
+        decision = router.choose(estimate_complexity(text), len(text) // 4)
+        latency, ok = models.call(decision.model)
+        router.record(decision.model, latency, ok)
+        chosen.append(decision)
+        latencies.append(latency)
+        clock.now += interval_s
+    return chosen, latencies
+
+
+class TestComplexity:
+    """Test the request-complexity estimate."""
+
+    def test_complexity_orders_requests(self):
+        """Test harder requests score higher."""
+        assert estimate_complexity(SIMPLE) < estimate_complexity(MEDIUM)
+        assert estimate_complexity(MEDIUM) < estimate_complexity(HARD)
+        assert 0.0 <= estimate_complexity(HARD * 10, turns=100) <= 1.0
+
+    def test_priors_route_by_tier(self):
+        """Test each difficulty goes to the cheapest sufficient model."""
+        router = _router(Clock())
+
+        assert router.choose(estimate_complexity(SIMPLE)).model == LITE
+        assert router.choose(estimate_complexity(MEDIUM)).model == FLASH
+        assert router.choose(estimate_complexity(HARD)).model == PRO
+
+
+class TestRoutingSimulation:
+    """Test routing decisions over simulated traffic."""
+
+    def test_mixed_traffic_prefers_cheap_models(self):
+        """Test flash-lite takes the bulk and pro only the hard requests."""
+        clock, models = Clock(), SyntheticModels()
+        router = _router(clock, latency_slo_s=10.0)
+        prompts = [SIMPLE] * 70 + [MEDIUM] * 20 + [HARD] * 10
+        random.Random(1).shuffle(prompts)
+
+        chosen, latencies = _simulate(router, models, clock, prompts)
+
+        counts = Counter(d.model for d in chosen)
+        assert counts == {LITE: 70, FLASH: 20, PRO: 10}
+        assert percentile(latencies, 90) <= 10.0
+        routed_cost = sum(d.estimated_cost for d in chosen)
+        all_pro_cost = sum(router.estimated_cost(PRO, len(p) // 4) for p in prompts)
+        assert routed_cost < all_pro_cost / 4
+
+    def test_degraded_model_falls_back_and_recovers(self):
+        """Test errors move traffic off a model until the window expires."""
+        clock, models = Clock(), SyntheticModels()
+        router = _router(clock, window_s=60.0)
+
+        models.error_rate[LITE] = 1.0
+        outage, _ = _simulate(router, models, clock, [SIMPLE] * 30)
+        assert outage[0].model == LITE
+        assert not router.is_healthy(LITE)
+        # After min_samples failures, simple requests go to flash
+        assert {d.model for d in outage[10:]} == {FLASH}
+        assert all(d.fallback is False for d in outage[10:])
+
+        models.error_rate[LITE] = 0.0
+        clock.now += 61
+        recovered, _ = _simulate(router, models, clock, [SIMPLE] * 10)
+        assert {d.model for d in recovered} == {LITE}
+
+    def test_latency_slo_excludes_slow_model(self):
+        """Test hard requests fall back when pro's live p90 breaks the SLO."""
+        clock, models = Clock(), SyntheticModels()
+        router = _router(clock, latency_slo_s=8.0)
+
+        models.median_s[PRO] = 20.0
+        chosen, _ = _simulate(router, models, clock, [HARD] * 20)
+
+        assert chosen[0].model == PRO
+        assert router.predicted_latency_s(PRO) > 8.0
+        assert chosen[-1].model == FLASH
+        assert chosen[-1].fallback is True
+
+    def test_cost_ceiling_excludes_expensive_model(self):
+        """Test pro is skipped when it would exceed the cost ceiling."""
+        router = _router(Clock(), max_cost_per_request=0.0001)
+
+        decision = router.choose(estimate_complexity(HARD), len(HARD) // 4)
+
+        assert decision.model == FLASH
+        assert decision.fallback is True
+        assert decision.estimated_cost <= 0.0001
+
+    def test_all_models_down_still_routes(self):
+        """Test a decision is always returned."""
+        clock = Clock()
+        router = _router(clock)
+
+        for model in (LITE, FLASH, PRO):
+            for _ in range(5):
+                router.record(model, 1.0, model == PRO and _ == 0)
+
+        assert router.choose(0.0).model == PRO
+
+    def test_from_benchmarks_uses_measured_latency(self):
+        """Test benchmark p90s replace the static priors."""
+        slow_lite = ModelBenchmark(
+            model=LITE, avg_latency=9.0, avg_tokens=50, quality_score=0.1,
+            cost_estimate=0.0, success_rate=1.0, p90_latency=12.0,
+        )
+        router = ModelRouter.from_benchmarks(
+            {LITE: slow_lite}, COST_PER_1K_TOKENS, latency_slo_s=10.0
+        )
+
+        assert router.predicted_latency_s(LITE) == 12.0
+        assert router.choose(estimate_complexity(SIMPLE)).model == FLASH
+
+
+class TestRouterCallbacks:
+    """Test the ADK callback integration."""
+
+    def _request(self, text):
+        return LlmRequest(
+            model='gemini-2.5-flash',
+            contents=[types.Content(role='user', parts=[types.Part(text=text)])],
+        )
+
+    def test_before_model_callback_rewrites_model(self):
+        """Test the request's model is replaced by the routed model."""
+        clock = Clock()
+        router = _router(clock)
+        context = SimpleNamespace(invocation_id='inv-1', agent_name='agent')
+        request = self._request(SIMPLE)
+
+        assert router.before_model_callback(context, request) is None
+        assert request.model == LITE
+
+        clock.now += 0.7
+        router.after_model_callback(context, LlmResponse(partial=True))
+        assert len(router.stats[LITE]) == 0
+        router.after_model_callback(context, LlmResponse())
+        assert router.stats[LITE].samples[0][1:] == (0.7, True)
+
+    def test_model_errors_recorded(self):
+        """Test failed calls count against the routed model."""
+        router = _router(Clock())
+        context = SimpleNamespace(invocation_id='inv-1', agent_name='agent')
+
+        for _ in range(5):
+            request = self._request(SIMPLE)
+            router.before_model_callback(context, request)
+            router.on_model_error_callback(context, request, RuntimeError("503"))
+
+        assert router.stats[LITE].error_rate == 1.0
+        assert router.route(self._request(SIMPLE)).model == FLASH
+
+    def test_root_agent_uses_router(self):
+        """Test the agent routes its model calls."""
+        from model_selector.agent import model_router, root_agent
+
+        assert root_agent.before_model_callback == model_router.before_model_callback
+        assert root_agent.after_model_callback == model_router.after_model_callback
+
+    def test_invalid_router(self):
+        """Test a router needs models."""
+        with pytest.raises(ValueError):
+            ModelRouter([])
@@ -5,7 +5,7 @@ This agent demonstrates comprehensive observability patterns including:
 - SaveFilesAsArtifactsPlugin for automatic file saving
 - MetricsCollectorPlugin for request/response tracking
 - AlertingPlugin for error detection and alerts
-- PerformanceProfilerPlugin for detailed performance analysis
+- PerformanceProfilerPlugin for per-tool and per-model latency distributions
 - ProductionMonitoringSystem for complete monitoring solution
 
 Features:
@@ -17,15 +17,24 @@ Features:
 """
 
 import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Deque, Dict, Hashable, Optional
 from dataclasses import dataclass, field
 
 from google.adk.agents import Agent
 from google.adk.plugins import BasePlugin
-from google.adk.events import Event
 from google.genai import types
 
+from .profiling import InFlightCalls, LatencyDistributions, LatencyHistogram
+
+# Finished requests, profiles and alerts kept for inspection; older ones
+# live on only in the aggregates
+RECENT_LIMIT = 100
+
+# Invocations tracked at once; the oldest are dropped if runs never finish
+MAX_IN_FLIGHT_REQUESTS = 10_000
+
 
 @dataclass
 class RequestMetrics:
@@ -43,14 +52,15 @@ class RequestMetrics:
 
 @dataclass
 class AggregateMetrics:
-    """Aggregate metrics across requests."""
+    """Aggregate metrics across requests, bounded in memory."""
     total_requests: int = 0
     successful_requests: int = 0
     failed_requests: int = 0
     total_latency: float = 0.0
     total_tokens: int = 0
     total_tool_calls: int = 0
-    requests: List[RequestMetrics] = field(default_factory=list)
+    requests: Deque[RequestMetrics] = field(default_factory=lambda: deque(maxlen=RECENT_LIMIT))
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
 
     @property
     def success_rate(self) -> float:
@@ -74,8 +84,20 @@ class AggregateMetrics:
         return self.total_tokens / self.total_requests
 
 
+def _model_call_key(callback_context) -> Hashable:
+    """Model calls are sequential per agent branch within an invocation."""
+    branch = getattr(callback_context, 'branch', None) or callback_context.agent_name
+    return (callback_context.invocation_id, 'model', branch)
+
+
+def _tool_call_key(tool, tool_context) -> Hashable:
+    """Tool calls are identified by the model's function call id."""
+    call_id = getattr(tool_context, 'function_call_id', None) or tool.name
+    return (tool_context.invocation_id, 'tool', call_id)
+
+
 class MetricsCollectorPlugin(BasePlugin):
-    """Plugin to collect request metrics."""
+    """Plugin to collect request metrics, one record per invocation."""
 
     def __init__(self, name: str = 'metrics_collector_plugin'):
         """Initialize metrics collector."""
@@ -83,39 +105,83 @@ class MetricsCollectorPlugin(BasePlugin):
         self.metrics = AggregateMetrics()
         self.current_requests: Dict[str, RequestMetrics] = {}
 
-    async def on_event_callback(self, *, invocation_context, event: Event) -> Optional[Event]:
-        """Handle agent events for metrics collection."""
-        # Track events (implementation simplified for tutorial)
-        if hasattr(event, 'event_type'):
-            if event.event_type == 'request_start':
-                request_id = str(time.time())
-                metrics = RequestMetrics(
-                    request_id=request_id,
-                    agent_name='observability_agent',
-                    start_time=time.time()
-                )
-                self.current_requests[request_id] = metrics
-                print(f"📊 [METRICS] Request started at {datetime.now().strftime('%H:%M:%S')}")
-            
-            elif event.event_type == 'request_complete':
-                if self.current_requests:
-                    request_id = list(self.current_requests.keys())[0]
-                    metrics = self.current_requests[request_id]
-                    metrics.end_time = time.time()
-                    metrics.latency = metrics.end_time - metrics.start_time
-                    
-                    # Update aggregates
-                    self.metrics.total_requests += 1
-                    self.metrics.successful_requests += 1
-                    self.metrics.total_latency += metrics.latency
-                    self.metrics.requests.append(metrics)
-                    
-                    print(f"✅ [METRICS] Request completed: {metrics.latency:.2f}s")
-                    del self.current_requests[request_id]
+    async def before_run_callback(self, *, invocation_context) -> Optional[types.Content]:
+        """Open a request record for the invocation."""
+        request_id = invocation_context.invocation_id
+        self.current_requests[request_id] = RequestMetrics(
+            request_id=request_id,
+            agent_name=invocation_context.agent.name,
+            start_time=time.time()
+        )
+        while len(self.current_requests) > MAX_IN_FLIGHT_REQUESTS:
+            del self.current_requests[next(iter(self.current_requests))]
+        print(f"📊 [METRICS] Request started at {datetime.now().strftime('%H:%M:%S')}")
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response) -> None:
+        """Add the response's token usage to its request."""
+        request = self.current_requests.get(callback_context.invocation_id)
+        usage = llm_response.usage_metadata
+        if request and usage and not llm_response.partial:
+            request.token_count += usage.total_token_count or 0
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error) -> None:
+        self._mark_failed(callback_context.invocation_id, error)
+        return None
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context) -> None:
+        request = self.current_requests.get(tool_context.invocation_id)
+        if request:
+            request.tool_calls += 1
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error) -> None:
+        self._mark_failed(tool_context.invocation_id, error)
+        return None
+
+    async def after_run_callback(self, *, invocation_context) -> None:
+        self._complete(invocation_context.invocation_id)
+
+    async def on_run_error_callback(self, *, invocation_context, error) -> None:
+        self._mark_failed(invocation_context.invocation_id, error)
+        self._complete(invocation_context.invocation_id)
+
+    def _mark_failed(self, request_id: str, error: Exception) -> None:
+        request = self.current_requests.get(request_id)
+        if request:
+            request.success = False
+            request.error = f"{type(error).__name__}: {error}"
+
+    def _complete(self, request_id: str) -> None:
+        metrics = self.current_requests.pop(request_id, None)
+        if metrics is None:
+            return
+        metrics.end_time = time.time()
+        metrics.latency = metrics.end_time - metrics.start_time
+
+        # Update aggregates
+        m = self.metrics
+        m.total_requests += 1
+        if metrics.success:
+            m.successful_requests += 1
+        else:
+            m.failed_requests += 1
+        m.total_latency += metrics.latency
+        m.total_tokens += metrics.token_count
+        m.total_tool_calls += metrics.tool_calls
+        m.latency.record(metrics.latency, error=not metrics.success)
+        m.requests.append(metrics)
+
+        if metrics.success:
+            print(f"✅ [METRICS] Request completed: {metrics.latency:.2f}s")
+        else:
+            print(f"❌ [METRICS] Request failed after {metrics.latency:.2f}s: {metrics.error}")
 
     def get_summary(self) -> str:
         """Get metrics summary."""
         m = self.metrics
+        p = m.latency.percentiles((50, 95, 99))
 
         summary = f"""
 METRICS SUMMARY
@@ -127,6 +193,7 @@ Failed:               {m.failed_requests}
 Success Rate:         {m.success_rate*100:.1f}%
 
 Average Latency:      {m.avg_latency:.2f}s
+Latency p50/p95/p99:  {p[50]:.2f}s / {p[95]:.2f}s / {p[99]:.2f}s
 Average Tokens:       {m.avg_tokens:.0f}
 Total Tool Calls:     {m.total_tool_calls}
 
@@ -137,7 +204,7 @@ Total Tool Calls:     {m.total_tool_calls}
 
 
 class AlertingPlugin(BasePlugin):
-    """Plugin for alerting on anomalies."""
+    """Plugin for alerting on slow and failing invocations."""
 
     def __init__(self, name: str = 'alerting_plugin', latency_threshold: float = 5.0, error_threshold: int = 3):
         """
@@ -152,88 +219,149 @@ class AlertingPlugin(BasePlugin):
         self.latency_threshold = latency_threshold
         self.error_threshold = error_threshold
         self.consecutive_errors = 0
-
-    async def on_event_callback(self, *, invocation_context, event: Event) -> Optional[Event]:
-        """Handle agent events for alerting."""
-        if hasattr(event, 'event_type'):
-            if event.event_type == 'request_complete':
-                # Reset error counter on success
-                self.consecutive_errors = 0
-            
-            elif event.event_type == 'request_error':
-                self.consecutive_errors += 1
-                print("🚨 [ALERT] Error detected")
-                
-                if self.consecutive_errors >= self.error_threshold:
-                    print(f"🚨🚨 [CRITICAL ALERT] {self.consecutive_errors} consecutive errors!")
+        self.alerts: Deque[Dict[str, Any]] = deque(maxlen=RECENT_LIMIT)
+        self._runs = InFlightCalls(MAX_IN_FLIGHT_REQUESTS)
+
+    async def before_run_callback(self, *, invocation_context) -> Optional[types.Content]:
+        self._runs.start(invocation_context.invocation_id, {'errors': 0})
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error) -> None:
+        self._record_error(callback_context.invocation_id, error)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error) -> None:
+        self._record_error(tool_context.invocation_id, error)
+        return None
+
+    async def after_run_callback(self, *, invocation_context) -> None:
+        finished = self._runs.finish(invocation_context.invocation_id)
+        if finished is None:
+            return
+        latency, state = finished
+        if latency > self.latency_threshold:
+            self._alert('latency', invocation_context.invocation_id,
+                        f"Request took {latency:.2f}s (threshold {self.latency_threshold:.2f}s)")
+        if state['errors']:
+            self._count_failure(invocation_context.invocation_id)
+        else:
+            # Reset error counter on success
+            self.consecutive_errors = 0
+
+    async def on_run_error_callback(self, *, invocation_context, error) -> None:
+        self._runs.finish(invocation_context.invocation_id)
+        self._alert('error', invocation_context.invocation_id, f"{type(error).__name__}: {error}")
+        self._count_failure(invocation_context.invocation_id)
+
+    def _record_error(self, invocation_id: str, error: Exception) -> None:
+        state = self._runs.info(invocation_id)
+        if state is not None:
+            state['errors'] += 1
+        self._alert('error', invocation_id, f"{type(error).__name__}: {error}")
+
+    def _count_failure(self, invocation_id: str) -> None:
+        self.consecutive_errors += 1
+        if self.consecutive_errors >= self.error_threshold:
+            self._alert('critical', invocation_id, f"{self.consecutive_errors} consecutive errors!")
+
+    def _alert(self, kind: str, invocation_id: str, message: str) -> None:
+        self.alerts.append({
+            'type': kind, 'invocation_id': invocation_id, 'message': message, 'time': time.time()
+        })
+        prefix = "🚨🚨 [CRITICAL ALERT]" if kind == 'critical' else "🚨 [ALERT]"
+        print(f"{prefix} {message}")
 
 
 class PerformanceProfilerPlugin(BasePlugin):
-    """Plugin for detailed performance profiling."""
+    """
+    Plugin for per-tool and per-model latency profiling.
+
+    Each call is timed from its before- to its after-callback under a key of
+    (invocation id, function call id) for tools and (invocation id, agent
+    branch) for models, so overlapping invocations never share state.
+    Durations stream into log-bucketed histograms; only the last
+    `recent_limit` individual profiles are kept.
+    """
 
-    def __init__(self, name: str = 'performance_profiler_plugin'):
+    def __init__(self, name: str = 'performance_profiler_plugin', recent_limit: int = RECENT_LIMIT):
         """Initialize profiler."""
         super().__init__(name)
-        self.profiles: List[Dict] = []
-        self.current_profile: Optional[Dict] = None
-
-    async def on_event_callback(self, *, invocation_context, event: Event) -> Optional[Event]:
-        """Handle agent events for profiling."""
-        if hasattr(event, 'event_type'):
-            if event.event_type == 'tool_call_start':
-                self.current_profile = {
-                    'tool': getattr(event, 'tool_name', 'unknown'),
-                    'start_time': time.time()
-                }
-                print("⚙️ [PROFILER] Tool call started")
-            
-            elif event.event_type == 'tool_call_complete':
-                if self.current_profile:
-                    self.current_profile['end_time'] = time.time()
-                    self.current_profile['duration'] = (
-                        self.current_profile['end_time'] - self.current_profile['start_time']
-                    )
-                    self.profiles.append(self.current_profile)
-                    print(f"✅ [PROFILER] Tool call completed: {self.current_profile['duration']:.2f}s")
-                    self.current_profile = None
+        self.tool_latency = LatencyDistributions()
+        self.model_latency = LatencyDistributions()
+        self.in_flight = InFlightCalls()
+        self.profiles: Deque[Dict[str, Any]] = deque(maxlen=recent_limit)
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context) -> None:
+        self.in_flight.start(_tool_call_key(tool, tool_context), tool.name)
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result) -> None:
+        self._finish('tool', _tool_call_key(tool, tool_context), error=False)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error) -> None:
+        self._finish('tool', _tool_call_key(tool, tool_context), error=True)
+        return None
+
+    async def before_model_callback(self, *, callback_context, llm_request) -> None:
+        self.in_flight.start(_model_call_key(callback_context), llm_request.model or 'unknown')
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response) -> None:
+        # Streaming responses call back per chunk; time to the final one
+        if not llm_response.partial:
+            self._finish('model', _model_call_key(callback_context), error=False)
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error) -> None:
+        self._finish('model', _model_call_key(callback_context), error=True)
+        return None
+
+    async def after_run_callback(self, *, invocation_context) -> None:
+        self.in_flight.discard_invocation(invocation_context.invocation_id)
+
+    async def on_run_error_callback(self, *, invocation_context, error) -> None:
+        self.in_flight.discard_invocation(invocation_context.invocation_id)
+
+    def _finish(self, kind: str, key: Hashable, error: bool) -> None:
+        finished = self.in_flight.finish(key)
+        if finished is None:
+            return
+        duration, name = finished
+        distributions = self.tool_latency if kind == 'tool' else self.model_latency
+        distributions.record(name, duration, error)
+        self.profiles.append({
+            'kind': kind,
+            'name': name,
+            'invocation_id': key[0],
+            'call_id': key[2],
+            'duration': duration,
+            'error': error,
+        })
+
+    def get_latency_distributions(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tool and per-model latency histograms, ready to export as JSON."""
+        return {
+            'tools': self.tool_latency.to_dict(),
+            'models': self.model_latency.to_dict(),
+        }
 
     def get_profile_summary(self) -> str:
         """Get profiling summary."""
-        if not self.profiles:
+        if not self.tool_latency and not self.model_latency:
             return "No profiles collected"
 
         summary = f"\nPERFORMANCE PROFILE\n{'='*70}\n\n"
 
-        tool_stats = {}
-
-        for profile in self.profiles:
-            if 'duration' not in profile:
-                continue
-
-            tool = profile['tool']
-
-            if tool not in tool_stats:
-                tool_stats[tool] = {
-                    'calls': 0,
-                    'total_duration': 0.0,
-                    'min_duration': float('inf'),
-                    'max_duration': 0.0
-                }
-
-            stats = tool_stats[tool]
-            stats['calls'] += 1
-            stats['total_duration'] += profile['duration']
-            stats['min_duration'] = min(stats['min_duration'], profile['duration'])
-            stats['max_duration'] = max(stats['max_duration'], profile['duration'])
-
-        for tool, stats in tool_stats.items():
-            avg_duration = stats['total_duration'] / stats['calls']
-
-            summary += f"Tool: {tool}\n"
-            summary += f"  Calls:        {stats['calls']}\n"
-            summary += f"  Avg Duration: {avg_duration:.3f}s\n"
-            summary += f"  Min Duration: {stats['min_duration']:.3f}s\n"
-            summary += f"  Max Duration: {stats['max_duration']:.3f}s\n\n"
+        for label, distributions in (('Tool', self.tool_latency), ('Model', self.model_latency)):
+            for name, stats in sorted(distributions.series.items()):
+                p = stats.percentiles((50, 95, 99))
+                summary += f"{label}: {name}\n"
+                summary += f"  Calls:        {stats.count} ({stats.errors} errors)\n"
+                summary += f"  Avg Duration: {stats.mean:.3f}s\n"
+                summary += f"  p50/p95/p99:  {p[50]:.3f}s / {p[95]:.3f}s / {p[99]:.3f}s\n"
+                summary += f"  Min Duration: {stats.min:.3f}s\n"
+                summary += f"  Max Duration: {stats.max:.3f}s\n\n"
 
         summary += f"{'='*70}\n"
 
@@ -0,0 +1,199 @@
+"""
+Bounded, streaming latency aggregates for the observability plugins.
+
+Plugins see thousands of tool and model calls over a process lifetime, so
+nothing here keeps per-call records beyond a small recent-sample window:
+
+- LatencyHistogram: log-bucketed (16 sub-buckets per power of two, ~3%
+  relative error), sparse, O(1) record; count/sum/min/max kept exactly
+- LatencyDistributions: one histogram per series name (tool, model),
+  with a cap on the number of series
+- InFlightCalls: start times of calls that have begun but not finished,
+  keyed by (invocation id, call id) so overlapping invocations never
+  share a slot, with a cap so abandoned calls cannot leak
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+# Latencies from 1µs to ~1000s; 16 sub-buckets per power of two
+MIN_LATENCY_S = 1e-6
+SUB_BUCKETS = 16
+NUM_BUCKETS = 30 * SUB_BUCKETS + 1
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Series beyond this many are folded into OVERFLOW_SERIES
+DEFAULT_MAX_SERIES = 256
+OVERFLOW_SERIES = '__other__'
+
+# Calls still in flight beyond this many evict the oldest
+DEFAULT_MAX_IN_FLIGHT = 10_000
+
+
+def bucket_index(latency: float) -> int:
+    """Histogram bucket of a latency in seconds."""
+    if latency <= MIN_LATENCY_S:
+        return 0
+    mantissa, exponent = math.frexp(latency / MIN_LATENCY_S)
+    index = (exponent - 1) * SUB_BUCKETS + int((mantissa * 2 - 1) * SUB_BUCKETS) + 1
+    return min(index, NUM_BUCKETS - 1)
+
+
+def bucket_bounds(index: int) -> Tuple[float, float]:
+    """Lower and upper latency bound of a bucket."""
+    if index == 0:
+        return 0.0, MIN_LATENCY_S
+    octave, sub = divmod(index - 1, SUB_BUCKETS)
+    base = MIN_LATENCY_S * 2 ** octave
+    return base * (1 + sub / SUB_BUCKETS), base * (1 + (sub + 1) / SUB_BUCKETS)
+
+
+class LatencyHistogram:
+    """Sparse log-bucketed latency histogram with exact count/sum/min/max."""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, latency: float, error: bool = False) -> None:
+        index = bucket_index(latency)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.errors += error
+        self.total += latency
+        if latency < self.min:
+            self.min = latency
+        if latency > self.max:
+            self.max = latency
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentiles(self, percentiles: Iterable[float] = PERCENTILES) -> Dict[float, float]:
+        """Percentiles in seconds (bucket midpoints, clamped to min/max)."""
+        wanted = sorted(percentiles)
+        result = {p: 0.0 for p in wanted}
+        if not self.count:
+            return result
+        pending = [(p, max(1, math.ceil(p / 100 * self.count))) for p in wanted]
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            while pending and seen >= pending[0][1]:
+                low, high = bucket_bounds(index)
+                result[pending.pop(0)[0]] = min(max((low + high) / 2, self.min), self.max)
+            if not pending:
+                break
+        return result
+
+    def percentile(self, p: float) -> float:
+        return self.percentiles((p,))[p]
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.errors += other.errors
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary plus the non-empty buckets as [upper bound seconds, count]."""
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_s': self.mean,
+            'min_s': self.min if self.count else 0.0,
+            'max_s': self.max,
+            'percentiles_s': {f'p{p}': v for p, v in self.percentiles().items()},
+            'buckets': [[bucket_bounds(i)[1], self.buckets[i]] for i in sorted(self.buckets)],
+        }
+
+
+class LatencyDistributions:
+    """Named latency histograms (one per tool or model), bounded in number."""
+
+    def __init__(self, max_series: int = DEFAULT_MAX_SERIES):
+        self.max_series = max_series
+        self.series: Dict[str, LatencyHistogram] = {}
+
+    def record(self, name: str, latency: float, error: bool = False) -> None:
+        histogram = self.series.get(name)
+        if histogram is None:
+            if len(self.series) >= self.max_series:
+                name = OVERFLOW_SERIES
+            histogram = self.series.setdefault(name, LatencyHistogram())
+        histogram.record(latency, error)
+
+    def get(self, name: str) -> Optional[LatencyHistogram]:
+        return self.series.get(name)
+
+    def total(self) -> LatencyHistogram:
+        merged = LatencyHistogram()
+        for histogram in self.series.values():
+            merged.merge(histogram)
+        return merged
+
+    def __len__(self) -> int:
+        return len(self.series)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: h.to_dict() for name, h in sorted(self.series.items())}
+
+
+class InFlightCalls:
+    """
+    Start times of in-flight calls, keyed per call.
+
+    Keys are (invocation id, call id) tuples. When more than max_size calls
+    are open (e.g. an invocation died without its after-callback), the
+    oldest are dropped and counted in `evicted`.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_IN_FLIGHT, clock=time.perf_counter):
+        self.max_size = max_size
+        self.clock = clock
+        self.evicted = 0
+        self._calls: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+
+    def start(self, key: Hashable, info: Any = None) -> None:
+        self._calls[key] = (self.clock(), info)
+        self._calls.move_to_end(key)
+        while len(self._calls) > self.max_size:
+            self._calls.popitem(last=False)
+            self.evicted += 1
+
+    def finish(self, key: Hashable) -> Optional[Tuple[float, Any]]:
+        """Remove a call and return (elapsed seconds, info), or None if unknown."""
+        entry = self._calls.pop(key, None)
+        if entry is None:
+            return None
+        started, info = entry
+        return self.clock() - started, info
+
+    def info(self, key: Hashable) -> Any:
+        """The info stored with an open call, or None."""
+        entry = self._calls.get(key)
+        return entry[1] if entry else None
+
+    def discard_invocation(self, invocation_id: str) -> int:
+        """Drop every open call of an invocation; returns how many were dropped."""
+        stale = [k for k in self._calls if isinstance(k, tuple) and k and k[0] == invocation_id]
+        for key in stale:
+            del self._calls[key]
+        return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
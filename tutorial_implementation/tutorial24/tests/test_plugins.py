@@ -108,8 +108,8 @@ class TestPerformanceProfilerPlugin:
         """Test plugin can be initialized."""
         plugin = PerformanceProfilerPlugin()
         assert plugin is not None
-        assert plugin.profiles == []
-        assert plugin.current_profile is None
+        assert list(plugin.profiles) == []
+        assert len(plugin.in_flight) == 0
 
     def test_get_profile_summary_empty(self):
         """Test get_profile_summary with no profiles."""
@@ -118,22 +118,17 @@ class TestPerformanceProfilerPlugin:
         assert isinstance(summary, str)
         assert "No profiles collected" in summary
 
-    def test_profile_data_structure(self):
-        """Test that profiles can be added."""
-        plugin = PerformanceProfilerPlugin()
-        
-        # Simulate adding a profile
-        profile = {
-            'tool': 'test_tool',
-            'start_time': time.time(),
-            'end_time': time.time() + 1.0,
-            'duration': 1.0
-        }
-        plugin.profiles.append(profile)
-        
-        assert len(plugin.profiles) == 1
-        assert plugin.profiles[0]['tool'] == 'test_tool'
-        assert 'duration' in plugin.profiles[0]
+    def test_profiles_are_bounded(self):
+        """Test only the most recent profiles are kept."""
+        plugin = PerformanceProfilerPlugin(recent_limit=3)
+
+        for i in range(10):
+            plugin.in_flight.start(('inv', 'tool', f'call-{i}'), 'test_tool')
+            plugin._finish('tool', ('inv', 'tool', f'call-{i}'), error=False)
+
+        assert [p['call_id'] for p in plugin.profiles] == ['call-7', 'call-8', 'call-9']
+        assert plugin.tool_latency.get('test_tool').count == 10
+        assert 'Tool: test_tool' in plugin.get_profile_summary()
 
 
 class TestPluginIntegration:
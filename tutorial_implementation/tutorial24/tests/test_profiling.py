@@ -0,0 +1,239 @@
+"""
+Test streaming latency aggregates and plugin behaviour under concurrency.
+"""
+
+import asyncio
+import random
+import re
+from typing import AsyncGenerator
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.apps import App
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from observability_agent.agent import (
+    AlertingPlugin,
+    MetricsCollectorPlugin,
+    PerformanceProfilerPlugin,
+)
+from observability_agent.profiling import (
+    InFlightCalls,
+    LatencyDistributions,
+    LatencyHistogram,
+    OVERFLOW_SERIES,
+)
+
+DELAY = re.compile(r'delay (-?[\d.]+)')
+
+
+class StubModel(BaseLlm):
+    """Asks for one slow_lookup call with the delay in the prompt, then answers."""
+
+    model: str = 'stub-model'
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(random.random() / 100)
+        parts = [p for c in llm_request.contents for p in (c.parts or [])]
+        if any(p.function_response for p in parts):
+            content = types.Content(role='model', parts=[types.Part.from_text(text='done')])
+        else:
+            prompt = ' '.join(p.text for p in parts if p.text)
+            delay = float(DELAY.search(prompt).group(1))
+            content = types.Content(role='model', parts=[
+                types.Part.from_function_call(name='slow_lookup', args={'delay': delay})
+            ])
+        yield LlmResponse(
+            content=content,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=10, candidates_token_count=5, total_token_count=15
+            ),
+        )
+
+
+async def slow_lookup(delay: float) -> dict:
+    """Wait for `delay` seconds; fail for negative delays."""
+    if delay < 0:
+        raise RuntimeError('lookup failed')
+    await asyncio.sleep(delay)
+    return {'status': 'success', 'delay': delay}
+
+
+def _runner(*plugins):
+    agent = Agent(name='stub_agent', model=StubModel(), instruction='Look things up.', tools=[slow_lookup])
+    return InMemoryRunner(app=App(name='profiling_test', root_agent=agent, plugins=list(plugins)))
+
+
+async def _invoke(runner, session_id, delay):
+    """Run one invocation; returns its invocation id."""
+    await runner.session_service.create_session(
+        app_name='profiling_test', user_id='user', session_id=session_id
+    )
+    message = types.Content(role='user', parts=[types.Part.from_text(text=f'delay {delay}')])
+    invocation_id = None
+    async for event in runner.run_async(user_id='user', session_id=session_id, new_message=message):
+        invocation_id = event.invocation_id
+    return invocation_id
+
+
+class TestLatencyHistogram:
+    """Test the log-bucketed histogram."""
+
+    def test_percentiles_within_bucket_error(self):
+        """Test percentiles land within a bucket (~6%) of the exact value."""
+        histogram = LatencyHistogram()
+        for i in range(1, 1001):
+            histogram.record(i / 1000)
+
+        assert histogram.count == 1000
+        assert histogram.min == 0.001 and histogram.max == 1.0
+        assert histogram.percentile(50) == pytest.approx(0.5, rel=0.07)
+        assert histogram.percentile(99) == pytest.approx(0.99, rel=0.07)
+
+    def test_memory_bounded_by_buckets(self):
+        """Test 100k records of similar latency use a handful of buckets."""
+        histogram = LatencyHistogram()
+        for i in range(100_000):
+            histogram.record(0.1 + (i % 100) / 1000)
+
+        assert len(histogram.buckets) <= 17
+        assert sum(c for _, c in histogram.to_dict()['buckets']) == 100_000
+
+    def test_merge(self):
+        """Test merged histograms equal one fed both streams."""
+        a, b, both = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for i in range(50):
+            a.record(i / 100)
+            both.record(i / 100)
+            b.record(i / 10, error=True)
+            both.record(i / 10, error=True)
+
+        a.merge(b)
+
+        assert a.buckets == both.buckets
+        assert (a.count, a.errors, a.min, a.max) == (both.count, both.errors, both.min, both.max)
+        assert a.percentiles() == both.percentiles()
+
+    def test_series_capped(self):
+        """Test series beyond the cap are folded into one overflow series."""
+        distributions = LatencyDistributions(max_series=2)
+        for name in ('a', 'b', 'c', 'd'):
+            distributions.record(name, 0.1)
+
+        assert sorted(distributions.series) == [OVERFLOW_SERIES, 'a', 'b']
+        assert distributions.get(OVERFLOW_SERIES).count == 2
+        assert distributions.total().count == 4
+
+
+class TestInFlightCalls:
+    """Test in-flight call tracking."""
+
+    def test_keys_are_independent(self):
+        """Test overlapping calls finish with their own start times."""
+        now = [0.0]
+        calls = InFlightCalls(clock=lambda: now[0])
+        calls.start(('inv1', 'tool', 'c1'), 'a')
+        now[0] = 1.0
+        calls.start(('inv2', 'tool', 'c1'), 'b')
+        now[0] = 3.0
+
+        assert calls.finish(('inv1', 'tool', 'c1')) == (3.0, 'a')
+        assert calls.finish(('inv2', 'tool', 'c1')) == (2.0, 'b')
+        assert calls.finish(('inv2', 'tool', 'c1')) is None
+
+    def test_bounded(self):
+        """Test abandoned calls are evicted oldest first."""
+        calls = InFlightCalls(max_size=3)
+        for i in range(5):
+            calls.start(('inv', 'tool', i))
+
+        assert len(calls) == 3
+        assert calls.evicted == 2
+        assert ('inv', 'tool', 0) not in calls
+        assert calls.discard_invocation('inv') == 3
+
+
+class TestOverlappingInvocations:
+    """Test the plugins against concurrent runs of a stub model."""
+
+    @pytest.mark.asyncio
+    async def test_fifty_overlapping_invocations(self):
+        """Test each call is timed under its own key while 50 runs overlap."""
+        metrics = MetricsCollectorPlugin()
+        profiler = PerformanceProfilerPlugin()
+        alerting = AlertingPlugin(latency_threshold=60.0)
+        runner = _runner(metrics, profiler, alerting)
+        delays = [0.01 + (i % 10) * 0.01 for i in range(50)]
+
+        invocation_ids = await asyncio.gather(*(
+            _invoke(runner, f'session-{i}', delay) for i, delay in enumerate(delays)
+        ))
+        delay_of = dict(zip(invocation_ids, delays))
+
+        assert len(set(invocation_ids)) == 50
+        m = metrics.metrics
+        assert (m.total_requests, m.successful_requests, m.total_tool_calls) == (50, 50, 50)
+        assert m.total_tokens == 50 * 2 * 15
+        assert m.latency.count == 50
+        assert metrics.current_requests == {}
+
+        tool_stats = profiler.tool_latency.get('slow_lookup')
+        model_stats = profiler.model_latency.get('stub-model')
+        assert tool_stats.count == 50
+        assert model_stats.count == 100
+        assert len(profiler.in_flight) == 0
+
+        # Every tool duration covers its own invocation's requested delay; a
+        # shared slot would time long calls from a later, shorter call's start
+        tool_profiles = [p for p in profiler.profiles if p['kind'] == 'tool']
+        assert len(tool_profiles) == 50
+        for profile in tool_profiles:
+            expected = delay_of[profile['invocation_id']]
+            assert expected <= profile['duration'] < expected + 0.5
+
+        assert tool_stats.min >= 0.01
+        assert tool_stats.percentile(99) >= 0.1
+
+        exported = profiler.get_latency_distributions()
+        assert exported['tools']['slow_lookup']['count'] == 50
+        assert exported['models']['stub-model']['count'] == 100
+        assert alerting.consecutive_errors == 0
+        assert list(alerting.alerts) == []
+
+    @pytest.mark.asyncio
+    async def test_failures_are_attributed(self):
+        """Test a failing tool marks only its own invocation as failed."""
+        metrics = MetricsCollectorPlugin()
+        profiler = PerformanceProfilerPlugin()
+        alerting = AlertingPlugin(latency_threshold=60.0, error_threshold=1)
+        runner = _runner(metrics, profiler, alerting)
+
+        results = await asyncio.gather(
+            _invoke(runner, 'ok', 0.01),
+            _invoke(runner, 'bad', -1),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[1], RuntimeError)
+        assert (metrics.metrics.successful_requests, metrics.metrics.failed_requests) == (1, 1)
+        assert profiler.tool_latency.get('slow_lookup').errors == 1
+        assert len(profiler.in_flight) == 0
+        assert {a['type'] for a in alerting.alerts} == {'error', 'critical'}
+        assert all(a['invocation_id'] != results[0] for a in alerting.alerts)
+
+    @pytest.mark.asyncio
+    async def test_latency_alert(self):
+        """Test runs slower than the threshold raise a latency alert."""
+        alerting = AlertingPlugin(latency_threshold=0.0)
+        runner = _runner(alerting)
+
+        invocation_id = await _invoke(runner, 's', 0.01)
+
+        assert alerting.alerts[0]['type'] == 'latency'
+        assert alerting.alerts[0]['invocation_id'] == invocation_id
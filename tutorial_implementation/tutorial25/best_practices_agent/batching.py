@@ -0,0 +1,321 @@
+"""
+Concurrent batch execution for the Best Practices Agent.
+
+Demonstrates:
+- Bounded concurrency: a fixed pool of workers pulls items, so at most
+  `concurrency` calls are in flight however large the batch is
+- Async callables run on the event loop, sync callables on a thread pool
+- Per-item timeouts that also respect the propagated deadline
+- Partial failures: one failing item never fails the batch
+- Ordered results (`run`) or completion-order streaming (`stream`)
+- Chunked execution for backends with a native multi-get (`run_chunks`)
+- Measured per-item latency recorded into a metrics collector
+"""
+
+import asyncio
+import contextvars
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .resilience import remaining_time
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class ItemResult:
+    """Outcome of one item of a batch."""
+    index: int
+    item: Any
+    status: str  # 'success', 'error' or 'timeout'
+    value: Any = None
+    error: Optional[str] = None
+    latency_s: float = 0.0
+    job: int = 0  # chunk the item ran in (its own index when not chunked)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 'success'
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            'index': self.index,
+            'item': self.item,
+            'status': self.status,
+            'latency_ms': round(self.latency_s * 1000, 2),
+        }
+        if self.ok:
+            result['value'] = self.value
+        else:
+            result['error'] = self.error
+        return result
+
+
+@dataclass
+class BatchReport:
+    """Ordered results of a batch plus measured timings."""
+    results: List[ItemResult]
+    wall_time_s: float
+    concurrency: int
+    work_time_s: float = field(init=False)
+
+    def __post_init__(self):
+        # Sum of call latencies, counting each chunk once: what running the
+        # same calls one after another would have cost
+        per_job = {r.job: r.latency_s for r in self.results}
+        self.work_time_s = sum(per_job.values())
+
+    @property
+    def succeeded(self) -> int:
+        return sum(r.ok for r in self.results)
+
+    @property
+    def failed(self) -> int:
+        return sum(r.status == 'error' for r in self.results)
+
+    @property
+    def timed_out(self) -> int:
+        return sum(r.status == 'timeout' for r in self.results)
+
+    @property
+    def speedup(self) -> float:
+        """Measured sequential cost divided by wall time."""
+        return self.work_time_s / self.wall_time_s if self.wall_time_s > 0 else 1.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'items': len(self.results),
+            'succeeded': self.succeeded,
+            'failed': self.failed,
+            'timed_out': self.timed_out,
+            'wall_time_ms': round(self.wall_time_s * 1000, 2),
+            'sequential_time_ms': round(self.work_time_s * 1000, 2),
+            'speedup': round(self.speedup, 2),
+            'concurrency': self.concurrency,
+        }
+
+
+class BatchExecutor:
+    """
+    Run a callable over many items with bounded concurrency.
+
+    `fn` may be a coroutine function (awaited on the event loop) or a plain
+    function (run on a thread pool of `concurrency` threads, with the
+    caller's context variables). Exceptions and timeouts are captured per
+    item. A timed-out thread cannot be interrupted; its result is discarded
+    when it finishes.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 16,
+        item_timeout_seconds: Optional[float] = None,
+        metrics: Optional[Any] = None,
+        metric_name: Optional[str] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """
+        Args:
+            concurrency: Maximum calls in flight
+            item_timeout_seconds: Timeout for each call (None for no limit)
+            metrics: Collector with record_item(latency, error=..., tool=...);
+                every item's measured latency is recorded in its own series,
+                not as a request
+            metric_name: Series to record items under (default "batch_item")
+            clock: Time source for latency measurement
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+
+        self.concurrency = concurrency
+        self.item_timeout = item_timeout_seconds
+        self.metrics = metrics
+        self.metric_name = metric_name or "batch_item"
+        self.clock = clock
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def stream(self, items: Sequence[Any], fn: Callable[[Any], Any]) -> AsyncIterator[ItemResult]:
+        """Yield an ItemResult per item as soon as it completes."""
+        items = list(items)
+        jobs = [([i], [item]) for i, item in enumerate(items)]
+        return self._stream(jobs, fn, batched=False)
+
+    async def run(self, items: Sequence[Any], fn: Callable[[Any], Any]) -> BatchReport:
+        """Process every item and return results in input order."""
+        start = self.clock()
+        results = [r async for r in self.stream(items, fn)]
+        return self._report(results, start)
+
+    def stream_chunks(
+        self,
+        items: Sequence[Any],
+        batch_fn: Callable[[List[Any]], Any],
+        chunk_size: int = 50,
+    ) -> AsyncIterator[ItemResult]:
+        """
+        Yield per-item results of `batch_fn` called on chunks of items.
+
+        `batch_fn` takes a list and returns a list of the same length; an
+        Exception instance in that list fails only its item. A chunk that
+        raises or times out fails all of its items.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        items = list(items)
+        jobs = [
+            (list(range(i, min(i + chunk_size, len(items)))), items[i:i + chunk_size])
+            for i in range(0, len(items), chunk_size)
+        ]
+        return self._stream(jobs, batch_fn, batched=True)
+
+    async def run_chunks(
+        self,
+        items: Sequence[Any],
+        batch_fn: Callable[[List[Any]], Any],
+        chunk_size: int = 50,
+    ) -> BatchReport:
+        """Chunked counterpart of run()."""
+        start = self.clock()
+        results = [r async for r in self.stream_chunks(items, batch_fn, chunk_size)]
+        return self._report(results, start)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _report(self, results: List[ItemResult], start: float) -> BatchReport:
+        results.sort(key=lambda r: r.index)
+        return BatchReport(results, self.clock() - start, self.concurrency)
+
+    def _timeout(self) -> Optional[float]:
+        """Per-call timeout, capped by the caller's deadline."""
+        left = remaining_time()
+        if left is None:
+            return self.item_timeout
+        if self.item_timeout is None:
+            return left
+        return min(self.item_timeout, left)
+
+    async def _start_call(self, fn: Callable, arg: Any, pool: Optional[ThreadPoolExecutor]) -> Awaitable:
+        """Start fn(arg); returns once it is running, with an awaitable for its result."""
+        if pool is None:
+            return fn(arg)
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        started = asyncio.Event()
+
+        def run():
+            loop.call_soon_threadsafe(started.set)
+            return ctx.run(fn, arg)
+
+        future = loop.run_in_executor(pool, run)
+        try:
+            # A timed-out call keeps its thread, so later items may queue here
+            await started.wait()
+        except BaseException:
+            future.cancel()
+            raise
+        return future
+
+    async def _run_job(
+        self,
+        job_id: int,
+        indices: List[int],
+        chunk: List[Any],
+        fn: Callable,
+        batched: bool,
+        pool: Optional[ThreadPoolExecutor],
+    ) -> List[ItemResult]:
+        timeout = self._timeout()
+        start = self.clock()
+        try:
+            if timeout is not None and timeout <= 0:
+                raise asyncio.TimeoutError()
+            call = await self._start_call(fn, chunk if batched else chunk[0], pool)
+            # Time and timeout run from when the call starts, not from when
+            # it queued for a free thread
+            start = self.clock()
+            timeout = self._timeout()
+            value = await asyncio.wait_for(call, timeout)
+            values = list(value) if batched else [value]
+            if len(values) != len(chunk):
+                raise ValueError(
+                    f"batch function returned {len(values)} results for {len(chunk)} items"
+                )
+            outcomes: List[Tuple[str, Any, Optional[str]]] = [
+                ('error', None, f"{type(v).__name__}: {v}") if isinstance(v, Exception)
+                else ('success', v, None)
+                for v in values
+            ]
+        except asyncio.TimeoutError as e:
+            message = f"Timed out after {timeout:.3f}s" if timeout is not None else str(e) or "Timed out"
+            outcomes = [('timeout', None, message)] * len(chunk)
+        except Exception as e:
+            outcomes = [('error', None, f"{type(e).__name__}: {e}")] * len(chunk)
+        latency = self.clock() - start
+
+        results = [
+            ItemResult(index, item, status, value, error, latency, job_id)
+            for index, item, (status, value, error) in zip(indices, chunk, outcomes)
+        ]
+        if self.metrics is not None:
+            for r in results:
+                self.metrics.record_item(r.latency_s, error=not r.ok, tool=self.metric_name)
+        return results
+
+    async def _stream(
+        self,
+        jobs: List[Tuple[List[int], List[Any]]],
+        fn: Callable,
+        batched: bool,
+    ) -> AsyncIterator[ItemResult]:
+        if not jobs:
+            return
+
+        workers_count = min(self.concurrency, len(jobs))
+        pool = None
+        if not inspect.iscoroutinefunction(fn):
+            pool = ThreadPoolExecutor(max_workers=workers_count, thread_name_prefix="batch")
+
+        pending = iter(enumerate(jobs))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=2 * workers_count)
+
+        async def worker():
+            try:
+                # Workers share one iterator, so items are pulled lazily and
+                # a slow item never holds up the rest
+                for job_id, (indices, chunk) in pending:
+                    for result in await self._run_job(job_id, indices, chunk, fn, batched, pool):
+                        await queue.put(result)
+            except Exception as e:
+                # Item errors are captured in _run_job; this is a bug, surface it
+                await queue.put(e)
+            await queue.put(_DONE)
+
+        workers = [asyncio.create_task(worker()) for _ in range(workers_count)]
+        try:
+            finished = 0
+            while finished < workers_count:
+                result = await queue.get()
+                if result is _DONE:
+                    finished += 1
+                    continue
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            # Also runs when the consumer stops early: stop remaining work
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
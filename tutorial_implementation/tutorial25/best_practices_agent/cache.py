@@ -0,0 +1,399 @@
+"""
+Production cache for the Best Practices Agent.
+
+Demonstrates:
+- Bounded size by entry count and bytes, O(1) LRU eviction
+- Per-entry TTL with periodic (optionally background) expiry sweeps
+- Single-flight loading: concurrent misses on a key run the loader once
+- Stale-while-revalidate: serve an expired value while it is refreshed
+- Thread-safe sync API and an asyncio API
+"""
+
+import asyncio
+import logging
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a value in bytes."""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    expires_at: float
+    size: int
+
+
+class _Flight:
+    """A load in progress, shared by every caller that misses the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class CachedDataStore:
+    """
+    Bounded LRU + TTL cache with single-flight loading.
+
+    Entries live in an OrderedDict ordered by recency, so lookups, updates and
+    evictions are O(1). Expired entries are removed when read, by a sweep
+    every `sweep_interval_seconds` (amortized over writes), or by a background
+    thread started with `start_background_sweep()`.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 300,
+        max_entries: int = 1024,
+        max_bytes: int = 10 * 1024 * 1024,
+        sweep_interval_seconds: float = 60,
+        stale_while_revalidate_seconds: float = 0,
+        sizeof: Callable[[Any], int] = estimate_size,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            ttl_seconds: Default time-to-live of an entry
+            max_entries: Maximum number of entries
+            max_bytes: Maximum total estimated size of values
+            sweep_interval_seconds: Minimum time between expiry sweeps
+            stale_while_revalidate_seconds: How long after expiry
+                get_or_compute may serve the old value while refreshing it
+            sizeof: Size estimator for values
+            clock: Time source
+        """
+        if max_entries < 1 or max_bytes < 1:
+            raise ValueError("max_entries and max_bytes must be positive")
+
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval_seconds
+        self.stale_window = stale_while_revalidate_seconds
+        self.sizeof = sizeof
+        self.clock = clock
+
+        self.cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self.bytes = 0
+        self._lock = threading.RLock()
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[str, asyncio.Task] = {}
+        self._refreshing: set = set()
+        self._last_sweep = clock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejected = 0
+        self.loads = 0
+        self.load_errors = 0
+        self.coalesced = 0
+        self.stale_served = 0
+
+    # ------------------------------------------------------------------
+    # Basic operations
+    # ------------------------------------------------------------------
+
+    def _remove(self, key: str) -> None:
+        entry = self.cache.pop(key)
+        self.bytes -= entry.size
+
+    def _lookup(self, key: str, allow_stale: bool = False) -> Any:
+        """Return (value, is_stale) or _MISSING; the caller holds the lock."""
+        entry = self.cache.get(key)
+        if entry is None:
+            return _MISSING
+
+        now = self.clock()
+        if now < entry.expires_at:
+            self.cache.move_to_end(key)
+            return entry.value, False
+        if now < entry.expires_at + self.stale_window:
+            # Kept for get_or_compute to serve while it revalidates
+            return (entry.value, True) if allow_stale else _MISSING
+
+        self._remove(key)
+        self.expirations += 1
+        return _MISSING
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get cached value if not expired."""
+        with self._lock:
+            found = self._lookup(key)
+            if found is _MISSING:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return found[0]
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> bool:
+        """
+        Store a value, evicting least recently used entries to make room.
+
+        Returns:
+            False if the value alone exceeds max_bytes and was not cached
+        """
+        size = self.sizeof(value)
+        ttl = self.ttl if ttl_seconds is None else ttl_seconds
+
+        with self._lock:
+            if key in self.cache:
+                self._remove(key)
+            if size > self.max_bytes:
+                self.rejected += 1
+                return False
+
+            self._maybe_sweep()
+            while self.cache and (
+                len(self.cache) >= self.max_entries
+                or self.bytes + size > self.max_bytes
+            ):
+                oldest = next(iter(self.cache))
+                self._remove(oldest)
+                self.evictions += 1
+
+            self.cache[key] = _Entry(value, self.clock() + ttl, size)
+            self.bytes += size
+            return True
+
+    def delete(self, key: str) -> bool:
+        """Remove a key; returns whether it was present."""
+        with self._lock:
+            if key not in self.cache:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self.cache.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    # ------------------------------------------------------------------
+    # Expiry
+    # ------------------------------------------------------------------
+
+    def sweep(self) -> int:
+        """Remove every entry past its TTL and stale window; returns the count."""
+        with self._lock:
+            now = self.clock()
+            self._last_sweep = now
+            expired = [
+                key for key, entry in self.cache.items()
+                if now >= entry.expires_at + self.stale_window
+            ]
+            for key in expired:
+                self._remove(key)
+            self.expirations += len(expired)
+            return len(expired)
+
+    def _maybe_sweep(self) -> None:
+        if self.clock() - self._last_sweep >= self.sweep_interval:
+            self.sweep()
+
+    def start_background_sweep(self) -> None:
+        """Sweep expired entries every sweep_interval in a daemon thread."""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(self.sweep_interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    logger.error(f"Cache sweep failed: {e}")
+
+        self._sweeper = threading.Thread(target=run, name="cache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def stop_background_sweep(self) -> None:
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join(timeout=1)
+            self._sweeper = None
+
+    # ------------------------------------------------------------------
+    # Single-flight loading (threads)
+    # ------------------------------------------------------------------
+
+    def _load(self, key: str, loader: Callable[[], Any], ttl: Optional[float], flight: _Flight):
+        try:
+            flight.value = loader()
+            self.set(key, flight.value, ttl)
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self.load_errors += 1
+        finally:
+            with self._lock:
+                self.loads += 1
+                self._flights.pop(key, None)
+                self._refreshing.discard(key)
+            flight.done.set()
+
+    def get_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        """
+        Return the cached value, or compute it once for all concurrent callers.
+
+        Within the stale-while-revalidate window an expired value is returned
+        immediately and refreshed in a background thread.
+        """
+        with self._lock:
+            found = self._lookup(key, allow_stale=True)
+            if found is not _MISSING:
+                value, stale = found
+                self.hits += 1
+                if stale:
+                    self.stale_served += 1
+                    if key not in self._flights:
+                        flight = self._flights[key] = _Flight()
+                        self._refreshing.add(key)
+                        threading.Thread(
+                            target=self._load,
+                            args=(key, loader, ttl_seconds, flight),
+                            daemon=True,
+                        ).start()
+                return value
+
+            self.misses += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if leader:
+            self._load(key, loader, ttl_seconds, flight)
+        else:
+            flight.done.wait()
+
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    # ------------------------------------------------------------------
+    # Single-flight loading (asyncio)
+    # ------------------------------------------------------------------
+
+    async def _aload(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: Optional[float],
+    ) -> Any:
+        try:
+            value = await loader()
+            self.set(key, value, ttl)
+            return value
+        except BaseException:
+            with self._lock:
+                self.load_errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.loads += 1
+                self._async_flights.pop(key, None)
+                self._refreshing.discard(key)
+
+    async def aget_or_compute(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl_seconds: Optional[float] = None,
+    ) -> Any:
+        """Async get_or_compute: the loader is a coroutine function."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            found = self._lookup(key, allow_stale=True)
+            if found is not _MISSING:
+                value, stale = found
+                self.hits += 1
+                if stale:
+                    self.stale_served += 1
+                    if key not in self._async_flights:
+                        flight = self._async_flights[key] = loop.create_task(
+                            self._aload(key, loader, ttl_seconds)
+                        )
+                        # Nobody awaits a background refresh; retrieve its error
+                        flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+                        self._refreshing.add(key)
+                return value
+
+            self.misses += 1
+            flight = self._async_flights.get(key)
+            if flight is None:
+                # The load runs as its own task, so cancelling the caller that
+                # started it doesn't fail the other callers waiting on the key
+                flight = self._async_flights[key] = loop.create_task(
+                    self._aload(key, loader, ttl_seconds)
+                )
+            else:
+                self.coalesced += 1
+
+        # shield: a cancelled caller must not cancel the shared load
+        return await asyncio.shield(flight)
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            total = self.hits + self.misses
+            hit_ratio = self.hits / total if total > 0 else 0.0
+
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': f"{hit_ratio * 100:.1f}%",
+                'hit_ratio': round(hit_ratio, 4),
+                'size': len(self.cache),
+                'max_entries': self.max_entries,
+                'memory_bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'memory_utilization': f"{self.bytes / self.max_bytes * 100:.1f}%",
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'rejected': self.rejected,
+                'loads': self.loads,
+                'load_errors': self.load_errors,
+                'coalesced_loads': self.coalesced,
+                'stale_served': self.stale_served,
+                'refreshing': len(self._refreshing),
+                'background_sweep': self._sweeper is not None and self._sweeper.is_alive(),
+            }
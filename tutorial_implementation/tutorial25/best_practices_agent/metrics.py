@@ -0,0 +1,395 @@
+"""
+Low-overhead metrics core for the Best Practices Agent.
+
+Demonstrates:
+- Log-bucketed latency histograms (HDR style): fixed memory, ~3% relative
+  error on any percentile, O(1) record
+- Time-bucketed sliding windows (1m/5m/15m) for request rate, error ratio
+  and windowed percentiles
+- Per-tool series so one slow tool is not averaged away
+- Memory bounded by bucket and slot counts, never by traffic
+
+Run `python -m best_practices_agent.metrics` to benchmark record_request.
+"""
+
+import math
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latencies from 1µs to ~1000s; 16 sub-buckets per power of two
+MIN_LATENCY_S = 1e-6
+SUB_BUCKETS = 16
+NUM_BUCKETS = 30 * SUB_BUCKETS + 1
+
+WINDOWS = {'1m': 60, '5m': 300, '15m': 900}
+PERCENTILES = (50, 95, 99)
+
+_frexp = math.frexp
+
+
+def bucket_index(latency: float) -> int:
+    """Histogram bucket of a latency in seconds."""
+    if latency <= MIN_LATENCY_S:
+        return 0
+    # latency / MIN = mantissa * 2**exponent with mantissa in [0.5, 1)
+    mantissa, exponent = _frexp(latency / MIN_LATENCY_S)
+    index = (exponent - 1) * SUB_BUCKETS + int((mantissa * 2 - 1) * SUB_BUCKETS) + 1
+    return index if index < NUM_BUCKETS else NUM_BUCKETS - 1
+
+
+def bucket_bounds(index: int) -> Tuple[float, float]:
+    """Lower and upper latency bound of a bucket."""
+    if index == 0:
+        return 0.0, MIN_LATENCY_S
+    octave, sub = divmod(index - 1, SUB_BUCKETS)
+    base = MIN_LATENCY_S * 2 ** octave
+    return base * (1 + sub / SUB_BUCKETS), base * (1 + (sub + 1) / SUB_BUCKETS)
+
+
+def percentiles_from_buckets(
+    buckets: Iterable[Tuple[int, int]],
+    total: int,
+    percentiles: Iterable[float] = PERCENTILES,
+    max_value: Optional[float] = None,
+) -> Dict[float, float]:
+    """Percentiles (seconds) from (bucket, count) pairs; bucket midpoints."""
+    wanted = sorted(percentiles)
+    result = {p: 0.0 for p in wanted}
+    if total <= 0:
+        return result
+
+    pending = [(p, max(1, math.ceil(p / 100 * total))) for p in wanted]
+    seen = 0
+    for index, count in sorted(buckets):
+        seen += count
+        while pending and seen >= pending[0][1]:
+            low, high = bucket_bounds(index)
+            value = (low + high) / 2
+            result[pending.pop(0)[0]] = min(value, max_value) if max_value else value
+        if not pending:
+            break
+    return result
+
+
+class LatencyHistogram:
+    """Log-bucketed histogram over the lifetime of a series."""
+
+    def __init__(self):
+        self.counts: List[int] = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, latency: float, bucket: Optional[int] = None) -> None:
+        self.counts[bucket_index(latency) if bucket is None else bucket] += 1
+        self.count += 1
+        self.total += latency
+        if latency > self.max:
+            self.max = latency
+
+    def percentiles(self, percentiles: Iterable[float] = PERCENTILES) -> Dict[float, float]:
+        nonzero = ((i, c) for i, c in enumerate(self.counts) if c)
+        return percentiles_from_buckets(nonzero, self.count, percentiles, self.max)
+
+    def percentile(self, p: float) -> float:
+        return self.percentiles((p,))[p]
+
+
+class SlidingWindow:
+    """
+    Ring of fixed time slots covering the last `span_seconds`.
+
+    Each slot holds counts, errors, a latency sum and a sparse histogram.
+    A slot is reset lazily when the ring wraps onto it, so recording never
+    scans the ring.
+    """
+
+    def __init__(self, span_seconds: float = 900, slot_seconds: float = 5):
+        self.slot_seconds = slot_seconds
+        self.slots = math.ceil(span_seconds / slot_seconds)
+        self._epochs = [-1] * self.slots
+        self._counts = [0] * self.slots
+        self._errors = [0] * self.slots
+        self._sums = [0.0] * self.slots
+        self._hists: List[Dict[int, int]] = [{} for _ in range(self.slots)]
+
+    def record(self, now: float, latency: float, error: bool, bucket: int) -> None:
+        epoch = int(now // self.slot_seconds)
+        i = epoch % self.slots
+        if self._epochs[i] != epoch:
+            self._epochs[i] = epoch
+            self._counts[i] = 0
+            self._errors[i] = 0
+            self._sums[i] = 0.0
+            self._hists[i].clear()
+        self._counts[i] += 1
+        if error:
+            self._errors[i] += 1
+        self._sums[i] += latency
+        hist = self._hists[i]
+        hist[bucket] = hist.get(bucket, 0) + 1
+
+    def summary(self, now: float, seconds: float) -> Dict[str, Any]:
+        """Rate, error ratio and percentiles over the last `seconds`."""
+        current = int(now // self.slot_seconds)
+        oldest = current - min(self.slots, math.ceil(seconds / self.slot_seconds)) + 1
+        requests = errors = 0
+        latency_sum = 0.0
+        merged: Dict[int, int] = {}
+        for i in range(self.slots):
+            if oldest <= self._epochs[i] <= current:
+                requests += self._counts[i]
+                errors += self._errors[i]
+                latency_sum += self._sums[i]
+                for bucket, count in self._hists[i].items():
+                    merged[bucket] = merged.get(bucket, 0) + count
+
+        pct = percentiles_from_buckets(merged.items(), requests)
+        return {
+            'requests': requests,
+            'errors': errors,
+            'error_ratio': round(errors / requests, 4) if requests else 0.0,
+            'requests_per_second': round(requests / seconds, 3),
+            'avg_latency_ms': round(latency_sum / requests * 1000, 2) if requests else 0.0,
+            **{f'p{p}_ms': round(v * 1000, 2) for p, v in pct.items()},
+        }
+
+
+class _Series:
+    """Lifetime histogram plus sliding window for one tool (or all)."""
+
+    __slots__ = ('errors', 'histogram', 'window')
+
+    def __init__(self, slot_seconds: float):
+        self.errors = 0
+        self.histogram = LatencyHistogram()
+        self.window = SlidingWindow(max(WINDOWS.values()), slot_seconds)
+
+    def record(self, now: float, latency: float, error: bool, bucket: int) -> None:
+        self.histogram.record(latency, bucket)
+        if error:
+            self.errors += 1
+        self.window.record(now, latency, error, bucket)
+
+    def summary(self, now: float) -> Dict[str, Any]:
+        hist = self.histogram
+        pct = hist.percentiles()
+        return {
+            'requests': hist.count,
+            'errors': self.errors,
+            'error_rate': f"{self.errors / hist.count * 100:.2f}%" if hist.count else "0.00%",
+            'avg_latency_ms': round(hist.total / hist.count * 1000, 2) if hist.count else 0.0,
+            **{f'p{p}_ms': round(v * 1000, 2) for p, v in pct.items()},
+            'max_ms': round(hist.max * 1000, 2),
+            'last_5m': self.window.summary(now, WINDOWS['5m']),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe request metrics: totals, per-tool histograms, sliding windows.
+
+    record_request() is O(1): one bucket computation and a few counter
+    updates on the total series and the tool's series.
+    """
+
+    OTHER = "other"
+
+    def __init__(
+        self,
+        slot_seconds: float = 5,
+        max_tools: int = 64,
+        min_window_requests: int = 5,
+        degraded_error_ratio: float = 0.10,
+        unhealthy_error_ratio: float = 0.50,
+        latency_slo_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            slot_seconds: Sliding window resolution
+            max_tools: Series kept per tool, including the shared "other"
+                that absorbs tools beyond the limit
+            min_window_requests: Requests a window needs to judge health
+            degraded_error_ratio: Windowed error ratio that degrades health
+            unhealthy_error_ratio: Windowed error ratio that fails health
+            latency_slo_seconds: Windowed p99 above this degrades health
+            clock: Monotonic time source for windows
+        """
+        self.slot_seconds = slot_seconds
+        self.max_tools = max_tools
+        self.min_window_requests = min_window_requests
+        self.degraded_error_ratio = degraded_error_ratio
+        self.unhealthy_error_ratio = unhealthy_error_ratio
+        self.latency_slo_seconds = latency_slo_seconds
+        self.clock = clock
+
+        self.request_count = 0
+        self.error_count = 0
+        self.total_latency = 0.0
+        self.start_time = time.time()
+        self._total = _Series(slot_seconds)
+        self._tools: Dict[str, _Series] = {}
+        self._lock = threading.Lock()
+
+    def record_request(self, latency: float, error: bool = False, tool: Optional[str] = None):
+        """Record one request's latency (seconds) and outcome."""
+        bucket = bucket_index(latency)
+        now = self.clock()
+        with self._lock:
+            self.request_count += 1
+            self.total_latency += latency
+            if error:
+                self.error_count += 1
+            self._total.record(now, latency, error, bucket)
+            if tool is not None:
+                self._series(tool).record(now, latency, error, bucket)
+
+    def record_item(self, latency: float, error: bool = False, tool: str = "batch_item"):
+        """
+        Record one unit of work inside a request, such as a batch item.
+
+        Only the `tool` series is updated: request totals, the overall
+        windows and health keep counting the enclosing request once.
+        """
+        bucket = bucket_index(latency)
+        now = self.clock()
+        with self._lock:
+            self._series(tool).record(now, latency, error, bucket)
+
+    def _series(self, tool: str) -> _Series:
+        series = self._tools.get(tool)
+        if series is None:
+            if len(self._tools) >= self.max_tools - 1:
+                tool = self.OTHER
+            series = self._tools.get(tool)
+            if series is None:
+                series = self._tools[tool] = _Series(self.slot_seconds)
+        return series
+
+    def percentile(self, p: float, tool: Optional[str] = None) -> float:
+        """Lifetime latency percentile in seconds."""
+        with self._lock:
+            series = self._total if tool is None else self._tools.get(tool)
+            return series.histogram.percentile(p) if series else 0.0
+
+    def window(self, name: str, tool: Optional[str] = None) -> Dict[str, Any]:
+        """Summary of one sliding window ('1m', '5m' or '15m')."""
+        with self._lock:
+            series = self._total if tool is None else self._tools.get(tool)
+            if series is None:
+                return SlidingWindow(1, 1).summary(self.clock(), WINDOWS[name])
+            return series.window.summary(self.clock(), WINDOWS[name])
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get current metrics."""
+        uptime = time.time() - self.start_time
+        now = self.clock()
+        with self._lock:
+            avg_latency = self.total_latency / self.request_count if self.request_count > 0 else 0
+            error_rate = (self.error_count / self.request_count * 100) if self.request_count > 0 else 0
+            hist = self._total.histogram
+            pct = hist.percentiles()
+
+            return {
+                'uptime_seconds': round(uptime, 2),
+                'total_requests': self.request_count,
+                'total_errors': self.error_count,
+                'error_rate': f"{error_rate:.2f}%",
+                'avg_latency_ms': round(avg_latency * 1000, 2),
+                'requests_per_second': round(self.request_count / uptime, 2) if uptime > 0 else 0,
+                'latency_ms': {
+                    **{f'p{p}': round(v * 1000, 2) for p, v in pct.items()},
+                    'max': round(hist.max * 1000, 2),
+                },
+                'windows': {
+                    name: self._total.window.summary(now, seconds)
+                    for name, seconds in WINDOWS.items()
+                },
+                'tools': {
+                    name: series.summary(now) for name, series in sorted(self._tools.items())
+                },
+            }
+
+    def health_status(self) -> Tuple[str, List[str]]:
+        """
+        Health from recent windows rather than lifetime totals.
+
+        The 1m and 5m windows are judged separately (when they hold at
+        least min_window_requests) and the worst verdict wins, so a fresh
+        regression shows up within a minute and old incidents age out.
+        """
+        order = {'healthy': 0, 'degraded': 1, 'unhealthy': 2}
+        status, reasons = 'healthy', []
+        for name in ('1m', '5m'):
+            window = self.window(name)
+            if window['requests'] < self.min_window_requests:
+                continue
+            verdict = 'healthy'
+            if window['error_ratio'] > self.unhealthy_error_ratio:
+                verdict = 'unhealthy'
+            elif window['error_ratio'] > self.degraded_error_ratio:
+                verdict = 'degraded'
+            elif window['p99_ms'] > self.latency_slo_seconds * 1000:
+                verdict = 'degraded'
+            if verdict != 'healthy':
+                reasons.append(
+                    f"{name}: error ratio {window['error_ratio']:.1%}, p99 {window['p99_ms']}ms"
+                )
+            if order[verdict] > order[status]:
+                status = verdict
+        return status, reasons
+
+
+# ============================================================================
+# BENCHMARK
+# ============================================================================
+
+def benchmark_record_request(
+    iterations: int = 200_000,
+    tools: int = 8,
+    error_rate: float = 0.05,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """
+    Measure the per-call cost of MetricsRegistry.record_request.
+
+    Inputs are generated up front so only record_request is timed. Returns
+    the mean cost in nanoseconds, the loop overhead subtracted.
+    """
+    rng = random.Random(seed)
+    registry = MetricsRegistry()
+    names = [f"tool_{i}" for i in range(tools)]
+    calls = [
+        (rng.lognormvariate(-4, 1.5), rng.random() < error_rate, names[i % tools])
+        for i in range(iterations)
+    ]
+    record = registry.record_request
+
+    start = time.perf_counter()
+    for latency, error, tool in calls:
+        pass
+    loop_overhead = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for latency, error, tool in calls:
+        record(latency, error, tool)
+    elapsed = time.perf_counter() - start
+
+    per_call = max(elapsed - loop_overhead, 0) / iterations
+    return {
+        'iterations': iterations,
+        'ns_per_call': round(per_call * 1e9, 1),
+        'us_per_call': round(per_call * 1e6, 3),
+        'calls_per_second': round(1 / per_call) if per_call > 0 else float('inf'),
+    }
+
+
+if __name__ == "__main__":
+    result = benchmark_record_request()
+    print(
+        f"record_request: {result['us_per_call']}µs/call "
+        f"({result['calls_per_second']:,} calls/s over {result['iterations']:,} calls)"
+    )
@@ -0,0 +1,438 @@
+"""
+Resilience primitives for the Best Practices Agent.
+
+Demonstrates:
+- Retry with exponential backoff and full jitter
+- Retry budgets that cap retries to a fraction of traffic
+- Deadline propagation across nested calls, tasks and threads
+- Circuit breaker with a sliding-window failure rate and limited
+  half-open probes
+
+Everything works for sync and async callables, as helpers or decorators,
+and is safe to share across concurrent invocations. Async paths never
+block the event loop.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Deque, Iterator, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker rejects a call."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the propagated deadline leaves no time for the call."""
+
+
+# ============================================================================
+# DEADLINES
+# ============================================================================
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "deadline", default=None
+)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    Bound everything inside the block to `seconds` from now.
+
+    Nested deadlines keep the earliest one. The deadline is a context
+    variable, so it follows asyncio tasks and asyncio.to_thread calls.
+    """
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline (None if unbounded)."""
+    expires = _deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+# ============================================================================
+# RETRY
+# ============================================================================
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of requests over a sliding time window.
+
+    Prevents retry storms: when a dependency is down, every caller retrying
+    `max_attempts` times multiplies its load. With a budget, retries stop
+    once they exceed `ratio` of recent requests (plus a small floor).
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10, window_seconds: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window_seconds
+        self.clock = clock
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _prune(self, now: float) -> None:
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self) -> None:
+        with self._lock:
+            now = self.clock()
+            self._prune(now)
+            self._requests.append(now)
+
+    def try_acquire(self) -> bool:
+        """Reserve one retry; False if the budget is spent."""
+        with self._lock:
+            now = self.clock()
+            self._prune(now)
+            allowed = max(self.min_retries, self.ratio * len(self._requests))
+            if len(self._retries) >= allowed:
+                self.rejected += 1
+                return False
+            self._retries.append(now)
+            return True
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter, a retry budget and deadlines."""
+    max_attempts: int = 3
+    base_delay_seconds: float = 0.1
+    max_delay_seconds: float = 5.0
+    retry_on: Tuple[Type[BaseException], ...] = (Exception,)
+    give_up_on: Tuple[Type[BaseException], ...] = (CircuitOpenError, DeadlineExceeded)
+    budget: Optional[RetryBudget] = None
+    on_retry: Optional[Callable[[int, BaseException, float], None]] = None
+    rng: random.Random = field(default_factory=random.Random)
+
+    def __post_init__(self):
+        if self.max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max_delay, base * 2**attempt)]."""
+        return self.rng.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * 2 ** attempt))
+
+    def _next_delay(self, attempt: int, error: BaseException) -> float:
+        """Delay before the next attempt, or re-raise if retrying is not allowed."""
+        if isinstance(error, self.give_up_on) or not isinstance(error, self.retry_on):
+            raise error
+        if attempt + 1 >= self.max_attempts:
+            raise error
+        if self.budget is not None and not self.budget.try_acquire():
+            logger.warning("Retry budget exhausted, not retrying")
+            raise error
+
+        delay = self.backoff(attempt)
+        left = remaining_time()
+        if left is not None and delay >= left:
+            raise DeadlineExceeded("Deadline leaves no time for another attempt") from error
+
+        if self.on_retry is not None:
+            self.on_retry(attempt + 1, error, delay)
+        logger.info(f"Attempt {attempt + 1} failed ({error}), retrying in {delay:.2f}s")
+        return delay
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a sync callable with retries (sleeps the calling thread)."""
+        if self.budget is not None:
+            self.budget.record_request()
+        for attempt in range(self.max_attempts):
+            left = remaining_time()
+            if left is not None and left <= 0:
+                raise DeadlineExceeded("Deadline exceeded before attempt")
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                time.sleep(self._next_delay(attempt, e))
+
+    async def call_async(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a coroutine function with retries; backoff never blocks the loop."""
+        if self.budget is not None:
+            self.budget.record_request()
+        for attempt in range(self.max_attempts):
+            left = remaining_time()
+            if left is not None and left <= 0:
+                raise DeadlineExceeded("Deadline exceeded before attempt")
+            try:
+                if left is None:
+                    return await func(*args, **kwargs)
+                try:
+                    return await asyncio.wait_for(func(*args, **kwargs), timeout=left)
+                except asyncio.TimeoutError as e:
+                    if remaining_time() <= 0:
+                        raise DeadlineExceeded("Deadline exceeded during attempt") from e
+                    raise
+            except BaseException as e:
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                await asyncio.sleep(self._next_delay(attempt, e))
+
+
+def retry(policy: Optional[RetryPolicy] = None, **policy_kwargs) -> Callable:
+    """
+    Decorator retrying a sync or async function.
+
+        @retry(max_attempts=4, base_delay_seconds=0.2)
+        async def fetch(...): ...
+    """
+    policy = policy or RetryPolicy(**policy_kwargs)
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await policy.call_async(func, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            return policy.call(func, *args, **kwargs)
+        return sync_wrapper
+
+    return decorator
+
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+class CircuitBreaker:
+    """
+    Circuit breaker for external dependencies.
+
+    Prevents cascading failures by temporarily blocking requests
+    to failing services.
+
+    - CLOSED: calls pass; outcomes are kept over a sliding time window.
+      The circuit opens when the window holds at least `failure_threshold`
+      calls and the failure rate reaches `failure_rate_threshold`.
+    - OPEN: calls are rejected with CircuitOpenError for `timeout_seconds`.
+    - HALF_OPEN: at most `half_open_max_calls` probes run at once; others
+      are rejected. `success_threshold` probe successes close the circuit,
+      any probe failure reopens it.
+
+    State transitions happen under a lock, so one breaker can be shared by
+    concurrent sync and async invocations.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        timeout_seconds: float = 30,
+        failure_rate_threshold: float = 0.5,
+        window_seconds: float = 60,
+        window_max_calls: int = 1000,
+        half_open_max_calls: int = 1,
+        success_threshold: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            failure_threshold: Minimum calls in the window before it can open
+            timeout_seconds: How long the circuit stays open
+            failure_rate_threshold: Failure ratio in the window that opens it
+            window_seconds: Sliding window length for the failure rate
+            window_max_calls: Most recent outcomes kept in the window
+            half_open_max_calls: Concurrent probes allowed while half-open
+            success_threshold: Probe successes needed to close
+            clock: Time source
+        """
+        self.failure_threshold = failure_threshold
+        self.timeout = timeout_seconds
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window = window_seconds
+        self.window_max_calls = window_max_calls
+        self.half_open_max_calls = half_open_max_calls
+        self.success_threshold = success_threshold
+        self.clock = clock
+
+        self.state = CircuitState.CLOSED
+        self.last_failure_time: Optional[float] = None
+        self.opened_at: Optional[float] = None
+        self.success_count = 0
+        self.rejected = 0
+        # Bounded so a busy dependency can't grow the window without limit
+        self._outcomes: Deque[Tuple[float, bool]] = deque(maxlen=window_max_calls)
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Window statistics
+    # ------------------------------------------------------------------
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    @property
+    def failures(self) -> int:
+        """Failures in the current window."""
+        with self._lock:
+            self._prune(self.clock())
+            return sum(1 for _, ok in self._outcomes if not ok)
+
+    @property
+    def failure_rate(self) -> float:
+        with self._lock:
+            self._prune(self.clock())
+            if not self._outcomes:
+                return 0.0
+            return sum(1 for _, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    # ------------------------------------------------------------------
+    # State machine
+    # ------------------------------------------------------------------
+
+    def _open(self, now: float) -> None:
+        self.state = CircuitState.OPEN
+        self.opened_at = now
+        self._probes = 0
+        self.success_count = 0
+
+    def _before_call(self) -> bool:
+        """Admit or reject a call; returns whether it is a half-open probe."""
+        with self._lock:
+            now = self.clock()
+            if self.state == CircuitState.OPEN:
+                if now - self.opened_at >= self.timeout:
+                    logger.info("Circuit breaker entering HALF_OPEN state")
+                    self.state = CircuitState.HALF_OPEN
+                    self._probes = 0
+                    self.success_count = 0
+                else:
+                    self.rejected += 1
+                    retry_in = int(self.timeout - (now - self.opened_at))
+                    raise CircuitOpenError(f"Circuit breaker is OPEN. Try again in {retry_in}s")
+
+            if self.state == CircuitState.HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError("Circuit breaker is HALF_OPEN and probing")
+                self._probes += 1
+                return True
+            return False
+
+    def _on_success(self, probe: bool) -> None:
+        with self._lock:
+            now = self.clock()
+            if probe:
+                self._probes -= 1
+                if self.state != CircuitState.HALF_OPEN:
+                    return
+                self.success_count += 1
+                if self.success_count >= self.success_threshold:
+                    logger.info("Circuit breaker closing after successful probe")
+                    self.state = CircuitState.CLOSED
+                    self._outcomes.clear()
+                    self.success_count = 0
+                return
+            self._prune(now)
+            self._outcomes.append((now, True))
+
+    def _on_failure(self, probe: bool) -> None:
+        with self._lock:
+            now = self.clock()
+            self.last_failure_time = now
+            if probe:
+                self._probes -= 1
+                if self.state == CircuitState.HALF_OPEN:
+                    logger.warning("Circuit breaker reopening after failed probe")
+                    self._open(now)
+                return
+
+            self._prune(now)
+            self._outcomes.append((now, False))
+            if self.state != CircuitState.CLOSED:
+                return
+            calls = len(self._outcomes)
+            failed = sum(1 for _, ok in self._outcomes if not ok)
+            if calls >= self.failure_threshold and failed / calls >= self.failure_rate_threshold:
+                logger.warning(f"Circuit breaker opening after {failed}/{calls} failures")
+                self._open(now)
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def call(self, func, *args, **kwargs):
+        """Execute function with circuit breaker protection."""
+        probe = self._before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self._on_failure(probe)
+            raise
+        self._on_success(probe)
+        return result
+
+    async def call_async(self, func, *args, **kwargs):
+        """Await a coroutine function with circuit breaker protection."""
+        probe = self._before_call()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # Not the dependency's fault: release the probe slot only
+            with self._lock:
+                if probe:
+                    self._probes -= 1
+            raise
+        except Exception:
+            self._on_failure(probe)
+            raise
+        self._on_success(probe)
+        return result
+
+    def __call__(self, func):
+        """Use the breaker as a decorator on a sync or async function."""
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                return await self.call_async(func, *args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def sync_wrapper(*args, **kwargs):
+            return self.call(func, *args, **kwargs)
+        return sync_wrapper
+
+    def stats(self) -> dict:
+        """Current state and window statistics."""
+        return {
+            'state': self.state.value,
+            'failures': self.failures,
+            'failure_rate': round(self.failure_rate, 4),
+            'rejected': self.rejected,
+        }
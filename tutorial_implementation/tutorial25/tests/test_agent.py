@@ -168,9 +168,10 @@ class TestValidation:
 class TestRetryLogic:
     """Test retry with exponential backoff."""
     
-    def test_retry_eventually_succeeds(self):
+    @pytest.mark.asyncio
+    async def test_retry_eventually_succeeds(self):
         """Test that retry logic can succeed."""
-        result = retry_with_backoff_tool(
+        result = await retry_with_backoff_tool(
             operation="test_operation",
             max_retries=5
         )
@@ -179,9 +180,10 @@ class TestRetryLogic:
         assert 'status' in result
         assert 'attempts' in result or 'report' in result
     
-    def test_retry_with_max_retries(self):
+    @pytest.mark.asyncio
+    async def test_retry_with_max_retries(self):
         """Test retry respects max_retries."""
-        result = retry_with_backoff_tool(
+        result = await retry_with_backoff_tool(
             operation="test_operation",
             max_retries=1
         )
@@ -189,9 +191,10 @@ class TestRetryLogic:
         assert 'status' in result
         assert 'report' in result
     
-    def test_retry_includes_timing(self):
+    @pytest.mark.asyncio
+    async def test_retry_includes_timing(self):
         """Test that retry includes timing information."""
-        result = retry_with_backoff_tool(
+        result = await retry_with_backoff_tool(
             operation="test_operation",
             max_retries=2
         )
@@ -333,34 +336,38 @@ class TestCaching:
 class TestBatchProcessing:
     """Test batch processing functionality."""
     
-    def test_batch_process_items(self):
+    @pytest.mark.asyncio
+    async def test_batch_process_items(self):
         """Test batch processing of items."""
         items = ["item1", "item2", "item3"]
-        result = batch_process_tool(items=items)
+        result = await batch_process_tool(items=items)
         
         assert result['status'] == 'success'
         assert result['items_processed'] == 3
         assert 'results' in result
         assert len(result['results']) == 3
     
-    def test_batch_process_single_item(self):
+    @pytest.mark.asyncio
+    async def test_batch_process_single_item(self):
         """Test batch processing with single item."""
         items = ["single_item"]
-        result = batch_process_tool(items=items)
+        result = await batch_process_tool(items=items)
         
         assert result['status'] == 'success'
         assert result['items_processed'] == 1
     
-    def test_batch_process_empty_list(self):
+    @pytest.mark.asyncio
+    async def test_batch_process_empty_list(self):
         """Test batch processing with empty list."""
-        result = batch_process_tool(items=[])
+        result = await batch_process_tool(items=[])
         
         assert result['status'] == 'error'
     
-    def test_batch_process_efficiency(self):
+    @pytest.mark.asyncio
+    async def test_batch_process_efficiency(self):
         """Test that batch processing reports efficiency."""
         items = ["a", "b", "c", "d", "e"]
-        result = batch_process_tool(items=items)
+        result = await batch_process_tool(items=items)
         
         if result['status'] == 'success':
             assert 'processing_time_ms' in result
@@ -419,7 +426,8 @@ class TestMonitoring:
 class TestIntegration:
     """Test integration scenarios."""
     
-    def test_full_workflow(self):
+    @pytest.mark.asyncio
+    async def test_full_workflow(self):
         """Test a complete workflow using multiple tools."""
         # 1. Validate input
         validation = validate_input_tool(
@@ -438,14 +446,15 @@ class TestIntegration:
         assert cache_set['status'] == 'success'
         
         # 3. Batch process
-        batch = batch_process_tool(items=["order1", "order2"])
+        batch = await batch_process_tool(items=["order1", "order2"])
         assert batch['status'] == 'success'
         
         # 4. Check health
         health = health_check_tool()
         assert health['status'] == 'success'
     
-    def test_error_handling_workflow(self):
+    @pytest.mark.asyncio
+    async def test_error_handling_workflow(self):
         """Test error handling across multiple operations."""
         # Invalid validation
         result1 = validate_input_tool(
@@ -463,7 +472,7 @@ class TestIntegration:
         assert result2['status'] == 'error'
         
         # Empty batch
-        result3 = batch_process_tool(items=[])
+        result3 = await batch_process_tool(items=[])
         assert result3['status'] == 'error'
         
         # Health should still work despite errors
@@ -490,10 +499,11 @@ class TestPerformance:
             # Should complete in reasonable time
             assert result['validation_time_ms'] < 1000  # Less than 1 second
     
-    def test_batch_processing_faster_than_sequential(self):
+    @pytest.mark.asyncio
+    async def test_batch_processing_faster_than_sequential(self):
         """Test that batch processing is efficient."""
         items = [f"item{i}" for i in range(10)]
-        result = batch_process_tool(items=items)
+        result = await batch_process_tool(items=items)
         
         if result['status'] == 'success':
             # Batch should be faster than sequential
@@ -0,0 +1,288 @@
+"""Test the concurrent batch executor."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from best_practices_agent.agent import MetricsCollector, batch_process_tool, metrics
+from best_practices_agent.batching import BatchExecutor
+from best_practices_agent.resilience import deadline
+
+
+class InFlight:
+    """Tracks the peak number of concurrent calls."""
+
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        with self._lock:
+            self.calls += 1
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self._lock:
+            self.current -= 1
+
+
+# ============================================================================
+# EXECUTION
+# ============================================================================
+
+class TestBatchExecutor:
+    """Test bounded concurrency, ordering and failure handling."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test no more than `concurrency` calls run at once."""
+        tracker = InFlight()
+
+        async def work(item):
+            with tracker:
+                await asyncio.sleep(0.01)
+            return item
+
+        report = await BatchExecutor(concurrency=5).run(range(50), work)
+
+        assert report.succeeded == 50
+        assert tracker.peak == 5
+
+    @pytest.mark.asyncio
+    async def test_parallel_speedup_is_measured(self):
+        """Test wall time reflects real parallelism."""
+        async def work(item):
+            await asyncio.sleep(0.02)
+            return item
+
+        report = await BatchExecutor(concurrency=20).run(range(100), work)
+
+        # Sequential: 100 x 20ms = 2s; with 20 in flight about 100ms
+        assert report.wall_time_s < 0.6
+        assert report.work_time_s >= 2.0
+        assert report.speedup > 4
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order(self):
+        """Test run() returns results ordered by input index."""
+        async def work(item):
+            await asyncio.sleep(0.001 * (10 - item))
+            return item * 2
+
+        report = await BatchExecutor(concurrency=10).run(range(10), work)
+
+        assert [r.value for r in report.results] == [i * 2 for i in range(10)]
+
+    @pytest.mark.asyncio
+    async def test_stream_yields_in_completion_order(self):
+        """Test stream() yields fast items before slow ones."""
+        async def work(delay):
+            await asyncio.sleep(delay)
+            return delay
+
+        seen = [r.value async for r in BatchExecutor(concurrency=3).stream([0.1, 0.05, 0.0], work)]
+
+        assert seen == [0.0, 0.05, 0.1]
+
+    @pytest.mark.asyncio
+    async def test_partial_failures_and_timeouts(self):
+        """Test failing and slow items are reported without failing the batch."""
+        async def work(item):
+            if item == "bad":
+                raise ValueError("invalid item")
+            if item == "slow":
+                await asyncio.sleep(1)
+            return item
+
+        report = await BatchExecutor(concurrency=4, item_timeout_seconds=0.05).run(
+            ["a", "bad", "slow", "b"], work
+        )
+
+        assert [r.status for r in report.results] == ['success', 'error', 'timeout', 'success']
+        assert "invalid item" in report.results[1].error
+        assert (report.succeeded, report.failed, report.timed_out) == (2, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_sync_functions_run_in_threads(self):
+        """Test blocking callables run in parallel on the thread pool."""
+        tracker = InFlight()
+
+        def blocking(item):
+            with tracker:
+                time.sleep(0.02)
+            return threading.current_thread().name
+
+        start = time.perf_counter()
+        report = await BatchExecutor(concurrency=8).run(range(16), blocking)
+
+        assert time.perf_counter() - start < 0.25
+        assert tracker.peak == 8
+        assert all(r.value.startswith("batch") for r in report.results)
+
+    @pytest.mark.asyncio
+    async def test_sync_timeout_starts_when_item_runs(self):
+        """Test waiting for a thread held by a timed-out item doesn't count."""
+        def work(item):
+            time.sleep(item)
+            return item
+
+        report = await BatchExecutor(concurrency=1, item_timeout_seconds=0.1).run([0.3, 0.05], work)
+
+        assert [r.status for r in report.results] == ['timeout', 'success']
+
+    @pytest.mark.asyncio
+    async def test_deadline_caps_item_timeout(self):
+        """Test items do not run past the caller's deadline."""
+        async def work(item):
+            await asyncio.sleep(0.05)
+            return item
+
+        with deadline(0.08):
+            report = await BatchExecutor(concurrency=1).run(range(5), work)
+
+        assert report.succeeded == 1
+        assert report.timed_out == 4
+        assert report.wall_time_s < 0.2
+
+    @pytest.mark.asyncio
+    async def test_early_stop_cancels_remaining_work(self):
+        """Test closing a stream stops the workers."""
+        tracker = InFlight()
+
+        async def work(item):
+            with tracker:
+                await asyncio.sleep(0.01)
+            return item
+
+        stream = BatchExecutor(concurrency=2).stream(range(100), work)
+        async for result in stream:
+            break
+        await stream.aclose()
+        calls = tracker.calls
+        await asyncio.sleep(0.05)
+
+        assert tracker.calls == calls < 100
+        assert tracker.current == 0
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self):
+        """Test an empty batch returns an empty report."""
+        async def work(item):
+            return item
+
+        report = await BatchExecutor().run([], work)
+
+        assert report.results == []
+
+    def test_invalid_concurrency(self):
+        """Test concurrency must be positive."""
+        with pytest.raises(ValueError):
+            BatchExecutor(concurrency=0)
+
+
+class TestChunkedExecution:
+    """Test chunked execution against multi-get style backends."""
+
+    @pytest.mark.asyncio
+    async def test_chunks_and_per_item_errors(self):
+        """Test chunk sizes and that an Exception in the output fails one item."""
+        chunk_sizes = []
+
+        async def multi_get(keys):
+            chunk_sizes.append(len(keys))
+            return [KeyError(k) if k == 7 else k * 10 for k in keys]
+
+        report = await BatchExecutor(concurrency=2).run_chunks(range(10), multi_get, chunk_size=4)
+
+        assert sorted(chunk_sizes) == [2, 4, 4]
+        assert report.results[7].status == 'error'
+        assert report.succeeded == 9
+        assert report.results[9].value == 90
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_fails_its_items(self):
+        """Test a chunk that raises fails only its own items."""
+        async def multi_get(keys):
+            if 0 in keys:
+                raise ConnectionError("shard down")
+            return keys
+
+        report = await BatchExecutor().run_chunks(range(6), multi_get, chunk_size=3)
+
+        assert [r.status for r in report.results] == ['error'] * 3 + ['success'] * 3
+
+    @pytest.mark.asyncio
+    async def test_wrong_result_length_is_an_error(self):
+        """Test a batch function must return one result per item."""
+        async def multi_get(keys):
+            return keys[:-1]
+
+        report = await BatchExecutor().run_chunks(range(3), multi_get, chunk_size=3)
+
+        assert report.failed == 3
+
+
+# ============================================================================
+# METRICS & TOOL INTEGRATION
+# ============================================================================
+
+class TestBatchMetrics:
+    """Test measured latency reaches the metrics collector."""
+
+    @pytest.mark.asyncio
+    async def test_per_item_latency_recorded(self):
+        """Test each item records its measured latency and outcome."""
+        collector = MetricsCollector()
+
+        async def work(item):
+            await asyncio.sleep(0.01)
+            if item % 4 == 0:
+                raise RuntimeError("boom")
+            return item
+
+        await BatchExecutor(concurrency=4, metrics=collector).run(range(8), work)
+
+        items = collector.get_metrics()['tools']['batch_item']
+        assert (items['requests'], items['errors']) == (8, 2)
+        assert items['avg_latency_ms'] >= 10
+        # Items are not requests: totals and health are untouched
+        assert collector.request_count == 0
+        assert collector.error_count == 0
+
+    @pytest.mark.asyncio
+    async def test_tool_records_one_request_per_batch(self):
+        """Test a batch adds one request to the totals whatever its size."""
+        before = metrics.get_metrics()
+
+        await batch_process_tool(items=[f"sku-{i}" for i in range(50)], concurrency=8)
+
+        after = metrics.get_metrics()
+        assert after['total_requests'] == before['total_requests'] + 1
+        assert after['tools']['batch_item']['requests'] >= 50
+
+    @pytest.mark.asyncio
+    async def test_tool_processes_hundreds_concurrently(self):
+        """Test the tool handles a large batch with a real speedup."""
+        items = [f"sku-{i}" for i in range(300)]
+
+        result = await batch_process_tool(items=items, concurrency=32)
+
+        assert result['status'] == 'success'
+        assert result['items_succeeded'] == 300
+        assert result['speedup'] > 5
+        assert result['results'][0]['processed'] == "PROCESSED-sku-0"
+
+    @pytest.mark.asyncio
+    async def test_tool_reports_partial_failure(self):
+        """Test invalid items fail individually."""
+        result = await batch_process_tool(items=["a", " ", "b"])
+
+        assert result['status'] == 'success'
+        assert result['items_failed'] == 1
+        assert result['results'][1]['status'] == 'error'
+        assert '⚠️' in result['report']
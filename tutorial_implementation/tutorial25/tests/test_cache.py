@@ -0,0 +1,297 @@
+"""Test the bounded LRU + TTL cache with single-flight loading."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from best_practices_agent.agent import cache_operation_tool, health_check_tool
+from best_practices_agent.cache import CachedDataStore
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+# ============================================================================
+# BOUNDS & EXPIRY
+# ============================================================================
+
+class TestCacheBounds:
+    """Test LRU eviction, memory limits and TTL."""
+
+    def test_lru_eviction_by_entries(self):
+        """Test the least recently used key is evicted first."""
+        cache = CachedDataStore(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats()['evictions'] == 1
+
+    def test_eviction_by_bytes(self):
+        """Test total value size stays under max_bytes."""
+        cache = CachedDataStore(max_entries=100, max_bytes=250)
+        for i in range(5):
+            cache.set(f"k{i}", "x" * 100)
+
+        stats = cache.stats()
+        assert stats['size'] == 2
+        assert stats['memory_bytes'] == 200
+        assert stats['evictions'] == 3
+
+    def test_oversized_value_rejected(self):
+        """Test a value larger than the cache is not stored."""
+        cache = CachedDataStore(max_bytes=10)
+
+        assert cache.set("big", "x" * 11) is False
+        assert len(cache) == 0
+        assert cache.stats()['rejected'] == 1
+
+    def test_overwrite_updates_memory(self):
+        """Test replacing a key does not leak its old size."""
+        cache = CachedDataStore()
+        cache.set("k", "x" * 100)
+        cache.set("k", "x" * 10)
+
+        assert cache.stats()['memory_bytes'] == 10
+
+    def test_ttl_expiry(self):
+        """Test entries expire after their TTL."""
+        clock = FakeClock()
+        cache = CachedDataStore(ttl_seconds=10, clock=clock)
+        cache.set("short", "v", ttl_seconds=1)
+        cache.set("long", "v")
+
+        clock.now += 5
+        assert cache.get("short") is None
+        assert cache.get("long") == "v"
+        assert cache.stats()['expirations'] == 1
+
+    def test_sweep_removes_unread_expired_entries(self):
+        """Test the sweep reclaims entries that are never read again."""
+        clock = FakeClock()
+        cache = CachedDataStore(ttl_seconds=1, sweep_interval_seconds=60, clock=clock)
+        for i in range(10):
+            cache.set(f"k{i}", i)
+
+        clock.now += 2
+        assert cache.sweep() == 10
+        assert cache.stats()['memory_bytes'] == 0
+
+    def test_sweep_amortized_over_writes(self):
+        """Test writes trigger a sweep once the interval has passed."""
+        clock = FakeClock()
+        cache = CachedDataStore(ttl_seconds=1, sweep_interval_seconds=30, clock=clock)
+        cache.set("old", 1)
+
+        clock.now += 31
+        cache.set("new", 2)
+
+        assert len(cache) == 1
+
+    def test_background_sweep(self):
+        """Test the daemon thread expires entries without any access."""
+        cache = CachedDataStore(ttl_seconds=0.01, sweep_interval_seconds=0.02)
+        cache.set("k", "v")
+        cache.start_background_sweep()
+        try:
+            deadline = time.time() + 2
+            while len(cache) and time.time() < deadline:
+                time.sleep(0.01)
+            assert len(cache) == 0
+            assert cache.stats()['background_sweep'] is True
+        finally:
+            cache.stop_background_sweep()
+
+    def test_invalid_bounds(self):
+        """Test nonsensical limits are rejected."""
+        with pytest.raises(ValueError):
+            CachedDataStore(max_entries=0)
+
+
+# ============================================================================
+# SINGLE-FLIGHT & STALE-WHILE-REVALIDATE
+# ============================================================================
+
+class TestSingleFlight:
+    """Test concurrent misses run the loader once."""
+
+    def test_concurrent_threads_load_once(self):
+        """Test a thundering herd on one key triggers a single load."""
+        cache = CachedDataStore()
+        calls = []
+        start = threading.Barrier(10)
+
+        def loader():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        results = []
+
+        def worker():
+            start.wait()
+            results.append(cache.get_or_compute("k", loader))
+
+        threads = [threading.Thread(target=worker) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == ["value"] * 10
+        assert len(calls) == 1
+        assert cache.stats()['coalesced_loads'] == 9
+
+    def test_loader_error_shared_and_not_cached(self):
+        """Test waiters see the error and the next call retries."""
+        cache = CachedDataStore()
+
+        def failing():
+            raise RuntimeError("backend down")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_compute("k", failing)
+
+        assert cache.get_or_compute("k", lambda: "ok") == "ok"
+        assert cache.stats()['load_errors'] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_concurrent_load_once(self):
+        """Test concurrent coroutines share one async load."""
+        cache = CachedDataStore()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return len(calls)
+
+        results = await asyncio.gather(
+            *(cache.aget_or_compute("k", loader) for _ in range(20))
+        )
+
+        assert results == [1] * 20
+        assert len(calls) == 1
+        assert await cache.aget_or_compute("k", loader) == 1
+
+    @pytest.mark.asyncio
+    async def test_async_leader_cancelled(self):
+        """Test cancelling the caller that started a load doesn't fail the others."""
+        cache = CachedDataStore()
+        calls = []
+
+        async def loader():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+
+        leader = asyncio.ensure_future(cache.aget_or_compute("k", loader))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(cache.aget_or_compute("k", loader)) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        assert await asyncio.gather(*waiters) == ["value"] * 5
+        assert leader.cancelled()
+        assert len(calls) == 1
+        assert cache.get("k") == "value"
+
+    def test_stale_while_revalidate(self):
+        """Test an expired value is served while a refresh runs."""
+        clock = FakeClock()
+        cache = CachedDataStore(
+            ttl_seconds=10, stale_while_revalidate_seconds=30, clock=clock
+        )
+        cache.set("k", "old")
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return "new"
+
+        clock.now += 15
+        assert cache.get("k") is None
+        assert cache.get_or_compute("k", loader) == "old"
+        assert refreshed.wait(2)
+
+        deadline = time.time() + 2
+        while cache.stats()['refreshing'] and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get("k") == "new"
+        assert cache.stats()['stale_served'] == 1
+
+    @pytest.mark.asyncio
+    async def test_async_stale_while_revalidate(self):
+        """Test the async API refreshes stale values in a task."""
+        clock = FakeClock()
+        cache = CachedDataStore(
+            ttl_seconds=10, stale_while_revalidate_seconds=30, clock=clock
+        )
+        cache.set("k", "old")
+
+        async def loader():
+            return "new"
+
+        clock.now += 15
+        assert await cache.aget_or_compute("k", loader) == "old"
+        await asyncio.sleep(0.01)
+
+        assert await cache.aget_or_compute("k", loader) == "new"
+
+    def test_past_stale_window_reloads(self):
+        """Test values beyond the stale window are loaded synchronously."""
+        clock = FakeClock()
+        cache = CachedDataStore(
+            ttl_seconds=10, stale_while_revalidate_seconds=5, clock=clock
+        )
+        cache.set("k", "old")
+
+        clock.now += 20
+        assert cache.get_or_compute("k", lambda: "new") == "new"
+
+
+# ============================================================================
+# TOOL INTEGRATION
+# ============================================================================
+
+class TestCacheTools:
+    """Test the cache statistics exposed through tools."""
+
+    def test_delete_operation(self):
+        """Test cache_operation_tool deletes keys."""
+        cache_operation_tool(key="to_delete", value="v", operation="set")
+
+        result = cache_operation_tool(key="to_delete", operation="delete")
+
+        assert result['status'] == 'success'
+        assert result['deleted'] is True
+        assert not cache_operation_tool(key="to_delete", operation="get")['cache_hit']
+
+    def test_stats_expose_evictions_and_memory(self):
+        """Test stats include hit ratio, evictions and memory."""
+        result = cache_operation_tool(key="any", operation="stats")
+
+        stats = result['statistics']
+        for field in ('hit_ratio', 'evictions', 'memory_bytes', 'max_bytes',
+                      'memory_utilization', 'coalesced_loads'):
+            assert field in stats
+
+    def test_health_check_includes_cache(self):
+        """Test the health check reports cache effectiveness."""
+        result = health_check_tool()
+
+        assert 'hit ratio' in result['report']
+        assert 'evictions' in result['health']['cache_stats']
@@ -0,0 +1,240 @@
+"""Test latency histograms, sliding windows and the metrics tools."""
+
+import random
+import sys
+import threading
+
+import pytest
+
+from best_practices_agent.agent import MetricsCollector, get_metrics_tool, validate_input_tool
+from best_practices_agent.metrics import (
+    NUM_BUCKETS,
+    LatencyHistogram,
+    MetricsRegistry,
+    SlidingWindow,
+    benchmark_record_request,
+    bucket_bounds,
+    bucket_index,
+)
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _exact_percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(0, -(-len(ordered) * p // 100) - 1)]
+
+
+# ============================================================================
+# HISTOGRAM
+# ============================================================================
+
+class TestLatencyHistogram:
+    """Test the log-bucketed histogram."""
+
+    def test_bucket_contains_value(self):
+        """Test every latency falls inside its bucket's bounds."""
+        for latency in (2e-6, 1.5e-4, 0.0123, 0.5, 3.7, 120.0):
+            low, high = bucket_bounds(bucket_index(latency))
+            assert low <= latency < high
+
+    def test_extremes_are_clamped(self):
+        """Test out-of-range values land in the first and last bucket."""
+        assert bucket_index(0) == 0
+        assert bucket_index(1e9) == NUM_BUCKETS - 1
+
+    def test_percentile_relative_error(self):
+        """Test percentiles stay within ~3% of the exact value."""
+        rng = random.Random(1)
+        values = [rng.lognormvariate(-3, 1) for _ in range(20_000)]
+        hist = LatencyHistogram()
+        for v in values:
+            hist.record(v)
+
+        for p in (50, 95, 99):
+            exact = _exact_percentile(values, p)
+            assert abs(hist.percentile(p) - exact) / exact < 0.035
+
+    def test_memory_independent_of_traffic(self):
+        """Test recording more samples does not grow the histogram."""
+        hist = LatencyHistogram()
+        hist.record(0.01)
+        size = sys.getsizeof(hist.counts)
+        for i in range(50_000):
+            hist.record(i * 1e-5)
+
+        assert sys.getsizeof(hist.counts) == size
+        assert hist.count == 50_001
+
+
+# ============================================================================
+# SLIDING WINDOWS
+# ============================================================================
+
+class TestSlidingWindow:
+    """Test time-bucketed windows."""
+
+    def test_old_slots_age_out(self):
+        """Test requests leave the window after its span."""
+        clock = FakeClock()
+        window = SlidingWindow(span_seconds=900, slot_seconds=5)
+        for _ in range(10):
+            window.record(clock.now, 0.01, True, bucket_index(0.01))
+
+        clock.now += 120
+        window.record(clock.now, 0.02, False, bucket_index(0.02))
+
+        assert window.summary(clock.now, 60)['requests'] == 1
+        assert window.summary(clock.now, 300)['errors'] == 10
+
+        clock.now += 1000
+        assert window.summary(clock.now, 900)['requests'] == 0
+
+    def test_windowed_percentiles(self):
+        """Test window percentiles reflect only recent latencies."""
+        clock = FakeClock()
+        registry = MetricsRegistry(clock=clock)
+        for _ in range(100):
+            registry.record_request(1.0)
+        clock.now += 400
+        for _ in range(100):
+            registry.record_request(0.01)
+
+        assert registry.window('5m')['p99_ms'] == pytest.approx(10, rel=0.05)
+        assert registry.window('15m')['p99_ms'] == pytest.approx(1000, rel=0.05)
+
+    def test_ring_memory_is_constant(self):
+        """Test the ring keeps the same number of slots at any traffic."""
+        clock = FakeClock()
+        window = SlidingWindow(900, 5)
+        for i in range(20_000):
+            clock.now += 0.5
+            window.record(clock.now, 0.001, False, bucket_index(0.001))
+
+        assert len(window._counts) == 180
+        assert window.summary(clock.now, 900)['requests'] <= 900 / 0.5
+
+
+# ============================================================================
+# REGISTRY & HEALTH
+# ============================================================================
+
+class TestMetricsRegistry:
+    """Test per-tool series and windowed health."""
+
+    def test_per_tool_percentiles(self):
+        """Test a slow tool is reported separately from a fast one."""
+        registry = MetricsRegistry()
+        for _ in range(100):
+            registry.record_request(0.001, tool="fast")
+            registry.record_request(0.5, tool="slow")
+
+        tools = registry.get_metrics()['tools']
+
+        assert tools['fast']['p99_ms'] < 2
+        assert tools['slow']['p50_ms'] == pytest.approx(500, rel=0.05)
+        assert registry.get_metrics()['total_requests'] == 200
+
+    def test_tool_cardinality_is_bounded(self):
+        """Test unknown tools beyond max_tools share one series."""
+        registry = MetricsRegistry(max_tools=3)
+        for i in range(10):
+            registry.record_request(0.01, tool=f"tool{i}")
+
+        tools = registry.get_metrics()['tools']
+        assert len(tools) == 3
+        assert tools['other']['requests'] == 8
+
+    def test_recent_regression_degrades_health(self):
+        """Test a fresh error burst is visible despite a clean history."""
+        clock = FakeClock()
+        collector = MetricsCollector(clock=clock)
+        for _ in range(10_000):
+            collector.record_request(0.01)
+        clock.now += 3600
+
+        for i in range(20):
+            collector.record_request(0.01, error=i % 4 == 0)
+
+        health = collector.health_check()
+        assert health['status'] == 'degraded'
+        assert health['reasons']
+        # Lifetime error rate alone would have looked healthy
+        assert float(health['metrics']['error_rate'].rstrip('%')) < 1
+
+    def test_old_incident_ages_out(self):
+        """Test health recovers once errors leave the windows."""
+        clock = FakeClock()
+        registry = MetricsRegistry(clock=clock)
+        for _ in range(50):
+            registry.record_request(0.01, error=True)
+        assert registry.health_status()[0] == 'unhealthy'
+
+        clock.now += 600
+        for _ in range(10):
+            registry.record_request(0.01)
+
+        assert registry.health_status() == ('healthy', [])
+
+    def test_latency_slo_degrades_health(self):
+        """Test a slow p99 degrades health without errors."""
+        registry = MetricsRegistry(latency_slo_seconds=1.0)
+        for _ in range(20):
+            registry.record_request(3.0)
+
+        assert registry.health_status()[0] == 'degraded'
+
+    def test_concurrent_recording(self):
+        """Test counts are exact under concurrent writers."""
+        registry = MetricsRegistry()
+
+        def worker():
+            for _ in range(5_000):
+                registry.record_request(0.002, tool="t")
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert registry.get_metrics()['tools']['t']['requests'] == 20_000
+
+
+class TestRecordOverhead:
+    """Benchmark record_request."""
+
+    def test_record_request_is_microsecond_scale(self):
+        """Test recording costs microseconds, not milliseconds."""
+        result = benchmark_record_request(iterations=50_000)
+
+        # Typically 2-4µs in CPython; generous bound for slow CI machines
+        assert result['us_per_call'] < 25
+
+
+# ============================================================================
+# TOOL INTEGRATION
+# ============================================================================
+
+class TestMetricsTools:
+    """Test metrics exposed through tools."""
+
+    def test_get_metrics_exposes_percentiles(self):
+        """Test get_metrics_tool reports p50/p95/p99 overall and per tool."""
+        validate_input_tool(email="user@example.com", text="hi", priority="normal")
+
+        result = get_metrics_tool()
+
+        latency = result['metrics']['latency_ms']
+        assert {'p50', 'p95', 'p99'} <= set(latency)
+        assert 'p99' in result['report']
+        assert 'p95_ms' in result['metrics']['tools']['validate_input_tool']
+        assert set(result['metrics']['windows']) == {'1m', '5m', '15m'}
@@ -0,0 +1,432 @@
+"""Fault-injection tests for retry, deadlines and the circuit breaker."""
+
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+
+from best_practices_agent.agent import circuit_breaker_call_tool, retry_with_backoff_tool
+from best_practices_agent.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    DeadlineExceeded,
+    RetryBudget,
+    RetryPolicy,
+    deadline,
+    remaining_time,
+    retry,
+)
+
+
+class FakeClock:
+    """Manually advanced time source."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FaultInjector:
+    """Dependency that fails on scripted calls or at a random rate."""
+
+    def __init__(self, fail_first=0, failure_rate=0.0, latency=0.0, error=ConnectionError, seed=0):
+        self.fail_first = fail_first
+        self.failure_rate = failure_rate
+        self.latency = latency
+        self.error = error
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.concurrent = 0
+        self.max_concurrent = 0
+        self._lock = threading.Lock()
+
+    def _outcome(self):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call <= self.fail_first or self.rng.random() < self.failure_rate:
+            raise self.error(f"injected failure on call {call}")
+        return call
+
+    def sync(self):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._outcome()
+
+    async def async_(self):
+        with self._lock:
+            self.concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self.concurrent)
+        try:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self._outcome()
+        finally:
+            with self._lock:
+                self.concurrent -= 1
+
+
+def _policy(**kwargs):
+    settings = dict(max_attempts=5, base_delay_seconds=0.01, max_delay_seconds=0.05)
+    settings.update(kwargs)
+    return RetryPolicy(**settings)
+
+
+# ============================================================================
+# RETRY
+# ============================================================================
+
+class TestRetry:
+    """Test retry with full-jitter backoff."""
+
+    def test_full_jitter_bounds(self):
+        """Test delays are uniform in [0, min(max, base * 2**attempt)]."""
+        policy = RetryPolicy(base_delay_seconds=1.0, max_delay_seconds=5.0, rng=random.Random(0))
+        delays = [policy.backoff(10) for _ in range(500)]
+
+        assert all(0 <= d <= 5.0 for d in delays)
+        assert max(delays) > 4.0 and min(delays) < 1.0
+
+    def test_sync_retries_transient_failures(self):
+        """Test a sync call succeeds after injected failures."""
+        service = FaultInjector(fail_first=2)
+
+        assert _policy().call(service.sync) == 3
+        assert service.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_async_retries_transient_failures(self):
+        """Test an async call succeeds after injected failures."""
+        service = FaultInjector(fail_first=3)
+        retries = []
+
+        result = await _policy(on_retry=lambda a, e, d: retries.append(a)).call_async(service.async_)
+
+        assert result == 4
+        assert retries == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_backoff_does_not_block_event_loop(self):
+        """Test other coroutines keep running while a call backs off."""
+        service = FaultInjector(fail_first=4)
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        await _policy(base_delay_seconds=0.05, max_delay_seconds=0.05,
+                      rng=random.Random(1)).call_async(service.async_)
+        done.set()
+        await task
+
+        assert ticks >= 5
+
+    def test_exhausted_attempts_raise_last_error(self):
+        """Test the original error surfaces once attempts run out."""
+        service = FaultInjector(fail_first=100)
+
+        with pytest.raises(ConnectionError):
+            _policy(max_attempts=3).call(service.sync)
+        assert service.calls == 3
+
+    def test_non_retryable_errors_fail_fast(self):
+        """Test errors outside retry_on are not retried."""
+        service = FaultInjector(fail_first=100, error=ValueError)
+
+        with pytest.raises(ValueError):
+            _policy(retry_on=(ConnectionError,)).call(service.sync)
+        assert service.calls == 1
+
+    def test_decorator_sync_and_async(self):
+        """Test @retry wraps sync and async functions."""
+        sync_service, async_service = FaultInjector(fail_first=1), FaultInjector(fail_first=1)
+
+        @retry(max_attempts=3, base_delay_seconds=0.001)
+        def sync_tool():
+            return sync_service.sync()
+
+        @retry(max_attempts=3, base_delay_seconds=0.001)
+        async def async_tool():
+            return await async_service.async_()
+
+        assert sync_tool() == 2
+        assert asyncio.run(async_tool()) == 2
+        assert sync_tool.__name__ == "sync_tool"
+
+
+class TestRetryBudget:
+    """Test the retry budget caps retry amplification."""
+
+    def test_budget_limits_retries_under_outage(self):
+        """Test a total outage causes at most ratio * requests retries."""
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.2, min_retries=0, window_seconds=10, clock=clock)
+        service = FaultInjector(fail_first=10_000)
+        policy = _policy(max_attempts=4, base_delay_seconds=0, budget=budget)
+
+        for _ in range(100):
+            with pytest.raises(ConnectionError):
+                policy.call(service.sync)
+
+        # Without a budget: 100 requests x 4 attempts = 400 calls
+        assert service.calls <= 100 + 20
+        assert budget.rejected > 0
+
+    def test_budget_window_slides(self):
+        """Test retry capacity returns once old retries age out."""
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.0, min_retries=2, window_seconds=10, clock=clock)
+
+        assert budget.try_acquire() and budget.try_acquire()
+        assert not budget.try_acquire()
+        clock.now += 11
+        assert budget.try_acquire()
+
+
+class TestDeadline:
+    """Test deadline propagation."""
+
+    def test_nested_deadline_keeps_earliest(self):
+        """Test an inner deadline cannot extend the outer one."""
+        with deadline(0.5):
+            with deadline(60):
+                assert remaining_time() <= 0.5
+        assert remaining_time() is None
+
+    @pytest.mark.asyncio
+    async def test_deadline_cuts_slow_attempt(self):
+        """Test an async attempt is cancelled when the deadline passes."""
+        service = FaultInjector(latency=1.0)
+        start = time.monotonic()
+
+        with deadline(0.1):
+            with pytest.raises(DeadlineExceeded):
+                await _policy().call_async(service.async_)
+
+        assert time.monotonic() - start < 0.5
+
+    @pytest.mark.asyncio
+    async def test_deadline_stops_retries(self):
+        """Test no backoff is scheduled past the deadline."""
+        service = FaultInjector(fail_first=1000)
+        policy = _policy(max_attempts=100, base_delay_seconds=0.05, max_delay_seconds=0.05,
+                         rng=random.Random(3))
+        start = time.monotonic()
+
+        with deadline(0.2):
+            with pytest.raises((DeadlineExceeded, ConnectionError)):
+                await policy.call_async(service.async_)
+
+        assert time.monotonic() - start < 0.3
+        assert service.calls < 100
+
+    @pytest.mark.asyncio
+    async def test_deadline_propagates_to_threads(self):
+        """Test asyncio.to_thread work sees the caller's deadline."""
+        with deadline(5):
+            seen = await asyncio.to_thread(remaining_time)
+
+        assert seen is not None and 0 < seen <= 5
+
+
+# ============================================================================
+# CIRCUIT BREAKER
+# ============================================================================
+
+class TestCircuitBreaker:
+    """Test the sliding-window, half-open circuit breaker."""
+
+    def _fail(self, breaker, times):
+        for _ in range(times):
+            with pytest.raises(ConnectionError):
+                breaker.call(FaultInjector(fail_first=1).sync)
+
+    def test_isolated_failures_do_not_open(self):
+        """Test a low failure rate keeps the circuit closed."""
+        breaker = CircuitBreaker(failure_threshold=5, failure_rate_threshold=0.5)
+        service = FaultInjector(failure_rate=0.1, seed=2)
+
+        for _ in range(200):
+            try:
+                breaker.call(service.sync)
+            except ConnectionError:
+                pass
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_opens_on_failure_rate(self):
+        """Test the circuit opens once the window's failure rate is high."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=4, failure_rate_threshold=0.5, clock=clock)
+        breaker.call(lambda: "ok")
+        breaker.call(lambda: "ok")
+        self._fail(breaker, 1)
+        assert breaker.state == CircuitState.CLOSED
+
+        self._fail(breaker, 1)
+
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "ok")
+        assert breaker.rejected == 1
+
+    def test_old_failures_leave_window(self):
+        """Test failures older than the window no longer count."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, window_seconds=60, clock=clock)
+        self._fail(breaker, 2)
+
+        clock.now += 61
+        self._fail(breaker, 1)
+
+        assert breaker.failures == 1
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_window_bounded_by_calls(self):
+        """Test only the most recent outcomes are kept while closed."""
+        breaker = CircuitBreaker(failure_threshold=100, window_max_calls=10, clock=FakeClock())
+        for _ in range(50):
+            breaker.call(lambda: "ok")
+        self._fail(breaker, 2)
+
+        assert len(breaker._outcomes) == 10
+        assert breaker.failure_rate == 0.2
+
+    def test_half_open_probe_closes(self):
+        """Test a successful probe after the timeout closes the circuit."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, timeout_seconds=30, clock=clock)
+        self._fail(breaker, 2)
+
+        clock.now += 31
+        assert breaker.call(lambda: "probe") == "probe"
+
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.failures == 0
+
+    def test_half_open_probe_failure_reopens(self):
+        """Test a failed probe reopens the circuit for another timeout."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, timeout_seconds=30, clock=clock)
+        self._fail(breaker, 2)
+
+        clock.now += 31
+        self._fail(breaker, 1)
+
+        assert breaker.state == CircuitState.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.call(lambda: "ok")
+
+    @pytest.mark.asyncio
+    async def test_half_open_limits_probe_concurrency(self):
+        """Test only half_open_max_calls probes reach a recovering service."""
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, timeout_seconds=30,
+                                 half_open_max_calls=2, clock=clock)
+        self._fail(breaker, 2)
+        clock.now += 31
+        service = FaultInjector(latency=0.05)
+
+        results = await asyncio.gather(
+            *(breaker.call_async(service.async_) for _ in range(10)),
+            return_exceptions=True,
+        )
+
+        assert service.max_concurrent == 2
+        assert sum(isinstance(r, CircuitOpenError) for r in results) == 8
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_thread_safety_under_concurrent_faults(self):
+        """Test counters stay consistent with many threads sharing a breaker."""
+        breaker = CircuitBreaker(failure_threshold=20, failure_rate_threshold=0.9,
+                                 timeout_seconds=0.01)
+        service = FaultInjector(failure_rate=0.3, seed=5)
+        outcomes = {'ok': 0, 'failed': 0, 'rejected': 0}
+        lock = threading.Lock()
+
+        def worker():
+            for _ in range(200):
+                try:
+                    breaker.call(service.sync)
+                    kind = 'ok'
+                except CircuitOpenError:
+                    kind = 'rejected'
+                except ConnectionError:
+                    kind = 'failed'
+                with lock:
+                    outcomes[kind] += 1
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert sum(outcomes.values()) == 1600
+        assert outcomes['ok'] + outcomes['failed'] == service.calls
+        assert outcomes['rejected'] == breaker.rejected
+        assert breaker._probes == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_gives_up_on_open_circuit(self):
+        """Test stacked decorators: retry does not hammer an open circuit."""
+        breaker = CircuitBreaker(failure_threshold=2, timeout_seconds=60)
+        service = FaultInjector(fail_first=1000)
+
+        @retry(max_attempts=10, base_delay_seconds=0.001)
+        @breaker
+        async def call_service():
+            return await service.async_()
+
+        with pytest.raises(CircuitOpenError):
+            await call_service()
+        assert service.calls == 2
+
+
+# ============================================================================
+# TOOL INTEGRATION
+# ============================================================================
+
+class TestResilientTools:
+    """Test the tools built on the primitives."""
+
+    @pytest.mark.asyncio
+    async def test_retry_tool_reports_retries(self):
+        """Test the retry tool reports each retry and its backoff."""
+        random.seed(0)
+        result = await retry_with_backoff_tool(operation="sync_orders", max_retries=5)
+
+        assert result['status'] in ('success', 'error')
+        assert 'total_time_ms' in result
+        if result['status'] == 'success':
+            assert len(result['retries']) == result['attempts'] - 1
+
+    @pytest.mark.asyncio
+    async def test_retry_tool_runs_concurrently(self):
+        """Test concurrent tool invocations do not serialize on backoff."""
+        start = time.monotonic()
+
+        results = await asyncio.gather(
+            *(retry_with_backoff_tool(operation=f"op{i}", max_retries=3) for i in range(20))
+        )
+
+        assert len(results) == 20
+        # Worst case per call is ~0.5s + 1.0s of backoff; serial would be far longer
+        assert time.monotonic() - start < 3.0
+
+    def test_breaker_tool_flags_rejections(self):
+        """Test the breaker tool reports when the circuit rejected the call."""
+        result = circuit_breaker_call_tool(service_name="svc", simulate_failure=True)
+
+        assert result['status'] == 'error'
+        assert 'rejected_by_breaker' in result
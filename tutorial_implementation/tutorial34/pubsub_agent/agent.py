@@ -8,6 +8,9 @@ from pydantic import BaseModel, Field
 from google.adk.agents import LlmAgent
 from google.adk.tools import AgentTool
 
+from .router import SEED_KEYWORDS, DocumentRouter, RoutedDocumentAgent
+from .routing_data import TRAINING_SAMPLES
+
 
 # ============================================================================
 # Structured Output Schemas (Pydantic Models)
@@ -278,3 +281,28 @@ root_agent = LlmAgent(
     ),
     tools=[financial_tool, technical_tool, sales_tool, marketing_tool],
 )
+
+
+# ============================================================================
+# Local Routing Fast Path
+# ============================================================================
+# A local classifier sends confident documents straight to a specialist,
+# skipping the coordinator's two routing model calls; uncertain documents
+# fall back to root_agent.
+
+ROUTES = {
+    "financial": financial_agent,
+    "technical": technical_agent,
+    "sales": sales_agent,
+    "marketing": marketing_agent,
+}
+
+document_router = DocumentRouter.from_samples(TRAINING_SAMPLES, SEED_KEYWORDS)
+
+routed_agent = RoutedDocumentAgent(
+    name="routed_processor",
+    description="Routes documents to a specialized analyzer locally, falling back to the coordinator",
+    router=document_router,
+    routes=ROUTES,
+    fallback=root_agent,
+)
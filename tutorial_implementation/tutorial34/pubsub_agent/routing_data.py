@@ -0,0 +1,128 @@
+# Tutorial 34: Labelled Documents for the Local Router
+# TRAINING_SAMPLES fit the classifier; HELD_OUT_SAMPLES are never seen in
+# training and are used only to report routing accuracy and coverage.
+# Labels are keys of ROUTES in agent.py.
+
+TRAINING_SAMPLES = [
+    # Financial
+    ("Q4 2024 Financial Report: Revenue $1.2M, Profit 33%, operating margin improved", "financial"),
+    ("Quarterly earnings call: EPS of $0.42 beat consensus, net income up 12% year over year", "financial"),
+    ("FY2025 budget proposal allocates $4.5M to operating expenses and $1M to capital expenditure", "financial"),
+    ("Balance sheet summary: total assets $18M, liabilities $7M, shareholder equity $11M", "financial"),
+    ("Cash flow statement shows free cash flow of $2.3M after capex for the fiscal year", "financial"),
+    ("Income statement for Q2: gross profit $3.1M, EBITDA $1.4M, net loss narrowed", "financial"),
+    ("Audit findings: revenue recognition policy updated, no material weaknesses in internal controls", "financial"),
+    ("Annual report highlights dividend increase and share buyback of $50M", "financial"),
+    ("Cost reduction plan lowers overhead by 8% and improves gross margin to 41%", "financial"),
+    ("Variance analysis: actual spend 6% over budget due to higher payroll and travel expenses", "financial"),
+    ("Tax provision for the fiscal year estimated at 21% effective rate on pre-tax income", "financial"),
+    ("Treasury update: debt refinanced at lower interest rate, liquidity covers 18 months of burn", "financial"),
+    ("Monthly P&L review: revenue growth 15% month over month, operating loss reduced", "financial"),
+    ("Investor update: ARR reached $24M, burn multiple 1.3, runway through 2027", "financial"),
+    ("Accounts receivable aging shows $400K overdue more than 90 days; bad debt reserve increased", "financial"),
+    ("Forecasted revenue for next fiscal quarter is $6.8M with a 30% profit margin", "financial"),
+
+    # Technical
+    ("API v2 specification: REST endpoints for orders, OAuth2 authentication, rate limit 100 requests per second", "technical"),
+    ("Deployment guide: build the Docker image, push to Artifact Registry, deploy to Cloud Run", "technical"),
+    ("Database migration plan from MySQL to PostgreSQL with zero-downtime replication", "technical"),
+    ("Architecture overview: microservices behind an API gateway with Redis caching and Kafka events", "technical"),
+    ("Kubernetes configuration: three replicas, horizontal pod autoscaler, liveness and readiness probes", "technical"),
+    ("Incident postmortem: memory leak in the payment service caused pod restarts and 5xx errors", "technical"),
+    ("Terraform module provisions VPC, subnets, firewall rules and a Cloud SQL instance", "technical"),
+    ("CI/CD pipeline runs unit tests, lints Python code and deploys on merge to main branch", "technical"),
+    ("Performance benchmark: p99 latency dropped from 450ms to 120ms after query indexing", "technical"),
+    ("Security review: rotate service account keys, enable TLS 1.3, patch OpenSSL vulnerability", "technical"),
+    ("Design doc for event-driven ingestion using Pub/Sub topics, subscriptions and dead letter queues", "technical"),
+    ("Schema change adds a nullable column and a composite index on the orders table", "technical"),
+    ("SDK release notes: new Python client, async support, deprecated legacy endpoints", "technical"),
+    ("Load balancer configuration with health checks, SSL certificates and backend services", "technical"),
+    ("Observability setup: OpenTelemetry tracing, Prometheus metrics and structured logging", "technical"),
+    ("Server upgrade runbook: drain nodes, upgrade the kernel, reboot and verify cluster health", "technical"),
+
+    # Sales
+    ("Sales pipeline review: 12 open deals worth $3.4M, 4 in negotiation stage", "sales"),
+    ("Closed won: Acme Corp signed a 3-year contract valued at $450K", "sales"),
+    ("Sales forecast for Q3: commit $2.1M, best case $2.8M, pipeline coverage 3x", "sales"),
+    ("Account plan for Globex: expand seats, upsell premium tier, renewal due in March", "sales"),
+    ("Deal desk request: 15% discount for a multi-year commitment from Initech", "sales"),
+    ("Weekly sales report: 38 qualified leads, 9 demos booked, 3 proposals sent", "sales"),
+    ("Customer renewal at risk: champion left the company, contract expires next month", "sales"),
+    ("Territory assignment for account executives in the EMEA enterprise segment", "sales"),
+    ("Quota attainment: team reached 92% of quota, top rep closed $600K", "sales"),
+    ("Proposal sent to Umbrella Inc for 500 licenses with professional services", "sales"),
+    ("Lost deal analysis: prospect chose a competitor on price; procurement cycle was too long", "sales"),
+    ("CRM hygiene: update opportunity stages, close dates and next steps before forecast call", "sales"),
+    ("Partner channel sales: reseller sourced 8 new customers this quarter", "sales"),
+    ("Negotiation notes: buyer requests net-60 payment terms and a pilot before signing", "sales"),
+    ("Sales playbook for discovery calls, objection handling and closing techniques", "sales"),
+    ("Inbound lead from Stark Industries requested pricing for enterprise plan, SDR follow-up scheduled", "sales"),
+
+    # Marketing
+    ("Campaign results: email open rate 28%, click-through rate 4.2%, 1,200 signups", "marketing"),
+    ("Social media report: engagement up 35%, reach 2.1M impressions, follower growth 8%", "marketing"),
+    ("Q2 marketing strategy: brand awareness campaign targeting developers and startups", "marketing"),
+    ("Paid search performance: CPC $1.80, conversion rate 3.5%, cost per acquisition $52", "marketing"),
+    ("Content calendar: two blog posts per week, monthly webinar and a product launch video", "marketing"),
+    ("Audience segmentation for the newsletter: SMB, mid-market and enterprise personas", "marketing"),
+    ("Product launch plan: press release, influencer outreach and landing page A/B test", "marketing"),
+    ("SEO audit: organic traffic grew 22%, backlinks doubled, keyword rankings improved", "marketing"),
+    ("Event sponsorship at the developer conference generated 900 booth visits and 300 MQLs", "marketing"),
+    ("Brand guidelines update: new logo usage, color palette and messaging pillars", "marketing"),
+    ("Retargeting ads campaign spent $15K with a return on ad spend of 4.1x", "marketing"),
+    ("Customer survey: net promoter score 46, top request is better onboarding content", "marketing"),
+    ("Marketing attribution model credits webinars and paid social for most pipeline influence", "marketing"),
+    ("Video campaign on YouTube reached 500K viewers with a 61% completion rate", "marketing"),
+    ("Lifecycle email nurture sequence increased trial-to-paid conversion by 9%", "marketing"),
+    ("Competitive positioning and messaging for the spring campaign across social channels", "marketing"),
+]
+
+HELD_OUT_SAMPLES = [
+    # Financial
+    ("Third quarter results: revenue of $5.4M, net profit $900K, margin expanded two points", "financial"),
+    ("Board pack: operating expenses tracked 3% under budget; capex deferred to next fiscal year", "financial"),
+    ("Earnings guidance raised: full-year revenue now expected between $21M and $22M", "financial"),
+    ("Payroll and benefits costs rose 7%, compressing EBITDA margin to 18%", "financial"),
+    ("Statement of cash flows: operating cash inflow $3.2M, financing outflow for loan repayment", "financial"),
+    ("Internal audit of expense reports found duplicate reimbursements totalling $12K", "financial"),
+    ("Investor relations memo on dividend policy and earnings per share trend", "financial"),
+    ("Gross margin by product line and fiscal year-over-year growth rate", "financial"),
+    ("Working capital improved as inventory days fell and payables extended", "financial"),
+    ("Interest expense on the credit facility and covenant compliance for the quarter", "financial"),
+
+    # Technical
+    ("Runbook for rolling back a failed Cloud Run deployment and restoring the previous revision", "technical"),
+    ("GraphQL API schema for products and inventory with pagination and auth tokens", "technical"),
+    ("Redis cluster ran out of memory; eviction policy changed and cache TTLs shortened", "technical"),
+    ("Service mesh rollout: mTLS between microservices and traffic splitting for canary releases", "technical"),
+    ("Database backup configuration: nightly snapshots, point-in-time recovery, 30-day retention", "technical"),
+    ("Refactor the ingestion service to process Pub/Sub messages asynchronously with retries", "technical"),
+    ("Latency regression traced to an N+1 query in the order history endpoint", "technical"),
+    ("Container image hardening: distroless base, non-root user, vulnerability scanning in CI", "technical"),
+    ("Infrastructure as code review for the staging environment network and IAM roles", "technical"),
+    ("Upgrade Python runtime to 3.12 and pin dependency versions in the build", "technical"),
+
+    # Sales
+    ("Opportunity update: Wayne Enterprises moved to contract review, expected close $1.1M", "sales"),
+    ("Pipeline generated this month from outbound prospecting and referrals", "sales"),
+    ("Renewal negotiation with Hooli: customer wants a price freeze for two years", "sales"),
+    ("Account executive notes from the demo: buyer needs SSO and a security questionnaire", "sales"),
+    ("Commit forecast slipped as two large deals pushed to next quarter", "sales"),
+    ("Signed order form for 120 seats, deal value $96K, booked this week", "sales"),
+    ("Sales team headcount plan and quota capacity for the new fiscal year", "sales"),
+    ("Procurement asked for references and a redlined master services agreement before signing", "sales"),
+    ("Upsell opportunity: existing customer evaluating the analytics add-on", "sales"),
+    ("Win rate by segment and average sales cycle length for closed deals", "sales"),
+
+    # Marketing
+    ("Webinar campaign drew 1,400 registrants with 38% attendance and strong engagement", "marketing"),
+    ("Instagram and TikTok reach grew after the influencer partnership", "marketing"),
+    ("Landing page A/B test lifted conversion rate from 2.1% to 2.9%", "marketing"),
+    ("Rebrand launch: updated messaging, website refresh and press coverage", "marketing"),
+    ("Cost per lead on LinkedIn ads fell to $38 while click-through rate held at 0.9%", "marketing"),
+    ("Email newsletter audience grew to 45,000 subscribers with a 31% open rate", "marketing"),
+    ("Go-to-market messaging and positioning for the new product tier", "marketing"),
+    ("Organic search impressions and blog traffic trend for the content program", "marketing"),
+    ("Trade show booth campaign collected 600 leads and boosted brand awareness", "marketing"),
+    ("Customer advocacy program: case studies, testimonials and review site campaign", "marketing"),
+]
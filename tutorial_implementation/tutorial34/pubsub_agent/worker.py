@@ -0,0 +1,660 @@
+# Tutorial 34: Long-Running Document Worker
+# One event loop and one Runner for the life of the process; messages are
+# scheduled onto the loop with a concurrency cap, leases are extended while
+# documents are processed, and acks are sent in batches.
+#
+# The queue is reached through a small backend interface (pull, acknowledge,
+# modify_ack_deadline): PubSubBackend talks to Cloud Pub/Sub and
+# InProcessQueue stands in for it so the worker can be benchmarked offline.
+#
+# Run `python -m pubsub_agent.worker` to benchmark throughput and latency.
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncGenerator, Callable, Deque, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "pubsub_processor"
+USER_ID = "pubsub_subscriber"
+
+# Documents with the model at once; tune to the model's requests-per-minute quota
+DEFAULT_CONCURRENCY = 16
+
+# Lease granted per pull; must not exceed the subscription's ack deadline
+DEFAULT_ACK_DEADLINE = 60.0
+
+# Stop extending a lease after this long and let Pub/Sub redeliver
+DEFAULT_MAX_LEASE = 3600.0
+
+# Ack ids per acknowledge / modify_ack_deadline request
+DEFAULT_ACK_BATCH = 100
+
+# Longest an ack waits before its batch is sent
+DEFAULT_ACK_FLUSH_S = 0.1
+
+# End-to-end latencies kept for percentiles
+LATENCY_SAMPLES = 10_000
+
+
+# ============================================================================
+# Queue Backends
+# ============================================================================
+
+@dataclass
+class ReceivedMessage:
+    """A leased message: ack it, extend it, or let it be redelivered."""
+
+    ack_id: str
+    data: bytes
+    publish_time: float  # Unix seconds
+    delivery_attempt: int = 1
+
+
+class InProcessQueue:
+    """
+    Thread-safe stand-in for a Pub/Sub subscription.
+
+    Pulled messages are leased for `ack_deadline` seconds and redelivered
+    if the lease runs out before they are acked. Every delivery gets a new
+    ack id, so acks for an expired lease are ignored, as in Pub/Sub.
+    """
+
+    def __init__(self, ack_deadline: float = DEFAULT_ACK_DEADLINE, clock: Callable[[], float] = time.monotonic):
+        self.ack_deadline = ack_deadline
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._ids = itertools.count(1)
+        self._ready: Deque[str] = deque()
+        self._messages: Dict[str, Tuple[bytes, float, int]] = {}
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self.stats: Counter = Counter()
+
+    def publish(self, data: bytes) -> str:
+        with self._cond:
+            message_id = str(next(self._ids))
+            self._messages[message_id] = (data, time.time(), 0)
+            self._ready.append(message_id)
+            self.stats['published'] += 1
+            self._cond.notify()
+        return message_id
+
+    def pull(self, max_messages: int, timeout: Optional[float] = None) -> List[ReceivedMessage]:
+        """Lease up to `max_messages`, waiting up to `timeout` seconds for one."""
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            while True:
+                self._expire_leases()
+                if self._ready:
+                    break
+                remaining = None if deadline is None else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    return []
+                # Wake periodically so expired leases are noticed
+                self._cond.wait(0.05 if remaining is None else min(remaining, 0.05))
+
+            received = []
+            now = self._clock()
+            while self._ready and len(received) < max_messages:
+                message_id = self._ready.popleft()
+                data, published, attempts = self._messages[message_id]
+                attempts += 1
+                self._messages[message_id] = (data, published, attempts)
+                ack_id = f"{message_id}-{attempts}"
+                self._leases[ack_id] = (message_id, now + self.ack_deadline)
+                received.append(ReceivedMessage(ack_id, data, published, attempts))
+            self.stats['delivered'] += len(received)
+            self.stats['redelivered'] += sum(1 for m in received if m.delivery_attempt > 1)
+            return received
+
+    def acknowledge(self, ack_ids: List[str]) -> None:
+        with self._cond:
+            self.stats['ack_requests'] += 1
+            for ack_id in ack_ids:
+                lease = self._leases.pop(ack_id, None)
+                if lease is not None:
+                    self._messages.pop(lease[0], None)
+                    self.stats['acked'] += 1
+
+    def modify_ack_deadline(self, ack_ids: List[str], seconds: float) -> None:
+        """Extend leases by `seconds` from now; 0 nacks them for redelivery."""
+        with self._cond:
+            self.stats['modify_requests'] += 1
+            now = self._clock()
+            for ack_id in ack_ids:
+                lease = self._leases.get(ack_id)
+                if lease is None:
+                    continue
+                if seconds <= 0:
+                    del self._leases[ack_id]
+                    self._ready.append(lease[0])
+                    self.stats['nacked'] += 1
+                    self._cond.notify()
+                else:
+                    self._leases[ack_id] = (lease[0], now + seconds)
+
+    def _expire_leases(self) -> None:
+        now = self._clock()
+        expired = [ack_id for ack_id, (_, expires) in self._leases.items() if expires <= now]
+        for ack_id in expired:
+            message_id, _ = self._leases.pop(ack_id)
+            self._ready.append(message_id)
+        self.stats['expired'] += len(expired)
+
+    def __len__(self) -> int:
+        """Messages not yet acked (ready or leased)."""
+        with self._cond:
+            return len(self._messages)
+
+
+class PubSubBackend:
+    """Synchronous-pull backend for a Cloud Pub/Sub subscription."""
+
+    def __init__(self, project_id: str, subscription_id: str, client: Any = None):
+        if client is None:
+            from google.cloud import pubsub_v1
+            client = pubsub_v1.SubscriberClient()
+        self._client = client
+        self.subscription_path = client.subscription_path(project_id, subscription_id)
+
+    def pull(self, max_messages: int, timeout: Optional[float] = None) -> List[ReceivedMessage]:
+        from google.api_core import exceptions
+
+        try:
+            response = self._client.pull(
+                request={"subscription": self.subscription_path, "max_messages": max_messages},
+                timeout=timeout,
+            )
+        except exceptions.DeadlineExceeded:
+            return []
+        return [
+            ReceivedMessage(
+                ack_id=received.ack_id,
+                data=received.message.data,
+                publish_time=received.message.publish_time.timestamp(),
+                delivery_attempt=received.delivery_attempt or 1,
+            )
+            for received in response.received_messages
+        ]
+
+    def acknowledge(self, ack_ids: List[str]) -> None:
+        self._client.acknowledge(request={"subscription": self.subscription_path, "ack_ids": ack_ids})
+
+    def modify_ack_deadline(self, ack_ids: List[str], seconds: float) -> None:
+        self._client.modify_ack_deadline(request={
+            "subscription": self.subscription_path,
+            "ack_ids": ack_ids,
+            "ack_deadline_seconds": int(seconds),
+        })
+
+
+# ============================================================================
+# Document Processing
+# ============================================================================
+
+def build_prompt(document_id: str, content: str) -> types.Content:
+    """User message asking the coordinator to route and analyze a document."""
+    text = f"""Analyze this document and route it to the appropriate analyzer:
+
+Document ID: {document_id}
+
+Content:
+{content}
+
+Analyze the document type and extract relevant information."""
+    return types.Content(role="user", parts=[types.Part(text=text)])
+
+
+def response_text(event: Any) -> str:
+    """Concatenated text parts of an event, or '' if it has none."""
+    if event is None or not getattr(event, "content", None) or not event.content.parts:
+        return ""
+    return "".join(part.text for part in event.content.parts if part.text)
+
+
+async def process_document(runner: Runner, document_id: str, content: str, user_id: str = USER_ID) -> str:
+    """Run one document through `runner` in a fresh session; returns the final text."""
+    session_service = runner.session_service
+    session = await session_service.create_session(app_name=runner.app_name, user_id=user_id)
+    try:
+        final_event = None
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=session.id,
+            new_message=build_prompt(document_id, content),
+        ):
+            final_event = event
+        return response_text(final_event)
+    finally:
+        # Sessions are per document; drop them so a long-lived worker stays bounded
+        await session_service.delete_session(app_name=runner.app_name, user_id=user_id, session_id=session.id)
+
+
+# ============================================================================
+# Worker
+# ============================================================================
+
+class DocumentWorker:
+    """
+    Pull documents from a backend and process them on one persistent loop.
+
+    The loop runs on a background thread with a single Runner. `run()` pulls
+    only as many messages as there are free concurrency slots, so no message
+    sits leased while waiting for the model. While a document is processed
+    its lease is extended before it runs out; acks and nacks are collected
+    and sent in batches. Malformed payloads are logged and acked, since
+    redelivery can't fix them; only processing errors are nacked.
+
+    Args:
+        backend: InProcessQueue, PubSubBackend or anything with the same methods
+        agent: Agent to run (defaults to the coordinator root_agent)
+        max_concurrency: Documents processed at once
+        ack_deadline: Lease length granted by the subscription, in seconds
+        max_lease: Longest a lease is extended for before giving up
+        ack_batch_size: Ack ids per backend request
+        ack_flush_interval: Longest an ack waits for its batch
+        on_result: Called with (document_id, text) for each processed
+            document; exceptions it raises are logged and counted
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        agent: Optional[BaseAgent] = None,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        ack_deadline: float = DEFAULT_ACK_DEADLINE,
+        max_lease: float = DEFAULT_MAX_LEASE,
+        ack_batch_size: int = DEFAULT_ACK_BATCH,
+        ack_flush_interval: float = DEFAULT_ACK_FLUSH_S,
+        app_name: str = APP_NAME,
+        on_result: Optional[Callable[[str, str], None]] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if agent is None:
+            from .agent import root_agent
+            agent = root_agent
+        self.backend = backend
+        self.agent = agent
+        self.max_concurrency = max_concurrency
+        self.ack_deadline = ack_deadline
+        self.max_lease = max_lease
+        self.ack_batch_size = ack_batch_size
+        self.ack_flush_interval = ack_flush_interval
+        self.app_name = app_name
+        self.on_result = on_result
+
+        self.stats: Counter = Counter()
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._stopping = threading.Event()
+        self._futures: set = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[Runner] = None
+        self._maintenance: Optional[asyncio.Task] = None
+
+        # Touched only on the loop thread
+        self._leases: Dict[str, List[float]] = {}  # ack_id -> [expires_at, leased_at]
+        self._acks: List[str] = []
+        self._nacks: List[str] = []
+        self._flush_now: Optional[asyncio.Event] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> "DocumentWorker":
+        """Start the event loop thread and create the Runner. Idempotent."""
+        if self._loop is not None:
+            return self
+        self._stopping.clear()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="document-worker", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._setup(), self._loop).result()
+        return self
+
+    async def _setup(self) -> None:
+        self._runner = Runner(app_name=self.app_name, agent=self.agent, session_service=InMemorySessionService())
+        self._flush_now = asyncio.Event()
+        self._maintenance = asyncio.create_task(self._maintain())
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Finish in-flight documents, send pending acks and stop the loop."""
+        self._stopping.set()
+        if self._loop is None:
+            return
+        for future in list(self._futures):
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._loop.close()
+        self._loop = self._thread = self._runner = None
+
+    async def _shutdown(self) -> None:
+        self._maintenance.cancel()
+        try:
+            await self._maintenance
+        except asyncio.CancelledError:
+            pass
+        await self._flush()
+        await self._runner.close()
+
+    def __enter__(self) -> "DocumentWorker":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    # ------------------------------------------------------------------
+    # Pulling and scheduling
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        max_messages: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        pull_timeout: float = 1.0,
+    ) -> Dict[str, Any]:
+        """
+        Pull and process messages until stopped.
+
+        Blocks the calling thread. Returns when `stop()` is called from
+        another thread, after `max_messages` messages have been pulled, or
+        when nothing has arrived for `idle_timeout` seconds and nothing is in
+        flight. Returns `summary()`.
+        """
+        self.start()
+        pulled = 0
+        idle_since = time.monotonic()
+        while not self._stopping.is_set():
+            if max_messages is not None and pulled >= max_messages:
+                break
+            limit = self.max_concurrency if max_messages is None else min(self.max_concurrency, max_messages - pulled)
+            slots = self._acquire_slots(limit)
+            if slots == 0:
+                continue
+            messages = self.backend.pull(slots, timeout=pull_timeout)
+            for _ in range(slots - len(messages)):
+                self._slots.release()
+            if messages:
+                pulled += len(messages)
+                self.stats['pulled'] += len(messages)
+                for message in messages:
+                    self._schedule(message)
+                idle_since = time.monotonic()
+            elif idle_timeout is not None and not self._futures and time.monotonic() - idle_since >= idle_timeout:
+                break
+        self.wait()
+        return self.summary()
+
+    def _acquire_slots(self, limit: int) -> int:
+        """Block for one free slot, then take up to `limit` without blocking."""
+        if not self._slots.acquire(timeout=0.1):
+            return 0
+        taken = 1
+        while taken < limit and self._slots.acquire(blocking=False):
+            taken += 1
+        return taken
+
+    def _schedule(self, message: ReceivedMessage) -> Future:
+        """Hand a message (holding a slot) to the loop thread."""
+        future = asyncio.run_coroutine_threadsafe(self._handle(message, time.monotonic()), self._loop)
+        self._futures.add(future)
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future) -> None:
+        self._futures.discard(future)
+        self._slots.release()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Block until scheduled documents finish and their acks are sent."""
+        for future in list(self._futures):
+            future.result(timeout)
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._flush(), self._loop).result(timeout)
+
+    # ------------------------------------------------------------------
+    # Loop thread
+    # ------------------------------------------------------------------
+
+    async def _handle(self, message: ReceivedMessage, pulled_at: float) -> Optional[str]:
+        self._leases[message.ack_id] = [pulled_at + self.ack_deadline, pulled_at]
+        try:
+            data = json.loads(message.data.decode("utf-8"))
+            if not isinstance(data, dict):
+                raise ValueError("payload is not a JSON object")
+        except ValueError as e:
+            # Redelivery can't fix a bad payload, so drop it rather than retry forever
+            logger.error("Dropping malformed message %s: %s", message.ack_id, e)
+            self.stats['malformed'] += 1
+            self._release(message.ack_id, self._acks)
+            return None
+
+        document_id = data.get("document_id")
+        try:
+            text = await process_document(self._runner, document_id, data.get("content", ""))
+        except Exception as e:
+            logger.warning("Processing %s failed: %s", document_id or message.ack_id, e)
+            self.stats['failed'] += 1
+            self._release(message.ack_id, self._nacks)
+            return None
+
+        self.stats['processed'] += 1
+        self.latencies.append(time.time() - message.publish_time)
+        self._release(message.ack_id, self._acks)
+        if self.on_result is not None:
+            try:
+                self.on_result(document_id, text)
+            except Exception:
+                # Already acked; a callback error must not stop the worker
+                logger.exception("on_result failed for %s", document_id)
+                self.stats['callback_errors'] += 1
+        return text
+
+    def _release(self, ack_id: str, batch: List[str]) -> None:
+        self._leases.pop(ack_id, None)
+        batch.append(ack_id)
+        if len(batch) >= self.ack_batch_size:
+            self._flush_now.set()
+
+    async def _maintain(self) -> None:
+        """Flush ack batches and extend leases that are about to run out."""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), self.ack_flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self._flush()
+                await self._extend_leases()
+            except Exception as e:
+                logger.warning("Ack maintenance failed: %s", e)
+
+    async def _flush(self) -> None:
+        acks, self._acks = self._acks, []
+        nacks, self._nacks = self._nacks, []
+        for start in range(0, len(acks), self.ack_batch_size):
+            await asyncio.to_thread(self.backend.acknowledge, acks[start:start + self.ack_batch_size])
+            self.stats['ack_requests'] += 1
+        for start in range(0, len(nacks), self.ack_batch_size):
+            await asyncio.to_thread(self.backend.modify_ack_deadline, nacks[start:start + self.ack_batch_size], 0)
+            self.stats['nack_requests'] += 1
+
+    async def _extend_leases(self) -> None:
+        """Extend leases within a third of the deadline (or one flush) of expiring."""
+        now = time.monotonic()
+        margin = max(self.ack_deadline / 3, self.ack_flush_interval * 2)
+        due = []
+        for ack_id, lease in self._leases.items():
+            if lease[0] - now > margin:
+                continue
+            if now - lease[1] >= self.max_lease:
+                continue  # Held too long; let it be redelivered
+            lease[0] = now + self.ack_deadline
+            due.append(ack_id)
+        for start in range(0, len(due), self.ack_batch_size):
+            await asyncio.to_thread(
+                self.backend.modify_ack_deadline, due[start:start + self.ack_batch_size], self.ack_deadline
+            )
+            self.stats['extension_requests'] += 1
+        self.stats['lease_extensions'] += len(due)
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def summary(self) -> Dict[str, Any]:
+        """Counters plus end-to-end latency percentiles (publish to done)."""
+        summary: Dict[str, Any] = dict(self.stats)
+        summary['in_flight'] = len(self._futures)
+        summary.update(latency_percentiles(self.latencies))
+        return summary
+
+
+def latency_percentiles(samples: Any, percentiles: Tuple[int, ...] = (50, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of `samples` as {'p50': ..., ...}."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+    return {f"p{p}": ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))] for p in percentiles}
+
+
+# ============================================================================
+# Offline Benchmark
+# ============================================================================
+
+class SimulatedLlm(BaseLlm):
+    """Model stand-in that answers after a log-normal delay around `latency`."""
+
+    model: str = "simulated-model"
+    latency: float = 0.2
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        await asyncio.sleep(self.latency * random.lognormvariate(0, 0.5))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="financial: analyzed")]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=100, candidates_token_count=10, total_token_count=110
+            ),
+        )
+
+
+def _legacy_consume(queue: InProcessQueue, agent: BaseAgent, documents: int, threads: int) -> List[float]:
+    """The original subscriber: asyncio.run and a new Runner per message on a callback pool."""
+
+    def callback(message: ReceivedMessage) -> float:
+        data = json.loads(message.data.decode("utf-8"))
+
+        async def once() -> str:
+            runner = Runner(app_name=APP_NAME, agent=agent, session_service=InMemorySessionService())
+            return await process_document(runner, data["document_id"], data["content"])
+
+        asyncio.run(once())
+        queue.acknowledge([message.ack_id])
+        return time.time() - message.publish_time
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        while len(futures) < documents:
+            for message in queue.pull(documents - len(futures), timeout=0.1):
+                futures.append(pool.submit(callback, message))
+    return [f.result() for f in futures]
+
+
+def benchmark_worker(
+    documents: int = 300,
+    concurrency: int = 32,
+    callback_threads: int = 10,
+    model_latency: float = 0.2,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Drain a backlog of `documents` through the original callback subscriber
+    and through DocumentWorker, against a simulated model.
+
+    The callback baseline uses the Pub/Sub client's default pool of 10
+    threads. The worker runs at the same cap and at `concurrency`, so the
+    gain from loop and Runner reuse is reported separately from the gain
+    from a higher cap. Returns docs/min, latency percentiles and ack RPCs.
+    """
+    agent = LlmAgent(name=APP_NAME, model=SimulatedLlm(latency=model_latency), instruction="Route documents.")
+    payloads = [
+        json.dumps({"document_id": f"DOC-{i:05d}", "content": f"Q{i % 4 + 1} revenue ${i}K"}).encode("utf-8")
+        for i in range(documents)
+    ]
+
+    def backlog() -> InProcessQueue:
+        queue = InProcessQueue(ack_deadline=600)
+        for payload in payloads:
+            queue.publish(payload)
+        return queue
+
+    results: Dict[str, Any] = {"documents": documents, "model_latency_s": model_latency}
+
+    random.seed(seed)
+    queue = backlog()
+    t0 = time.perf_counter()
+    latencies = _legacy_consume(queue, agent, documents, callback_threads)
+    elapsed = time.perf_counter() - t0
+    results["callback"] = {
+        "concurrency": callback_threads,
+        "docs_per_min": documents / elapsed * 60,
+        "ack_requests": queue.stats["ack_requests"],
+        **latency_percentiles(latencies),
+    }
+
+    for label, cap in (("worker_same_cap", callback_threads), ("worker", concurrency)):
+        random.seed(seed)
+        queue = backlog()
+        t0 = time.perf_counter()
+        with DocumentWorker(queue, agent=agent, max_concurrency=cap) as worker:
+            summary = worker.run(max_messages=documents)
+        elapsed = time.perf_counter() - t0
+        assert summary["processed"] == documents and len(queue) == 0
+        results[label] = {
+            "concurrency": cap,
+            "docs_per_min": documents / elapsed * 60,
+            "ack_requests": queue.stats["ack_requests"],
+            **latency_percentiles(worker.latencies),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    result = benchmark_worker()
+    print(f"Backlog: {result['documents']} documents, simulated model latency ~{result['model_latency_s']}s")
+    print(f"{'mode':<18}{'cap':>5}{'docs/min':>11}{'p50':>8}{'p95':>8}{'p99':>8}{'ack RPCs':>10}")
+    for label in ("callback", "worker_same_cap", "worker"):
+        r = result[label]
+        print(f"{label:<18}{r['concurrency']:>5}{r['docs_per_min']:>11.0f}"
+              f"{r['p50']:>7.2f}s{r['p95']:>7.2f}s{r['p99']:>7.2f}s{r['ack_requests']:>10}")
@@ -2,12 +2,14 @@ import os
 import sys
 import json
 import asyncio
+import argparse
 import logging
 from google.cloud import pubsub_v1
 from google.adk import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
-from pubsub_agent.agent import root_agent
+from pubsub_agent.agent import root_agent, routed_agent
+from pubsub_agent.worker import DEFAULT_CONCURRENCY, DocumentWorker, PubSubBackend
 
 # Suppress noisy debug messages from libraries
 logging.getLogger('google.auth').setLevel(logging.WARNING)
@@ -18,8 +20,8 @@ logging.getLogger('absl').setLevel(logging.ERROR)
 project_id = os.environ.get("GCP_PROJECT")
 subscription_id = "document-processor"
 
-subscriber = pubsub_v1.SubscriberClient()
-subscription_path = subscriber.subscription_path(project_id, subscription_id)
+# Matches --ack-deadline in `make gcp-setup`
+SUBSCRIPTION_ACK_DEADLINE = 600
 
 async def process_document_with_agent(document_id: str, content: str):
     """Process document using the ADK root_agent coordinator."""
@@ -107,25 +109,84 @@ def process_message(message):
         print(f"❌ Error: {document_id} - {str(e)[:100]}")
         message.nack()
 
-# Subscribe and process
-print("\n" + "="*70)
-print("🚀 Document Processing Coordinator")
-print("="*70)
-print(f"Subscription: {subscription_id}")
-print(f"Project:      {project_id or '(not set - local mode)'}")
-print(f"Agent:        root_agent (multi-analyzer coordinator)")
-print("="*70)
-print("Waiting for messages...\n")
-
-streaming_pull_future = subscriber.subscribe(
-    subscription_path,
-    callback=process_message
-)
-
-try:
-    streaming_pull_future.result()
-except KeyboardInterrupt:
-    streaming_pull_future.cancel()
+def print_banner(mode: str):
+    print("\n" + "="*70)
+    print("🚀 Document Processing Coordinator")
+    print("="*70)
+    print(f"Subscription: {subscription_id}")
+    print(f"Project:      {project_id or '(not set - local mode)'}")
+    print(f"Agent:        root_agent (multi-analyzer coordinator)")
+    print(f"Mode:         {mode}")
+    print("="*70)
+    print("Waiting for messages...\n")
+
+
+def print_stopped():
     print("\n" + "="*70)
     print("✋ Processor stopped")
     print("="*70)
+
+
+def run_streaming():
+    """Streaming pull: one asyncio.run (and Runner) per message in the callback."""
+    subscriber = pubsub_v1.SubscriberClient()
+    subscription_path = subscriber.subscription_path(project_id, subscription_id)
+
+    print_banner("streaming callback")
+    streaming_pull_future = subscriber.subscribe(
+        subscription_path,
+        callback=process_message
+    )
+
+    try:
+        streaming_pull_future.result()
+    except KeyboardInterrupt:
+        streaming_pull_future.cancel()
+        print_stopped()
+
+
+def print_result(document_id: str, text: str):
+    if text:
+        print(f"✅ Success: {document_id}")
+        print(f"   └─ {text.strip()[:200]}...")
+    else:
+        print(f"✅ Completed {document_id} (no text response)")
+
+
+def run_worker(concurrency: int, local_routing: bool = True):
+    """Worker mode: one event loop and Runner, capped concurrency, batched acks."""
+    backend = PubSubBackend(project_id, subscription_id)
+    worker = DocumentWorker(
+        backend,
+        agent=routed_agent if local_routing else root_agent,
+        max_concurrency=concurrency,
+        ack_deadline=SUBSCRIPTION_ACK_DEADLINE,
+        on_result=print_result,
+    )
+
+    routing = "local fast path" if local_routing else "coordinator only"
+    print_banner(f"worker (max {concurrency} concurrent documents, {routing})")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop()
+        print(f"Processed: {worker.stats['processed']}  Failed: {worker.stats['failed']}")
+        print_stopped()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process documents from Pub/Sub with the coordinator agent")
+    parser.add_argument("--worker", action="store_true",
+                        help="use the long-running worker instead of per-message callbacks")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="documents processed at once in worker mode (tune to model quota)")
+    parser.add_argument("--no-local-routing", action="store_true",
+                        help="in worker mode, send every document through the coordinator LLM")
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.concurrency, local_routing=not args.no_local_routing)
+    else:
+        run_streaming()
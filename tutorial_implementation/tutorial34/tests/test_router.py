@@ -0,0 +1,154 @@
+# Tutorial 34: Local Router Tests
+# Validates the TF-IDF routing fast path and its fallback to the coordinator
+
+from typing import AsyncGenerator
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from pubsub_agent.router import (
+    SEED_KEYWORDS,
+    DocumentRouter,
+    RoutedDocumentAgent,
+    document_text,
+    evaluate_router,
+    tokenize,
+)
+from pubsub_agent.routing_data import HELD_OUT_SAMPLES, TRAINING_SAMPLES
+from pubsub_agent.worker import build_prompt
+
+
+class NamedModel(BaseLlm):
+    """Replies with its own model name so tests can see who answered."""
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.model)]))
+
+
+@pytest.fixture(scope="module")
+def router():
+    return DocumentRouter.from_samples(TRAINING_SAMPLES, SEED_KEYWORDS)
+
+
+class TestDocumentRouter:
+    """Test the classifier and its confidence threshold."""
+
+    def test_tokenize(self):
+        """Test stopwords and bare numbers are dropped and bigrams added."""
+        assert tokenize("The Q4 revenue was $1.2M") == ["q4", "revenue", "m", "q4 revenue", "revenue m"]
+
+    def test_document_text_strips_prompt(self):
+        """Test the subscriber's prompt wrapper is not classified."""
+        prompt = build_prompt("DOC-1", "Revenue $1M")
+        assert document_text(prompt) == "Revenue $1M"
+        assert document_text(build_prompt("DOC-2", "Part one.\n\nPart two.")) == "Part one.\n\nPart two."
+        assert document_text(None) == ""
+
+    def test_confident_routes(self, router):
+        """Test clear documents are routed locally with high confidence."""
+        cases = {
+            "Q4 2024 Financial Report: Revenue $1.2M, Profit 33%": "financial",
+            "Deploy the API to Cloud Run and migrate the database": "technical",
+            "Closed the Acme contract; pipeline has three deals in negotiation": "sales",
+            "Campaign engagement rose and conversion rate hit 4%": "marketing",
+        }
+        for text, label in cases.items():
+            decision = router.classify(text)
+            assert decision.route == label
+            assert decision.confidence >= router.threshold
+
+    def test_unknown_vocabulary_falls_back(self, router):
+        """Test documents sharing no vocabulary get zero confidence."""
+        decision = router.classify("Lorem ipsum dolor sit amet")
+        assert decision.route is None
+        assert decision.confidence == 0.0
+
+    def test_threshold_controls_fallback(self):
+        """Test a stricter threshold sends more documents to the coordinator."""
+        loose = DocumentRouter.from_samples(TRAINING_SAMPLES, SEED_KEYWORDS, threshold=0.0)
+        strict = DocumentRouter.from_samples(TRAINING_SAMPLES, SEED_KEYWORDS, threshold=0.99)
+
+        assert evaluate_router(loose, HELD_OUT_SAMPLES)['coverage'] == 1.0
+        assert evaluate_router(strict, HELD_OUT_SAMPLES)['coverage'] < 0.5
+
+    def test_held_out_accuracy(self, router):
+        """Test routing is accurate on documents not seen in training."""
+        result = evaluate_router(router, HELD_OUT_SAMPLES, model_call_s=1.0)
+
+        assert result['routed_accuracy'] >= 0.95
+        assert result['coverage'] >= 0.8
+        assert result['coordinator_calls_saved'] == 2 * result['routed']
+        assert result['saved_s_per_document'] > 1.0
+        assert result['classify_us'] < 5000
+
+    def test_empty_training_rejected(self):
+        """Test fitting without samples is an error."""
+        with pytest.raises(ValueError):
+            DocumentRouter().fit([])
+
+
+class TestRoutedDocumentAgent:
+    """Test dispatch to specialists and fallback to the coordinator."""
+
+    @pytest.fixture
+    def runner(self, router):
+        routes = {
+            label: LlmAgent(name=f"{label}_analyzer", model=NamedModel(model=label))
+            for label in ("financial", "technical", "sales", "marketing")
+        }
+        coordinator = LlmAgent(name="pubsub_processor", model=NamedModel(model="coordinator"))
+        agent = RoutedDocumentAgent(name="routed_processor", router=router, routes=routes, fallback=coordinator)
+        return InMemoryRunner(agent=agent, app_name="routing_test")
+
+    async def _run(self, runner, content):
+        session = await runner.session_service.create_session(app_name="routing_test", user_id="u")
+        events = [
+            event async for event in runner.run_async(
+                user_id="u", session_id=session.id, new_message=build_prompt("DOC-1", content)
+            )
+        ]
+        session = await runner.session_service.get_session(app_name="routing_test", user_id="u", session_id=session.id)
+        return events, session.state["routing"]
+
+    @pytest.mark.asyncio
+    async def test_routes_directly_to_specialist(self, runner):
+        """Test a confident document is answered by the specialist alone."""
+        events, routing = await self._run(runner, "Quarterly earnings: net income up 12%, EPS beat")
+
+        assert [e.author for e in events] == ["routed_processor", "financial_analyzer"]
+        assert events[-1].content.parts[0].text == "financial"
+        assert routing["route"] == "financial" and routing["agent"] == "financial_analyzer"
+
+    @pytest.mark.asyncio
+    async def test_uncertain_document_uses_coordinator(self, runner):
+        """Test a document the router cannot place goes to the coordinator."""
+        events, routing = await self._run(runner, "Minutes of the offsite: lunch menu and seating")
+
+        assert events[-1].author == "pubsub_processor"
+        assert routing["route"] is None and routing["agent"] == "pubsub_processor"
+
+
+class TestAgentWiring:
+    """Test the module-level routed agent in agent.py."""
+
+    def test_routes_use_existing_specialists(self):
+        """Test routed_agent dispatches to the coordinator's own analyzers."""
+        from pubsub_agent.agent import (
+            ROUTES, financial_agent, marketing_agent, root_agent, routed_agent, sales_agent, technical_agent,
+        )
+
+        assert routed_agent.routes == ROUTES == {
+            "financial": financial_agent,
+            "technical": technical_agent,
+            "sales": sales_agent,
+            "marketing": marketing_agent,
+        }
+        assert routed_agent.fallback is root_agent
+        assert root_agent.parent_agent is None and financial_agent.parent_agent is None
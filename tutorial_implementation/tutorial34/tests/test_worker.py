@@ -0,0 +1,265 @@
+# Tutorial 34: Document Worker Tests
+# Validates the persistent-loop worker against the in-process queue backend
+
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from typing import AsyncGenerator
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from pubsub_agent.worker import (
+    DocumentWorker,
+    InProcessQueue,
+    PubSubBackend,
+    benchmark_worker,
+    latency_percentiles,
+)
+
+
+class CountingModel(BaseLlm):
+    """Answers after `delay` seconds and records peak concurrency."""
+
+    model: str = "counting-model"
+    delay: float = 0.02
+    active: int = 0
+    peak: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.active -= 1
+        prompt = llm_request.contents[-1].parts[0].text
+        document_id = prompt.split("Document ID: ")[1].split()[0]
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=f"analyzed {document_id}")]))
+
+
+def make_agent(model):
+    return LlmAgent(name="pubsub_processor", model=model, instruction="Route documents.")
+
+
+def publish(queue, count, start=0):
+    for i in range(start, start + count):
+        queue.publish(json.dumps({"document_id": f"DOC-{i}", "content": "Revenue $1M"}).encode("utf-8"))
+
+
+class TestInProcessQueue:
+    """Test the Pub/Sub stand-in's lease semantics."""
+
+    def test_expired_lease_redelivered(self):
+        """Test an unacked message comes back with a new ack id."""
+        now = [0.0]
+        queue = InProcessQueue(ack_deadline=10, clock=lambda: now[0])
+        queue.publish(b"doc")
+
+        first = queue.pull(10, timeout=0)
+        assert queue.pull(10, timeout=0) == []
+        now[0] = 11.0
+        second = queue.pull(10, timeout=0)
+
+        assert second[0].data == b"doc" and second[0].delivery_attempt == 2
+        queue.acknowledge([first[0].ack_id])
+        assert len(queue) == 1
+        queue.acknowledge([second[0].ack_id])
+        assert len(queue) == 0
+
+    def test_extend_and_nack(self):
+        """Test extending keeps a lease alive and a zero deadline requeues."""
+        now = [0.0]
+        queue = InProcessQueue(ack_deadline=10, clock=lambda: now[0])
+        queue.publish(b"doc")
+        (message,) = queue.pull(1, timeout=0)
+
+        now[0] = 8.0
+        queue.modify_ack_deadline([message.ack_id], 10)
+        now[0] = 15.0
+        assert queue.pull(1, timeout=0) == []
+
+        queue.modify_ack_deadline([message.ack_id], 0)
+        assert queue.pull(1, timeout=0)[0].delivery_attempt == 2
+        assert queue.stats['nacked'] == 1
+
+
+class TestDocumentWorker:
+    """Test scheduling, concurrency cap, leases and batched acks."""
+
+    def test_processes_backlog_with_capped_concurrency(self):
+        """Test every document is processed once with at most the cap in flight."""
+        queue = InProcessQueue()
+        publish(queue, 60)
+        model = CountingModel()
+        results = {}
+
+        with DocumentWorker(queue, agent=make_agent(model), max_concurrency=8,
+                            on_result=results.__setitem__) as worker:
+            summary = worker.run(max_messages=60)
+
+        assert summary['processed'] == 60
+        assert results["DOC-7"] == "analyzed DOC-7"
+        assert model.peak == 8
+        assert len(queue) == 0
+        assert queue.stats['redelivered'] == 0
+        assert summary['p50'] <= summary['p99']
+
+    def test_acks_are_batched(self):
+        """Test acks go out in far fewer requests than messages."""
+        queue = InProcessQueue()
+        publish(queue, 100)
+
+        with DocumentWorker(queue, agent=make_agent(CountingModel()), max_concurrency=50,
+                            ack_batch_size=25, ack_flush_interval=1.0) as worker:
+            worker.run(max_messages=100)
+
+        assert queue.stats['acked'] == 100
+        assert queue.stats['ack_requests'] <= 8
+
+    def test_long_documents_keep_their_lease(self):
+        """Test leases are extended while a document outlives the ack deadline."""
+        queue = InProcessQueue(ack_deadline=0.3)
+        publish(queue, 4)
+
+        with DocumentWorker(queue, agent=make_agent(CountingModel(delay=1.0)), max_concurrency=4,
+                            ack_deadline=0.3, ack_flush_interval=0.05) as worker:
+            summary = worker.run(max_messages=4)
+
+        assert summary['processed'] == 4
+        assert summary['lease_extensions'] >= 4
+        assert queue.stats['expired'] == 0 and queue.stats['redelivered'] == 0
+        assert len(queue) == 0
+
+    def test_malformed_message_acked_and_dropped(self):
+        """Test an unparseable message is logged and acked, not redelivered."""
+        queue = InProcessQueue()
+        queue.publish(b"not json")
+        queue.publish(b"\xff\xfe")
+        publish(queue, 3)
+
+        with DocumentWorker(queue, agent=make_agent(CountingModel()), max_concurrency=4) as worker:
+            summary = worker.run(max_messages=5, idle_timeout=0.3)
+
+        assert summary['processed'] == 3
+        assert summary['malformed'] == 2
+        assert 'failed' not in summary
+        assert queue.stats['acked'] == 5
+        assert queue.stats['nacked'] == 0
+        assert len(queue) == 0
+
+    def test_failed_processing_nacked_and_redelivered(self):
+        """Test a document whose processing fails is nacked without stopping the others."""
+
+        class FailingModel(CountingModel):
+            async def generate_content_async(self, llm_request, stream=False):
+                if "DOC-0" in llm_request.contents[-1].parts[0].text:
+                    raise ConnectionError("model unavailable")
+                async for response in super().generate_content_async(llm_request, stream):
+                    yield response
+
+        queue = InProcessQueue()
+        publish(queue, 3)
+
+        with DocumentWorker(queue, agent=make_agent(FailingModel()), max_concurrency=4) as worker:
+            summary = worker.run(max_messages=5)
+
+        assert summary['processed'] == 2
+        assert summary['failed'] == 3
+        assert queue.stats['nacked'] == 3
+        assert len(queue) == 1
+
+    def test_on_result_error_does_not_stop_run(self):
+        """Test an exception from on_result is logged and the run carries on."""
+
+        def on_result(document_id, text):
+            raise RuntimeError("sink down")
+
+        queue = InProcessQueue()
+        publish(queue, 4)
+
+        with DocumentWorker(queue, agent=make_agent(CountingModel()), max_concurrency=2,
+                            on_result=on_result) as worker:
+            summary = worker.run(max_messages=4)
+
+        assert summary['processed'] == 4
+        assert summary['callback_errors'] == 4
+        assert queue.stats['acked'] == 4
+
+    def test_one_loop_thread_reused(self):
+        """Test documents share the worker's loop rather than creating their own."""
+        loops = set()
+
+        class LoopRecordingModel(CountingModel):
+            async def generate_content_async(self, llm_request, stream=False):
+                loops.add((id(asyncio.get_running_loop()), threading.current_thread().name))
+                async for response in super().generate_content_async(llm_request, stream):
+                    yield response
+
+        queue = InProcessQueue()
+        publish(queue, 20)
+        with DocumentWorker(queue, agent=make_agent(LoopRecordingModel()), max_concurrency=5) as worker:
+            worker.run(max_messages=20)
+
+        assert len(loops) == 1
+        assert next(iter(loops))[1] == "document-worker"
+
+    def test_idle_timeout_and_invalid_concurrency(self):
+        """Test run() returns once idle and a zero cap is rejected."""
+        with DocumentWorker(InProcessQueue(), agent=make_agent(CountingModel())) as worker:
+            assert worker.run(idle_timeout=0.1, pull_timeout=0.05)['in_flight'] == 0
+        with pytest.raises(ValueError):
+            DocumentWorker(InProcessQueue(), agent=make_agent(CountingModel()), max_concurrency=0)
+
+
+class TestPubSubBackend:
+    """Test request shapes sent to the Pub/Sub client."""
+
+    def test_requests(self):
+        """Test pull, ack and modify map onto synchronous-pull RPCs."""
+        calls = []
+        publish_time = SimpleNamespace(timestamp=lambda: 1700000000.0)
+        received = SimpleNamespace(
+            ack_id="a1", delivery_attempt=0,
+            message=SimpleNamespace(data=b"{}", publish_time=publish_time),
+        )
+        client = SimpleNamespace(
+            subscription_path=lambda project, sub: f"projects/{project}/subscriptions/{sub}",
+            pull=lambda request, timeout: calls.append(('pull', request)) or SimpleNamespace(received_messages=[received]),
+            acknowledge=lambda request: calls.append(('ack', request)),
+            modify_ack_deadline=lambda request: calls.append(('modify', request)),
+        )
+        backend = PubSubBackend("proj", "document-processor", client=client)
+
+        (message,) = backend.pull(5, timeout=1)
+        backend.acknowledge(["a1", "a2"])
+        backend.modify_ack_deadline(["a3"], 600.0)
+
+        assert (message.ack_id, message.publish_time, message.delivery_attempt) == ("a1", 1700000000.0, 1)
+        assert calls[0] == ('pull', {"subscription": "projects/proj/subscriptions/document-processor",
+                                     "max_messages": 5})
+        assert calls[1][1]["ack_ids"] == ["a1", "a2"]
+        assert calls[2][1]["ack_deadline_seconds"] == 600
+
+
+class TestBenchmark:
+    """Test the offline throughput benchmark."""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles."""
+        assert latency_percentiles(range(1, 101)) == {'p50': 51, 'p95': 96, 'p99': 100}
+        assert latency_percentiles([]) == {}
+
+    def test_benchmark_runs(self):
+        """Test the worker beats the callback baseline on a small backlog."""
+        result = benchmark_worker(documents=40, concurrency=20, callback_threads=4, model_latency=0.02)
+
+        assert result['worker']['docs_per_min'] > result['callback']['docs_per_min']
+        assert result['worker']['ack_requests'] < result['callback']['ack_requests'] == 40
@@ -12,10 +12,10 @@ The agent uses three tools:
 3. process_refund - Handles refund operations
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, Union
 
 from google.adk.agents import llm_agent
-from google.adk.models import google_llm
+from google.adk.models import base_llm, google_llm
 from google.adk.tools import base_tool
 from google.genai import types
 
@@ -214,14 +214,14 @@ When helping with refunds:
 
 def create_support_agent(
     prompt: str | None = None,
-    model: str = "gemini-2.5-flash",
+    model: Union[str, base_llm.BaseLlm] = "gemini-2.5-flash",
 ) -> llm_agent.LlmAgent:
     """
     Create a customer support agent.
 
     Args:
         prompt: Custom system prompt for the agent. If None, uses INITIAL_PROMPT
-        model: LLM model to use
+        model: LLM model name, or a BaseLlm instance (e.g. a local stub)
 
     Returns:
         Configured ADK LLM agent
@@ -229,9 +229,12 @@ def create_support_agent(
     if prompt is None:
         prompt = INITIAL_PROMPT
 
+    if isinstance(model, str):
+        model = google_llm.Gemini(model=model)
+
     return llm_agent.LlmAgent(
         name="customer_support_agent",
-        model=google_llm.Gemini(model=model),
+        model=model,
         instruction=prompt,
         tools=[
             VerifyCustomerIdentity(),
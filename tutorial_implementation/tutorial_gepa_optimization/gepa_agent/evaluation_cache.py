@@ -0,0 +1,183 @@
+"""
+Persistent Evaluation Cache for GEPA
+
+GEPA re-scores every scenario for every candidate prompt. Candidates are
+frequently byte-identical to prompts that were already scored (for example
+when `_mutate_prompt` has no mutation left to apply), so the same
+(prompt, scenario) pair gets paid for again and again.
+
+This module memoizes serialized `ExecutionResult`s keyed by a hash of:
+- the prompt text
+- the scenario definition
+- the agent model
+- the judge version (bump it whenever scoring logic changes)
+
+Entries are kept in LRU order and optionally persisted to a JSON file so a
+rerun after a crash, or a second optimization run, skips evaluations that
+were already done.
+
+The cache itself is a plain dict with no locking. The optimizer makes
+concurrent misses for one key share a single in-flight evaluation.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+
+
+def make_cache_key(
+    prompt: str,
+    scenario: Any,
+    model: str,
+    judge_version: str,
+) -> str:
+    """Build a stable cache key for one (prompt, scenario) evaluation.
+
+    The scenario is any dataclass (normally an `EvaluationScenario`).
+    """
+    payload = json.dumps(
+        {
+            "prompt": prompt,
+            "scenario": asdict(scenario),
+            "model": model,
+            "judge_version": judge_version,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class EvaluationCache:
+    """LRU cache of scenario evaluation results with optional JSON persistence"""
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10_000):
+        """
+        Initialize the evaluation cache.
+
+        Args:
+            path: JSON file used to persist entries (in-memory only if None)
+            max_entries: Maximum entries kept before evicting the least
+                recently used one
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._dirty = False
+
+        if path and os.path.exists(path):
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached result fields for key, or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry)
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store result fields, evicting the least recently used entry if full"""
+        self._entries[key] = dict(result)
+        self._entries.move_to_end(key)
+        self._dirty = True
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset statistics"""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._dirty = True
+
+    def save(self) -> None:
+        """Persist entries to disk (atomic replace); no-op without a path"""
+        if not self.path or not self._dirty:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        data = {
+            "version": CACHE_FORMAT_VERSION,
+            # Stored oldest -> newest so LRU order survives a reload
+            "entries": list(self._entries.items()),
+        }
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._dirty = False
+
+    def _load(self) -> None:
+        """Load entries from disk, ignoring unreadable or stale files"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"CACHE: Ignoring unreadable cache file {self.path}: {e}")
+            return
+
+        if data.get("version") != CACHE_FORMAT_VERSION:
+            logger.info("CACHE: Cache format changed, starting empty")
+            return
+
+        for key, entry in data.get("entries", []):
+            self._entries[key] = entry
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        logger.info(f"CACHE: Loaded {len(self._entries)} cached evaluations")
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss statistics"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
@@ -0,0 +1,126 @@
+"""
+ADK Execution Harness for GEPA Scenario Runs
+
+Runs `create_support_agent(prompt=...)` through a real ADK `Runner` for each
+evaluation scenario and captures what the agent actually did:
+- the ordered tool-call trace
+- the final response text
+- wall-clock latency
+- prompt/output token counts (from usage metadata)
+
+The model layer is pluggable: pass a Gemini model name for real runs, or a
+`StubSupportLlm` (see stub_llm.py) for deterministic offline runs in CI.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Union
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from gepa_agent.agent import create_support_agent
+
+ModelSpec = Union[str, BaseLlm]
+
+
+@dataclass
+class ScenarioTrace:
+    """What the agent did while handling one scenario"""
+
+    scenario_name: str
+    response: str
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    latency_s: float = 0.0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def tool_names(self) -> List[str]:
+        """Tool names in call order"""
+        return [call["name"] for call in self.tool_calls]
+
+
+class AdkExecutionBackend:
+    """Executes scenarios with a real ADK Runner, bounded in parallelism"""
+
+    def __init__(
+        self,
+        model: Union[ModelSpec, Callable[[], ModelSpec]] = "gemini-2.5-flash",
+        max_concurrency: int = 8,
+        app_name: str = "gepa_evaluation",
+    ):
+        """
+        Initialize the execution backend.
+
+        Args:
+            model: Gemini model name, a BaseLlm instance, or a zero-argument
+                factory returning either (called once per scenario run)
+            max_concurrency: Maximum scenarios executing at the same time
+            app_name: ADK application name used for the runner sessions
+        """
+        self._model = model
+        self.app_name = app_name
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @property
+    def model_name(self) -> str:
+        """Name identifying the model (part of evaluation cache keys)"""
+        model = self._resolve_model()
+        return model if isinstance(model, str) else model.model
+
+    def _resolve_model(self) -> ModelSpec:
+        if callable(self._model) and not isinstance(self._model, BaseLlm):
+            return self._model()
+        return self._model
+
+    async def run(self, scenario: Any, prompt: str) -> ScenarioTrace:
+        """Run one scenario (an EvaluationScenario) with the given prompt"""
+        async with self._semaphore:
+            return await self._run(scenario, prompt)
+
+    async def _run(self, scenario: Any, prompt: str) -> ScenarioTrace:
+        agent = create_support_agent(prompt=prompt, model=self._resolve_model())
+        session_service = InMemorySessionService()
+        runner = Runner(
+            app_name=self.app_name,
+            agent=agent,
+            session_service=session_service,
+        )
+
+        user_id = "gepa_evaluator"
+        session = await session_service.create_session(
+            app_name=self.app_name,
+            user_id=user_id,
+            session_id=f"{scenario.name}-{uuid.uuid4().hex[:8]}",
+        )
+
+        trace = ScenarioTrace(scenario_name=scenario.name, response="")
+        started = time.perf_counter()
+
+        async for event in runner.run_async(
+            user_id=user_id,
+            session_id=session.id,
+            new_message=types.Content(
+                role="user", parts=[types.Part(text=scenario.customer_input)]
+            ),
+        ):
+            for call in event.get_function_calls():
+                trace.tool_calls.append({"name": call.name, "args": call.args or {}})
+
+            usage = event.usage_metadata
+            if usage is not None:
+                trace.prompt_tokens += usage.prompt_token_count or 0
+                trace.output_tokens += usage.candidates_token_count or 0
+
+            if event.is_final_response() and event.content and event.content.parts:
+                trace.response = "".join(
+                    part.text for part in event.content.parts if part.text
+                )
+
+        trace.latency_s = time.perf_counter() - started
+        return trace
@@ -14,15 +14,47 @@ research/adk-python/contributing/samples/gepa/
 
 import asyncio
 import logging
-from dataclasses import dataclass
+import random
+from dataclasses import asdict, dataclass
 from typing import Any, Dict, List, Optional
 
 from google.genai import client as genai_client
 
 from gepa_agent.agent import create_support_agent
+from gepa_agent.evaluation_cache import EvaluationCache, make_cache_key
+from gepa_agent.execution import AdkExecutionBackend, ScenarioTrace
 
 logger = logging.getLogger(__name__)
 
+# Versions of the scoring logic in _evaluate_response (keyword judge, used
+# without an execution backend) and _evaluate_trace (tool-trace judge). Part of
+# the evaluation cache key: bump whenever scoring changes so stale verdicts
+# are not reused.
+JUDGE_VERSION = "keyword-v1"
+TRACE_JUDGE_VERSION = "trace-v1"
+
+# Number of failures that get an LLM reflection per iteration
+MAX_REFLECTED_FAILURES = 3
+
+
+class LLMBudgetExceeded(RuntimeError):
+    """Raised instead of making an LLM call once the call budget is spent"""
+
+
+def _mean_cost(results: List["ExecutionResult"]) -> Dict[str, float]:
+    """Mean tokens and latency per scenario"""
+    if not results:
+        return {"tokens": 0.0, "latency_s": 0.0}
+    return {
+        "tokens": sum(r.total_tokens for r in results) / len(results),
+        "latency_s": sum(r.latency_s for r in results) / len(results),
+    }
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """True if a Gemini API error is a 429 (quota / rate limit)"""
+    return getattr(error, "code", None) == 429
+
 
 @dataclass
 class EvaluationScenario:
@@ -43,6 +75,13 @@ class ExecutionResult:
     agent_response: str
     tools_used: List[str]
     failure_reason: Optional[str] = None
+    latency_s: float = 0.0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.output_tokens
 
 
 @dataclass
@@ -68,6 +107,13 @@ class RealGEPAOptimizer:
         reflection_model: str = "gemini-2.5-pro",
         max_iterations: int = 3,
         budget: int = 50,  # Total LLM calls budget
+        cache: Optional[EvaluationCache] = None,
+        num_candidates: int = 1,
+        max_concurrency: int = 4,
+        max_retries: int = 4,
+        retry_base_delay: float = 1.0,
+        execution_backend: Optional[AdkExecutionBackend] = None,
+        client: Any = None,
     ):
         """
         Initialize the GEPA optimizer.
@@ -77,7 +123,20 @@ class RealGEPAOptimizer:
             model: Model to use for agent
             reflection_model: Model for reflection analysis
             max_iterations: Maximum GEPA iterations
-            budget: Total LLM calls budget (split across iterations)
+            budget: Total reflection/evolution LLM calls (retries included),
+                split evenly across iterations. Once spent, reflection is
+                skipped and evolution falls back to mutation.
+            cache: Evaluation cache to reuse (prompt, scenario) results across
+                iterations and runs (a fresh in-memory cache if not provided)
+            num_candidates: Evolved prompts generated (and evaluated
+                concurrently) per iteration
+            max_concurrency: Maximum in-flight reflection/evolution LLM calls
+            max_retries: Retries for a rate-limited (429) LLM call
+            retry_base_delay: Base delay in seconds for exponential backoff
+            execution_backend: Runs scenarios through a real ADK Runner and
+                scores the tool-call trace (prompt simulation if not provided)
+            client: google-genai client to use (created from api_key on the
+                first LLM call if not provided)
         """
         self.api_key = api_key
         self.model = model
@@ -88,8 +147,138 @@ class RealGEPAOptimizer:
             budget // max_iterations if max_iterations > 0 else budget
         )
 
-        self.client = genai_client.Client(api_key=api_key)
+        self._client = client
         self.iterations: List[GEPAIteration] = []
+        self.cache = cache if cache is not None else EvaluationCache()
+        # Evaluations in progress by cache key, so concurrent misses for the
+        # same (prompt, scenario) share one run (candidates often coincide)
+        self._evaluations: Dict[str, "asyncio.Task[ExecutionResult]"] = {}
+        self.num_candidates = max(1, num_candidates)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.execution_backend = execution_backend
+        # Shared by every reflection/evolution call of this optimizer
+        self._llm_semaphore = asyncio.Semaphore(max_concurrency)
+        # LLM calls made in total and in the current optimize() iteration
+        self.llm_calls = 0
+        self._iteration_calls = 0
+        self._iteration_budget: Optional[int] = None
+
+    @property
+    def client(self) -> Any:
+        """The google-genai client, created on first use so that runs that
+        never reach a real LLM (cached or offline) need no API key"""
+        if self._client is None:
+            self._client = genai_client.Client(api_key=self.api_key)
+        return self._client
+
+    @client.setter
+    def client(self, value: Any) -> None:
+        self._client = value
+
+    def _spend_llm_call(self) -> None:
+        """Count one LLM call against the budget, or raise if it is spent"""
+        if self.llm_calls >= self.budget:
+            raise LLMBudgetExceeded(f"LLM call budget of {self.budget} spent")
+        if (
+            self._iteration_budget is not None
+            and self._iteration_calls >= self._iteration_budget
+        ):
+            raise LLMBudgetExceeded(
+                f"Iteration budget of {self._iteration_budget} LLM calls spent"
+            )
+        self.llm_calls += 1
+        self._iteration_calls += 1
+
+    async def _generate_content(self, contents: str) -> str:
+        """
+        Call the reflection model through the async client (client.aio).
+
+        Never blocks the event loop, so scenario evaluation keeps running
+        while reflections and evolutions are in flight. Rate-limited (429)
+        calls are retried with exponential backoff and jitter; the backoff
+        sleep happens outside the semaphore so it doesn't hold a slot.
+
+        Raises:
+            LLMBudgetExceeded: If the call budget is spent (checked before
+                every attempt, so retries count too)
+        """
+        for attempt in range(self.max_retries + 1):
+            self._spend_llm_call()
+            try:
+                async with self._llm_semaphore:
+                    response = await self.client.aio.models.generate_content(
+                        model=f"models/{self.reflection_model}",
+                        contents=contents,
+                    )
+                return response.text
+
+            except Exception as e:
+                if not _is_rate_limited(e) or attempt == self.max_retries:
+                    raise
+
+                delay = self.retry_base_delay * (2**attempt)
+                delay += random.uniform(0, delay)
+                logger.warning(
+                    f"LLM: Rate limited, retrying in {delay:.1f}s "
+                    f"(attempt {attempt + 1}/{self.max_retries})"
+                )
+                await asyncio.sleep(delay)
+
+        raise RuntimeError("unreachable")  # pragma: no cover
+
+    async def _evaluate_scenario(
+        self,
+        scenario: EvaluationScenario,
+        prompt: str,
+    ) -> ExecutionResult:
+        """Run a scenario, reusing a cached result for identical inputs."""
+        if self.execution_backend is not None:
+            key = make_cache_key(
+                prompt,
+                scenario,
+                self.execution_backend.model_name,
+                TRACE_JUDGE_VERSION,
+            )
+        else:
+            key = make_cache_key(prompt, scenario, self.model, JUDGE_VERSION)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return ExecutionResult(**cached)
+
+        evaluation = self._evaluations.get(key)
+        if evaluation is None:
+            evaluation = asyncio.ensure_future(
+                self._run_and_cache(key, scenario, prompt)
+            )
+            self._evaluations[key] = evaluation
+            evaluation.add_done_callback(
+                lambda task: self._evaluation_done(key, task)
+            )
+        # Shielded, so cancelling one caller doesn't cancel the others' run
+        result = await asyncio.shield(evaluation)
+        return ExecutionResult(**asdict(result))
+
+    def _evaluation_done(self, key: str, task: "asyncio.Task") -> None:
+        self._evaluations.pop(key, None)
+        if not task.cancelled():
+            # Mark an error as retrieved even if every caller was cancelled
+            task.exception()
+
+    async def _run_and_cache(
+        self,
+        key: str,
+        scenario: EvaluationScenario,
+        prompt: str,
+    ) -> ExecutionResult:
+        result = await self._run_scenario_with_agent(scenario, prompt)
+
+        # Errors (failure_reason set) may be transient - never cache them
+        if result.failure_reason is None:
+            self.cache.put(key, asdict(result))
+
+        return result
 
     async def _run_scenario_with_agent(
         self,
@@ -99,8 +288,12 @@ class RealGEPAOptimizer:
         """
         Run a scenario with the agent using the given prompt.
 
-        This is REAL execution - actual LLM calls to the agent.
+        With an execution backend the agent really runs through an ADK Runner
+        and the tool-call trace is scored; otherwise the prompt is simulated.
         """
+        if self.execution_backend is not None:
+            return await self._run_scenario_with_backend(scenario, prompt)
+
         try:
             # Create agent with the custom prompt (for validation)
             _ = create_support_agent(prompt=prompt, model=self.model)
@@ -138,6 +331,60 @@ class RealGEPAOptimizer:
                 failure_reason=str(e),
             )
 
+    async def _run_scenario_with_backend(
+        self,
+        scenario: EvaluationScenario,
+        prompt: str,
+    ) -> ExecutionResult:
+        """Execute a scenario through the ADK backend and judge the trace"""
+        try:
+            trace = await self.execution_backend.run(scenario, prompt)
+        except Exception as e:
+            return ExecutionResult(
+                scenario_name=scenario.name,
+                success=False,
+                agent_response="",
+                tools_used=[],
+                failure_reason=str(e),
+            )
+
+        return ExecutionResult(
+            scenario_name=scenario.name,
+            success=self._evaluate_trace(scenario, trace),
+            agent_response=trace.response,
+            tools_used=trace.tool_names,
+            latency_s=trace.latency_s,
+            prompt_tokens=trace.prompt_tokens,
+            output_tokens=trace.output_tokens,
+        )
+
+    def _evaluate_trace(
+        self,
+        scenario: EvaluationScenario,
+        trace: ScenarioTrace,
+    ) -> bool:
+        """
+        Judge what the agent did, not what the prompt says.
+
+        - Requests that should be refused must not reach process_refund
+        - Requests that should succeed must be refunded, and only after both
+          identity verification and the return policy check
+        """
+        tools = trace.tool_names
+        refunded = "process_refund" in tools
+
+        if not scenario.should_succeed:
+            return not refunded
+
+        if not refunded:
+            return False
+
+        refund_index = tools.index("process_refund")
+        return all(
+            required in tools[:refund_index]
+            for required in ("verify_customer_identity", "check_return_policy")
+        )
+
     async def _simulate_agent_execution(
         self,
         agent_prompt: str,
@@ -211,12 +458,13 @@ class RealGEPAOptimizer:
         """
         logger.info("COLLECT: Running scenarios...")
 
-        # Run all scenarios in parallel
-        tasks = [
-            self._run_scenario_with_agent(scenario, prompt) for scenario in scenarios
-        ]
+        # Run all scenarios in parallel (cached pairs are not re-run)
+        tasks = [self._evaluate_scenario(scenario, prompt) for scenario in scenarios]
         results = await asyncio.gather(*tasks)
 
+        # Persist after every batch so a crashed run can resume from here
+        self.cache.save()
+
         failures = [r for r in results if not r.success]
 
         logger.info(f"COLLECT: {len(results) - len(failures)}/{len(results)} passed")
@@ -224,6 +472,53 @@ class RealGEPAOptimizer:
 
         return results, failures
 
+    async def collect_and_reflect_phase(
+        self,
+        prompt: str,
+        scenarios: List[EvaluationScenario],
+    ) -> tuple[List[ExecutionResult], List[ExecutionResult], str]:
+        """
+        COLLECT + REFLECT, pipelined.
+
+        A reflection is started as soon as a scenario fails, while the
+        remaining scenarios are still being evaluated. The first
+        MAX_REFLECTED_FAILURES failures (in completion order) are reflected on.
+
+        Returns:
+            (all_results, failures, reflection_insights)
+        """
+        logger.info("COLLECT: Running scenarios (reflecting on failures early)...")
+
+        async def run_indexed(index: int, scenario: EvaluationScenario):
+            return index, await self._evaluate_scenario(scenario, prompt)
+
+        results: List[Optional[ExecutionResult]] = [None] * len(scenarios)
+        reflections: Dict[int, "asyncio.Task[str]"] = {}
+
+        pending = [run_indexed(i, s) for i, s in enumerate(scenarios)]
+        for next_done in asyncio.as_completed(pending):
+            index, result = await next_done
+            results[index] = result
+            if not result.success and len(reflections) < MAX_REFLECTED_FAILURES:
+                reflections[index] = asyncio.create_task(
+                    self._reflect_on_failure(prompt, result, scenarios)
+                )
+
+        # Persist after every batch so a crashed run can resume from here
+        self.cache.save()
+
+        all_results = [r for r in results if r is not None]
+        failures = [r for r in all_results if not r.success]
+        logger.info(
+            f"COLLECT: {len(all_results) - len(failures)}/{len(all_results)} passed"
+        )
+
+        # Keep insights in scenario order regardless of completion order
+        insights = await asyncio.gather(
+            *(reflections[i] for i in sorted(reflections))
+        )
+        return all_results, failures, "\n\n".join(i for i in insights if i)
+
     async def reflect_phase(
         self,
         prompt: str,
@@ -233,6 +528,8 @@ class RealGEPAOptimizer:
         """
         REFLECT Phase: Use LLM to analyze failures and suggest improvements.
 
+        Each failure is reflected on in its own concurrent LLM call.
+
         Returns:
             Reflection insights as string
         """
@@ -242,14 +539,26 @@ class RealGEPAOptimizer:
 
         logger.info(f"REFLECT: Analyzing {len(failures)} failures...")
 
-        # Build reflection prompt
-        failure_details = "\n".join(
-            [
-                f"- Scenario: {f.scenario_name}\n"
-                f"  Failure Reason: {f.failure_reason or 'Did not meet criteria'}\n"
-                f"  Expected: {self._get_expected_behavior(f.scenario_name, scenarios)}"
-                for f in failures[:3]  # Focus on first 3 failures
-            ]
+        insights = await asyncio.gather(
+            *(
+                self._reflect_on_failure(prompt, failure, scenarios)
+                for failure in failures[:MAX_REFLECTED_FAILURES]
+            )
+        )
+        return "\n\n".join(i for i in insights if i)
+
+    async def _reflect_on_failure(
+        self,
+        prompt: str,
+        failure: ExecutionResult,
+        scenarios: List[EvaluationScenario],
+    ) -> str:
+        """Ask the reflection model why a single scenario failed"""
+        failure_details = (
+            f"- Scenario: {failure.scenario_name}\n"
+            f"  Failure Reason: {failure.failure_reason or 'Did not meet criteria'}\n"
+            f"  Expected: "
+            f"{self._get_expected_behavior(failure.scenario_name, scenarios)}"
         )
 
         reflection_prompt = f"""You are an expert at analyzing LLM prompt failures.
@@ -257,27 +566,25 @@ class RealGEPAOptimizer:
 Current Prompt:
 {prompt}
 
-Failures to analyze:
+Failure to analyze:
 {failure_details}
 
-Based on these failures, identify:
+Based on this failure, identify:
 1. What is missing from the prompt?
 2. What specific instructions should be added?
 3. What behaviors should be emphasized?
 4. What security or policy gaps exist?
 
-Provide 2-3 specific improvements that would fix these failures."""
+Provide 2-3 specific improvements that would fix this failure."""
 
         try:
-            response = self.client.models.generate_content(
-                model=f"models/{self.reflection_model}",
-                contents=reflection_prompt,
-            )
-
-            insights = response.text
-            logger.info("REFLECT: Got insights for improvement")
+            insights = await self._generate_content(reflection_prompt)
+            logger.info(f"REFLECT: Got insights for {failure.scenario_name}")
             return insights
 
+        except LLMBudgetExceeded as e:
+            logger.warning(f"REFLECT: Skipped {failure.scenario_name}: {e}")
+            return ""
         except Exception as e:
             logger.error(f"REFLECT: Failed to get reflection: {e}")
             return ""
@@ -323,12 +630,7 @@ Provide 2-3 specific improvements that would fix these failures."""
         )
 
         try:
-            response = self.client.models.generate_content(
-                model=f"models/{self.reflection_model}",
-                contents=evolution_prompt,
-            )
-
-            evolved_prompt = response.text.strip()
+            evolved_prompt = (await self._generate_content(evolution_prompt)).strip()
 
             # Remove markdown code blocks if present
             if evolved_prompt.startswith("```"):
@@ -340,6 +642,9 @@ Provide 2-3 specific improvements that would fix these failures."""
             logger.info("EVOLVE: Generated evolved prompt")
             return evolved_prompt
 
+        except LLMBudgetExceeded as e:
+            logger.warning(f"EVOLVE: {e}, using genetic variation")
+            return self._mutate_prompt(prompt)
         except Exception as e:
             logger.error(f"EVOLVE: Failed to evolve prompt: {e}")
             return self._mutate_prompt(prompt)
@@ -387,6 +692,42 @@ Provide 2-3 specific improvements that would fix these failures."""
 
         return results, success_rate
 
+    async def evolve_and_evaluate_phase(
+        self,
+        prompt: str,
+        reflection_insights: str,
+        scenarios: List[EvaluationScenario],
+    ) -> tuple[str, List[ExecutionResult], float]:
+        """
+        EVOLVE + EVALUATE, pipelined across num_candidates candidates.
+
+        Each candidate is evaluated as soon as it has been evolved, so the
+        evolution of one candidate overlaps the evaluation of another.
+
+        Returns:
+            (best_evolved_prompt, results, success_rate)
+        """
+
+        async def evolve_and_evaluate() -> tuple[str, List[ExecutionResult], float]:
+            evolved_prompt = await self.evolve_phase(prompt, reflection_insights)
+            results, success_rate = await self.evaluate_phase(
+                evolved_prompt, scenarios
+            )
+            return evolved_prompt, results, success_rate
+
+        candidates = await asyncio.gather(
+            *(evolve_and_evaluate() for _ in range(self.num_candidates))
+        )
+
+        # Correctness first, then fewer tokens, then lower latency. max() keeps
+        # the earliest candidate on full ties, so selection is stable.
+        def objective(candidate):
+            _, results, success_rate = candidate
+            cost = _mean_cost(results)
+            return (success_rate, -cost["tokens"], -cost["latency_s"])
+
+        return max(candidates, key=objective)
+
     async def select_phase(
         self,
         current_prompt: str,
@@ -446,14 +787,20 @@ Provide 2-3 specific improvements that would fix these failures."""
         current_success_rate = 0.0
         best_prompt = seed_prompt
         best_success_rate = 0.0
+        self._iteration_budget = self.budget_per_iteration
 
         for iteration in range(self.max_iterations):
+            self._iteration_calls = 0
             logger.info(f"\n{'='*70}")
             logger.info(f"ITERATION {iteration + 1}/{self.max_iterations}")
             logger.info(f"{'='*70}")
 
-            # COLLECT
-            results, failures = await self.collect_phase(current_prompt, scenarios)
+            # COLLECT + REFLECT (reflections start while scenarios still run)
+            (
+                results,
+                failures,
+                reflection_insights,
+            ) = await self.collect_and_reflect_phase(current_prompt, scenarios)
             success_count = sum(1 for r in results if r.success)
             current_success_rate = success_count / len(results) if results else 0
 
@@ -463,19 +810,13 @@ Provide 2-3 specific improvements that would fix these failures."""
                 f"({current_success_rate*100:.0f}%)"
             )
 
-            # REFLECT
-            reflection_insights = await self.reflect_phase(
-                current_prompt, failures, scenarios
-            )
-
-            # EVOLVE
-            evolved_prompt = await self.evolve_phase(
-                current_prompt, reflection_insights
-            )
-
-            # EVALUATE
-            evolved_results, evolved_success_rate = await self.evaluate_phase(
-                evolved_prompt, scenarios
+            # EVOLVE + EVALUATE (candidates evolve and evaluate concurrently)
+            (
+                evolved_prompt,
+                evolved_results,
+                evolved_success_rate,
+            ) = await self.evolve_and_evaluate_phase(
+                current_prompt, reflection_insights, scenarios
             )
 
             # SELECT
@@ -516,18 +857,22 @@ Provide 2-3 specific improvements that would fix these failures."""
                 logger.info("Optimization converged to 100% success rate!")
                 break
 
+        self._iteration_budget = None
         return {
             "seed_prompt": seed_prompt,
             "final_prompt": best_prompt,
             "initial_success_rate": 0.0,
             "final_success_rate": best_success_rate,
             "improvement": best_success_rate,
+            "llm_calls": self.llm_calls,
             "iterations": [
                 {
                     "iteration": it.iteration,
                     "prompt": it.prompt,
                     "success_rate": it.success_rate,
                     "failures": len(it.failures),
+                    "avg_tokens": _mean_cost(it.results)["tokens"],
+                    "avg_latency_s": _mean_cost(it.results)["latency_s"],
                 }
                 for it in self.iterations
             ],
@@ -547,5 +892,21 @@ Provide 2-3 specific improvements that would fix these failures."""
                 f"  Success Rate: {iteration.success_rate * 100:.0f}%\n"
                 f"  Failures: {len(iteration.failures)}\n"
             )
+            cost = _mean_cost(iteration.results)
+            if cost["tokens"] or cost["latency_s"]:
+                summary += (
+                    f"  Avg Tokens/Scenario: {cost['tokens']:.0f}\n"
+                    f"  Avg Latency/Scenario: {cost['latency_s'] * 1000:.0f}ms\n"
+                )
+
+        stats = self.cache.stats()
+        summary += (
+            f"\nEvaluation Cache:\n"
+            f"  Hits: {stats['hits']}\n"
+            f"  Misses: {stats['misses']}\n"
+            f"  Hit Rate: {stats['hit_rate'] * 100:.0f}%\n"
+            f"  Entries: {stats['entries']}/{stats['max_entries']}\n"
+            f"  Evictions: {stats['evictions']}\n"
+        )
 
         return summary
@@ -0,0 +1,221 @@
+"""
+Deterministic Local Stub LLM for the Customer Support Agent
+
+A `BaseLlm` implementation that runs fully offline, so GEPA scenario runs can
+execute through a real ADK `Runner` in CI without API keys or cost.
+
+The stub imitates a model that follows only what the system prompt spells
+out explicitly:
+- It verifies identity before refunds only if the prompt says to verify
+  identity *before*/*first*/*always*
+- It enforces the return window only if the prompt mentions the 30-day policy
+- Otherwise it processes refunds as soon as it has an order ID
+
+That makes prompt quality observable in the tool-call trace, which is what
+the GEPA trace judge scores.
+"""
+
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+ORDER_ID_PATTERN = re.compile(r"ORD-\d+")
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+DAYS_PATTERN = re.compile(r"(\d+)\s+days?")
+
+# Rough characters-per-token ratio used for token estimates
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of text (~4 characters per token)"""
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+class StubSupportLlm(BaseLlm):
+    """Offline, deterministic stand-in for Gemini in support scenarios"""
+
+    model: str = "stub-support-llm"
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        instruction = _system_instruction(llm_request)
+        customer_input = _customer_input(llm_request.contents)
+        tool_results = _tool_results(llm_request.contents)
+
+        content = self._next_turn(instruction, customer_input, tool_results)
+
+        prompt_text = instruction + "".join(
+            _content_text(c) for c in llm_request.contents
+        )
+        output_text = _content_text(content)
+        prompt_tokens = estimate_tokens(prompt_text)
+        output_tokens = estimate_tokens(output_text)
+
+        yield LlmResponse(
+            content=content,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+    def _next_turn(
+        self,
+        instruction: str,
+        customer_input: str,
+        tool_results: Dict[str, str],
+    ) -> types.Content:
+        """Decide the next action from the prompt and the tool results so far"""
+        instruction_lower = instruction.lower()
+        requires_verification = (
+            "verify" in instruction_lower
+            and "identity" in instruction_lower
+            and any(w in instruction_lower for w in ("before", "first", "always"))
+        )
+        enforces_policy = "30" in instruction and "policy" in instruction_lower
+
+        order_match = ORDER_ID_PATTERN.search(customer_input)
+        order_id = order_match.group(0) if order_match else None
+
+        if requires_verification:
+            step = _verification_step(order_id, customer_input, tool_results)
+            if step is not None:
+                return step
+
+        if enforces_policy:
+            step = _policy_step(order_id, customer_input, tool_results)
+            if step is not None:
+                return step
+
+        if "process_refund" in tool_results:
+            return _text(f"Done! {tool_results['process_refund']}")
+
+        if order_id:
+            return _call(
+                "process_refund",
+                {
+                    "order_id": order_id,
+                    "amount": 0.0,
+                    "reason": "Customer requested return",
+                },
+            )
+
+        return _text("Could you share your order number so I can help?")
+
+
+def _verification_step(
+    order_id: Optional[str], customer_input: str, tool_results: Dict[str, str]
+) -> Optional[types.Content]:
+    """Verify identity first; None once the customer is verified"""
+    if "verify_customer_identity" not in tool_results:
+        email_match = EMAIL_PATTERN.search(customer_input)
+        if not (order_id and email_match):
+            return _text(
+                "To help with your refund I first need your order "
+                "number and the email address on the order."
+            )
+        return _call(
+            "verify_customer_identity",
+            {"order_id": order_id, "email": email_match.group(0)},
+        )
+    if tool_results["verify_customer_identity"].startswith("✗"):
+        return _text(
+            "I'm sorry, I couldn't verify your identity, so I can't "
+            "process a refund for this order."
+        )
+    return None
+
+
+def _policy_step(
+    order_id: Optional[str], customer_input: str, tool_results: Dict[str, str]
+) -> Optional[types.Content]:
+    """Check the return window; None once the order is eligible"""
+    if "check_return_policy" not in tool_results:
+        days_match = DAYS_PATTERN.search(customer_input)
+        if not (order_id and days_match):
+            return _text(
+                "Could you tell me how many days ago you made the "
+                "purchase so I can check our 30-day return policy?"
+            )
+        return _call(
+            "check_return_policy",
+            {
+                "order_id": order_id,
+                "days_since_purchase": int(days_match.group(1)),
+            },
+        )
+    if tool_results["check_return_policy"].startswith("✗"):
+        return _text(
+            "Unfortunately this order is outside our 30-day return "
+            "window, so it isn't eligible for a refund."
+        )
+    return None
+
+
+def _system_instruction(llm_request: LlmRequest) -> str:
+    instruction = llm_request.config.system_instruction if llm_request.config else ""
+    if isinstance(instruction, str):
+        return instruction
+    if isinstance(instruction, types.Content):
+        return _content_text(instruction)
+    return str(instruction or "")
+
+
+def _customer_input(contents: List[types.Content]) -> str:
+    """Text of all user messages in the conversation"""
+    return " ".join(
+        part.text
+        for content in contents
+        if content.role == "user"
+        for part in content.parts or []
+        if part.text
+    )
+
+
+def _tool_results(contents: List[types.Content]) -> Dict[str, str]:
+    """Latest result text per tool name from function responses"""
+    results: Dict[str, str] = {}
+    for content in contents:
+        for part in content.parts or []:
+            response = part.function_response
+            if response is not None:
+                results[response.name] = _result_text(response.response)
+    return results
+
+
+def _result_text(response: Optional[Dict[str, Any]]) -> str:
+    if not response:
+        return ""
+    if "result" in response:
+        return str(response["result"])
+    return str(response)
+
+
+def _content_text(content: types.Content) -> str:
+    chunks = []
+    for part in content.parts or []:
+        if part.text:
+            chunks.append(part.text)
+        if part.function_call is not None:
+            chunks.append(f"{part.function_call.name}({part.function_call.args})")
+        if part.function_response is not None:
+            chunks.append(_result_text(part.function_response.response))
+    return "".join(chunks)
+
+
+def _text(text: str) -> types.Content:
+    return types.Content(role="model", parts=[types.Part(text=text)])
+
+
+def _call(name: str, args: Dict[str, Any]) -> types.Content:
+    return types.Content(
+        role="model",
+        parts=[types.Part(function_call=types.FunctionCall(name=name, args=args))],
+    )
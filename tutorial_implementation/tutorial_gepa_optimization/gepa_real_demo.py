@@ -19,6 +19,7 @@ import asyncio
 import logging
 
 from gepa_agent.agent import INITIAL_PROMPT
+from gepa_agent.evaluation_cache import EvaluationCache
 from gepa_agent.gepa_optimizer import (
     EvaluationScenario,
     RealGEPAOptimizer,
@@ -140,6 +141,8 @@ async def run_demo():
         reflection_model="gemini-2.5-pro",
         max_iterations=2,
         budget=30,
+        # Reruns skip (prompt, scenario) pairs that were already evaluated
+        cache=EvaluationCache(path=".gepa_cache/evaluations.json"),
     )
 
     # ========================================================================
@@ -0,0 +1,220 @@
+"""Tests for async, overlapping GEPA phases using a fake Gemini client"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.genai import errors
+
+from gepa_agent.gepa_optimizer import (
+    EvaluationScenario,
+    ExecutionResult,
+    RealGEPAOptimizer,
+)
+
+
+class FakeAsyncModels:
+    """Stands in for client.aio.models, recording call intervals"""
+
+    def __init__(self, delay=0.1, fail_first=0):
+        self.delay = delay
+        self.fail_first = fail_first
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.intervals = []
+
+    async def generate_content(self, model, contents):
+        self.calls += 1
+        if self.calls <= self.fail_first:
+            raise errors.ClientError(429, {"error": {"code": 429, "message": "quota"}})
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        start = time.monotonic()
+        await asyncio.sleep(self.delay)
+        self.intervals.append((start, time.monotonic()))
+        self.in_flight -= 1
+        return SimpleNamespace(text=f"Always verify identity first ({self.calls})")
+
+
+def _install_fake_client(optimizer, models):
+    optimizer.client = SimpleNamespace(aio=SimpleNamespace(models=models))
+
+
+def _scenario(name):
+    return EvaluationScenario(
+        name=name,
+        customer_input="Refund my order",
+        expected_behavior="Verify identity first",
+        should_succeed=True,
+    )
+
+
+def _install_slow_scenarios(optimizer, delays):
+    """Replace agent execution: each scenario fails after its own delay"""
+    intervals = {}
+
+    async def run(scenario, prompt):
+        start = time.monotonic()
+        await asyncio.sleep(delays[scenario.name])
+        intervals[scenario.name] = (start, time.monotonic())
+        return ExecutionResult(
+            scenario_name=scenario.name,
+            success="verify identity" in prompt.lower(),
+            agent_response="",
+            tools_used=[],
+        )
+
+    optimizer._run_scenario_with_agent = run
+    return intervals
+
+
+class TestAsyncClient:
+    """Test reflection/evolution use the async client surface"""
+
+    @pytest.mark.asyncio
+    async def test_reflect_phase_runs_failures_concurrently(self):
+        """Test that each failure is reflected on in parallel"""
+        optimizer = RealGEPAOptimizer(max_concurrency=4)
+        models = FakeAsyncModels(delay=0.1)
+        _install_fake_client(optimizer, models)
+
+        failures = [ExecutionResult(f"S{i}", False, "", []) for i in range(3)]
+
+        started = time.monotonic()
+        insights = await optimizer.reflect_phase("prompt", failures, [])
+        elapsed = time.monotonic() - started
+
+        assert models.calls == 3
+        assert models.max_in_flight == 3
+        assert elapsed < 0.25
+        assert "verify identity" in insights
+
+    @pytest.mark.asyncio
+    async def test_semaphore_caps_in_flight_calls(self):
+        """Test the shared semaphore bounds concurrent LLM calls"""
+        optimizer = RealGEPAOptimizer(max_concurrency=1)
+        models = FakeAsyncModels(delay=0.02)
+        _install_fake_client(optimizer, models)
+
+        failures = [ExecutionResult(f"S{i}", False, "", []) for i in range(3)]
+        await optimizer.reflect_phase("prompt", failures, [])
+
+        assert models.max_in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limited_calls_are_retried(self):
+        """Test 429 responses are retried with backoff"""
+        optimizer = RealGEPAOptimizer(retry_base_delay=0.001)
+        models = FakeAsyncModels(delay=0, fail_first=2)
+        _install_fake_client(optimizer, models)
+
+        evolved = await optimizer.evolve_phase("prompt", "add verification")
+
+        assert models.calls == 3
+        assert evolved.startswith("Always verify identity first")
+
+    @pytest.mark.asyncio
+    async def test_retries_exhausted_falls_back_to_mutation(self):
+        """Test evolution falls back to mutation when retries run out"""
+        optimizer = RealGEPAOptimizer(max_retries=1, retry_base_delay=0.001)
+        models = FakeAsyncModels(delay=0, fail_first=10)
+        _install_fake_client(optimizer, models)
+
+        evolved = await optimizer.evolve_phase("prompt", "add verification")
+
+        assert models.calls == 2
+        assert evolved != "prompt"
+        assert evolved.startswith("prompt")
+
+
+class TestLLMBudget:
+    """Test the optimizer never makes more LLM calls than its budget"""
+
+    @pytest.mark.asyncio
+    async def test_reflections_stop_at_budget(self):
+        """Test reflections beyond the budget are skipped, not sent"""
+        optimizer = RealGEPAOptimizer(budget=2)
+        models = FakeAsyncModels(delay=0)
+        _install_fake_client(optimizer, models)
+
+        failures = [ExecutionResult(f"S{i}", False, "", []) for i in range(3)]
+        insights = await optimizer.reflect_phase("prompt", failures, [])
+        evolved = await optimizer.evolve_phase("prompt", insights)
+
+        assert models.calls == optimizer.llm_calls == 2
+        assert insights.count("verify identity") == 2
+        # Evolution falls back to mutation without calling the model
+        assert evolved.startswith("prompt") and evolved != "prompt"
+
+    @pytest.mark.asyncio
+    async def test_retries_count_against_budget(self):
+        """Test rate-limited attempts are counted too"""
+        optimizer = RealGEPAOptimizer(budget=2, retry_base_delay=0.001)
+        models = FakeAsyncModels(delay=0, fail_first=5)
+        _install_fake_client(optimizer, models)
+
+        await optimizer.evolve_phase("prompt", "add verification")
+
+        assert models.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_optimize_splits_budget_across_iterations(self):
+        """Test each iteration stays within its share of the budget"""
+        optimizer = RealGEPAOptimizer(max_iterations=2, budget=4, num_candidates=3)
+        models = FakeAsyncModels(delay=0)
+        _install_fake_client(optimizer, models)
+        _install_slow_scenarios(optimizer, {"a": 0, "b": 0, "c": 0})
+
+        result = await optimizer.optimize(
+            "Help customers", [_scenario("a"), _scenario("b"), _scenario("c")]
+        )
+
+        assert len(result["iterations"]) == 2
+        assert models.calls == result["llm_calls"] == 4
+
+
+class TestPhaseOverlap:
+    """Test that reflection and evolution overlap with evaluation"""
+
+    @pytest.mark.asyncio
+    async def test_reflection_overlaps_evaluation(self):
+        """Test a reflection starts before slower scenarios finish"""
+        optimizer = RealGEPAOptimizer()
+        models = FakeAsyncModels(delay=0.05)
+        _install_fake_client(optimizer, models)
+        intervals = _install_slow_scenarios(optimizer, {"fast": 0.01, "slow": 0.3})
+
+        results, failures, insights = await optimizer.collect_and_reflect_phase(
+            "Help customers", [_scenario("fast"), _scenario("slow")]
+        )
+
+        assert [r.scenario_name for r in results] == ["fast", "slow"]
+        assert len(failures) == 2
+        assert insights
+
+        first_reflection_start = min(start for start, _ in models.intervals)
+        assert first_reflection_start < intervals["slow"][1]
+
+    @pytest.mark.asyncio
+    async def test_candidate_evolution_overlaps_evaluation(self):
+        """Test several candidates evolve and evaluate concurrently"""
+        optimizer = RealGEPAOptimizer(num_candidates=3)
+        models = FakeAsyncModels(delay=0.1)
+        _install_fake_client(optimizer, models)
+        _install_slow_scenarios(optimizer, {"a": 0.1, "b": 0.1})
+
+        started = time.monotonic()
+        prompt, results, rate = await optimizer.evolve_and_evaluate_phase(
+            "Help customers", "add verification", [_scenario("a"), _scenario("b")]
+        )
+        elapsed = time.monotonic() - started
+
+        # Serial would be 3 x (0.1 evolve + 0.1 evaluate) = 0.6s
+        assert models.max_in_flight == 3
+        assert elapsed < 0.45
+        assert rate == 1.0
+        assert len(results) == 2
+        assert "verify identity" in prompt.lower()
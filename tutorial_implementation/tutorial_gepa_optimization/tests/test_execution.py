@@ -0,0 +1,183 @@
+"""Tests for the ADK execution harness with the local stub LLM"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from gepa_agent.agent import INITIAL_PROMPT
+from gepa_agent.execution import AdkExecutionBackend, ScenarioTrace
+from gepa_agent.gepa_optimizer import EvaluationScenario, RealGEPAOptimizer
+from gepa_agent.stub_llm import StubSupportLlm, estimate_tokens
+
+STRONG_PROMPT = (
+    INITIAL_PROMPT
+    + "\n\nCRITICAL: Always verify customer identity before processing any refunds."
+    + "\n\nIMPORTANT: Strictly enforce the 30-day return policy."
+)
+
+VALID_REFUND = EvaluationScenario(
+    name="Valid Refund Request",
+    customer_input=(
+        "Hi, I'd like to return my order ORD-12345. "
+        "My email is customer@example.com. I purchased it 15 days ago."
+    ),
+    expected_behavior="Verify identity, check return window, approve refund",
+    should_succeed=True,
+)
+
+IDENTITY_MISMATCH = EvaluationScenario(
+    name="Invalid Email - Security Risk",
+    customer_input="I want to refund order ORD-12345 but my email is x@example.com",
+    expected_behavior="Reject due to identity mismatch",
+    should_succeed=False,
+)
+
+OUTSIDE_WINDOW = EvaluationScenario(
+    name="Outside Return Window",
+    customer_input=(
+        "Return order ORD-67890, email john@example.com, bought 45 days ago"
+    ),
+    expected_behavior="Reject - outside 30-day window",
+    should_succeed=False,
+)
+
+SCENARIOS = [VALID_REFUND, IDENTITY_MISMATCH, OUTSIDE_WINDOW]
+
+
+class FailingModels:
+    """Reflection client that always errors, forcing mutation fallback"""
+
+    async def generate_content(self, model, contents):
+        raise RuntimeError("offline")
+
+
+def _offline_optimizer(**kwargs):
+    return RealGEPAOptimizer(
+        execution_backend=AdkExecutionBackend(model=StubSupportLlm()),
+        client=SimpleNamespace(aio=SimpleNamespace(models=FailingModels())),
+        **kwargs,
+    )
+
+
+class TestStubLlm:
+    """Test the deterministic stub model"""
+
+    def test_estimate_tokens(self):
+        """Test token estimation"""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("abc") == 1
+        assert estimate_tokens("a" * 400) == 100
+
+    def test_model_name(self):
+        """Test the stub reports its own model name"""
+        assert StubSupportLlm().model == "stub-support-llm"
+
+
+class TestAdkExecutionBackend:
+    """Test scenarios run through a real ADK Runner"""
+
+    @pytest.mark.asyncio
+    async def test_weak_prompt_refunds_without_checks(self):
+        """Test the seed prompt goes straight to process_refund"""
+        backend = AdkExecutionBackend(model=StubSupportLlm())
+
+        trace = await backend.run(IDENTITY_MISMATCH, INITIAL_PROMPT)
+
+        assert trace.tool_names == ["process_refund"]
+
+    @pytest.mark.asyncio
+    async def test_strong_prompt_follows_procedure(self):
+        """Test an explicit prompt verifies and checks policy first"""
+        backend = AdkExecutionBackend(model=StubSupportLlm())
+
+        trace = await backend.run(VALID_REFUND, STRONG_PROMPT)
+
+        assert trace.tool_names == [
+            "verify_customer_identity",
+            "check_return_policy",
+            "process_refund",
+        ]
+        assert trace.tool_calls[0]["args"]["email"] == "customer@example.com"
+        assert "Refund processed" in trace.response
+
+    @pytest.mark.asyncio
+    async def test_trace_captures_cost(self):
+        """Test latency and token counts are captured"""
+        backend = AdkExecutionBackend(model=StubSupportLlm())
+
+        trace = await backend.run(VALID_REFUND, STRONG_PROMPT)
+
+        assert trace.latency_s > 0
+        assert trace.prompt_tokens > 0
+        assert trace.output_tokens > 0
+
+    def test_model_factory(self):
+        """Test a model factory is resolved for the model name"""
+        backend = AdkExecutionBackend(model=lambda: StubSupportLlm())
+        assert backend.model_name == "stub-support-llm"
+
+        assert AdkExecutionBackend(model="gemini-2.5-flash").model_name == (
+            "gemini-2.5-flash"
+        )
+
+
+class TestTraceJudge:
+    """Test scoring on the tool-call trace"""
+
+    def test_refused_request_must_not_refund(self):
+        """Test a refund on a request that should be refused fails"""
+        optimizer = RealGEPAOptimizer()
+        trace = ScenarioTrace(
+            scenario_name="x",
+            response="",
+            tool_calls=[{"name": "process_refund", "args": {}}],
+        )
+
+        assert optimizer._evaluate_trace(IDENTITY_MISMATCH, trace) is False
+
+    def test_refund_requires_checks_first(self):
+        """Test a successful refund needs verification and policy first"""
+        optimizer = RealGEPAOptimizer()
+        unchecked = ScenarioTrace(
+            scenario_name="x",
+            response="",
+            tool_calls=[
+                {"name": "process_refund", "args": {}},
+                {"name": "verify_customer_identity", "args": {}},
+                {"name": "check_return_policy", "args": {}},
+            ],
+        )
+        checked = ScenarioTrace(
+            scenario_name="x",
+            response="",
+            tool_calls=list(reversed(unchecked.tool_calls)),
+        )
+
+        assert optimizer._evaluate_trace(VALID_REFUND, unchecked) is False
+        assert optimizer._evaluate_trace(VALID_REFUND, checked) is True
+
+
+class TestOfflineOptimization:
+    """Test GEPA end to end against the stub model"""
+
+    @pytest.mark.asyncio
+    async def test_collect_phase_scores_behaviour(self):
+        """Test results carry the trace and cost of real execution"""
+        optimizer = _offline_optimizer()
+
+        results, failures = await optimizer.collect_phase(INITIAL_PROMPT, SCENARIOS)
+
+        assert len(failures) == 3
+        assert all(r.tools_used == ["process_refund"] for r in results)
+        assert all(r.total_tokens > 0 for r in results)
+
+    @pytest.mark.asyncio
+    async def test_optimize_converges(self):
+        """Test mutation-driven GEPA reaches 100% on the stub"""
+        optimizer = _offline_optimizer(max_iterations=3)
+
+        results = await optimizer.optimize(INITIAL_PROMPT, SCENARIOS)
+
+        assert results["final_success_rate"] == 1.0
+        assert results["iterations"][0]["avg_tokens"] > 0
+        assert "Avg Tokens/Scenario" in optimizer.get_results_summary()